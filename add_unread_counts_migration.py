@@ -0,0 +1,20 @@
+"""
+Migration: Backfill ChatParticipant.unread_count for existing conversations
+"""
+
+def run_migration():
+    """Recompute unread counters from each participant's read marker, in chunks"""
+    from main import app
+    from services.database_migration_service import get_migration_service
+    
+    with app.app_context():
+        print("🔄 Backfilling unread counts...")
+        result = get_migration_service().backfill_unread_counts()
+        
+        if result['status'] == 'success':
+            print(f"✅ Updated unread counts for {result['participants_updated']} chat participants")
+        else:
+            print(f"❌ Migration failed: {result.get('error')}")
+
+if __name__ == '__main__':
+    run_migration()
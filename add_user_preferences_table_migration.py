@@ -0,0 +1,22 @@
+"""
+Migration: Move JSON preferences out of User.bio into the user_preferences table
+"""
+
+def run_migration():
+    """Create user_preferences and migrate legacy bio preferences in batches"""
+    from main import app
+    from services.database_migration_service import get_migration_service
+    
+    with app.app_context():
+        print("🔄 Migrating user preferences...")
+        result = get_migration_service().migrate_user_preferences()
+        
+        if result['status'] == 'success':
+            print(f"✅ Migrated preferences for {result['users_migrated']} users")
+            if result['bios_skipped']:
+                print(f"ℹ️ {result['bios_skipped']} bios were plain text and left unchanged")
+        else:
+            print(f"❌ Migration failed: {result.get('error')}")
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1 @@
+# Benchmarks package - standalone micro-benchmarks, run with `python -m benchmarks.<name>`
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: Babel post metadata extraction
+Compares the legacy per-call regex extraction with the single-pass extractor.
+
+Usage: python -m benchmarks.bench_babel_extraction [iterations]
+"""
+
+import random
+import re
+import sys
+import time
+
+from services.babel.babel_extraction import BabelMetadataExtractor
+
+
+SAMPLE_POSTS = [
+    "Looking for someone to practice spanish with! #language #exchange",
+    "Anyone into anime and manga? Let's talk #anime",
+    "Just finished a painting session, then cooking dinner. #art #food",
+    "Learning python and javascript for a react project #coding",
+    "Good morning everyone, what's up today?",
+    "Fluent english speaker, want to learn japanese and korean",
+    "Travel photography from my trip last summer #travel #photography",
+    "Yoga and meditation keep me sane during exams",
+]
+
+
+def legacy_extract(content):
+    """Baseline - the pre-compiled-engine implementation (with the empty-match guard)"""
+    hashtags = list(set(re.findall(r'#(\w+)', content)))
+
+    languages = []
+    for pattern in [
+        r'\b(english|spanish|french|german|italian|portuguese|russian|japanese|korean|chinese|arabic|hindi)\b',
+        r'\b(practice|learn|speak|fluent)\s+(english|spanish|french|german|italian|portuguese|russian|japanese|korean|chinese|arabic|hindi)\b'
+    ]:
+        matches = re.findall(pattern, content.lower())
+        if matches and isinstance(matches[0], tuple):
+            languages.extend([m[1] for m in matches])
+        else:
+            languages.extend(matches)
+
+    topics = []
+    for pattern in [
+        r'\b(gaming|music|movies|sports|technology|art|food|travel|books|anime|manga)\b',
+        r'\b(coding|programming|python|javascript|react|nodejs)\b',
+        r'\b(fitness|yoga|meditation|cooking|photography|drawing|painting)\b'
+    ]:
+        topics.extend(re.findall(pattern, content.lower()))
+
+    return {'hashtags': hashtags, 'languages': list(set(languages)), 'topics': list(set(topics))}
+
+
+def run_benchmark(iterations: int = 50000) -> dict:
+    """Time both implementations over the same synthetic corpus"""
+    random.seed(42)
+    corpus = [random.choice(SAMPLE_POSTS) for _ in range(iterations)]
+    extractor = BabelMetadataExtractor.from_file()
+
+    results = {}
+    for name, extract in (('legacy', legacy_extract), ('single_pass', extractor.extract)):
+        start = time.perf_counter()
+        for content in corpus:
+            extract(content)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'total_seconds': round(elapsed, 4),
+            'posts_per_second': round(iterations / elapsed),
+            'microseconds_per_post': round(elapsed / iterations * 1_000_000, 2)
+        }
+
+    results['speedup'] = round(results['legacy']['total_seconds'] / results['single_pass']['total_seconds'], 2)
+    return results
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    for name, value in run_benchmark(iterations).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,236 @@
+"""
+Micro-benchmark: Bot detection content checks
+Compares the legacy per-rule regex loops and character similarity with the
+compiled single-pass engine and MinHash sketches.
+
+Usage: python -m benchmarks.bench_bot_detection [iterations]
+       python -m benchmarks.bench_bot_detection --check [samples]
+       python -m benchmarks.bench_bot_detection --calibrate [pairs]
+--check fuzzes the engine against the legacy per-rule scan and exits 1 on any
+difference (run it after changing detection rules or the engine).
+--calibrate reports near-duplicate recall and false-positive rate for the
+legacy positional rule and for MinHash thresholds, on edited copies
+(up to 20% of characters substituted, inserted or deleted) and distinct messages.
+"""
+
+import random
+import re
+import string
+import sys
+import time
+
+from services.bot_detection_engine import LINK_PATTERN, CONTACT_PATTERNS
+from services.bot_detection_service import BotDetectionService
+
+
+HAM_MESSAGES = [
+    "hey, how was the exam? i think it went ok lol",
+    "by the way, that reminds me of the trip we took last summer",
+    "oops sorry, autocorrect on my phone changed that word",
+    "I love this song, it makes me so happy 😂",
+    "Anyway, want to practice spanish tomorrow after class?",
+    "in my opinion the second movie was better than the first one",
+]
+
+SPAM_MESSAGES = [
+    "FREE FREE FREE money cash prize click visit follow http://a.io http://b.io http://c.io",
+    "buy cheap pills now telegram: @deals whatsapp: @deals call 555-123-4567",
+    "hellohellohello how are youhow are you subscribe join register",
+    "crypto bitcoin trading profit investment earn money make money",
+    "aaaaaaaaaa URGENT URGENT please please please please respond",
+]
+
+
+# Rule keywords glued together with and without separators, so rules overlap and nest
+FUZZ_TOKENS = [
+    'buy', 'sell', 'deal', 'free', 'win', 'money', 'cash', 'cheap', 'click', 'visit', 'follow', 'join',
+    'http', 'www', '.com', 'telegram', 'whatsapp', 'discord', '$50', '20$', 'earn money', 'make money',
+    'get paid', 'pills', 'viagra', 'dating', 'webcam', 'crypto', 'bitcoin', 'profit', 'hello', 'hey',
+    'how are you', 'please', 'urgent', 'lol', 'haha', 'i think', 'by the way', 'sorry', '555-123-4567',
+    'a.b@mail.com', '5551234567@x.org', 'telegram: @deals', 'HELLOWORLD', 'aaaaaa', ' ', ' ', '\n', '!', '?'
+]
+
+
+def fuzz_messages(samples: int, seed: int = 7):
+    """Random messages built from rule keywords"""
+    rng = random.Random(seed)
+    for _ in range(samples):
+        yield ''.join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(1, 12)))
+
+
+def check_parity(samples: int = 200000) -> list:
+    """Messages where the engine's scan differs from the legacy scan (should be empty)"""
+    service = BotDetectionService()
+    return [
+        message for message in set(fuzz_messages(samples))
+        if legacy_scan(service, message) != service.engine.scan(message)
+    ]
+
+
+def legacy_scan(service, message):
+    """Baseline - one re.search per rule, as the service did before the engine"""
+    indicators = service.bot_indicators
+    message_lower = message.lower()
+    return {
+        'repetitive': any(re.search(p, message, re.IGNORECASE | re.MULTILINE) for p in indicators['repetitive_messages']),
+        'unnatural_language': any(re.search(p, message, re.IGNORECASE) for p in indicators['unnatural_language']),
+        'spam_hits': sum(1 for p in indicators['spam_patterns'] if re.search(p, message_lower)),
+        'link_count': len(re.findall(LINK_PATTERN, message)),
+        'contact_count': sum(len(re.findall(p, message)) for p in CONTACT_PATTERNS),
+        'human_groups': {
+            group for group, patterns in service.human_indicators.items()
+            if any(re.search(p, message_lower) for p in patterns)
+        }
+    }
+
+
+def legacy_similarity(text1, text2):
+    """Baseline - positional character comparison"""
+    if not text1 or not text2:
+        return 0.0
+    longer = text1 if len(text1) > len(text2) else text2
+    shorter = text2 if len(text1) > len(text2) else text1
+    matches = sum(1 for i, char in enumerate(shorter) if char == longer[i])
+    return matches / len(longer)
+
+
+def _repetition_pairs(window, similarity):
+    """Baseline - every pair in a 10 message window, recomputed per message"""
+    count = 0
+    for i in range(len(window) - 1):
+        for j in range(i + 1, len(window)):
+            if similarity(window[i], window[j]) > 0.8:
+                count += 1
+    return count
+
+
+def _edit(rng, message, edits):
+    """Copy of a message with random character substitutions, insertions and deletions"""
+    chars = list(message)
+    for _ in range(edits):
+        i = rng.randrange(len(chars))
+        roll = rng.random()
+        if roll < 0.5:
+            chars[i] = rng.choice(string.ascii_lowercase + ' ')
+        elif roll < 0.75:
+            chars.insert(i, rng.choice(string.ascii_lowercase))
+        elif len(chars) > 1:
+            del chars[i]
+    return ''.join(chars)
+
+
+def edited_corpus(iterations: int, seed: int = 42) -> list:
+    """Mostly distinct messages - edited copies of the ham/spam corpus"""
+    rng = random.Random(seed)
+    base = HAM_MESSAGES + SPAM_MESSAGES
+    return [_edit(rng, message, rng.randint(1, len(message) // 5)) for message in (rng.choice(base) for _ in range(iterations))]
+
+
+def calibrate(pairs: int = 10000, seed: int = 9) -> dict:
+    """Recall on edited copies and false-positive rate on distinct messages"""
+    rng = random.Random(seed)
+    engine = BotDetectionService().engine
+    base = HAM_MESSAGES + SPAM_MESSAGES + list(set(fuzz_messages(300, seed)))
+    base = [message for message in base if len(message.strip()) >= 5]
+    positives = []
+    for _ in range(pairs):
+        message = rng.choice(base)
+        positives.append((message, _edit(rng, message, rng.randint(0, len(message) // 5))))
+    negatives = []
+    while len(negatives) < pairs:
+        a, b = rng.choice(base), rng.choice(base)
+        if a != b:
+            negatives.append((a, b))
+
+    def rates(score, threshold):
+        return {
+            'recall': round(sum(score(a, b) > threshold for a, b in positives) / pairs, 3),
+            'false_positive_rate': round(sum(score(a, b) > threshold for a, b in negatives) / pairs, 4)
+        }
+
+    def minhash(a, b):
+        return engine.similarity(engine.sketch(a), engine.sketch(b))
+
+    results = {'legacy_positional_0.8': rates(legacy_similarity, 0.8)}
+    for threshold in (0.4, 0.5, 0.6, 0.75):
+        results[f'minhash_{threshold}'] = rates(minhash, threshold)
+    return results
+
+
+def run_benchmark(iterations: int = 20000) -> dict:
+    """Time both implementations over the same synthetic ham/spam corpus"""
+    random.seed(42)
+    corpus = [random.choice(HAM_MESSAGES + SPAM_MESSAGES) for _ in range(iterations)]
+    distinct = edited_corpus(iterations)
+    service = BotDetectionService()
+    engine = service.engine
+
+    def legacy_dedupe(messages):
+        window = []
+        for message in messages:
+            window = (window + [message])[-10:]
+            _repetition_pairs(window, legacy_similarity)
+
+    def minhash_dedupe(messages):
+        # As the service does: the new message vs the 9 before it, scored on arrival
+        window = []
+        for message in messages:
+            window = (window + [service.build_sample(window, message, 0.0)])[-9:]
+
+    def legacy(messages):
+        for message in messages:
+            legacy_scan(service, message)
+        legacy_dedupe(messages)
+
+    def compiled(messages):
+        for message in messages:
+            engine.scan(message)
+        minhash_dedupe(messages)
+
+    runs = (
+        ('legacy', legacy, corpus),
+        ('compiled', compiled, corpus),
+        ('legacy_dedupe', legacy_dedupe, corpus),
+        ('minhash_dedupe', minhash_dedupe, corpus),
+        ('legacy_dedupe_distinct', legacy_dedupe, distinct),
+        ('minhash_dedupe_distinct', minhash_dedupe, distinct),
+    )
+    results = {}
+    for name, run, messages in runs:
+        start = time.perf_counter()
+        run(messages)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'total_seconds': round(elapsed, 4),
+            'messages_per_second': round(iterations / elapsed),
+            'microseconds_per_message': round(elapsed / iterations * 1_000_000, 2)
+        }
+
+    def speedup(baseline, new):
+        return round(results[baseline]['total_seconds'] / results[new]['total_seconds'], 2)
+
+    results['speedup'] = speedup('legacy', 'compiled')
+    results['dedupe_speedup'] = speedup('legacy_dedupe', 'minhash_dedupe')
+    results['dedupe_speedup_distinct'] = speedup('legacy_dedupe_distinct', 'minhash_dedupe_distinct')
+    results['scan_mismatches'] = sum(
+        1 for message in set(corpus) if legacy_scan(service, message) != engine.scan(message)
+    )
+    return results
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--check']:
+        mismatches = check_parity(int(sys.argv[2]) if len(sys.argv) > 2 else 200000)
+        for message in mismatches[:20]:
+            print(f"mismatch: {message!r}")
+        print(f"scan_mismatches: {len(mismatches)}")
+        sys.exit(1 if mismatches else 0)
+
+    if sys.argv[1:2] == ['--calibrate']:
+        for name, value in calibrate(int(sys.argv[2]) if len(sys.argv) > 2 else 10000).items():
+            print(f"{name}: {value}")
+        sys.exit(0)
+
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, value in run_benchmark(iterations).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,591 @@
+"""
+End-to-end load benchmark: chat, translation, Babel feed, discovery and search
+Boots the real app (main.py) against a throwaway SQLite database and a stub
+DeepL server, seeds a synthetic multilingual community, then drives each
+scenario with virtual users over HTTP and Socket.IO. Reports throughput,
+p50/p95/p99 latency, SQL queries per operation and process memory, and can
+save the results as a JSON baseline to compare later commits against.
+
+Scenarios:
+  direct_chat     1:1 chats, send over Socket.IO until the sender sees its echo
+  group_room      50-person multilingual group chats, echo and fan-out delivery
+  babel_timeline  scroll the Babel timeline five pages deep with keyset cursors
+  room_discovery  discoverable / trending / featured room listings
+  friend_search   typeahead over friend and user search
+
+A run is invalid, and exits 1 without saving a baseline, when any operation
+fails more often than --max-error-rate or when a translating scenario ran but
+the stub DeepL server received no requests.
+
+Usage: python -m benchmarks.bench_end_to_end [--scenarios a,b] [--users 20] [--duration 15]
+       [--deepl-latency-ms 80] [--save-baseline] [--compare] [--tolerance 0.25] [--output run.json]
+       [--max-error-rate 0.01]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPO_ROOT, 'benchmarks', 'baselines', 'end_to_end.json')
+LOGIN_PATH = '/__bench__/login'  # Registered on the benchmark app only
+
+LANGUAGES = ['en', 'es', 'de', 'fr', 'ja', 'pt', 'it', 'zh']
+PHRASES = {
+    'en': ['how was your day', 'see you tomorrow', 'did you watch the match', 'let us grab coffee'],
+    'es': ['como estuvo tu dia', 'nos vemos manana', 'viste el partido', 'tomamos un cafe'],
+    'de': ['wie war dein tag', 'bis morgen', 'hast du das spiel gesehen', 'lass uns kaffee trinken'],
+    'fr': ['comment etait ta journee', 'a demain', 'tu as vu le match', 'on prend un cafe'],
+    'ja': ['kyou wa dou datta', 'mata ashita', 'shiai mita', 'kohi nomou'],
+    'pt': ['como foi seu dia', 'ate amanha', 'viu o jogo', 'vamos tomar um cafe'],
+    'it': ['com e andata oggi', 'a domani', 'hai visto la partita', 'prendiamo un caffe'],
+    'zh': ['ni jintian zenmeyang', 'mingtian jian', 'ni kan bisai le ma', 'qu he kafei ba'],
+}
+CHAT_EVENTS = ('joined_chat', 'new_message', 'message_error', 'message_blocked')
+PASSIVE_OPERATIONS = ('room.deliver',)  # Observed on receivers, not requests; kept out of 'all'
+TRANSLATING_SCENARIOS = ('direct_chat', 'group_room')  # Every message goes through the stub DeepL
+
+
+# Environment
+def _prepare_environment(workdir: str) -> None:
+    """Point the app at a throwaway SQLite database before config.py is imported"""
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ.setdefault('USER_STATS_BACKGROUND_REFRESH', 'false')
+    os.environ.setdefault('SERVICE_WARMUP', 'false')  # Warmed explicitly before measuring
+    os.environ.setdefault('TRACE_SAMPLE_RATE', '0')
+    os.environ.setdefault('DB_HEALTH_BACKGROUND', 'false')
+    os.chdir(workdir)  # Services keep their SQLite side caches in the working directory
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"App did not start listening on port {port}")
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process (server and clients share it)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class QueryCounter:
+    """Counts SQL statements the app executes (before_cursor_execute)"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+
+class BenchApp:
+    """The real app served on a local port, with the stub DeepL server behind it"""
+
+    def __init__(self, deepl_latency_ms: float):
+        from benchmarks.deepl_stub import DeepLStubServer
+
+        self.deepl = DeepLStubServer(latency_ms=deepl_latency_ms, jitter_ms=deepl_latency_ms / 4).start()
+
+        import main
+        from flask_login import login_user
+        from models import db, User
+        from services.deepl_integration import get_deepl_service
+        from services.rate_limiter import get_rate_limiter, RateLimitPolicy
+
+        self.app, self.socketio, self.db = main.app, main.socketio, db
+
+        @self.app.route(f"{LOGIN_PATH}/<int:user_id>")
+        def bench_login(user_id):
+            login_user(db.session.get(User, user_id))
+            return {'user_id': user_id}
+
+        deepl = get_deepl_service()
+        deepl.api_url = f"{self.deepl.url}/v2/translate"
+        deepl.usage_url = f"{self.deepl.url}/v2/usage"
+        # Virtual users send far more than a person does in a day; keep the burst limit only
+        get_rate_limiter().register_policy(RateLimitPolicy('message_daily', limit=10 ** 9, window=86400))
+
+        with self.app.app_context():
+            self.queries = QueryCounter(db.engine)
+
+        # A running worker swaps in WebSocketService's handlers on its first message; start there
+        from services.websocket_service import initialize_websocket_service
+        with self.app.app_context():
+            initialize_websocket_service(self.socketio)
+
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)  # No access log per request
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(
+            target=self.socketio.run, args=(self.app,),
+            kwargs={'host': '127.0.0.1', 'port': self.port, 'debug': False, 'use_reloader': False,
+                    'log_output': False, 'allow_unsafe_werkzeug': True},
+            name='bench-app', daemon=True
+        ).start()
+        _wait_for_port(self.port)
+
+    def warm_up(self) -> None:
+        """Build lazily constructed services before anything is measured"""
+        from services.service_container import get_container
+        with self.app.app_context():
+            get_container().warm_up()
+
+
+# Seed data
+def _username(rng: random.Random, index: int) -> str:
+    syllables = ['ka', 'lo', 'mi', 'ra', 'su', 'te', 'no', 'vi', 'an', 'el', 'or', 'is']
+    return ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) + str(index)
+
+
+def seed_community(bench: BenchApp, users: int, group_size: int = 50, posts_per_user: int = 5,
+                   rooms: int = 200, friends_per_user: int = 10) -> dict:
+    """Synthetic users, 1:1 and group chats, friendships, Babel posts and discoverable rooms"""
+    from models import db, User, UserType, Chat, ChatParticipant, BabelPost
+    from models.safety_models import Friendship
+    from models.user_models import Room, RoomMember, RoomType, RoomMemberRole
+
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with bench.app.app_context():
+        people = [
+            User(username=_username(rng, index), email=f"bench{index}@example.com", password_hash='bench',
+                 preferred_language=LANGUAGES[index % len(LANGUAGES)], birth_date=date(1990, 1, 1),
+                 user_type=UserType.ADULT, is_discoverable=True, display_name=None)
+            for index in range(users)
+        ]
+        db.session.add_all(people)
+        db.session.flush()
+        user_ids = [person.id for person in people]
+
+        friendships = set()
+        for position, user_id in enumerate(user_ids):
+            for offset in range(1, friends_per_user // 2 + 1):
+                friend_id = user_ids[(position + offset) % len(user_ids)]
+                friendships.update({(user_id, friend_id), (friend_id, user_id)})
+        db.session.add_all(Friendship(user1_id=a, user2_id=b) for a, b in friendships)
+
+        direct_chats = []
+        for first, second in zip(user_ids[0::2], user_ids[1::2]):
+            chat = Chat(is_group=False, created_by=first)
+            db.session.add(chat)
+            db.session.flush()
+            db.session.add_all([ChatParticipant(chat_id=chat.id, user_id=first),
+                                ChatParticipant(chat_id=chat.id, user_id=second)])
+            direct_chats.append((chat.id, first, second))
+
+        group_chats = []
+        for start in range(0, len(user_ids) - group_size + 1, group_size):
+            members = user_ids[start:start + group_size]
+            chat = Chat(name=f"Language exchange {len(group_chats) + 1}", is_group=True,
+                        created_by=members[0], max_participants=group_size)
+            db.session.add(chat)
+            db.session.flush()
+            db.session.add_all(ChatParticipant(chat_id=chat.id, user_id=member) for member in members)
+            group_chats.append((chat.id, members))
+
+        tags = ['#travel', '#music', '#food', '#football', '#anime', '#books', '#coding', '#language']
+        db.session.add_all(
+            BabelPost(user_id=user_id, content=f"{rng.choice(PHRASES[rng.choice(LANGUAGES)])} {rng.choice(tags)}",
+                      tags=json.dumps([rng.choice(tags)]), languages=rng.choice(LANGUAGES),
+                      likes_count=rng.randint(0, 50), comments_count=rng.randint(0, 10))
+            for user_id in user_ids for _ in range(posts_per_user)
+        )
+
+        for index in range(rooms):
+            owner_id = rng.choice(user_ids)
+            room = Room(name=f"{rng.choice(tags)[1:].title()} room {index}", type=RoomType.PUBLIC,
+                        owner_id=owner_id, is_discoverable=True, activity_score=rng.randint(0, 1000))
+            db.session.add(room)
+            db.session.flush()
+            db.session.add(RoomMember(room_id=room.id, user_id=owner_id, role=RoomMemberRole.OWNER))
+
+        db.session.commit()
+        usernames = [person.username for person in people]
+
+    return {
+        'user_ids': user_ids,
+        'usernames': usernames,
+        'direct_chats': direct_chats,
+        'group_chats': group_chats,
+        'seed_seconds': round(time.perf_counter() - started, 2)
+    }
+
+
+# Scenarios
+def _message_text(user, rng: random.Random) -> str:
+    """A varied phrase so bot detection sees human-looking traffic"""
+    user.state['sent'] = user.state.get('sent', 0) + 1
+    language = LANGUAGES[user.user_id % len(LANGUAGES)]
+    return f"{rng.choice(PHRASES[language])} {rng.choice(string.ascii_lowercase)}{user.state['sent']}"
+
+
+def _message_body(payload: dict) -> str:
+    """Original text of a new_message payload (the two broadcast paths use different keys)"""
+    return payload.get('original_text') or payload.get('content') or payload.get('text')
+
+
+def _is_own_echo(user, text: str):
+    return lambda payload: payload.get('sender_id') == user.user_id and _message_body(payload) == text
+
+
+def _join_chat(user, chat_id: int) -> None:
+    user.emit_and_wait('chat.join', 'join_chat', {'chat_id': chat_id}, 'joined_chat',
+                       match=lambda payload: payload.get('chat_id') == chat_id)
+
+
+def _send(user, chat_id: int, name: str, rng: random.Random) -> None:
+    text = _message_text(user, rng)
+    user.emit_and_wait(name, 'send_message', {'chat_id': chat_id, 'message': text}, 'new_message',
+                       match=_is_own_echo(user, text), failure_events=('message_error', 'message_blocked'))
+
+
+def scenario_direct_chat(bench, community, users, stats, args):
+    """Pairs of users chatting 1:1 (each message is translated through the stub DeepL)"""
+    pairs = community['direct_chats'][:max(1, users // 2)]
+    clients = []
+    for chat_id, first, second in pairs:
+        for user_id in (first, second):
+            client = _client(bench, user_id, stats)
+            client.connect_socket(CHAT_EVENTS)
+            _join_chat(client, chat_id)
+            client.state['chat_id'] = chat_id
+            clients.append(client)
+    rng = random.Random(7)
+    return clients, lambda user: _send(user, user.state['chat_id'], 'chat.send', rng), args.think_time
+
+
+def scenario_group_room(bench, community, users, stats, args):
+    """Members of 50-person multilingual groups sending; every connected member receives"""
+    if not community['group_chats']:
+        raise RuntimeError('group_room needs at least one full group (--community-users >= 50)')
+    chat_id, members = community['group_chats'][0]
+    sent_at = {}
+    clients = []
+    for user_id in members[:min(users, len(members))]:
+        client = _client(bench, user_id, stats)
+        client.connect_socket(CHAT_EVENTS)
+        _join_chat(client, chat_id)
+
+        def on_delivery(event, payload, client=client):
+            # Fan-out latency: send time on the sender's thread to receipt on this member's
+            if event == 'new_message' and payload.get('sender_id') != client.user_id:
+                started = sent_at.get(_message_body(payload))
+                if started is not None:
+                    client.stats.record('room.deliver', time.perf_counter() - started)
+
+        client.listeners.append(on_delivery)
+        clients.append(client)
+
+    rng = random.Random(11)
+
+    def task(user):
+        text = _message_text(user, rng)
+        sent_at[text] = time.perf_counter()
+        user.emit_and_wait('room.send', 'send_message', {'chat_id': chat_id, 'message': text}, 'new_message',
+                           match=_is_own_echo(user, text), failure_events=('message_error', 'message_blocked'))
+    return clients, task, args.think_time
+
+
+def scenario_babel_timeline(bench, community, users, stats, args):
+    """Scroll the Babel timeline five pages deep, then start again from the top"""
+    clients = [_client(bench, user_id, stats) for user_id in community['user_ids'][:users]]
+
+    def task(user):
+        cursor = user.state.get('cursor') if user.state.get('page', 0) < 5 else None
+        result = user.get('babel.timeline', '/api/babel/timeline', per_page=20, **({'cursor': cursor} if cursor else {}))
+        next_cursor = ((result or {}).get('pagination') or {}).get('next_cursor')
+        user.state['page'] = user.state.get('page', 0) + 1 if cursor and next_cursor else 1
+        user.state['cursor'] = next_cursor
+    return clients, task, (0.0, 0.0)
+
+
+def scenario_room_discovery(bench, community, users, stats, args):
+    """Room discovery pages, sometimes filtered by a search term"""
+    clients = [_client(bench, user_id, stats) for user_id in community['user_ids'][:users]]
+    rng = random.Random(13)
+    searches = ['', '', 'music', 'travel', 'food']
+
+    def task(user):
+        page = rng.choice(('discoverable', 'discoverable', 'trending', 'featured'))
+        params = {'search': rng.choice(searches)} if page == 'discoverable' else {}
+        user.get(f"rooms.{page}", f"/api/rooms/{page}", **params)
+    return clients, task, (0.0, 0.0)
+
+
+def scenario_friend_search(bench, community, users, stats, args):
+    """Typeahead: 1-4 typed characters of a real username, friend and user search"""
+    clients = [_client(bench, user_id, stats) for user_id in community['user_ids'][:users]]
+    rng = random.Random(17)
+    usernames = community['usernames']
+
+    def task(user):
+        typed = rng.choice(usernames)[:rng.randint(1, 4)]
+        if rng.random() < 0.5:
+            user.get('search.friends', '/api/v1/friends/search', q=typed)
+        else:
+            user.get('search.users', '/api/v1/users/search', q=typed, limit=10)
+    return clients, task, (0.0, 0.0)
+
+
+SCENARIOS = {
+    'direct_chat': scenario_direct_chat,
+    'group_room': scenario_group_room,
+    'babel_timeline': scenario_babel_timeline,
+    'room_discovery': scenario_room_discovery,
+    'friend_search': scenario_friend_search,
+}
+
+
+def _client(bench, user_id, stats):
+    from benchmarks.load_client import VirtualUser
+    return VirtualUser(bench.base_url, user_id, stats, LOGIN_PATH)
+
+
+def run_scenario(name: str, bench: BenchApp, community: dict, args) -> dict:
+    """Run one scenario and return its report"""
+    from benchmarks.load_client import LoadStats, run_users
+
+    setup_stats = LoadStats()  # Connects and joins are not part of the measured window
+    clients, task, think_time = SCENARIOS[name](bench, community, args.users, setup_stats, args)
+    stats = LoadStats()
+    for client in clients:
+        client.stats = stats
+
+    rss_before = _rss_mb()
+    queries_before = bench.queries.count
+    wall_seconds = run_users(clients, task, args.duration, wait=think_time)
+    queries = bench.queries.count - queries_before
+    for client in clients:
+        client.close()
+
+    operations = stats.summary(wall_seconds, passive=PASSIVE_OPERATIONS)
+    measured = operations.get('all', {}).get('count', 0)
+    report = {
+        'virtual_users': len(clients),
+        'wall_seconds': round(wall_seconds, 2),
+        'operations': operations,
+        'queries_per_op': round(queries / measured, 1) if measured else None,
+        'rss_mb': round(_rss_mb(), 1),
+        'rss_growth_mb': round(_rss_mb() - rss_before, 1)
+    }
+    setup_failures = {op: row['outcomes'] for op, row in setup_stats.summary(1).items() if row['errors'] and op != 'all'}
+    if setup_failures:
+        report['setup_failures'] = setup_failures
+    return report
+
+
+# Validation
+def find_problems(results: dict, max_error_rate: float) -> list:
+    """Why a run cannot serve as a baseline - failing operations or an unused DeepL stub"""
+    problems = []
+    for scenario, report in results['scenarios'].items():
+        for operation, row in report['operations'].items():
+            if operation == 'all' or not row['count']:
+                continue
+            error_rate = row['errors'] / row['count']
+            if error_rate > max_error_rate:
+                failures = {outcome: count for outcome, count in row['outcomes'].items() if outcome != 'ok'}
+                problems.append(f"{scenario}.{operation}: {row['errors']}/{row['count']} failed {failures}")
+        if report.get('setup_failures'):
+            problems.append(f"{scenario}: setup failures {report['setup_failures']}")
+
+    translating = [name for name in results['scenarios'] if name in TRANSLATING_SCENARIOS]
+    if translating and not results['meta']['deepl_requests']:
+        problems.append(f"{', '.join(translating)} ran but the stub DeepL server received no requests")
+    return problems
+
+
+# Baselines
+def _headline(report: dict) -> dict:
+    """The numbers compared across commits"""
+    overall = report['operations'].get('all', {})
+    return {
+        'throughput_per_s': overall.get('throughput_per_s'),
+        'p99_ms': overall.get('p99_ms'),
+        'error_rate': round(overall['errors'] / overall['count'], 3) if overall.get('count') else None,
+        'queries_per_op': report['queries_per_op'],
+        'rss_mb': report['rss_mb']
+    }
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions beyond `tolerance` (relative) in throughput, p99 latency or queries per op"""
+    regressions = []
+    for scenario, report in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if not previous:
+            continue
+        current, before = _headline(report), previous['headline']
+        checks = (
+            ('throughput_per_s', lambda now, then: now < then * (1 - tolerance)),
+            ('p99_ms', lambda now, then: now > then * (1 + tolerance)),
+            ('queries_per_op', lambda now, then: now > then * (1 + tolerance) + 0.5),
+            ('error_rate', lambda now, then: now > then + 0.01),
+        )
+        for metric, regressed in checks:
+            now, then = current.get(metric), before.get(metric)
+            if now is not None and then is not None and regressed(now, then):
+                regressions.append(f"{scenario}.{metric}: {then} -> {now}")
+    return regressions
+
+
+def _print_report(name: str, report: dict) -> None:
+    print(f"\n{name}  ({report['virtual_users']} users, {report['wall_seconds']}s, "
+          f"{report['queries_per_op']} queries/op, rss {report['rss_mb']}MB +{report['rss_growth_mb']}MB)")
+    print(f"  {'operation':<20}{'count':>8}{'errors':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for operation, row in report['operations'].items():
+        print(f"  {operation:<20}{row['count']:>8}{row['errors']:>8}{row['throughput_per_s']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+        failures = {outcome: count for outcome, count in row['outcomes'].items() if outcome != 'ok'}
+        if failures and operation != 'all':
+            print(f"    failures: {failures}")
+    if report.get('setup_failures'):
+        print(f"  setup failures: {report['setup_failures']}")
+
+
+def run_benchmark(scenarios=None, users: int = 20, duration: float = 15.0, community_users: int = 400,
+                  deepl_latency_ms: float = 80.0, think_time=(0.2, 0.6)) -> dict:
+    """Boot the app, seed it and run the scenarios; returns the full results"""
+    args = argparse.Namespace(users=users, duration=duration, think_time=tuple(think_time))
+    workdir = tempfile.mkdtemp(prefix='unibabel-bench-')
+    _prepare_environment(workdir)
+
+    boot_started = time.perf_counter()
+    bench = BenchApp(deepl_latency_ms)
+    boot_seconds = time.perf_counter() - boot_started
+    community = seed_community(bench, community_users)
+    bench.warm_up()
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'params': {'users': users, 'duration': duration, 'community_users': community_users,
+                       'deepl_latency_ms': deepl_latency_ms, 'think_time': list(think_time)},
+            'boot_seconds': round(boot_seconds, 2),
+            'seed_seconds': community['seed_seconds'],
+            'workdir': workdir
+        },
+        'scenarios': {}
+    }
+    for name in scenarios or SCENARIOS:
+        report = run_scenario(name, bench, community, args)
+        report['headline'] = _headline(report)
+        results['scenarios'][name] = report
+        _print_report(name, report)
+    results['meta']['deepl_requests'] = bench.deepl.requests
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='End-to-end load benchmark')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--users', type=int, default=20, help='concurrent virtual users per scenario')
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds per scenario')
+    parser.add_argument('--community-users', type=int, default=400, help='seeded users')
+    parser.add_argument('--deepl-latency-ms', type=float, default=80.0, help='stub DeepL latency')
+    parser.add_argument('--think-time', type=float, nargs=2, default=(0.2, 0.6), metavar=('MIN', 'MAX'),
+                        help='seconds between chat messages per user')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='exit 1 on regressions against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='relative regression tolerance')
+    parser.add_argument('--output', help='also write the full results to this JSON file')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='highest tolerated per-operation error rate')
+    options = parser.parse_args(argv)
+
+    unknown = [name for name in options.scenarios.split(',') if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    results = run_benchmark(options.scenarios.split(','), options.users, options.duration,
+                            options.community_users, options.deepl_latency_ms, options.think_time)
+
+    results['problems'] = find_problems(results, options.max_error_rate)
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    status = 0
+    print(f"\ndeepl stub requests: {results['meta']['deepl_requests']}")
+    if results['problems']:
+        print(f"\nINVALID RUN - {len(results['problems'])} problems:")
+        for problem in results['problems']:
+            print(f"  {problem}")
+        status = 1
+    if options.compare:
+        if os.path.exists(options.baseline):
+            with open(options.baseline) as baseline_file:
+                baseline = json.load(baseline_file)
+            if baseline.get('meta', {}).get('params') != results['meta']['params']:
+                print(f"\nnote: baseline was recorded with {baseline.get('meta', {}).get('params')}")
+            regressions = compare_to_baseline(results, baseline, options.tolerance)
+            print(f"\nCompared with baseline {baseline.get('meta', {}).get('commit')}: "
+                  + ('no regressions' if not regressions else f"{len(regressions)} regressions"))
+            for regression in regressions:
+                print(f"  REGRESSION {regression}")
+            status = 1 if regressions else status
+        else:
+            print(f"\nno baseline at {options.baseline}; run with --save-baseline first")
+
+    if options.save_baseline and results['problems']:
+        print("\nbaseline not written - fix the problems above first")
+    elif options.save_baseline:
+        os.makedirs(os.path.dirname(options.baseline), exist_ok=True)
+        with open(options.baseline, 'w') as baseline_file:
+            json.dump({'meta': results['meta'],
+                       'scenarios': {name: {'headline': report['headline']}
+                                     for name, report in results['scenarios'].items()}},
+                      baseline_file, indent=2)
+        print(f"\nbaseline written to {options.baseline}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: Rate limiter under concurrent load
+Compares the legacy "load every sent message and count" daily check with the
+O(1) sliding-window and token-bucket policies, for 10k users across threads.
+
+Usage: python -m benchmarks.bench_rate_limiter [users] [hits_per_user] [threads]
+"""
+
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from services.rate_limiter import RateLimiter, MemoryRateLimitBackend, DEFAULT_POLICIES
+
+
+def legacy_daily_check(connection, user_id, now, limit=100):
+    """Baseline - load every message the user sent, count in Python, then insert"""
+    sent = connection.execute('SELECT * FROM message WHERE sender_id = ?', (user_id,)).fetchall()
+    allowed = len(sent) < limit
+    if allowed:
+        connection.execute('INSERT INTO message (sender_id, original_text, timestamp) VALUES (?, ?, ?)',
+                           (user_id, 'hello there', now))
+    return allowed
+
+
+def _legacy_database(history):
+    """In-memory SQLite message table (indexed on sender_id) with the seed history"""
+    connection = sqlite3.connect(':memory:', check_same_thread=False)
+    connection.execute('CREATE TABLE message (id INTEGER PRIMARY KEY, sender_id INTEGER, '
+                       'original_text TEXT, timestamp REAL)')
+    connection.execute('CREATE INDEX idx_message_sender ON message (sender_id)')
+    connection.executemany(
+        'INSERT INTO message (sender_id, original_text, timestamp) VALUES (?, ?, ?)',
+        ((user_id, 'hello there', stamp) for user_id, stamps in history.items() for stamp in stamps)
+    )
+    return connection
+
+
+def _percentile(samples, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _run_threads(threads, work):
+    """Run `work(thread_index)` on N threads, returns wall-clock seconds"""
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def run_benchmark(users: int = 10000, hits_per_user: int = 20, threads: int = 8) -> dict:
+    """Time both daily checks over the same shuffled hit stream"""
+    random.seed(42)
+    stream = [user_id for user_id in range(users) for _ in range(hits_per_user)]
+    random.shuffle(stream)
+    chunks = [stream[i::threads] for i in range(threads)]
+
+    # Pre-existing history so the legacy check has realistic rows to load
+    base_history = {user_id: [time.time() - 3600] * 40 for user_id in range(users)}
+    connection = _legacy_database(base_history)
+    connection_lock = threading.Lock()
+
+    def legacy(index):
+        for user_id in chunks[index]:
+            with connection_lock:  # One shared connection, as sqlite serializes writers anyway
+                legacy_daily_check(connection, user_id, time.time())
+
+    limiter = RateLimiter(MemoryRateLimitBackend(max_keys=users * 4), DEFAULT_POLICIES)
+    latencies = [[] for _ in range(threads)]
+
+    def limited(index):
+        record = latencies[index].append
+        for user_id in chunks[index]:
+            start = time.perf_counter()
+            if limiter.hit('message_burst', user_id).allowed:
+                limiter.hit('message_daily', user_id, seed=lambda: base_history[user_id])
+            record(time.perf_counter() - start)
+
+    total_hits = len(stream)
+    results = {}
+    for name, work in (('legacy', legacy), ('rate_limiter', limited)):
+        elapsed = _run_threads(threads, work)
+        results[name] = {
+            'total_seconds': round(elapsed, 4),
+            'checks_per_second': round(total_hits / elapsed)
+        }
+
+    all_latencies = [sample for thread_samples in latencies for sample in thread_samples]
+    results['rate_limiter']['p50_us'] = round(_percentile(all_latencies, 0.50) * 1_000_000, 2)
+    results['rate_limiter']['p99_us'] = round(_percentile(all_latencies, 0.99) * 1_000_000, 2)
+    results['speedup'] = round(results['legacy']['total_seconds'] / results['rate_limiter']['total_seconds'], 2)
+    results['limiter_stats'] = limiter.backend.get_stats()
+    return results
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:4]]
+    for name, value in run_benchmark(*args).items():
+        print(f"{name}: {value}")
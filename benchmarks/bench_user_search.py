@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: User typeahead search
+Compares the legacy `ilike('%q%')` scan (a leading wildcard can't use an index,
+so every row is checked) with the prefix index, over a synthetic user table.
+
+Usage: python -m benchmarks.bench_user_search [users] [queries]
+"""
+
+import random
+import string
+import sys
+import time
+
+from models import UserType
+from services.user_search_index import UserSearchIndex, VISIBLE_SCOPES, SCOPE_OPEN
+
+
+def legacy_search(rows, query, limit=10):
+    """Baseline - case-insensitive substring test on every row, as ILIKE '%q%' does"""
+    needle = query.lower()
+    matches = []
+    for user_id, username, display_name, user_type, is_discoverable, is_blocked in rows:
+        if not is_discoverable or is_blocked:
+            continue
+        if needle in username.lower() or (display_name and needle in display_name.lower()):
+            matches.append(user_id)
+            if len(matches) >= limit:
+                break
+    return matches
+
+
+def _synthetic_users(users):
+    """Random usernames/display names with the platform's age mix"""
+    random.seed(42)
+    user_types = [UserType.CHILD] * 2 + [UserType.TEEN] * 3 + [UserType.ADULT] * 5
+    rows = []
+    for user_id in range(1, users + 1):
+        username = ''.join(random.choices(string.ascii_lowercase, k=random.randint(5, 12))) + str(user_id)
+        display_name = username.capitalize() if random.random() < 0.5 else None
+        rows.append((user_id, username, display_name, random.choice(user_types),
+                     random.random() < 0.9, random.random() < 0.01))
+    return rows
+
+
+def _percentile(samples, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_benchmark(users: int = 1000000, queries: int = 200) -> dict:
+    """Time both searches over the same typed prefixes (1-4 characters)"""
+    rows = _synthetic_users(users)
+    typed = [row[1][:random.randint(1, 4)] for row in random.sample(rows, queries)]
+
+    index = UserSearchIndex()
+    start = time.perf_counter()
+    index.load_rows(rows)
+    build_seconds = time.perf_counter() - start
+    index.refreshed_at = index.loaded_at = time.time() + 86400  # No DB refresh during the run
+
+    results = {'users': users, 'index_build_seconds': round(build_seconds, 2)}
+    legacy_queries = typed[:max(1, queries // 10)]  # The scan is slow - sample it
+    for name, search, sample in (
+        ('legacy', lambda q: legacy_search(rows, q), legacy_queries),
+        ('prefix_index', lambda q: index.search_prefix(q, VISIBLE_SCOPES, 10), typed),
+        ('prefix_index_scoped', lambda q: index.search_prefix(q, (SCOPE_OPEN,), 10), typed)
+    ):
+        latencies = []
+        for query in sample:
+            begin = time.perf_counter()
+            search(query)
+            latencies.append(time.perf_counter() - begin)
+        results[name] = {
+            'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+            'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3)
+        }
+
+    results['speedup_p99'] = round(results['legacy']['p99_ms'] / results['prefix_index']['p99_ms'], 1)
+    return results
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    for name, value in run_benchmark(*args).items():
+        print(f"{name}: {value}")
@@ -0,0 +1,102 @@
+"""
+Stub DeepL HTTP server for benchmarks
+Answers /v2/translate and /v2/usage like DeepL Pro, after a configurable
+latency, so translation-heavy flows can be load tested without API cost or
+network variance.
+
+Usage: python -m benchmarks.deepl_stub [port] [latency_ms] [jitter_ms]
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class DeepLStubServer:
+    """Threaded DeepL look-alike; translations are the text tagged with the target language"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 80.0, jitter_ms: float = 20.0, error_rate: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.characters = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'DeepLStubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='deepl-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _delay(self) -> None:
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                if self.path.rstrip('/') != '/v2/translate':
+                    return self._reply(404, {'message': 'Not found'})
+
+                texts = form.get('text', [])
+                target = (form.get('target_lang') or ['EN'])[0]
+                with stub._lock:
+                    stub.requests += 1
+                    stub.characters += sum(len(text) for text in texts)
+                stub._delay()
+                if stub.error_rate and random.random() < stub.error_rate:
+                    return self._reply(429, {'message': 'Too many requests'})
+                self._reply(200, {'translations': [
+                    {'detected_source_language': (form.get('source_lang') or ['EN'])[0], 'text': f"[{target}] {text}"}
+                    for text in texts
+                ]})
+
+            def do_GET(self):
+                if self.path.rstrip('/') != '/v2/usage':
+                    return self._reply(404, {'message': 'Not found'})
+                self._reply(200, {'character_count': stub.characters, 'character_limit': 1000000000})
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        return Handler
+
+
+if __name__ == '__main__':
+    args = [float(arg) for arg in sys.argv[1:4]]
+    server = DeepLStubServer(int(args[0]) if args else 8765, *args[1:]).start()
+    print(f"DeepL stub listening on {server.url} (latency {server.latency_ms}ms ±{server.jitter_ms}ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,192 @@
+"""
+Load generator for the end-to-end benchmarks
+Locust-style virtual users: each one is a logged-in HTTP session plus an
+optional Socket.IO client, looping over a weighted task with think time while
+every operation's latency and outcome is recorded.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+try:
+    import socketio
+    SOCKETIO_CLIENT_AVAILABLE = True
+except ImportError:
+    SOCKETIO_CLIENT_AVAILABLE = False
+
+
+def _percentile(samples, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class LoadStats:
+    """Latencies and outcomes per operation, shared by all virtual users"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, outcome: str = 'ok') -> None:
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.outcomes[name][outcome] += 1
+
+    def summary(self, wall_seconds: float, passive: Tuple[str, ...] = ()) -> Dict[str, dict]:
+        """Throughput and p50/p95/p99 per operation, plus an 'all' row of the non-passive ones"""
+        with self._lock:
+            rows = dict(self.latencies)
+            rows['all'] = [sample for name, samples in self.latencies.items() if name not in passive for sample in samples]
+            outcomes = {name: dict(counter) for name, counter in self.outcomes.items()}
+        outcomes['all'] = dict(sum((Counter(counter) for name, counter in outcomes.items() if name not in passive), Counter()))
+
+        summary = {}
+        for name, samples in rows.items():
+            if not samples:
+                continue
+            ok = outcomes[name].get('ok', 0)
+            summary[name] = {
+                'count': len(samples),
+                'errors': len(samples) - ok,
+                'outcomes': outcomes[name],
+                'throughput_per_s': round(ok / wall_seconds, 1) if wall_seconds else None,
+                'p50_ms': round(_percentile(samples, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(samples, 0.95) * 1000, 2),
+                'p99_ms': round(_percentile(samples, 0.99) * 1000, 2),
+                'max_ms': round(max(samples) * 1000, 2)
+            }
+        return summary
+
+
+class VirtualUser:
+    """One simulated client: a logged-in requests.Session and, optionally, a Socket.IO connection"""
+
+    def __init__(self, base_url: str, user_id: int, stats: LoadStats, login_path: str):
+        self.base_url = base_url
+        self.user_id = user_id
+        self.stats = stats
+        self.http = requests.Session()
+        self.socket = None
+        self.state = {}  # Per-user scenario state (cursors, chat ids, ...)
+        self.listeners = []  # Callables (event, payload) invoked for every received event
+        self._waiters = []  # (event, match, threading.Event, slot)
+        self._waiters_lock = threading.Lock()
+
+        response = self.http.get(f"{base_url}{login_path}/{user_id}")
+        response.raise_for_status()
+
+    # HTTP
+    def get(self, name: str, path: str, **params) -> Optional[dict]:
+        return self._request(name, 'GET', path, params=params)
+
+    def post(self, name: str, path: str, payload: Optional[dict] = None) -> Optional[dict]:
+        return self._request(name, 'POST', path, json=payload or {})
+
+    def _request(self, name: str, method: str, path: str, **kwargs) -> Optional[dict]:
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, f"{self.base_url}{path}", timeout=30, **kwargs)
+        except requests.RequestException as e:
+            self.stats.record(name, time.perf_counter() - started, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - started
+        self.stats.record(name, elapsed, 'ok' if response.status_code < 400 else f"http_{response.status_code}")
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    # Socket.IO
+    def connect_socket(self, events: Tuple[str, ...] = ()) -> None:
+        """Open a Socket.IO connection that shares the HTTP session's login cookie"""
+        if not SOCKETIO_CLIENT_AVAILABLE:
+            raise RuntimeError('python-socketio is required for Socket.IO scenarios')
+        self.socket = socketio.Client(reconnection=False, handle_sigint=False, http_session=self.http)
+        for event in events:
+            self.socket.on(event, self._dispatcher(event))
+        self.socket.connect(self.base_url, wait_timeout=10)
+
+    def _dispatcher(self, event: str) -> Callable:
+        def dispatch(payload=None):
+            for listener in self.listeners:
+                listener(event, payload)
+            with self._waiters_lock:
+                for waiter in list(self._waiters):
+                    waiter_event, match, done, slot = waiter
+                    if waiter_event == event and match(payload):
+                        slot.append(payload)
+                        done.set()
+                        self._waiters.remove(waiter)
+        return dispatch
+
+    def expect(self, event: str, match: Callable[[dict], bool] = lambda payload: True) -> Tuple[threading.Event, list]:
+        """Register interest in an event before triggering it"""
+        done, slot = threading.Event(), []
+        with self._waiters_lock:
+            self._waiters.append((event, match, done, slot))
+        return done, slot
+
+    def emit_and_wait(self, name: str, event: str, data: dict, expect_event: str,
+                      match: Callable[[dict], bool], failure_events: Tuple[str, ...] = (),
+                      timeout: float = 10.0) -> Optional[dict]:
+        """Emit an event and time until a matching reply (or a failure event) arrives"""
+        waiters = [(expect_event, self.expect(expect_event, match))]
+        waiters += [(failure, self.expect(failure)) for failure in failure_events]
+        started = time.perf_counter()
+        self.socket.emit(event, data)
+
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            for waiter_event, (done, slot) in waiters:
+                if done.is_set():
+                    self._drop_waiters(waiters)
+                    outcome = 'ok' if waiter_event == expect_event else waiter_event
+                    self.stats.record(name, time.perf_counter() - started, outcome)
+                    return slot[0] if slot else None
+            time.sleep(0.0005)
+
+        self._drop_waiters(waiters)
+        self.stats.record(name, time.perf_counter() - started, 'timeout')
+        return None
+
+    def _drop_waiters(self, waiters) -> None:
+        with self._waiters_lock:
+            slots = {id(slot) for _, (_, slot) in waiters}
+            self._waiters = [waiter for waiter in self._waiters if id(waiter[3]) not in slots]
+
+    def close(self) -> None:
+        if self.socket is not None:
+            try:
+                self.socket.disconnect()
+            except Exception:
+                pass
+        self.http.close()
+
+
+def run_users(users: List[VirtualUser], task: Callable[[VirtualUser], None], duration: float,
+              wait: Tuple[float, float] = (0.0, 0.0), max_iterations: Optional[int] = None) -> float:
+    """Run `task` in a loop on every user's thread for `duration` seconds, returns wall-clock seconds"""
+    deadline = time.perf_counter() + duration
+
+    def loop(user):
+        iterations = 0
+        while time.perf_counter() < deadline and (max_iterations is None or iterations < max_iterations):
+            task(user)
+            iterations += 1
+            if wait[1] > 0:
+                time.sleep(random.uniform(*wait))
+
+    threads = [threading.Thread(target=loop, args=(user,), daemon=True) for user in users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
@@ -4,6 +4,62 @@ from datetime import timedelta
 
 load_dotenv()
 
+# SQLAlchemy engine profiles, picked per deployment with DB_ENGINE_PROFILE.
+# pool_size is the steady-state connections per worker process; every eventlet/threading
+# greenlet doing DB work holds one, so DB_WORKER_CONCURRENCY caps pool_size + max_overflow
+# (keep workers x that total under the server's max_connections).
+ENGINE_PROFILES = {
+    'sqlite-dev': {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+    },
+    'pg-small': {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'pool_use_lifo': True,  # Idle connections beyond the working set age out instead of staying warm
+        'query_cache_size': 1000,
+        'insertmanyvalues_page_size': 1000,
+        'connect_args': {'connect_timeout': 5, 'application_name': 'unibabel',
+                         'options': '-c statement_timeout=15000'},
+    },
+    'pg-large': {
+        'pool_size': 20,
+        'max_overflow': 20,
+        'pool_timeout': 5,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'pool_use_lifo': True,
+        'query_cache_size': 4000,  # Many distinct statements across timeline/search/admin paths
+        'insertmanyvalues_page_size': 5000,
+        'connect_args': {'connect_timeout': 5, 'application_name': 'unibabel',
+                         'options': '-c statement_timeout=10000'},
+    },
+}
+
+
+def engine_options(profile: str, database_uri: str, concurrency: int = 0) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for a profile, with driver-specific fast paths"""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE '{profile}' (expected one of {', '.join(ENGINE_PROFILES)})")
+    options = {key: dict(value) if isinstance(value, dict) else value
+               for key, value in ENGINE_PROFILES[profile].items()}
+    if not database_uri.startswith('postgresql'):
+        options.pop('connect_args', None)  # libpq settings mean nothing to other drivers
+    elif database_uri.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        # Batch executemany UPDATE/DELETE too (INSERTs already use multi-row VALUES pages)
+        options['executemany_mode'] = 'values_plus_batch'
+    elif database_uri.startswith('postgresql+psycopg://'):
+        # psycopg 3 prepares a statement server-side after it has run this many times on a connection
+        options['connect_args']['prepare_threshold'] = 5
+
+    if concurrency and 'pool_size' in options:
+        options['pool_size'] = min(options['pool_size'], concurrency)
+        options['max_overflow'] = max(0, min(options['max_overflow'], concurrency - options['pool_size']))
+    return options
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
@@ -14,10 +70,19 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = DATABASE_URL or 'sqlite:///smartmessenger.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-    }
+    
+    # Engine profile: 'sqlite-dev', 'pg-small' or 'pg-large' (see ENGINE_PROFILES)
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE') or (
+        'pg-small' if SQLALCHEMY_DATABASE_URI.startswith('postgresql') else 'sqlite-dev'
+    )
+    DB_WORKER_CONCURRENCY = int(os.environ.get('DB_WORKER_CONCURRENCY') or 0)  # Greenlets/threads per worker, 0 = profile default
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DB_ENGINE_PROFILE, SQLALCHEMY_DATABASE_URI, DB_WORKER_CONCURRENCY)
+    
+    # Optional read replica: timeline, discovery and search reads go here (see models.routing)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.startswith('postgres://'):
+        DATABASE_REPLICA_URL = DATABASE_REPLICA_URL.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
     
     # Cache configuration - DigitalOcean Redis
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
@@ -32,6 +97,103 @@ class Config:
     SOCKETIO_PING_TIMEOUT = 60
     SOCKETIO_PING_INTERVAL = 25
     
+    # WebRTC signaling relay: 'batched' coalesces trickle ICE candidates into webrtc_ice_candidates_received,
+    # 'direct' relays each one as webrtc_ice_candidate_received (websocket-client.js handles both)
+    SIGNALING_RELAY_MODE = os.environ.get('SIGNALING_RELAY_MODE') or 'batched'
+    SIGNALING_ICE_BATCH_WINDOW_MS = int(os.environ.get('SIGNALING_ICE_BATCH_WINDOW_MS') or 40)
+    
+    # Babel like/comment counts are pushed to feed viewers at most once per window
+    BABEL_ENGAGEMENT_BROADCAST_MS = int(os.environ.get('BABEL_ENGAGEMENT_BROADCAST_MS') or 500)
+    # Seconds between polls for Babel posts, likes and comments written by other workers
+    BABEL_TIMELINE_REFRESH = float(os.environ.get('BABEL_TIMELINE_REFRESH') or 5)
+    
+    # Bot detection behavior sessions: 'memory' (per worker, LRU capped) or 'redis' (shared)
+    BOT_SESSION_BACKEND = os.environ.get('BOT_SESSION_BACKEND') or 'memory'
+    BOT_SESSION_MAX_USERS = int(os.environ.get('BOT_SESSION_MAX_USERS') or 10000)
+    BOT_SESSION_WINDOW = int(os.environ.get('BOT_SESSION_WINDOW') or 20)
+    BOT_SESSION_TTL = int(os.environ.get('BOT_SESSION_TTL') or 3600)
+    
+    # Web worker processes (gunicorn reads WEB_CONCURRENCY as its default worker count). Per-worker
+    # 'memory' backends diverge when this is above 1, which is logged at startup
+    WEB_WORKERS = int(os.environ.get('WEB_CONCURRENCY') or 1)
+    
+    # Rate limiter state: 'memory' (per worker) or 'redis' (shared across workers)
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS') or 100000)
+    
+    # Social graph (friend adjacency) cache: 'memory' or 'redis' (shared); each worker's copy of a
+    # user's edges is reloaded after SOCIAL_GRAPH_LOCAL_TTL seconds in both modes
+    SOCIAL_GRAPH_BACKEND = os.environ.get('SOCIAL_GRAPH_BACKEND') or 'memory'
+    SOCIAL_GRAPH_MAX_USERS = int(os.environ.get('SOCIAL_GRAPH_MAX_USERS') or 50000)
+    SOCIAL_GRAPH_LOCAL_TTL = float(os.environ.get('SOCIAL_GRAPH_LOCAL_TTL') or 30)
+    
+    # Activity feeds materialized at write time: 'memory' (per worker, reconciled with the database
+    # every ACTIVITY_FEED_LOCAL_TTL seconds) or 'redis' (shared)
+    ACTIVITY_FEED_BACKEND = os.environ.get('ACTIVITY_FEED_BACKEND') or 'memory'
+    ACTIVITY_FEED_SIZE = int(os.environ.get('ACTIVITY_FEED_SIZE') or 100)
+    ACTIVITY_FEED_MAX_USERS = int(os.environ.get('ACTIVITY_FEED_MAX_USERS') or 50000)
+    ACTIVITY_FEED_LOCAL_TTL = float(os.environ.get('ACTIVITY_FEED_LOCAL_TTL') or 30)
+    
+    # Socket.IO message queue (e.g. a Redis URL) so emits reach clients connected to other workers
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE') or None
+    
+    # Admin user counters: snapshot TTL; when background refresh is enabled an expired snapshot
+    # is served while one background task recomputes it (only when the stats are requested)
+    USER_STATS_TTL = int(os.environ.get('USER_STATS_TTL') or 60)
+    USER_STATS_BACKGROUND_REFRESH = os.environ.get('USER_STATS_BACKGROUND_REFRESH', 'true').lower() == 'true'
+    
+    # Request/Socket.IO/cache/DeepL telemetry: 'memory' (per worker) or 'redis' (summed across workers).
+    # With several workers use 'redis' - in memory mode /metrics only shows whichever worker answered the scrape
+    METRICS_BACKEND = os.environ.get('METRICS_BACKEND') or 'memory'
+    METRICS_PUBLISH_INTERVAL = float(os.environ.get('METRICS_PUBLISH_INTERVAL') or 5)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token for /metrics, open when unset
+    
+    # Send pipeline tracing: fraction of sends traced, and how many traces to keep per worker
+    TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE') or 0.05)
+    TRACE_BUFFER_SIZE = int(os.environ.get('TRACE_BUFFER_SIZE') or 1000)
+    
+    # Services are built on first use; warm-up builds the costly ones in the background after boot
+    SERVICE_WARMUP = os.environ.get('SERVICE_WARMUP', 'true').lower() == 'true'
+    SERVICE_WARMUP_DELAY = float(os.environ.get('SERVICE_WARMUP_DELAY') or 1.0)
+    # STARTUP_PROFILE=1 times every import at boot (read directly, before this config is loaded)
+    
+    # Database health: cached SELECT 1 probe (TTL ± jitter fraction) and background pool sampling
+    DB_HEALTH_PROBE_TTL = float(os.environ.get('DB_HEALTH_PROBE_TTL') or 5)
+    DB_HEALTH_PROBE_JITTER = float(os.environ.get('DB_HEALTH_PROBE_JITTER') or 0.2)
+    DB_HEALTH_SAMPLE_INTERVAL = float(os.environ.get('DB_HEALTH_SAMPLE_INTERVAL') or 15)
+    DB_HEALTH_BACKGROUND = os.environ.get('DB_HEALTH_BACKGROUND', 'true').lower() == 'true'
+    
+    # Background jobs: 'sqlite' (durable, per host) or 'redis' (shared), run by workers inside each web process.
+    # JOB_WORKERS_IN_PROCESS=false leaves them to `python worker.py`, which must reach the same queue and uploads
+    JOB_QUEUE_BACKEND = os.environ.get('JOB_QUEUE_BACKEND') or 'sqlite'
+    JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH') or 'job_queue.db'
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+    JOB_WORKERS_IN_PROCESS = os.environ.get('JOB_WORKERS_IN_PROCESS', 'true').lower() == 'true'
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS') or 3)
+    JOB_RETRY_BACKOFF = float(os.environ.get('JOB_RETRY_BACKOFF') or 5)  # Seconds before the first retry, doubled after
+    JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS') or 300)
+    # Common-phrase maintenance job (stale + least used phrases per user), scheduled every N seconds; 0 = off
+    PHRASE_MAINTENANCE_INTERVAL = float(os.environ.get('PHRASE_MAINTENANCE_INTERVAL') or 86400)
+    PHRASE_MAX_AGE_DAYS = int(os.environ.get('PHRASE_MAX_AGE_DAYS') or 30)
+    PHRASE_CLEANUP_PERCENTAGE = float(os.environ.get('PHRASE_CLEANUP_PERCENTAGE') or 10)
+    PHRASE_MAINTENANCE_CHUNK = int(os.environ.get('PHRASE_MAINTENANCE_CHUNK') or 1000)  # Rows (or users) per DELETE
+
+    # ID verification OCR: parallel Tesseract passes (0 = one per core). OCR_TARGET_DPI resamples a
+    # detected card outline to that DPI; images without one keep the legacy upscale of small images
+    # (0 = legacy resize for every image). Remaining passes are cancelled once an earlier-ordered
+    # pass at OCR_EARLY_EXIT_CONFIDENCE% or better reads a labelled DOB
+    OCR_WORKERS = int(os.environ.get('OCR_WORKERS') or 0)
+    OCR_TARGET_DPI = int(os.environ.get('OCR_TARGET_DPI') or 300)
+    OCR_EARLY_EXIT_CONFIDENCE = float(os.environ.get('OCR_EARLY_EXIT_CONFIDENCE') or 80)
+    OCR_TIMEOUT = float(os.environ.get('OCR_TIMEOUT') or 20)  # Seconds per Tesseract pass
+    TESSERACT_CMD = os.environ.get('TESSERACT_CMD')
+
+    # SQL statements per request/event for development and CI: 'off', 'log' (flag N+1s) or 'strict' (budgets raise)
+    QUERY_INSPECTION = (os.environ.get('QUERY_INSPECTION') or 'off').lower()
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_N_PLUS_ONE_THRESHOLD') or 5)
+    QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT') or 0)  # 0 = no budget
+    QUERY_BUDGETS = os.environ.get('QUERY_BUDGETS') or ''  # e.g. "GET /api/chats/active=8,send_message=12"
+    
     # Cache configuration
     CACHE_TYPE = 'simple'
     CACHE_DEFAULT_TIMEOUT = 300
\ No newline at end of file
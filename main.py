@@ -5,6 +5,11 @@
 # M: Micro - Under 60 lines, focused
 # I: Interfaces - Clear contracts
 
+# Installed first so STARTUP_PROFILE=1 times every import below
+from services.service_container import get_startup_profiler
+startup_profiler = get_startup_profiler()
+startup_profiler.install_from_env()
+
 from flask import Flask
 from flask_socketio import SocketIO
 from flask_login import LoginManager
@@ -18,7 +23,7 @@ def create_app() -> Flask:
     
     # Initialize extensions with dependency injection
     db.init_app(app)
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
     
     # Store socketio in app context for injection
     app.extensions['socketio'] = socketio
@@ -41,17 +46,23 @@ def create_app() -> Flask:
     app.register_blueprint(admin_auth)
     
     # Register all micro routes
-    register_all_routes(app)
+    with startup_profiler.phase('register_routes'):
+        register_all_routes(app)
     
     return app, socketio
 
 # Create app instance for production deployment
-app, socketio = create_app()
+with startup_profiler.phase('create_app'):
+    app, socketio = create_app()
 
 # Create tables in app context
-with app.app_context():
+with startup_profiler.phase('create_tables'), app.app_context():
     create_tables()
 
+if startup_profiler.installed:
+    startup_profiler.uninstall()
+    startup_profiler.log_report()
+
 def main():
     """Application entry point - micro and focused"""
     socketio.run(app, debug=True, port=5000, host='127.0.0.1')
@@ -1,20 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
+from .routing import RoutingSession, read_primary, read_replica, use_read_replica
 
-# Initialize the database instance
-db = SQLAlchemy()
+# Initialize the database instance (reads can be routed to a replica, see routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Import all models from their respective microservices
 from .user_models import (
-    User, UserCommonPhrase, UserType, 
+    User, UserChange, UserCommonPhrase, UserType, 
     Room, RoomType, RoomMember, RoomMemberRole, RoomPermission,
     RoomRolePermissions, RoomSettings, RoomChannel,
     FriendGroup, FriendGroupType, FriendGroupMember, FriendGroupRole,
-    UserFriend
+    UserFriend, UserPreferences
 )
 from .chat_models import Chat, ChatParticipant, Message, TranslatedMessage
 from .subscription_models import UsageLog, DataHarvestingProfile, ConversationIntelligence, DataSalesRecord, ManipulationCampaign
 from .safety_models import UserReport, FriendRequest
-from .babel_models import BabelPost, BabelLike, BabelComment, BabelFollow, BabelPostType
+from .babel_models import BabelPost, BabelLike, BabelComment, BabelFollow, BabelPostType, BabelPostTag
 from .translation_models import Translation, TranslationSubmission, TranslationCache
 
 # Create database tables
@@ -23,16 +24,16 @@ def create_tables():
 
 # Export everything for easy importing
 __all__ = [
-    'db',
-    'User', 'UserCommonPhrase', 'UserType', 
+    'db', 'read_primary', 'read_replica', 'use_read_replica',
+    'User', 'UserChange', 'UserCommonPhrase', 'UserType', 
     'Room', 'RoomType', 'RoomMember', 'RoomMemberRole', 'RoomPermission',
     'RoomRolePermissions', 'RoomSettings', 'RoomChannel',
     'FriendGroup', 'FriendGroupType', 'FriendGroupMember', 'FriendGroupRole',
-    'UserFriend',
+    'UserFriend', 'UserPreferences',
     'Chat', 'ChatParticipant', 'Message', 'TranslatedMessage',
     'UsageLog', 'DataHarvestingProfile', 'ConversationIntelligence', 'DataSalesRecord', 'ManipulationCampaign',
     'UserReport', 'FriendRequest',
-    'BabelPost', 'BabelLike', 'BabelComment', 'BabelFollow', 'BabelPostType',
+    'BabelPost', 'BabelLike', 'BabelComment', 'BabelFollow', 'BabelPostType', 'BabelPostTag',
     'Translation', 'TranslationSubmission', 'TranslationCache',
     'create_tables'
 ]
\ No newline at end of file
@@ -94,6 +94,26 @@ class BabelPost(db.Model):
         return viewer_user.can_contact_user(self.user)
 
 
+class BabelPostTag(db.Model):
+    """
+    Inverted index of hashtags, topics and languages per Babel post
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('babel_post.id', ondelete='CASCADE'), nullable=False, index=True)
+    tag = db.Column(db.String(64), nullable=False)  # Normalized: lowercase, no leading '#'
+    kind = db.Column(db.String(16), nullable=False, default='hashtag')  # hashtag, topic, language
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Copied from post for index ordering
+    
+    # Relationships
+    post = db.relationship('BabelPost', backref=db.backref('tag_index', cascade='all, delete-orphan'))
+    
+    # Indexes - topic feeds are range scans on (tag, created_at)
+    __table_args__ = (
+        db.UniqueConstraint('post_id', 'tag', name='unique_post_tag'),
+        db.Index('idx_babel_tag_lookup', 'tag', 'created_at'),
+    )
+
+
 class BabelLike(db.Model):
     """
     Likes on Babel posts
@@ -0,0 +1,64 @@
+"""
+Read/write session routing
+SELECTs issued inside `read_replica()` go to the 'replica' bind when one is configured;
+everything else, and every read of a session that has already written, stays on the primary.
+`read_primary()` opts a block back out - process-wide cache loaders use it so replica lag
+is never frozen into a cache that outlives the request
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND_KEY = 'replica'
+
+_prefer_replica = ContextVar('unibabel_prefer_replica', default=False)
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that can route reads to a replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _prefer_replica.get() and not self._flushing and not self.info.get('wrote'):
+            replica = self._db.engines.get(REPLICA_BIND_KEY)
+            if replica is not None and getattr(clause, 'is_select', False):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _pin_to_primary(session, flush_context):
+    # Read-your-writes: a replica may lag, so stay on the primary until the session is removed
+    session.info['wrote'] = True
+
+
+@contextmanager
+def read_replica():
+    """Send this block's SELECTs to the read replica (no-op without one)"""
+    token = _prefer_replica.set(True)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+@contextmanager
+def read_primary():
+    """Keep this block's SELECTs on the primary, even inside `read_replica()` (also a decorator)"""
+    token = _prefer_replica.set(False)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+def use_read_replica(view):
+    """Decorator for read-mostly views: timeline, discovery and search"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_replica():
+            return view(*args, **kwargs)
+    return wrapper
@@ -794,6 +794,12 @@ class User(UserMixin, db.Model):
         
         return member is not None
 
+class UserChange(db.Model):
+    """Append-only log of users whose searchable fields changed, so every worker's search index can catch up"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
 class UserCommonPhrase(db.Model):
     """Store user's most common phrases for instant translation caching"""
     id = db.Column(db.Integer, primary_key=True)
@@ -849,98 +855,20 @@ class UserCommonPhrase(db.Model):
             user_id: Specific user to clean up (None for global cleanup)
             cleanup_percentage: Percentage of bottom phrases to remove (default 10%)
         """
-        if user_id:
-            # Clean up for specific user
-            total_phrases = cls.query.filter_by(user_id=user_id).count()
-            if total_phrases <= 10:  # Don't clean if user has very few phrases
-                return 0
-            
-            phrases_to_remove = max(1, int(total_phrases * cleanup_percentage / 100))
-            
-            # Get the least used phrases
-            unpopular_phrases = cls.query.filter_by(user_id=user_id)\
-                                      .order_by(cls.usage_count.asc())\
-                                      .limit(phrases_to_remove).all()
-            
-            removed_count = 0
-            for phrase in unpopular_phrases:
-                db.session.delete(phrase)
-                removed_count += 1
-            
-            db.session.commit()
-            return removed_count
-        else:
-            # Global cleanup - remove unpopular phrases across all users
-            total_phrases = cls.query.count()
-            if total_phrases <= 100:  # Don't clean if very few total phrases
-                return 0
-            
-            phrases_to_remove = max(10, int(total_phrases * cleanup_percentage / 100))
-            
-            # Get globally least used phrases
-            unpopular_phrases = cls.query.order_by(cls.usage_count.asc())\
-                                       .limit(phrases_to_remove).all()
-            
-            removed_count = 0
-            for phrase in unpopular_phrases:
-                db.session.delete(phrase)
-                removed_count += 1
-            
-            db.session.commit()
-            return removed_count
+        from services.phrase_maintenance import get_phrase_maintenance_service
+        return get_phrase_maintenance_service().cleanup_unpopular(user_id, cleanup_percentage)
     
     @classmethod
     def cleanup_old_phrases(cls, days_old=30):
         """Remove phrases that haven't been used in X days"""
-        from datetime import timedelta
-        cutoff_date = datetime.utcnow() - timedelta(days=days_old)
-        
-        old_phrases = cls.query.filter(cls.last_used < cutoff_date).all()
-        removed_count = 0
-        
-        for phrase in old_phrases:
-            db.session.delete(phrase)
-            removed_count += 1
-        
-        db.session.commit()
-        return removed_count
+        from services.phrase_maintenance import get_phrase_maintenance_service
+        return get_phrase_maintenance_service().cleanup_old(days_old)
     
     @classmethod
     def get_cache_efficiency_stats(cls):
-        """Get statistics about phrase caching efficiency"""
-        total_phrases = cls.query.count()
-        if total_phrases == 0:
-            return {
-                'total_phrases': 0,
-                'total_usage': 0,
-                'avg_usage': 0,
-                'top_10_percent_usage': 0,
-                'bottom_10_percent_usage': 0
-            }
-        
-        # Get usage distribution
-        all_phrases = cls.query.order_by(cls.usage_count.desc()).all()
-        
-        top_10_percent_count = max(1, int(total_phrases * 0.1))
-        bottom_10_percent_count = max(1, int(total_phrases * 0.1))
-        
-        top_phrases = all_phrases[:top_10_percent_count]
-        bottom_phrases = all_phrases[-bottom_10_percent_count:]
-        
-        total_usage = sum(phrase.usage_count for phrase in all_phrases)
-        top_usage = sum(phrase.usage_count for phrase in top_phrases)
-        bottom_usage = sum(phrase.usage_count for phrase in bottom_phrases)
-        
-        return {
-            'total_phrases': total_phrases,
-            'total_usage': total_usage,
-            'avg_usage': total_usage / total_phrases if total_phrases > 0 else 0,
-            'top_10_percent_usage': top_usage,
-            'bottom_10_percent_usage': bottom_usage,
-            'top_10_percent_count': top_10_percent_count,
-            'bottom_10_percent_count': bottom_10_percent_count,
-            'efficiency_ratio': top_usage / bottom_usage if bottom_usage > 0 else float('inf')
-        }
+        """Get statistics about phrase caching efficiency (aggregated in SQL)"""
+        from services.phrase_maintenance import get_phrase_maintenance_service
+        return get_phrase_maintenance_service().get_efficiency_stats()
     
     def to_dict(self):
         """Convert to dictionary for API responses"""
@@ -949,4 +877,208 @@ class UserCommonPhrase(db.Model):
             'usage_count': self.usage_count,
             'last_used': self.last_used.isoformat(),
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class UserPreferences(db.Model):
+    """Typed per-user preferences (one row per user, formerly JSON in User.bio)"""
+    SCHEMA_VERSION = 1
+
+    # API (section, key) -> column; registration and the preferences API used different key spellings
+    FIELD_MAP = {
+        ('language', 'autoTranslate'): 'auto_translate',
+        ('language', 'showOriginal'): 'show_original',
+        ('accessibility', 'highContrast'): 'high_contrast',
+        ('accessibility', 'largeText'): 'large_text',
+        ('accessibility', 'reducedMotion'): 'reduced_motion',
+        ('privacy', 'profileVisibility'): 'profile_visibility',
+        ('privacy', 'show_online_status'): 'show_online_status',
+        ('privacy', 'showOnlineStatus'): 'show_online_status',
+        ('privacy', 'allow_friend_requests'): 'allow_friend_requests',
+        ('notifications', 'messages'): 'message_notifications',
+        ('notifications', 'messageNotifications'): 'message_notifications',
+        ('notifications', 'rooms'): 'room_notifications',
+        ('notifications', 'roomNotifications'): 'room_notifications',
+        ('notifications', 'friend_requests'): 'friend_request_notifications',
+        ('notifications', 'mentions'): 'mention_notifications',
+        ('notifications', 'system'): 'system_notifications',
+        ('theme', 'mode'): 'theme_mode',
+        ('theme', 'color'): 'theme_color',
+        (None, 'avatar'): 'avatar',
+        (None, 'activity'): 'activity',
+    }
+
+    # Keys that live on User itself, applied by the caller
+    USER_FIELDS = {('language', 'preferred'), ('language', 'preferredLanguage'), ('privacy', 'discoverable')}
+
+    DEFAULTS = {
+        'auto_translate': True,
+        'show_original': False,
+        'high_contrast': False,
+        'large_text': False,
+        'reduced_motion': False,
+        'profile_visibility': 'public',
+        'show_online_status': True,
+        'allow_friend_requests': True,
+        'message_notifications': True,
+        'room_notifications': True,
+        'friend_request_notifications': True,
+        'mention_notifications': True,
+        'system_notifications': True,
+        'theme_mode': 'dark',
+        'theme_color': 'default',
+        'avatar': '👤',
+        'activity': None,
+    }
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    schema_version = db.Column(db.SmallInteger, default=SCHEMA_VERSION, nullable=False)
+
+    # Language
+    auto_translate = db.Column(db.Boolean, default=True, nullable=False)
+    show_original = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Accessibility
+    high_contrast = db.Column(db.Boolean, default=False, nullable=False)
+    large_text = db.Column(db.Boolean, default=False, nullable=False)
+    reduced_motion = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Privacy
+    profile_visibility = db.Column(db.String(20), default='public', nullable=False)
+    show_online_status = db.Column(db.Boolean, default=True, nullable=False)
+    allow_friend_requests = db.Column(db.Boolean, default=True, nullable=False)
+
+    # Notifications
+    message_notifications = db.Column(db.Boolean, default=True, nullable=False)
+    room_notifications = db.Column(db.Boolean, default=True, nullable=False)
+    friend_request_notifications = db.Column(db.Boolean, default=True, nullable=False)
+    mention_notifications = db.Column(db.Boolean, default=True, nullable=False)
+    system_notifications = db.Column(db.Boolean, default=True, nullable=False)
+
+    # Theme and presence
+    theme_mode = db.Column(db.String(20), default='dark', nullable=False)
+    theme_color = db.Column(db.String(20), default='default', nullable=False)
+    avatar = db.Column(db.String(255), default='👤')  # Emoji or image URL
+    activity = db.Column(db.String(150))
+
+    extra = db.Column(db.Text)  # JSON of keys without a column (rarely read, never on hot paths)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    user = db.relationship('User', backref=db.backref('preferences', uselist=False))
+
+    def __init__(self, **kwargs):
+        for column, default in self.DEFAULTS.items():
+            kwargs.setdefault(column, default)
+        kwargs.setdefault('schema_version', self.SCHEMA_VERSION)
+        super().__init__(**kwargs)
+
+    TRUE_STRINGS = {'true', '1', 'yes', 'on'}
+    FALSE_STRINGS = {'false', '0', 'no', 'off'}
+
+    @classmethod
+    def coerce(cls, column, value, name=None, truncate=False):
+        """
+        Convert a JSON value to a column's type (a column of this table by name, or any Column),
+        raising ValueError if it can't be stored. Booleans accept true/false spellings and 0/1;
+        strings must fit the column unless `truncate`
+        """
+        if isinstance(column, str):
+            column = cls.__table__.c[column]
+        name = name or column.name
+        if value is None:
+            if column.nullable:
+                return None
+            raise ValueError(f"{name} is required")
+        if isinstance(column.type, db.Boolean):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, int) and value in (0, 1):
+                return bool(value)
+            if isinstance(value, str) and value.strip().lower() in cls.TRUE_STRINGS | cls.FALSE_STRINGS:
+                return value.strip().lower() in cls.TRUE_STRINGS
+            raise ValueError(f"{name} must be true or false")
+        if not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+        length = column.type.length
+        if length and len(value) > length:
+            if not truncate:
+                raise ValueError(f"{name} is too long (max {length} characters)")
+            value = value[:length]
+        return value
+
+    def apply_dict(self, data, strict=True):
+        """
+        Apply API/legacy-bio shaped preferences, returns (section, key) pairs it stored in `extra`.
+        Strict (API) raises ValueError on a value its column can't hold; lenient (migration)
+        truncates long strings and keeps other unusable values in `extra`
+        """
+        import json
+        extra = json.loads(self.extra) if self.extra else {}
+        unknown = []
+        for section, value in data.items():
+            if isinstance(value, dict) and section != 'extra':
+                items = [(section, key, item) for key, item in value.items()]
+            else:
+                items = [(None, section, value)]
+            for item_section, key, item in items:
+                if (item_section, key) in self.USER_FIELDS:
+                    continue
+                column = self.FIELD_MAP.get((item_section, key))
+                if column:
+                    name = f"{item_section}.{key}" if item_section else key
+                    try:
+                        setattr(self, column, self.coerce(column, item, name=name, truncate=not strict))
+                        continue
+                    except ValueError:
+                        if strict:
+                            raise
+                if item_section is None:
+                    extra[key] = item
+                else:
+                    extra.setdefault(item_section, {})[key] = item
+                unknown.append((item_section, key))
+        self.extra = json.dumps(extra) if extra else None
+        return unknown
+
+    def to_dict(self, user=None):
+        """Preferences in the API shape (user supplies preferred language and discoverability)"""
+        import json
+        preferences = {
+            'language': {
+                'autoTranslate': self.auto_translate,
+                'showOriginal': self.show_original
+            },
+            'accessibility': {
+                'highContrast': self.high_contrast,
+                'largeText': self.large_text,
+                'reducedMotion': self.reduced_motion
+            },
+            'notifications': {
+                'messages': self.message_notifications,
+                'rooms': self.room_notifications,
+                'friend_requests': self.friend_request_notifications,
+                'mentions': self.mention_notifications,
+                'system': self.system_notifications
+            },
+            'privacy': {
+                'profileVisibility': self.profile_visibility,
+                'show_online_status': self.show_online_status,
+                'allow_friend_requests': self.allow_friend_requests
+            },
+            'theme': {
+                'mode': self.theme_mode,
+                'color': self.theme_color
+            },
+            'avatar': self.avatar,
+            'activity': self.activity
+        }
+        if user is not None:
+            preferences['language']['preferred'] = user.preferred_language
+            preferences['privacy']['discoverable'] = user.is_discoverable
+        if self.extra:
+            for section, value in json.loads(self.extra).items():
+                if isinstance(value, dict):
+                    preferences.setdefault(section, {}).update(value)
+                else:
+                    preferences.setdefault(section, value)
+        return preferences
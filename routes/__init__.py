@@ -12,10 +12,144 @@ def register_all_routes(app: Flask) -> None:
     from .chats_api import register_chats_api_routes
     from .activity_api import register_activity_api_routes
     from .users_api import register_users_api_routes
+    from .metrics_routes import register_metrics_routes
+    
+    # Telemetry first, so every request hook and Socket.IO handler registered below is timed
+    from services.metrics import configure_metrics, install_request_metrics, instrument_socketio
+    configure_metrics(
+        backend=app.config.get('METRICS_BACKEND', 'memory'),
+        redis_url=app.config.get('REDIS_URL'),
+        publish_interval=app.config.get('METRICS_PUBLISH_INTERVAL', 5),
+        web_workers=app.config.get('WEB_WORKERS', 1)
+    )
+    install_request_metrics(app)
+    if app.extensions.get('socketio'):
+        instrument_socketio(app.extensions['socketio'])
+    
+    # Sampled per-stage spans for the send-message pipeline
+    from services.tracing import configure_tracing
+    configure_tracing(
+        sample_rate=app.config.get('TRACE_SAMPLE_RATE', 0.05),
+        buffer_size=app.config.get('TRACE_BUFFER_SIZE', 1000)
+    )
+    
+    # Statement counts and N+1 detection per request and event (development/CI; off in production)
+    from services.query_inspector import (
+        configure_query_inspector, install_request_query_inspection, instrument_socketio_queries, parse_budgets
+    )
+    inspector = configure_query_inspector(
+        mode=app.config.get('QUERY_INSPECTION', 'off'),
+        n_plus_one_threshold=app.config.get('QUERY_N_PLUS_ONE_THRESHOLD', 5),
+        default_budget=app.config.get('QUERY_BUDGET_DEFAULT', 0),
+        budgets=parse_budgets(app.config.get('QUERY_BUDGETS', ''))
+    )
+    if inspector.enabled:
+        install_request_query_inspection(app)
+        if app.extensions.get('socketio'):
+            instrument_socketio_queries(app.extensions['socketio'])
+    
+    # Pool checkout/wait metrics and a cached, read-only database health probe
+    from models import db
+    from services.database_connection_service import get_connection_service
+    connection_service = get_connection_service()
+    connection_service.configure(
+        probe_ttl=app.config.get('DB_HEALTH_PROBE_TTL', 5),
+        probe_jitter=app.config.get('DB_HEALTH_PROBE_JITTER', 0.2)
+    )
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            connection_service.instrument_engine(engine, name=bind_key or 'primary')
+    if app.config.get('DB_HEALTH_BACKGROUND', True):
+        connection_service.start_background_sampling(
+            app,
+            socketio=app.extensions.get('socketio'),
+            interval=app.config.get('DB_HEALTH_SAMPLE_INTERVAL', 15)
+        )
     
     # Initialize audit logger (needed for analytics)
     from services.admin_interaction_logger import admin_interaction_logger
     
+    # Bot detection behavior sessions (memory or shared Redis)
+    from services.bot_detection_service import get_bot_detection_service
+    get_bot_detection_service().configure_session_store(
+        backend=app.config.get('BOT_SESSION_BACKEND', 'memory'),
+        redis_url=app.config.get('REDIS_URL'),
+        max_sessions=app.config.get('BOT_SESSION_MAX_USERS', 10000),
+        window_size=app.config.get('BOT_SESSION_WINDOW', 20),
+        ttl=app.config.get('BOT_SESSION_TTL', 3600)
+    )
+    
+    # Shared rate limiter for every send path (memory or Redis)
+    from services.rate_limiter import configure_rate_limiter
+    configure_rate_limiter(
+        backend=app.config.get('RATE_LIMIT_BACKEND', 'memory'),
+        redis_url=app.config.get('REDIS_URL'),
+        max_keys=app.config.get('RATE_LIMIT_MAX_KEYS', 100000),
+        web_workers=app.config.get('WEB_WORKERS', 1)
+    )
+    
+    # Friend adjacency cache shared by the friends and activity APIs
+    from services.social_graph import configure_social_graph
+    configure_social_graph(
+        backend=app.config.get('SOCIAL_GRAPH_BACKEND', 'memory'),
+        redis_url=app.config.get('REDIS_URL'),
+        max_users=app.config.get('SOCIAL_GRAPH_MAX_USERS', 50000),
+        local_ttl=app.config.get('SOCIAL_GRAPH_LOCAL_TTL', 30.0)
+    )
+    
+    # Per-user activity feeds, appended at write time and pushed over Socket.IO
+    from services.activity_feed import configure_activity_feed
+    configure_activity_feed(
+        backend=app.config.get('ACTIVITY_FEED_BACKEND', 'memory'),
+        redis_url=app.config.get('REDIS_URL'),
+        feed_size=app.config.get('ACTIVITY_FEED_SIZE', 100),
+        max_users=app.config.get('ACTIVITY_FEED_MAX_USERS', 50000),
+        local_ttl=app.config.get('ACTIVITY_FEED_LOCAL_TTL', 30.0),
+        web_workers=app.config.get('WEB_WORKERS', 1),
+        message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    )
+    
+    # Babel timeline: how often each worker polls for other workers' posts, likes and comments
+    from services.babel import get_timeline_store
+    get_timeline_store().refresh_interval = app.config.get('BABEL_TIMELINE_REFRESH', 5)
+    
+    # Admin user counters - one aggregate query, cached; expired snapshots refresh in the background
+    from services.user_stats_service import user_stats_service
+    user_stats_service.cache_ttl = app.config.get('USER_STATS_TTL', 60)
+    if app.config.get('USER_STATS_BACKGROUND_REFRESH', True):
+        user_stats_service.enable_background_refresh(app, socketio=app.extensions.get('socketio'))
+    
+    # Durable background jobs (OCR, cache backfills, phrase cleanup) run off the request path
+    from services.job_queue import configure_job_queue
+    job_queue = configure_job_queue(
+        backend=app.config.get('JOB_QUEUE_BACKEND', 'sqlite'),
+        db_path=app.config.get('JOB_QUEUE_PATH', 'job_queue.db'),
+        redis_url=app.config.get('REDIS_URL'),
+        workers=app.config.get('JOB_WORKERS', 2),
+        max_attempts=app.config.get('JOB_MAX_ATTEMPTS', 3),
+        retry_backoff=app.config.get('JOB_RETRY_BACKOFF', 5),
+        lease_seconds=app.config.get('JOB_LEASE_SECONDS', 300),
+        in_process_workers=app.config.get('JOB_WORKERS_IN_PROCESS', True)
+    )
+    from services.phrase_maintenance import get_phrase_maintenance_service
+    get_phrase_maintenance_service().chunk_size = app.config.get('PHRASE_MAINTENANCE_CHUNK', 1000)
+    if app.config.get('PHRASE_MAINTENANCE_INTERVAL', 86400):
+        job_queue.schedule('phrases.maintenance', app.config['PHRASE_MAINTENANCE_INTERVAL'], payload={
+            'days_old': app.config.get('PHRASE_MAX_AGE_DAYS', 30),
+            'cleanup_percentage': app.config.get('PHRASE_CLEANUP_PERCENTAGE', 10)
+        })
+    if app.config.get('JOB_WORKERS_IN_PROCESS', True):
+        job_queue.start(app)
+    
+    # Costly services are built on first use; warm them in the background once the worker serves
+    from services.service_container import get_container
+    if app.config.get('SERVICE_WARMUP', True):
+        get_container().start_warm_up(
+            app,
+            socketio=app.extensions.get('socketio'),
+            delay=app.config.get('SERVICE_WARMUP_DELAY', 1.0)
+        )
+    
     # Register core routes
     register_auth_routes(app)
     register_api_routes(app)
@@ -25,4 +159,5 @@ def register_all_routes(app: Flask) -> None:
     register_friends_api_routes(app)
     register_chats_api_routes(app)
     register_activity_api_routes(app)
-    register_users_api_routes(app)
\ No newline at end of file
+    register_users_api_routes(app)
+    register_metrics_routes(app)
\ No newline at end of file
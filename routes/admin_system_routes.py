@@ -3,13 +3,18 @@ Admin System Routes - Heroku System Health Monitoring
 Uses psutil + Heroku environment variables for real metrics
 """
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, Response
 from flask_login import login_required, current_user
 from functools import wraps
 import os
 import time
 from datetime import datetime
 import requests
+import json
+from services.tracing import get_tracer
+from services.service_container import get_container, get_startup_profiler
+from services.query_inspector import get_query_inspector
+from services.job_queue import get_job_queue
 
 # Try to import psutil, fallback if not available
 try:
@@ -211,4 +216,136 @@ def register_admin_system_routes(app: Flask) -> None:
                 'success': False,
                 'error': str(e),
                 'fallback': 'operational'
-            })
\ No newline at end of file
+            })
+    
+    @app.route('/api/admin/system/traces')
+    @login_required
+    @require_admin
+    def pipeline_traces():
+        """Per-stage send pipeline latency (p50/p95/p99) from sampled traces"""
+        try:
+            tracer = get_tracer()
+            limit = min(request.args.get('limit', 20, type=int), 200)
+            return jsonify({
+                'success': True,
+                'tracer': tracer.get_stats(),
+                'stages': tracer.get_stage_stats(),
+                'recent_traces': tracer.get_traces(limit=limit),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    @app.route('/api/admin/system/traces/export')
+    @login_required
+    @require_admin
+    def export_pipeline_traces():
+        """Download buffered traces as JSON or OTLP/JSON"""
+        tracer = get_tracer()
+        fmt = request.args.get('format', 'json')
+        if fmt == 'otlp':
+            payload = tracer.to_otlp()
+        else:
+            payload = {'traces': tracer.get_traces(limit=len(tracer.traces))}
+        filename = f"unibabel-traces-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{'otlp.json' if fmt == 'otlp' else 'json'}"
+        return Response(
+            json.dumps(payload),
+            mimetype='application/json',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    
+    @app.route('/api/admin/system/startup')
+    @login_required
+    @require_admin
+    def startup_profile():
+        """Startup phases, slowest imports and which services have been built"""
+        try:
+            limit = min(request.args.get('limit', 25, type=int), 200)
+            return jsonify({
+                'success': True,
+                'startup': get_startup_profiler().get_report(limit=limit),
+                'services': get_container().get_stats(),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    @app.route('/api/admin/system/queries')
+    @login_required
+    @require_admin
+    def query_inspection():
+        """Statements per route and event, worst first, with recent N+1 suspects and budget overruns"""
+        try:
+            limit = min(request.args.get('limit', 50, type=int), 200)
+            return jsonify({
+                'success': True,
+                'queries': get_query_inspector().get_report(limit=limit),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    @app.route('/api/admin/jobs', methods=['GET'])
+    @login_required
+    @require_admin
+    def list_jobs():
+        """Recent background jobs (optionally by status) and queue statistics"""
+        try:
+            job_queue = get_job_queue()
+            limit = min(request.args.get('limit', 50, type=int), 500)
+            return jsonify({
+                'success': True,
+                'jobs': job_queue.list_jobs(status=request.args.get('status'), limit=limit),
+                'stats': job_queue.get_stats()
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    @app.route('/api/admin/jobs', methods=['POST'])
+    @login_required
+    @require_admin
+    def enqueue_job():
+        """Queue a registered task: {task, payload, priority, dedup_key, delay}"""
+        data = request.get_json(silent=True) or {}
+        job_queue = get_job_queue()
+        if data.get('task') not in job_queue.tasks:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown task, expected one of: {', '.join(sorted(job_queue.tasks))}"
+            }), 400
+        try:
+            job = job_queue.enqueue(
+                data['task'],
+                payload=data.get('payload') or {},
+                priority=data.get('priority'),
+                dedup_key=data.get('dedup_key'),
+                delay=float(data.get('delay') or 0)
+            )
+            return jsonify({'success': True, 'job': job}), 202
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    @app.route('/api/admin/jobs/<job_id>', methods=['GET'])
+    @login_required
+    @require_admin
+    def get_job(job_id):
+        """One job's status, progress and result"""
+        job = get_job_queue().get_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job})
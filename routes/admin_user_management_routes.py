@@ -8,6 +8,7 @@ from flask_login import login_required, current_user
 from functools import wraps
 from datetime import datetime
 from models import User, db
+from services.user_stats_service import user_stats_service
 
 def require_admin(f):
     @wraps(f)
@@ -48,6 +49,7 @@ def register_admin_user_management_routes(app: Flask, audit_logger) -> None:
             user.is_online = False
             
             db.session.commit()
+            user_stats_service.invalidate()
             
             # Log the action
             AdminActivityLog.log_activity(
@@ -98,6 +100,7 @@ def register_admin_user_management_routes(app: Flask, audit_logger) -> None:
             user.blocked_by = None
             
             db.session.commit()
+            user_stats_service.invalidate()
             
             # Log the action
             AdminActivityLog.log_activity(
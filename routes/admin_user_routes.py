@@ -8,6 +8,7 @@ from flask_login import login_required, current_user
 from functools import wraps
 from models.user_models import User
 from models import db
+from services.user_stats_service import user_stats_service
 from datetime import datetime
 from enum import Enum
 
@@ -142,6 +143,7 @@ def register_admin_user_routes(app: Flask, audit_logger) -> None:
             user.is_blocked = True
             user.block_reason = reason
             db.session.commit()
+            user_stats_service.invalidate()
             
             # Log the action
             audit_logger.log_admin_action(
@@ -174,6 +176,7 @@ def register_admin_user_routes(app: Flask, audit_logger) -> None:
             user.is_blocked = False
             user.block_reason = None
             db.session.commit()
+            user_stats_service.invalidate()
             
             # Log the action
             audit_logger.log_admin_action(
@@ -5,6 +5,7 @@ Single Responsibility: Social media functionality only
 
 from flask import Flask, request, jsonify
 from flask_login import login_required, current_user
+from models import use_read_replica
 
 def register_api_babel_routes(app: Flask) -> None:
     """Register Babel social media routes - under 120 lines"""
@@ -44,6 +45,7 @@ def register_api_babel_routes(app: Flask) -> None:
 
     @app.route('/api/babel/timeline')
     @login_required
+    @use_read_replica
     def get_babel_timeline():
         """Get Babel timeline posts"""
         try:
@@ -51,16 +53,16 @@ def register_api_babel_routes(app: Flask) -> None:
             
             babel_service = get_babel_service()
             
-            page = request.args.get('page', 1, type=int)
+            cursor = request.args.get('cursor')
             per_page = request.args.get('per_page', 20, type=int)
             
             result = babel_service.get_timeline(
                 user_id=current_user.id,
-                page=page,
+                cursor=cursor,
                 per_page=per_page
             )
             
-            return jsonify(result), 200
+            return jsonify(result), result.get('status', 200)
             
         except Exception as e:
             return jsonify({'error': str(e)}), 500
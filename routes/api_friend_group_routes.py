@@ -7,8 +7,9 @@ from flask import request, jsonify, session
 from functools import wraps
 from auth import login_required
 from services.friend_group_service import FriendGroupService
+from services.friend_group_index import get_friend_group_index
 from models.user_models import FriendGroup, FriendGroupMember
-from models import db
+from models import db, User
 import logging
 
 # Initialize logger
@@ -18,6 +19,7 @@ def register_api_friend_group_routes(app):
     """Register friend group API micro-components"""
     
     friend_group_service = FriendGroupService()
+    group_index = get_friend_group_index()
     
     @app.route('/api/friend-groups/create', methods=['POST'])
     @login_required
@@ -72,30 +74,19 @@ def register_api_friend_group_routes(app):
         try:
             user_id = session.get('user_id')
             
-            # Get groups where user is a member
-            memberships = FriendGroupMember.query.filter_by(user_id=user_id).all()
-            
+            # Groups and member counts from the membership index (one join when cold)
             groups = []
-            for membership in memberships:
-                group = membership.friend_group
-                if group:
-                    # Count members
-                    member_count = FriendGroupMember.query.filter_by(friend_group_id=group.id).count()
-                    
-                    # Determine capabilities based on group type
-                    can_chat = group.type.value in ['mixed', 'chat_only']
-                    can_babel = group.type.value in ['mixed', 'babel_only']
-                    
-                    groups.append({
-                        'group_id': group.id,
-                        'group_name': group.name,
-                        'group_type': group.type.value,
-                        'member_count': member_count,
-                        'can_chat': can_chat,
-                        'can_babel': can_babel,
-                        'role': membership.role.value,
-                        'created_at': group.created_at.isoformat() if group.created_at else None
-                    })
+            for group in group_index.get_user_groups(user_id):
+                groups.append({
+                    'group_id': group.group_id,
+                    'group_name': group.name,
+                    'group_type': group.type.value,
+                    'member_count': len(group.members),
+                    'can_chat': group.can_chat,
+                    'can_babel': group.can_babel,
+                    'role': group.role_of(user_id).value,
+                    'created_at': group.created_at.isoformat() if group.created_at else None
+                })
             
             return jsonify({
                 'success': True,
@@ -115,46 +106,35 @@ def register_api_friend_group_routes(app):
             user_id = session.get('user_id')
             
             # Check if user is a member of this group
-            membership = FriendGroupMember.query.filter_by(
-                friend_group_id=group_id,
-                user_id=user_id
-            ).first()
-            
-            if not membership:
+            group = group_index.get_group(group_id)
+            if not group or user_id not in group.members:
                 return jsonify({'success': False, 'error': 'You are not a member of this group'}), 403
             
-            group = membership.friend_group
-            if not group:
-                return jsonify({'success': False, 'error': 'Group not found'}), 404
-            
-            # Get all members
+            # Get all members in one query
             members = []
-            for member in group.members:
+            for user in User.query.filter(User.id.in_(list(group.members))).all():
+                role, joined_at = group.members[user.id]
                 members.append({
-                    'user_id': member.user_id,
-                    'username': member.user.username,
-                    'display_name': member.user.display_name,
-                    'role': member.role.value,
-                    'joined_at': member.joined_at.isoformat() if member.joined_at else None
+                    'user_id': user.id,
+                    'username': user.username,
+                    'display_name': user.display_name,
+                    'role': role.value,
+                    'joined_at': joined_at.isoformat() if joined_at else None
                 })
             
-            # Determine capabilities
-            can_chat = group.type.value in ['mixed', 'chat_only']
-            can_babel = group.type.value in ['mixed', 'babel_only']
-            
             return jsonify({
                 'success': True,
                 'group': {
-                    'id': group.id,
+                    'id': group.group_id,
                     'name': group.name,
                     'type': group.type.value,
                     'created_at': group.created_at.isoformat() if group.created_at else None,
                     'creator_id': group.creator_id,
-                    'can_chat': can_chat,
-                    'can_babel': can_babel,
+                    'can_chat': group.can_chat,
+                    'can_babel': group.can_babel,
                     'members': members,
                     'member_count': len(members),
-                    'user_role': membership.role.value
+                    'user_role': group.role_of(user_id).value
                 }
             }), 200
             
@@ -162,6 +142,33 @@ def register_api_friend_group_routes(app):
             logger.error(f"Error getting group details: {str(e)}")
             return jsonify({'success': False, 'error': 'Internal server error'}), 500
     
+    @app.route('/api/friend-groups/<int:group_id>/members', methods=['POST'])
+    @login_required
+    def add_group_members(group_id):
+        """Add one or more members to a friend group in one transaction"""
+        try:
+            data = request.get_json() or {}
+            user_ids = data.get('user_ids')
+            if not isinstance(user_ids, list) or not user_ids:
+                return jsonify({'success': False, 'error': 'user_ids must be a non-empty list'}), 400
+            
+            try:
+                user_ids = [int(member_id) for member_id in user_ids]
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'user_ids must be integers'}), 400
+            
+            user_id = session.get('user_id')
+            result = friend_group_service.add_members_to_group(user_id, group_id, user_ids)
+            
+            if result.get('success'):
+                return jsonify(result), 200
+            else:
+                return jsonify(result), 403 if 'permission' in result.get('error', '') else 400
+            
+        except Exception as e:
+            logger.error(f"Error adding friend group members: {str(e)}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    
     @app.route('/api/friend-groups/<int:group_id>/delete', methods=['DELETE'])
     @login_required
     def delete_group(group_id):
@@ -181,6 +188,7 @@ def register_api_friend_group_routes(app):
             # Delete the group
             db.session.delete(group)
             db.session.commit()
+            group_index.invalidate_group(group_id)
             
             logger.info(f"Friend group {group_id} deleted by user {user_id}")
             
@@ -5,6 +5,7 @@ Single Responsibility: Room management only
 
 from flask import Flask, request, jsonify
 from flask_login import login_required, current_user
+from models import use_read_replica
 
 def register_api_room_routes(app: Flask) -> None:
     """Register room API routes - under 150 lines"""
@@ -128,6 +129,7 @@ def register_api_room_routes(app: Flask) -> None:
 
     @app.route('/api/rooms/discoverable', methods=['GET'])
     @login_required
+    @use_read_replica
     def get_discoverable_rooms():
         """Get public/discoverable rooms for discovery"""
         try:
@@ -138,7 +140,7 @@ def register_api_room_routes(app: Flask) -> None:
             category = request.args.get('category', '')
             
             rooms = room_service.get_discoverable_rooms(
-                current_user=current_user,
+                current_user.id,
                 category=category,
                 search_query=search_query
             )
@@ -156,7 +158,7 @@ def register_api_room_routes(app: Flask) -> None:
             from services.room_service import get_room_service
             
             room_service = get_room_service()
-            rooms = room_service.get_trending_rooms(current_user)
+            rooms = room_service.get_trending_rooms(current_user.id)
             
             return jsonify({'rooms': rooms}), 200
                 
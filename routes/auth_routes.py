@@ -52,6 +52,75 @@ def register_auth_routes(app: Flask) -> None:
         """Age verification page"""
         return render_template('verify_age.html')
 
+    @app.route('/api/verify-id', methods=['POST'])
+    @login_required
+    def verify_id():
+        """Save the ID and selfie uploads and queue OCR verification (poll the returned job)"""
+        id_file = request.files.get('id_document')
+        selfie_file = request.files.get('selfie')
+        if not id_file or not selfie_file:
+            return jsonify({
+                'success': False,
+                'error': 'Please upload both ID document and selfie'
+            }), 400
+        
+        try:
+            from services.id_verification_service import get_id_verification_service
+            from services.job_queue import get_job_queue
+            
+            verification_service = get_id_verification_service()
+            id_path, selfie_path = verification_service.save_verification_images(
+                id_file, selfie_file, current_user.id
+            )
+            job = get_job_queue().enqueue('id_verification.verify', {
+                'id_image_path': id_path,
+                'selfie_path': selfie_path,
+                'user_id': current_user.id
+            }, dedup_key=f"id_verification:{current_user.id}")
+            if not job['created']:
+                # A verification is already running for these earlier uploads - follow that one
+                verification_service.cleanup_verification_files(id_path, selfie_path)
+            return jsonify({
+                'success': True,
+                'pending': True,
+                'job_id': job['id']
+            }), 202
+            
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+
+    @app.route('/api/verify-id/<job_id>', methods=['GET'])
+    @login_required
+    def verify_id_status(job_id):
+        """Status of a queued ID verification, with the result once it has run"""
+        from services.job_queue import get_job_queue
+        
+        job = get_job_queue().get_job(job_id)
+        if job is None or job['task'] != 'id_verification.verify' or job['payload'].get('user_id') != current_user.id:
+            return jsonify({
+                'success': False,
+                'error': 'Verification not found'
+            }), 404
+        
+        if job['status'] in ('queued', 'running'):
+            return jsonify({
+                'success': True,
+                'pending': True,
+                'progress': job['progress']
+            })
+        if job['status'] == 'failed':
+            return jsonify({
+                'success': False,
+                'pending': False,
+                'error': 'Verification could not be completed. Please try again.'
+            })
+        
+        result = job['result'] or {}
+        return jsonify(dict(result, success=bool(result.get('verified')), pending=False))
+
     @app.route('/pending-parental-consent')
     def pending_parental_consent():
         """Page shown to minors waiting for parental consent"""
@@ -6,6 +6,9 @@ Single Responsibility: Chat management operations
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
 from models import db, Chat, ChatParticipant, Message, User
+from services.activity_feed import get_activity_feed
+from services.unread_counter import get_unread_counter
+from services.message_service import get_message_service
 from datetime import datetime
 import logging
 
@@ -23,60 +26,60 @@ def register_chats_api_routes(app):
             active_chats_query = db.session.query(
                 Chat.id,
                 Chat.name,
-                Chat.chat_type,
+                Chat.is_group,
                 Chat.created_at,
                 Chat.last_activity,
                 ChatParticipant.joined_at,
-                ChatParticipant.last_read_message_id
+                ChatParticipant.unread_count
             ).join(
                 ChatParticipant, ChatParticipant.chat_id == Chat.id
             ).filter(
-                ChatParticipant.user_id == current_user.id,
-                ChatParticipant.status == 'active'
+                ChatParticipant.user_id == current_user.id
             ).order_by(
                 Chat.last_activity.desc()
             ).all()
+            chat_ids = [chat_data.id for chat_data in active_chats_query]
+            
+            # Participant counts and last message previews for every chat in two queries
+            participant_counts = dict(db.session.query(
+                ChatParticipant.chat_id, db.func.count(ChatParticipant.id)
+            ).filter(
+                ChatParticipant.chat_id.in_(chat_ids)
+            ).group_by(ChatParticipant.chat_id).all()) if chat_ids else {}
+            
+            latest_ids = db.session.query(db.func.max(Message.id)).filter(
+                Message.chat_id.in_(chat_ids),
+                Message.is_deleted == False
+            ).group_by(Message.chat_id)
+            last_messages = dict(db.session.query(Message.chat_id, Message.original_text).filter(
+                Message.id.in_(latest_ids)
+            ).all()) if chat_ids else {}
+            
+            # Other participant's name for direct chats
+            direct_names = {}
+            direct_ids = [chat_data.id for chat_data in active_chats_query if not chat_data.is_group]
+            if direct_ids:
+                for chat_id, display_name, username in db.session.query(
+                    ChatParticipant.chat_id, User.display_name, User.username
+                ).join(
+                    User, User.id == ChatParticipant.user_id
+                ).filter(
+                    ChatParticipant.chat_id.in_(direct_ids),
+                    ChatParticipant.user_id != current_user.id
+                ).all():
+                    direct_names.setdefault(chat_id, display_name or username)
             
             chats_list = []
             for chat_data in active_chats_query:
-                # Get last message for preview
-                last_message = Message.query.filter_by(
-                    chat_id=chat_data.id
-                ).order_by(Message.created_at.desc()).first()
-                
-                # Count unread messages
-                unread_count = 0
-                if chat_data.last_read_message_id:
-                    unread_count = Message.query.filter(
-                        Message.chat_id == chat_data.id,
-                        Message.id > chat_data.last_read_message_id
-                    ).count()
-                else:
-                    unread_count = Message.query.filter_by(chat_id=chat_data.id).count()
-                
-                # Get participant count
-                participant_count = ChatParticipant.query.filter_by(
-                    chat_id=chat_data.id,
-                    status='active'
-                ).count()
+                participant_count = participant_counts.get(chat_data.id, 0)
                 
                 # Determine chat type and name
                 chat_type = 'room'
                 chat_name = chat_data.name
                 
-                if chat_data.chat_type == 'direct':
+                if not chat_data.is_group:
                     chat_type = 'direct'
-                    # For direct messages, get the other participant's name
-                    other_participant = db.session.query(User.display_name, User.username).join(
-                        ChatParticipant, ChatParticipant.user_id == User.id
-                    ).filter(
-                        ChatParticipant.chat_id == chat_data.id,
-                        ChatParticipant.user_id != current_user.id,
-                        ChatParticipant.status == 'active'
-                    ).first()
-                    
-                    if other_participant:
-                        chat_name = other_participant.display_name or other_participant.username
+                    chat_name = direct_names.get(chat_data.id, chat_name)
                 elif participant_count <= 10:
                     chat_type = 'group'
                 
@@ -97,10 +100,10 @@ def register_chats_api_routes(app):
                     'id': chat_data.id,
                     'name': chat_name,
                     'type': chat_type,
-                    'lastMessage': last_message.content if last_message else 'No messages yet',
+                    'lastMessage': last_messages.get(chat_data.id) or 'No messages yet',
                     'participantCount': participant_count,
                     'lastActive': last_active,
-                    'unreadCount': unread_count
+                    'unreadCount': chat_data.unread_count or 0
                 })
             
             return jsonify({
@@ -221,8 +224,7 @@ def register_chats_api_routes(app):
             # Check if user is participant
             participant = ChatParticipant.query.filter_by(
                 chat_id=chat_id,
-                user_id=current_user.id,
-                status='active'
+                user_id=current_user.id
             ).first()
             
             if not participant:
@@ -235,27 +237,27 @@ def register_chats_api_routes(app):
             limit = min(int(request.args.get('limit', 50)), 100)  # Max 100 messages
             offset = int(request.args.get('offset', 0))
             
-            # Get messages
-            messages = Message.query.filter_by(
-                chat_id=chat_id
+            # Get messages with their senders
+            messages = db.session.query(Message, User).join(
+                User, User.id == Message.sender_id
+            ).filter(
+                Message.chat_id == chat_id,
+                Message.is_deleted == False
             ).order_by(
-                Message.created_at.desc()
+                Message.timestamp.desc(), Message.id.desc()
             ).limit(limit).offset(offset).all()
             
             messages_list = []
-            for msg in messages:
-                # Get sender info
-                sender = User.query.get(msg.sender_id)
-                
+            for msg, sender in messages:
                 messages_list.append({
                     'id': msg.id,
-                    'content': msg.content,
+                    'content': msg.original_text,
                     'sender': {
                         'id': sender.id,
                         'username': sender.username,
                         'display_name': sender.display_name
                     },
-                    'created_at': msg.created_at.isoformat(),
+                    'created_at': msg.timestamp.isoformat(),
                     'message_type': msg.message_type or 'text'
                 })
             
@@ -284,8 +286,7 @@ def register_chats_api_routes(app):
             # Check if user is participant
             participant = ChatParticipant.query.filter_by(
                 chat_id=chat_id,
-                user_id=current_user.id,
-                status='active'
+                user_id=current_user.id
             ).first()
             
             if not participant:
@@ -294,7 +295,7 @@ def register_chats_api_routes(app):
                     'error': 'Not authorized to send messages to this chat'
                 }), 403
             
-            data = request.get_json()
+            data = request.get_json(silent=True) or {}
             message_content = data.get('message', '').strip()
             
             if not message_content:
@@ -303,16 +304,28 @@ def register_chats_api_routes(app):
                     'error': 'Message content is required'
                 }), 400
             
+            # Same burst and daily limits as the Socket.IO send path
+            rate_check = get_message_service().check_send_rate(current_user)
+            if not rate_check['allowed']:
+                return jsonify({
+                    'success': False,
+                    'error': rate_check['error'],
+                    'rate_limit': rate_check['rate_limit']
+                }), 429
+            
             # Create message
             message = Message(
                 chat_id=chat_id,
                 sender_id=current_user.id,
-                content=message_content,
+                original_text=message_content,
+                original_language='AUTO',
                 message_type='text',
-                created_at=datetime.utcnow()
+                timestamp=datetime.utcnow()
             )
             
             db.session.add(message)
+            db.session.flush()  # Get the message ID for the read markers
+            get_unread_counter().record_message(message)
             
             # Update chat activity
             chat = Chat.query.get(chat_id)
@@ -337,6 +350,42 @@ def register_chats_api_routes(app):
                 'error': 'Failed to send message'
             }), 500
     
+    @app.route('/api/v1/chats/<int:chat_id>/read', methods=['POST'])
+    @login_required
+    def mark_chat_read(chat_id):
+        """Mark a chat read up to a message (default: the latest)"""
+        data = request.get_json(silent=True) or {}
+        message_id = data.get('message_id')
+        if message_id is not None and not isinstance(message_id, int):
+            return jsonify({
+                'success': False,
+                'error': 'message_id must be an integer'
+            }), 400
+        
+        result = get_unread_counter().mark_read(current_user.id, chat_id, message_id)
+        if not result['success']:
+            return jsonify(result), 404
+        return jsonify(result)
+    
+    @app.route('/api/v1/chats/unread', methods=['GET'])
+    @login_required
+    def get_unread_counts():
+        """Unread badge counts per chat"""
+        try:
+            counts = get_unread_counter().get_unread_counts(current_user.id)
+            return jsonify({
+                'success': True,
+                'unread': {str(chat_id): count for chat_id, count in counts.items()},
+                'total': sum(counts.values())
+            })
+            
+        except Exception as e:
+            logger.error(f"Error getting unread counts: {e}")
+            return jsonify({
+                'success': False,
+                'error': 'Failed to get unread counts'
+            }), 500
+    
     @app.route('/api/v1/chats', methods=['POST'])
     @login_required
     def create_chat():
@@ -385,6 +434,7 @@ def register_chats_api_routes(app):
                     db.session.add(participant)
             
             db.session.commit()
+            get_activity_feed().record_chat_invite(chat, current_user, participants)
             
             logger.info(f"Chat created: {chat.id} by user {current_user.id}")
             
@@ -5,7 +5,11 @@ Single Responsibility: Friend management operations
 
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
-from models import db, User, UserFriend
+from models import db, User, UserFriend, use_read_replica
+from services.social_graph import get_social_graph
+from services.user_search_index import get_user_search_index
+from services.user_preferences_service import get_user_preferences_service
+from services.activity_feed import get_activity_feed
 from datetime import datetime
 import logging
 
@@ -19,20 +23,19 @@ def register_friends_api_routes(app):
     def get_friends():
         """Get user's friends list with online status"""
         try:
-            # Get friends from database
+            # Friend ids come from the social graph cache (both request directions)
+            friends_since = get_social_graph().get_friends_since(current_user.id)
             friends_query = db.session.query(
                 User.id,
                 User.username,
                 User.display_name,
-                User.bio,
-                User.last_activity,
-                UserFriend.created_at
-            ).join(
-                UserFriend, UserFriend.friend_id == User.id
+                User.last_activity
             ).filter(
-                UserFriend.user_id == current_user.id,
-                UserFriend.status == 'accepted'
-            ).all()
+                User.id.in_(friends_since)
+            ).all() if friends_since else []
+            
+            # Avatar and activity for every friend in one query
+            friend_preferences = get_user_preferences_service().load_preferences(friends_since)
             
             friends_list = []
             for friend in friends_query:
@@ -42,18 +45,9 @@ def register_friends_api_routes(app):
                     time_diff = (datetime.utcnow() - friend.last_activity).total_seconds()
                     is_online = time_diff < 300  # 5 minutes
                 
-                # Get avatar from bio if available
-                avatar = '👤'  # Default avatar
-                activity = None
-                if friend.bio:
-                    try:
-                        import json
-                        bio_data = json.loads(friend.bio)
-                        avatar = bio_data.get('avatar', '👤')
-                        if is_online:
-                            activity = bio_data.get('activity', 'Online')
-                    except:
-                        pass
+                preferences = friend_preferences[friend.id]
+                avatar = preferences.avatar or '👤'  # Default avatar
+                activity = (preferences.activity or 'Online') if is_online else None
                 
                 friends_list.append({
                     'id': friend.id,
@@ -62,7 +56,7 @@ def register_friends_api_routes(app):
                     'avatar': avatar,
                     'status': 'online' if is_online else 'offline',
                     'activity': activity,
-                    'friendship_date': friend.created_at.isoformat() if friend.created_at else None
+                    'friendship_date': datetime.utcfromtimestamp(friends_since[friend.id]).isoformat() if friends_since.get(friend.id) else None
                 })
             
             return jsonify({
@@ -107,7 +101,7 @@ def register_friends_api_routes(app):
                     'error': 'Cannot add yourself as a friend'
                 }), 400
             
-            # Check if friendship already exists
+            # Check if friendship already exists (the database, not the cached graph, guards writes)
             existing_friendship = UserFriend.query.filter(
                 ((UserFriend.user_id == current_user.id) & (UserFriend.friend_id == target_user.id)) |
                 ((UserFriend.user_id == target_user.id) & (UserFriend.friend_id == current_user.id))
@@ -135,6 +129,7 @@ def register_friends_api_routes(app):
             
             db.session.add(friend_request)
             db.session.commit()
+            get_activity_feed().record_friend_request(current_user, target_user.id)
             
             logger.info(f"Friend request sent from {current_user.username} to {username}")
             
@@ -189,7 +184,8 @@ def register_friends_api_routes(app):
     
     @app.route('/api/v1/friends/search', methods=['GET'])
     @login_required
-    def search_users():
+    @use_read_replica
+    def search_friend_candidates():
         """Search for users to add as friends"""
         try:
             query = request.args.get('q', '').strip()
@@ -200,31 +196,20 @@ def register_friends_api_routes(app):
                     'users': []
                 })
             
-            # Search users by username or display name
-            users = User.query.filter(
-                (User.username.ilike(f'%{query}%')) |
-                (User.display_name.ilike(f'%{query}%'))
-            ).filter(
-                User.id != current_user.id  # Exclude current user
-            ).limit(10).all()
+            # Search users by username or display name (prefix index, trigram fallback)
+            search_index = get_user_search_index()
+            users = search_index.load_users(search_index.search(query, limit=10, exclude_ids=[current_user.id]))
+            
+            # Resolve friendship status for every result in one lookup
+            statuses = get_social_graph().get_statuses(current_user.id, [user.id for user in users])
             
             users_list = []
             for user in users:
-                # Check if already friends
-                is_friend = UserFriend.query.filter(
-                    ((UserFriend.user_id == current_user.id) & (UserFriend.friend_id == user.id)) |
-                    ((UserFriend.user_id == user.id) & (UserFriend.friend_id == current_user.id))
-                ).first()
-                
-                friendship_status = 'none'
-                if is_friend:
-                    friendship_status = is_friend.status
-                
                 users_list.append({
                     'id': user.id,
                     'username': user.username,
                     'display_name': user.display_name,
-                    'friendship_status': friendship_status
+                    'friendship_status': statuses[user.id]
                 })
             
             return jsonify({
@@ -245,12 +230,7 @@ def register_friends_api_routes(app):
         """Get specific friend's status"""
         try:
             # Check if they're friends
-            friendship = UserFriend.query.filter(
-                ((UserFriend.user_id == current_user.id) & (UserFriend.friend_id == friend_id)) |
-                ((UserFriend.user_id == friend_id) & (UserFriend.friend_id == current_user.id))
-            ).filter(UserFriend.status == 'accepted').first()
-            
-            if not friendship:
+            if not get_social_graph().are_friends(current_user.id, friend_id):
                 return jsonify({
                     'success': False,
                     'error': 'Not friends'
@@ -302,22 +282,9 @@ def register_friends_api_routes(app):
                     'error': 'Status is required'
                 }), 400
             
-            # Update user's bio with status
+            # Update user's activity status
             current_user.last_activity = datetime.utcnow()
-            
-            # Try to update bio with status
-            try:
-                import json
-                bio_data = {}
-                if current_user.bio:
-                    bio_data = json.loads(current_user.bio)
-                
-                bio_data['activity'] = status
-                current_user.bio = json.dumps(bio_data)
-                
-            except:
-                # If bio parsing fails, create new bio
-                current_user.bio = json.dumps({'activity': status})
+            get_user_preferences_service().set_activity(current_user, status)
             
             db.session.commit()
             
@@ -0,0 +1,48 @@
+"""
+Metrics Routes - Prometheus exposition
+Single Responsibility: Serve runtime telemetry to scrapers and load balancers
+"""
+
+import hmac
+from flask import request, Response, current_app
+from models import db
+from services.metrics import get_metrics, sample_process_gauges
+from services.database_connection_service import get_connection_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+def register_metrics_routes(app):
+    """Register the Prometheus scrape endpoint and the load balancer health check"""
+    
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Metrics for every worker in Prometheus text format"""
+        token = current_app.config.get('METRICS_TOKEN')
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+            if not hmac.compare_digest(supplied, token):
+                return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        
+        try:
+            sample_process_gauges(db.engine)
+            body = get_metrics().render_prometheus()
+        except Exception as e:
+            logger.error(f"Error rendering metrics: {e}")
+            return Response('# metrics unavailable\n', status=500, mimetype='text/plain')
+        
+        return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    @app.route('/health', methods=['GET'])
+    def health_check():
+        """Load balancer health check: cached read-only database probe, 503 when it fails"""
+        probe = get_connection_service().probe()
+        return {
+            'status': 'healthy' if probe['connected'] else 'unhealthy',
+            'database': {
+                'connected': probe['connected'],
+                'response_time_ms': probe['response_time_ms'],
+                'checked_at': probe.get('checked_at'),
+                'cached': probe.get('cached', False)
+            }
+        }, 200 if probe['connected'] else 503
@@ -5,10 +5,11 @@ Single Responsibility: User profile and preferences management
 
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
-from models import db, User
+from models import db, User, use_read_replica
+from services.user_search_index import get_user_search_index, VISIBLE_SCOPES
+from services.user_preferences_service import get_user_preferences_service
 from datetime import datetime
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +25,8 @@ def register_users_api_routes(app):
             current_user.last_activity = datetime.utcnow()
             db.session.commit()
             
-            # Get user preferences from bio
-            preferences = {}
-            if current_user.bio:
-                try:
-                    preferences = json.loads(current_user.bio)
-                except json.JSONDecodeError:
-                    preferences = {}
+            # Get typed user preferences
+            preferences = get_user_preferences_service().get_preferences(current_user.id).to_dict(current_user)
             
             profile_data = {
                 'id': current_user.id,
@@ -131,38 +127,8 @@ def register_users_api_routes(app):
     def get_preferences():
         """Get user preferences"""
         try:
-            # Get preferences from bio field
-            preferences = {
-                'language': {
-                    'preferred': current_user.preferred_language,
-                    'autoTranslate': True,
-                    'showOriginal': False
-                },
-                'notifications': {
-                    'messages': True,
-                    'friend_requests': True,
-                    'mentions': True,
-                    'system': True
-                },
-                'privacy': {
-                    'discoverable': current_user.is_discoverable,
-                    'show_online_status': True,
-                    'allow_friend_requests': True
-                },
-                'theme': {
-                    'mode': 'dark',
-                    'color': 'default'
-                }
-            }
-            
-            # Override with stored preferences if available
-            if current_user.bio:
-                try:
-                    stored_prefs = json.loads(current_user.bio)
-                    if isinstance(stored_prefs, dict):
-                        preferences.update(stored_prefs)
-                except json.JSONDecodeError:
-                    pass
+            # Typed preferences row (defaults if the user has none yet)
+            preferences = get_user_preferences_service().get_preferences(current_user.id).to_dict(current_user)
             
             return jsonify({
                 'success': True,
@@ -183,35 +149,13 @@ def register_users_api_routes(app):
         try:
             data = request.get_json()
             
-            # Get current preferences
-            current_prefs = {}
-            if current_user.bio:
-                try:
-                    current_prefs = json.loads(current_user.bio)
-                except json.JSONDecodeError:
-                    current_prefs = {}
-            
-            # Update preferences
-            if 'language' in data:
-                current_prefs['language'] = data['language']
-                # Update preferred language in user table
-                if 'preferred' in data['language']:
-                    current_user.preferred_language = data['language']['preferred']
-            
-            if 'notifications' in data:
-                current_prefs['notifications'] = data['notifications']
-            
-            if 'privacy' in data:
-                current_prefs['privacy'] = data['privacy']
-                # Update discoverable setting
-                if 'discoverable' in data['privacy']:
-                    current_user.is_discoverable = data['privacy']['discoverable']
-            
-            if 'theme' in data:
-                current_prefs['theme'] = data['theme']
-            
-            # Store preferences in bio field
-            current_user.bio = json.dumps(current_prefs)
+            # Only the known sections are accepted
+            sections = {
+                section: data[section]
+                for section in ('language', 'accessibility', 'notifications', 'privacy', 'theme')
+                if isinstance(data.get(section), dict)
+            }
+            get_user_preferences_service().update_preferences(current_user, sections)
             
             db.session.commit()
             
@@ -222,6 +166,13 @@ def register_users_api_routes(app):
                 'message': 'Preferences updated successfully'
             })
             
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+            
         except Exception as e:
             logger.error(f"Error updating preferences for user {current_user.id}: {e}")
             db.session.rollback()
@@ -252,6 +203,7 @@ def register_users_api_routes(app):
     
     @app.route('/api/v1/users/search', methods=['GET'])
     @login_required
+    @use_read_replica
     def search_users():
         """Search for users"""
         try:
@@ -264,15 +216,10 @@ def register_users_api_routes(app):
                     'users': []
                 })
             
-            # Search users
-            users = User.query.filter(
-                (User.username.ilike(f'%{query}%')) |
-                (User.display_name.ilike(f'%{query}%'))
-            ).filter(
-                User.id != current_user.id,  # Exclude current user
-                User.is_discoverable == True,
-                User.is_blocked == False
-            ).limit(limit).all()
+            # Search discoverable, unblocked users through the prefix/trigram index
+            search_index = get_user_search_index()
+            user_ids = search_index.search(query, VISIBLE_SCOPES, limit, exclude_ids=[current_user.id])
+            users = search_index.load_users(user_ids)
             
             users_list = []
             for user in users:
@@ -285,7 +232,7 @@ def register_users_api_routes(app):
                     'languages_spoken': user.languages_spoken,
                     'interests': user.interests,
                     'is_online': user.is_online,
-                    'last_activity': user.last_activity.isoformat() if user.last_activity else None
+                    'last_seen': user.last_seen.isoformat() if user.last_seen else None
                 })
             
             return jsonify({
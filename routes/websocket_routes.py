@@ -3,6 +3,7 @@ from flask import Flask, request
 from flask_login import current_user
 from flask_socketio import emit, join_room, leave_room
 from datetime import datetime
+from services.tracing import get_tracer, traced
 
 def register_websocket_routes(app: Flask) -> None:
     """Register WebSocket events with dependency injection"""
@@ -12,24 +13,46 @@ def register_websocket_routes(app: Flask) -> None:
     if not socketio:
         return  # Skip if socketio not initialized
     
+    # WebRTC signaling relay - validates peers against the voice registry, then room membership
+    from services.room.room_signaling import RoomSignalingService
+    from services.room_service import get_room_service
+    signaling = RoomSignalingService(
+        socketio,
+        get_room_service().voice,
+        relay_mode=app.config.get('SIGNALING_RELAY_MODE', 'batched'),
+        ice_batch_window_ms=app.config.get('SIGNALING_ICE_BATCH_WINDOW_MS', 40)
+    )
+    app.extensions['signaling'] = signaling
+    
+    # Throttled Babel like/comment count broadcasts
+    from services.babel import get_engagement_counters
+    get_engagement_counters().bind_socketio(
+        socketio,
+        broadcast_interval_ms=app.config.get('BABEL_ENGAGEMENT_BROADCAST_MS', 500)
+    )
+    
+    def _signaling_profile():
+        """Cached sender profile for this socket, falls back to current_user"""
+        profile = signaling.get_profile(request.sid)
+        if profile is None and current_user.is_authenticated:
+            profile = signaling.register_socket(request.sid, current_user)
+        return profile
+    
     @socketio.on('connect')
     def handle_connect(auth):
         """Handle user connection"""
         if current_user.is_authenticated:
-            from models import db
-            current_user.is_online = True
-            current_user.last_seen = datetime.utcnow()
-            db.session.commit()
-            join_room(f"user_{current_user.id}")
+            from services.websocket_service import user_connected
+            user_connected(current_user)
 
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle user disconnection"""
+        from services.websocket_service import socket_disconnected
+        socket_disconnected()
         if current_user.is_authenticated:
-            from models import db
-            current_user.is_online = False
-            current_user.last_seen = datetime.utcnow()
-            db.session.commit()
+            from services.websocket_service import user_disconnected
+            user_disconnected(current_user)
 
     @socketio.on('join_chat')
     def handle_join_chat(data):
@@ -58,7 +81,23 @@ def register_websocket_routes(app: Flask) -> None:
         chat_id = data['chat_id']
         leave_room(f"chat_{chat_id}")
 
+    @socketio.on('join_babel_feed')
+    def handle_join_babel_feed(data=None):
+        """Subscribe to live Babel engagement count updates"""
+        if not current_user.is_authenticated:
+            return
+        
+        from services.babel import BabelEngagementCounters
+        join_room(BabelEngagementCounters.FEED_ROOM)
+
+    @socketio.on('leave_babel_feed')
+    def handle_leave_babel_feed(data=None):
+        """Unsubscribe from Babel engagement count updates"""
+        from services.babel import BabelEngagementCounters
+        leave_room(BabelEngagementCounters.FEED_ROOM)
+
     @socketio.on('send_message')
+    @traced('socket.send_message', root=True)
     def handle_send_message(data):
         """Handle sending a message - with bot detection pipeline"""
         if not current_user.is_authenticated:
@@ -74,9 +113,11 @@ def register_websocket_routes(app: Flask) -> None:
         message_service = get_message_service()
         chat_service = get_chat_service()
         websocket_service = initialize_websocket_service(socketio)
+        tracer = get_tracer()
         
         # 🤖 BOT DETECTION CHECK - Check if user can send messages
-        can_send_check = message_service.can_send_message(current_user)
+        with tracer.span('send.bot_detection'):
+            can_send_check = message_service.can_send_message(current_user)
         if not can_send_check['can_send']:
             emit('message_error', {
                 'error': can_send_check['reason'],
@@ -85,26 +126,30 @@ def register_websocket_routes(app: Flask) -> None:
             })
             return
         
-        # Check message limit
-        messages_today = message_service.get_user_messages_sent(current_user)
+        # Verify user is in chat (before consuming any rate limit)
+        with tracer.span('send.chat_access'):
+            result = chat_service.get_chat_by_id(current_user, chat_id)
+        if result['status'] != 200:
+            emit('message_error', {'error': result['error']})
+            return
+        
+        # Check burst and daily message limits (O(1) rate limiter)
+        with tracer.span('send.rate_limit'):
+            rate_check = message_service.check_send_rate(current_user)
         
-        if len(messages_today) >= 100:
+        if not rate_check['allowed']:
             emit('message_error', {
-                'error': 'Daily message limit exceeded',
+                'error': rate_check['error'],
                 'data_value': f"${current_user.id * 50}",
-                'messages_used': len(messages_today),
-                'message_limit': 100
+                'messages_used': rate_check['rate_limit']['used'],
+                'message_limit': rate_check['rate_limit']['limit'],
+                'retry_after': rate_check['rate_limit']['retry_after']
             })
             return
         
-        # Verify user is in chat
-        result = chat_service.get_chat_by_id(current_user, chat_id)
-        if result['status'] != 200:
-            emit('message_error', {'error': result['error']})
-            return
-        
         # Track common phrases
-        chat_service.add_common_phrase(current_user.id, message_text)
+        with tracer.span('send.phrase_tracking'):
+            chat_service.add_common_phrase(current_user.id, message_text)
         
         # Create message with bot detection
         result = message_service.send_message(
@@ -145,23 +190,24 @@ def register_websocket_routes(app: Flask) -> None:
             })
         
         # Emit to all participants with data vampire info
-        websocket_service.emit_new_message(
-            user_id=current_user.id,
-            chat_id=chat_id,
-            message_data={
-                'message_id': result['message_id'],
-                'content': message_text,
-                'timestamp': result['timestamp'],
-                'sender_username': current_user.username,
-                'data_harvested': result.get('data_harvesting', {}).get('data_value', 0) > 0,
-                'user_data_value': result.get('data_harvesting', {}).get('data_value', 0),
-                'vulnerability_score': result.get('data_harvesting', {}).get('vulnerability_score', 0),
-                'bot_analysis': {
-                    'risk_level': bot_analysis.get('risk_level', 'low'),
-                    'clean_message': bot_analysis.get('risk_level', 'low') == 'low'
+        with tracer.span('send.broadcast'):
+            websocket_service.emit_new_message(
+                user_id=current_user.id,
+                chat_id=chat_id,
+                message_data={
+                    'message_id': result['message_id'],
+                    'content': message_text,
+                    'timestamp': result['timestamp'],
+                    'sender_username': current_user.username,
+                    'data_harvested': result.get('data_harvesting', {}).get('data_value', 0) > 0,
+                    'user_data_value': result.get('data_harvesting', {}).get('data_value', 0),
+                    'vulnerability_score': result.get('data_harvesting', {}).get('vulnerability_score', 0),
+                    'bot_analysis': {
+                        'risk_level': bot_analysis.get('risk_level', 'low'),
+                        'clean_message': bot_analysis.get('risk_level', 'low') == 'low'
+                    }
                 }
-            }
-        )
+            )
 
     @socketio.on('typing')
     def handle_typing(data):
@@ -178,6 +224,17 @@ def register_websocket_routes(app: Flask) -> None:
             'is_typing': is_typing
         }, room=f"chat_{chat_id}", include_self=False)
 
+    @socketio.on('mark_read')
+    def handle_mark_read(data=None):
+        """Mark a chat read up to a message (default: the latest)"""
+        if not current_user.is_authenticated:
+            return
+        
+        from services.unread_counter import get_unread_counter
+        result = get_unread_counter().mark_read_event(current_user.id, data)
+        if not result['success']:
+            emit('error', {'message': result['error']})
+
     @socketio.on('voice_join_request')
     def handle_voice_join_request(data):
         """Handle request to join voice chat"""
@@ -227,6 +284,7 @@ def register_websocket_routes(app: Flask) -> None:
             
             # Leave voice room
             leave_room(f"voice_{room_id}")
+            signaling.discard_pending(current_user.id, room_id)
             
             # Notify others in voice chat
             emit('user_left_voice', {
@@ -244,57 +302,38 @@ def register_websocket_routes(app: Flask) -> None:
     @socketio.on('webrtc_offer')
     def handle_webrtc_offer(data):
         """Handle WebRTC offer for voice chat"""
-        if not current_user.is_authenticated:
+        profile = _signaling_profile()
+        if not profile:
             return
         
-        room_id = data['room_id']
-        target_user_id = data['target_user_id']
-        offer = data['offer']
-        
         # Send offer to specific user
-        emit('webrtc_offer_received', {
-            'from_user_id': current_user.id,
-            'from_username': current_user.username,
-            'from_display_name': current_user.display_name or current_user.username,
-            'offer': offer,
-            'room_id': room_id
-        }, room=f"user_{target_user_id}")
+        result = signaling.relay_offer(profile, data['room_id'], data['target_user_id'], data['offer'])
+        if not result['success']:
+            emit('voice_error', {'message': result['error']})
 
     @socketio.on('webrtc_answer')
     def handle_webrtc_answer(data):
         """Handle WebRTC answer for voice chat"""
-        if not current_user.is_authenticated:
+        profile = _signaling_profile()
+        if not profile:
             return
         
-        room_id = data['room_id']
-        target_user_id = data['target_user_id']
-        answer = data['answer']
-        
         # Send answer to specific user
-        emit('webrtc_answer_received', {
-            'from_user_id': current_user.id,
-            'from_username': current_user.username,
-            'from_display_name': current_user.display_name or current_user.username,
-            'answer': answer,
-            'room_id': room_id
-        }, room=f"user_{target_user_id}")
+        result = signaling.relay_answer(profile, data['room_id'], data['target_user_id'], data['answer'])
+        if not result['success']:
+            emit('voice_error', {'message': result['error']})
 
     @socketio.on('webrtc_ice_candidate')
     def handle_webrtc_ice_candidate(data):
-        """Handle WebRTC ICE candidate for voice chat"""
-        if not current_user.is_authenticated:
+        """Handle WebRTC ICE candidate for voice chat - trickle batched per target"""
+        profile = _signaling_profile()
+        if not profile:
             return
         
-        room_id = data['room_id']
-        target_user_id = data['target_user_id']
-        candidate = data['candidate']
-        
-        # Send ICE candidate to specific user
-        emit('webrtc_ice_candidate_received', {
-            'from_user_id': current_user.id,
-            'candidate': candidate,
-            'room_id': room_id
-        }, room=f"user_{target_user_id}")
+        # Queue ICE candidate for specific user
+        result = signaling.relay_ice_candidate(profile, data['room_id'], data['target_user_id'], data['candidate'])
+        if not result['success']:
+            emit('voice_error', {'message': result['error']})
 
     @socketio.on('voice_status_update')
     def handle_voice_status_update(data):
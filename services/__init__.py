@@ -3,8 +3,9 @@ UniBabel Microservices Registry
 Single Source of Truth for all microservices
 """
 
-from typing import Dict, List, Any
+import importlib
 import logging
+from typing import Dict, List, Any
 
 class MicroserviceRegistry:
     """Registry for all UniBabel microservices"""
@@ -117,44 +118,27 @@ class MicroserviceRegistry:
 # Global registry instance
 microservice_registry = MicroserviceRegistry()
 
-# Import all services to ensure they register themselves
-# Import all services to ensure they register themselves
-# Only import what exists and is needed
-try:
-    from .translation_orchestrator import get_orchestrator
-    translation_orchestrator = get_orchestrator()
-except ImportError as e:
-    print(f"Warning: Could not import translation orchestrator: {e}")
-    translation_orchestrator = None
-
-try:
-    from .user_profile_service import user_profile_service
-except ImportError as e:
-    print(f"Warning: Could not import user profile service: {e}")
-    user_profile_service = None
-
-try:
-    from .chat_service import get_chat_service
-    chat_service = get_chat_service()
-except ImportError as e:
-    print(f"Warning: Could not import chat service: {e}")
-    chat_service = None
-
-try:
-    from .message_service import get_message_service
-    message_service = get_message_service()
-except ImportError as e:
-    print(f"Warning: Could not import message service: {e}")
-    message_service = None
+# Services load on first access rather than when the package is imported:
+# `from services import get_chat_service` imports only the chat service module,
+# and the instance itself is built by the service container on first call
+_LAZY_EXPORTS = {
+    'get_orchestrator': 'services.translation_orchestrator',
+    'get_chat_service': 'services.chat_service',
+    'get_message_service': 'services.message_service',
+    'get_room_service': 'services.room',
+    'get_bot_detection_service': 'services.bot_detection_service',
+    'get_websocket_service': 'services.websocket_service',
+    'initialize_websocket_service': 'services.websocket_service',
+    'get_container': 'services.service_container',
+}
 
-# Export functions for external use
-def get_chat_service():
-    """Get the chat service instance"""
-    return chat_service
 
-def get_message_service():
-    """Get the message service instance"""
-    return message_service
+def __getattr__(name: str):
+    """Resolve lazily exported service accessors (PEP 562)"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'services' has no attribute '{name}'")
+    return getattr(importlib.import_module(module_name), name)
 
 # Print architecture on startup
 microservice_registry.print_architecture()
\ No newline at end of file
@@ -0,0 +1,447 @@
+"""
+Activity Feed 📰⚡
+Per-user activity feeds materialized at write time
+SRIMI: Single responsibility for the recent-activity stream
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event as sa_event, select
+from sqlalchemy.orm import Session, object_session
+from models import db, read_primary, Message, Chat, ChatParticipant, User, UserFriend
+
+try:
+    import redis
+except ImportError:  # Optional - feeds are kept per process without it
+    redis = None
+
+
+def _preview(text: str, length: int = 100) -> str:
+    """Trim message text for the feed"""
+    text = text or ''
+    return text[:length] + ('...' if len(text) > length else '')
+
+
+def _display_name(user) -> str:
+    """Display name with username fallback"""
+    return user.display_name or user.username
+
+
+def message_event(message: Message, sender: User, chat: Chat) -> Dict[str, Any]:
+    """Feed event for a message sent in a shared chat"""
+    return {
+        'type': 'message',
+        'id': f"msg_{message.id}",
+        'title': f"New message in {chat.name}",
+        'content': f"{_display_name(sender)}: {_preview(message.original_text)}",
+        'timestamp': (message.timestamp or datetime.utcnow()).isoformat(),
+        'icon': 'ri-message-3-line',
+        'color': 'blue',
+        'link': f"/chat/{chat.id}",
+        'priority': 'medium'
+    }
+
+
+def friend_request_event(requester: User, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """Feed event for a received friend request"""
+    return {
+        'type': 'friend_request',
+        'id': f"friend_req_{requester.id}",
+        'title': 'New friend request',
+        'content': f"{_display_name(requester)} wants to be your friend",
+        'timestamp': (timestamp or datetime.utcnow()).isoformat(),
+        'icon': 'ri-user-add-line',
+        'color': 'green',
+        'link': '/friends',
+        'priority': 'high'
+    }
+
+
+def presence_event(user: User) -> Dict[str, Any]:
+    """Feed event for a friend coming online"""
+    return {
+        'type': 'friend_online',
+        'id': f"online_{user.id}",
+        'title': 'Friend is online',
+        'content': f"{_display_name(user)} is now online",
+        'timestamp': datetime.utcnow().isoformat(),
+        'icon': 'ri-user-3-line',
+        'color': 'green',
+        'link': f'/profile/{user.id}',
+        'priority': 'low'
+    }
+
+
+def chat_invite_event(chat: Chat, creator: User, timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+    """Feed event for being added to a chat"""
+    return {
+        'type': 'chat_invite',
+        'id': f"chat_invite_{chat.id}",
+        'title': 'Added to chat',
+        'content': f"{_display_name(creator)} added you to {chat.name}",
+        'timestamp': (timestamp or datetime.utcnow()).isoformat(),
+        'icon': 'ri-chat-3-line',
+        'color': 'purple',
+        'link': f'/chat/{chat.id}',
+        'priority': 'medium'
+    }
+
+
+def _event_key(event: Dict[str, Any]) -> tuple:
+    """Identity of an occurrence - ids repeat when e.g. the same user sends a new friend request"""
+    return event['id'], event['timestamp']
+
+
+class _Feed(deque):
+    """
+    A user's events newest-first, remembering when it was last reconciled with the database
+    and which events it has already carried (so reconciling never re-announces them)
+    """
+
+    def __init__(self, events: Iterable[Dict[str, Any]] = (), maxlen: Optional[int] = None):
+        super().__init__(events, maxlen)
+        self.loaded_at = time.time()
+        self.seen = OrderedDict((_event_key(event), None) for event in self)
+
+    def remember(self, event: Dict[str, Any]) -> None:
+        """Record an event as delivered, keeping a few feeds' worth of history"""
+        self.seen[_event_key(event)] = None
+        while len(self.seen) > 4 * (self.maxlen or 100):
+            self.seen.popitem(last=False)
+
+
+class ActivityFeedService:
+    """
+    Capped per-user feeds of activity events.
+
+    Events are appended to every recipient's feed when they happen (message
+    sent, friend request received, friend came online, added to a chat) and
+    pushed to the recipient's Socket.IO room as `activity`, so clients only
+    need to fetch once and then follow deltas. Reads slice the materialized
+    list by a `since` cursor. A feed missing from memory (first read, restart
+    or eviction) is backfilled from the database. In memory mode other workers'
+    events never reach this worker's feeds directly, so a feed older than
+    `local_ttl` seconds is reconciled with a fresh backfill on read; events it
+    never carried get new cursors, so pollers pick them up as deltas, while
+    events it already delivered (even if since trimmed) are not repeated.
+
+    Message events are recorded by a Message insert hook once the send
+    commits, so every send path (Socket.IO handlers, REST, chat service)
+    feeds them without calling in.
+
+    Cursors are microsecond timestamps (or a Redis counter), so they stay
+    monotonic across restarts.
+    """
+
+    KEY_PREFIX = 'unibabel:activity'
+
+    def __init__(self, feed_size: int = 100, max_users: int = 50000, redis_client=None, ttl: int = 7 * 86400,
+                 local_ttl: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.feed_size = feed_size
+        self.max_users = max_users
+        self.redis = redis_client
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.feeds = OrderedDict()  # user_id -> _Feed, least recently used first
+        self.events_published = 0
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self.logger.info(f"📰 Activity Feed initialized ({'redis' if redis_client else 'memory'})")
+
+    # Reads
+    def get_feed(self, user_id: int, since: Optional[int] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Newest-first events plus the cursor to poll/resume from. The first read returns the
+        newest `limit` events; with a `since` cursor it returns the oldest `limit` events after
+        it, so the cursor (the newest event returned) never jumps over unreturned events
+        """
+        events = self._read(user_id)
+        if since is None:
+            page = events[:limit]
+        else:
+            page = [event for event in events if event['seq'] > since][-limit:]
+        cursor = page[0]['seq'] if page else since
+        return {'activities': page, 'cursor': cursor or 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get activity feed statistics"""
+        with self._lock:
+            return {
+                'backend': 'redis' if self.redis is not None else 'memory',
+                'feeds_cached': len(self.feeds),
+                'max_users': self.max_users,
+                'feed_size': self.feed_size,
+                'events_published': self.events_published
+            }
+
+    # Writes (call after the change is committed)
+    def record_message(self, message: Message, sender: User, chat: Chat, recipient_ids: Iterable[int]) -> None:
+        """A message was sent - notify every other participant"""
+        self.publish([user_id for user_id in recipient_ids if user_id != sender.id],
+                     message_event(message, sender, chat))
+
+    def record_friend_request(self, requester: User, target_id: int) -> None:
+        """A friend request was received"""
+        self.publish([target_id], friend_request_event(requester))
+
+    def record_presence(self, user: User, friend_ids: Iterable[int]) -> None:
+        """A user came online - tell their friends (replaces the previous online event)"""
+        self.publish(friend_ids, presence_event(user))
+
+    def record_chat_invite(self, chat: Chat, creator: User, participant_ids: Iterable[int]) -> None:
+        """Users were added to a chat by someone else"""
+        self.publish([user_id for user_id in participant_ids if user_id != creator.id],
+                     chat_invite_event(chat, creator))
+
+    def publish(self, user_ids: Iterable[int], event: Dict[str, Any]) -> None:
+        """Append an event to each recipient's feed and push it live"""
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return
+        try:
+            event = dict(event, seq=self._next_seq())
+            if self.redis is not None:
+                self._publish_shared(user_ids, event)
+            else:
+                with self._lock:
+                    for user_id in user_ids:
+                        feed = self.feeds.get(user_id)
+                        if feed is not None:  # Unmaterialized feeds will backfill from the DB
+                            self._append(feed, event)
+            self.events_published += 1
+            self._push(user_ids, event)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Activity publish failed: {e}")
+
+    def invalidate(self, *user_ids: int) -> None:
+        """Drop feeds so the next read backfills from the DB"""
+        with self._lock:
+            for user_id in user_ids:
+                self.feeds.pop(user_id, None)
+        if self.redis is not None and user_ids:
+            self.redis.delete(*(f'{self.KEY_PREFIX}:{user_id}' for user_id in user_ids))
+
+    # Storage
+    def _append(self, feed: deque, event: Dict[str, Any]) -> None:
+        """Add an event newest-first, replacing an older event with the same id"""
+        for index, existing in enumerate(feed):
+            if existing['id'] == event['id']:
+                del feed[index]
+                break
+        feed.appendleft(event)
+        feed.remember(event)
+
+    def _read(self, user_id: int) -> List[Dict[str, Any]]:
+        """Materialized feed, backfilled on first use and reconciled once older than local_ttl"""
+        if self.redis is not None:
+            return self._read_shared(user_id)
+
+        with self._lock:
+            feed = self.feeds.get(user_id)
+            if feed is not None and time.time() - feed.loaded_at < self.local_ttl:
+                self.feeds.move_to_end(user_id)
+                return list(feed)
+
+        events = self._backfill(user_id)
+        with self._lock:
+            live = self.feeds.get(user_id)
+            if live is None:
+                live = self.feeds[user_id] = _Feed(events, maxlen=self.feed_size)
+                while len(self.feeds) > self.max_users:
+                    self.feeds.popitem(last=False)
+            elif time.time() - live.loaded_at >= self.local_ttl:  # Not reconciled concurrently
+                for event in reversed(events):  # Oldest first, so the newest ends up in front
+                    if _event_key(event) not in live.seen:
+                        self._append(live, dict(event, seq=self._advance_seq()))
+                live.loaded_at = time.time()
+            self.feeds.move_to_end(user_id)
+            return list(live)
+
+    def _read_shared(self, user_id: int) -> List[Dict[str, Any]]:
+        """Read a feed from Redis, backfilling when the key is missing"""
+        key = f'{self.KEY_PREFIX}:{user_id}'
+        raw = self.redis.lrange(key, 0, self.feed_size - 1)
+        if raw:
+            events, seen = [], set()
+            for item in raw:  # Newest first - keep the latest event per id
+                event = json.loads(item)
+                if event['id'] not in seen:
+                    seen.add(event['id'])
+                    events.append(event)
+            return events
+
+        events = self._backfill(user_id)
+        if events:
+            pipe = self.redis.pipeline()
+            pipe.rpush(key, *(json.dumps(event) for event in events))
+            pipe.ltrim(key, 0, self.feed_size - 1)
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        return events
+
+    def _publish_shared(self, user_ids: List[int], event: Dict[str, Any]) -> None:
+        """Prepend to existing Redis feeds (missing feeds backfill on read)"""
+        payload = json.dumps(event)
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            key = f'{self.KEY_PREFIX}:{user_id}'
+            pipe.lpushx(key, payload)
+            pipe.ltrim(key, 0, self.feed_size - 1)
+        pipe.execute()
+
+    def _next_seq(self) -> int:
+        """Monotonic cursor value"""
+        if self.redis is not None:
+            return int(self.redis.incr(f'{self.KEY_PREFIX}:seq'))
+        with self._lock:
+            return self._advance_seq()
+
+    def _advance_seq(self) -> int:
+        """Next in-process cursor value (caller holds the lock)"""
+        self._last_seq = max(self._last_seq + 1, time.time_ns() // 1000)
+        return self._last_seq
+
+    def _push(self, user_ids: List[int], event: Dict[str, Any]) -> None:
+        """Send the delta to connected clients"""
+        socketio = current_app.extensions.get('socketio') if has_app_context() else None
+        if socketio is None:
+            return
+        for user_id in user_ids:
+            socketio.emit('activity', event, room=f"user_{user_id}")
+
+    @read_primary()
+    def _backfill(self, user_id: int) -> List[Dict[str, Any]]:
+        """Rebuild a feed from the database (newest first)"""
+        now = datetime.utcnow()
+        events = []
+
+        # Recent messages from the user's chats
+        messages = db.session.query(Message, Chat, User).join(
+            Chat, Chat.id == Message.chat_id
+        ).join(
+            ChatParticipant, ChatParticipant.chat_id == Chat.id
+        ).join(
+            User, User.id == Message.sender_id
+        ).filter(
+            ChatParticipant.user_id == user_id,
+            Message.sender_id != user_id,
+            Message.is_deleted == False,
+            Message.timestamp > now - timedelta(hours=24)
+        ).order_by(Message.timestamp.desc()).limit(self.feed_size).all()
+        events.extend(message_event(message, sender, chat) for message, chat, sender in messages)
+
+        # Pending friend requests
+        requests = db.session.query(UserFriend.created_at, User).join(
+            User, User.id == UserFriend.user_id
+        ).filter(
+            UserFriend.friend_id == user_id,
+            UserFriend.status == 'pending',
+            UserFriend.created_at > now - timedelta(days=7)
+        ).order_by(UserFriend.created_at.desc()).limit(5).all()
+        events.extend(friend_request_event(requester, created_at) for created_at, requester in requests)
+
+        # Chats the user was added to by someone else
+        chats = db.session.query(Chat, ChatParticipant.joined_at, User).join(
+            ChatParticipant, ChatParticipant.chat_id == Chat.id
+        ).join(
+            User, User.id == Chat.created_by
+        ).filter(
+            ChatParticipant.user_id == user_id,
+            ChatParticipant.joined_at > now - timedelta(hours=24),
+            Chat.created_by != user_id
+        ).order_by(ChatParticipant.joined_at.desc()).limit(5).all()
+        events.extend(chat_invite_event(chat, creator, joined_at) for chat, joined_at, creator in chats)
+
+        # Oldest gets the lowest cursor; backfilled cursors sit below any live one
+        events.sort(key=lambda event: event['timestamp'], reverse=True)
+        events = events[:self.feed_size]
+        base_seq = int((now - timedelta(days=8)).timestamp() * 1_000_000)
+        for position, event in enumerate(reversed(events)):
+            event['seq'] = base_seq + position
+        return events
+
+
+# Message events, recorded from the flush and published once the send commits
+def _on_message_inserted(mapper, connection, message: Message) -> None:
+    """Mapper event: build the feed event while the sender, chat and participants are readable"""
+    session = object_session(message)
+    if session is None:
+        return
+    try:
+        users, chats, participants = User.__table__, Chat.__table__, ChatParticipant.__table__
+        sender = connection.execute(
+            select(users.c.username, users.c.display_name).where(users.c.id == message.sender_id)
+        ).first()
+        chat = connection.execute(select(chats.c.id, chats.c.name).where(chats.c.id == message.chat_id)).first()
+        recipient_ids = connection.execute(select(participants.c.user_id).where(
+            participants.c.chat_id == message.chat_id,
+            participants.c.user_id != message.sender_id
+        )).scalars().all()
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"⚠️ Activity event for message {message.id} skipped: {e}")
+        return
+    if sender is not None and chat is not None and recipient_ids:
+        session.info.setdefault('activity_pending', []).append((recipient_ids, message_event(message, sender, chat)))
+
+
+def _on_commit(session) -> None:
+    """Session event: publish message events from the committed transaction"""
+    for recipient_ids, event in session.info.pop('activity_pending', None) or ():
+        get_activity_feed().publish(recipient_ids, event)
+
+
+def _on_rollback(session) -> None:
+    """Session event: the messages rolled back, drop their events"""
+    session.info.pop('activity_pending', None)
+
+
+sa_event.listen(Message, 'after_insert', _on_message_inserted)
+sa_event.listen(Session, 'after_commit', _on_commit)
+sa_event.listen(Session, 'after_rollback', _on_rollback)
+
+
+# Global instance
+_activity_feed = ActivityFeedService()
+
+
+def get_activity_feed() -> ActivityFeedService:
+    """Get the global activity feed"""
+    return _activity_feed
+
+
+def configure_activity_feed(backend: str = 'memory', redis_url: str = None, feed_size: int = 100,
+                            max_users: int = 50000, local_ttl: float = 30.0, web_workers: int = 1,
+                            message_queue: str = None) -> ActivityFeedService:
+    """Rebuild the global feed with the configured backend (called once at app startup)"""
+    global _activity_feed
+    logger = logging.getLogger(__name__)
+    client = None
+    if backend == 'redis':
+        if redis is None:
+            logger.warning("⚠️ redis package not installed, activity feeds stay in memory")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable for activity feeds, using memory: {e}")
+                client = None
+
+    if web_workers > 1:
+        if client is None:
+            logger.warning(f"⚠️ Activity feeds are per worker with {web_workers} workers - other workers' events "
+                           f"appear up to {local_ttl:g}s late. Set ACTIVITY_FEED_BACKEND=redis")
+        if not message_queue:
+            logger.warning(f"⚠️ Live activity pushes only reach clients on the publishing worker with {web_workers} "
+                           f"workers. Set SOCKETIO_MESSAGE_QUEUE")
+
+    _activity_feed = ActivityFeedService(feed_size=feed_size, max_users=max_users, redis_client=client,
+                                         local_ttl=local_ttl)
+    return _activity_feed
@@ -5,6 +5,10 @@ Babel Services Package - Unified interface for all Babel microservices
 from .babel_posts import BabelPostsService
 from .babel_timeline import BabelTimelineService
 from .babel_interactions import BabelInteractionsService
+from .babel_timeline_store import BabelTimelineStore, get_timeline_store
+from .babel_search_index import BabelSearchIndex, get_search_index
+from .babel_engagement import BabelEngagementCounters, get_engagement_counters
+from .babel_extraction import BabelMetadataExtractor, get_metadata_extractor
 from typing import Dict, Any
 
 
@@ -32,9 +36,9 @@ class BabelService:
         return self.posts.get_user_posts(user_id, viewer_id, page, per_page)
     
     # Timeline operations (delegate to timeline microservice)
-    def get_timeline(self, user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Get timeline posts for a user"""
-        return self.timeline.get_timeline(user_id, page, per_page)
+    def get_timeline(self, user_id: int, cursor: str = None, per_page: int = 20) -> Dict[str, Any]:
+        """Get timeline posts for a user (keyset cursor pagination)"""
+        return self.timeline.get_timeline(user_id, cursor, per_page)
     
     def search_posts(self, query: str, user_id: int, post_type: str = None, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
         """Search Babel posts"""
@@ -134,4 +138,7 @@ def get_babel_service() -> BabelService:
 
 
 # Export individual microservices for direct access if needed
-__all__ = ['BabelService', 'get_babel_service', 'BabelPostsService', 'BabelTimelineService', 'BabelInteractionsService']
\ No newline at end of file
+__all__ = ['BabelService', 'get_babel_service', 'BabelPostsService', 'BabelTimelineService', 'BabelInteractionsService',
+           'BabelTimelineStore', 'get_timeline_store', 'BabelSearchIndex', 'get_search_index',
+           'BabelEngagementCounters', 'get_engagement_counters',
+           'BabelMetadataExtractor', 'get_metadata_extractor']
\ No newline at end of file
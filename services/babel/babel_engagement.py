@@ -0,0 +1,129 @@
+"""
+Babel Engagement Counters - Atomic like/comment counts with throttled broadcasts
+"""
+
+import logging
+import threading
+from typing import Dict, Any
+from models import db, BabelPost, BabelLike
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+
+class BabelEngagementCounters:
+    """
+    Maintain BabelPost engagement counts without read-modify-write.
+
+    Counts change through `UPDATE ... SET likes_count = likes_count + delta` so
+    concurrent writers never overwrite each other. Like toggles rely on the
+    unique (user_id, post_id) constraint instead of a pre-check query. Count
+    changes are coalesced per post and pushed to feed viewers in batches.
+    """
+
+    FEED_ROOM = 'babel_feed'
+
+    def __init__(self, broadcast_interval_ms: int = 500):
+        self.logger = logging.getLogger(__name__)
+        self.socketio = None
+        self.broadcast_interval = broadcast_interval_ms / 1000.0
+
+        # Latest counts per post waiting for the next broadcast
+        self.pending_updates = {}  # post_id -> {'likes_count', 'comments_count'}
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+
+        self.logger.info("📈 Babel Engagement Counters initialized")
+
+    def bind_socketio(self, socketio, broadcast_interval_ms: int = None) -> None:
+        """Attach Socket.IO for count broadcasts"""
+        self.socketio = socketio
+        if broadcast_interval_ms is not None:
+            self.broadcast_interval = broadcast_interval_ms / 1000.0
+
+    # Counter updates (caller commits)
+    def toggle_like(self, user_id: int, post_id: int) -> str:
+        """Like or unlike a post, returns 'liked' or 'unliked'"""
+        removed = BabelLike.query.filter_by(user_id=user_id, post_id=post_id).delete(synchronize_session=False)
+        if removed:
+            self.adjust(post_id, likes=-removed)
+            return 'unliked'
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(BabelLike(user_id=user_id, post_id=post_id))
+        except IntegrityError:
+            # A concurrent request inserted the same like - already counted
+            return 'liked'
+
+        self.adjust(post_id, likes=1)
+        return 'liked'
+
+    def adjust(self, post_id: int, likes: int = 0, comments: int = 0) -> None:
+        """Atomically apply count deltas to a post"""
+        values = {}
+        if likes:
+            values['likes_count'] = BabelPost.likes_count + likes
+        if comments:
+            values['comments_count'] = BabelPost.comments_count + comments
+        if not values:
+            return
+
+        db.session.execute(
+            update(BabelPost).where(BabelPost.id == post_id).values(**values),
+            execution_options={'synchronize_session': False}
+        )
+
+    # Broadcasts
+    def publish(self, post_id: int, counts: Dict[str, int]) -> None:
+        """Queue a committed count change for the next throttled broadcast"""
+        if not self.socketio:
+            return
+
+        with self._lock:
+            self.pending_updates[post_id] = counts
+            schedule_flush = not self._flush_scheduled
+            self._flush_scheduled = True
+
+        if schedule_flush:
+            self.socketio.start_background_task(self._flush_after_interval)
+
+    def flush_updates(self) -> int:
+        """Emit all pending count changes in one event, returns posts sent"""
+        with self._lock:
+            updates = self.pending_updates
+            self.pending_updates = {}
+            self._flush_scheduled = False
+
+        if not updates:
+            return 0
+
+        self.socketio.emit('babel_engagement_update', {
+            'posts': [{'post_id': post_id, **counts} for post_id, counts in updates.items()]
+        }, room=self.FEED_ROOM)
+        return len(updates)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counter broadcast statistics"""
+        with self._lock:
+            return {
+                'broadcast_enabled': self.socketio is not None,
+                'broadcast_interval_ms': int(self.broadcast_interval * 1000),
+                'pending_posts': len(self.pending_updates)
+            }
+
+    def _flush_after_interval(self) -> None:
+        """Background task - wait out the throttle window, then flush"""
+        self.socketio.sleep(self.broadcast_interval)
+        try:
+            self.flush_updates()
+        except Exception as e:
+            self.logger.error(f"❌ Failed to broadcast engagement updates: {str(e)}")
+
+
+# Global instance
+_engagement_counters = BabelEngagementCounters()
+
+
+def get_engagement_counters() -> BabelEngagementCounters:
+    """Get the global engagement counters instance"""
+    return _engagement_counters
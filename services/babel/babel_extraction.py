@@ -0,0 +1,73 @@
+"""
+Babel Metadata Extraction - Single-pass hashtag, language and topic extraction
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Iterable
+
+
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), 'babel_vocabulary.json')
+
+
+class BabelMetadataExtractor:
+    """
+    Extract hashtags, languages and topics from post content in one scan.
+
+    A single precompiled token pattern walks the content once; each word is
+    lowercased and looked up in a keyword table (a one-word-per-keyword
+    automaton), so cost is linear in the content and independent of the
+    vocabulary size. The vocabulary is loaded from JSON (BABEL_VOCABULARY_PATH
+    overrides the bundled file), so new languages and topics need no code change.
+    """
+
+    TOKEN_PATTERN = re.compile(r'(#?)(\w+)', re.UNICODE)
+
+    def __init__(self, languages: Iterable[str], topics: Iterable[str]):
+        self.logger = logging.getLogger(__name__)
+        self.keyword_kinds = {}  # keyword -> 'languages' | 'topics'
+        for kind, words in (('languages', languages), ('topics', topics)):
+            for word in words:
+                keyword = word.strip().lower()
+                if keyword:
+                    self.keyword_kinds.setdefault(keyword, kind)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> 'BabelMetadataExtractor':
+        """Build an extractor from a vocabulary JSON file"""
+        path = path or os.environ.get('BABEL_VOCABULARY_PATH') or DEFAULT_VOCABULARY_PATH
+        with open(path, encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        return cls(vocabulary.get('languages', []), vocabulary.get('topics', []))
+
+    def extract(self, content: str) -> Dict[str, List[str]]:
+        """Return hashtags, languages and topics in order of first appearance"""
+        found = {'hashtags': {}, 'languages': {}, 'topics': {}}
+        if not content:
+            return {kind: [] for kind in found}
+
+        lookup = self.keyword_kinds.get
+        for hashtag_marker, word in self.TOKEN_PATTERN.findall(content):
+            if hashtag_marker:
+                found['hashtags'][word] = None  # '#art' also counts as the topic 'art'
+            keyword = word.lower()
+            kind = lookup(keyword)
+            if kind:
+                found[kind][keyword] = None
+
+        # Dicts preserve insertion order and dedupe
+        return {kind: list(values) for kind, values in found.items()}
+
+
+# Global instance
+_extractor = None
+
+
+def get_metadata_extractor() -> BabelMetadataExtractor:
+    """Get the global metadata extractor, loading the vocabulary on first use"""
+    global _extractor
+    if _extractor is None:
+        _extractor = BabelMetadataExtractor.from_file()
+    return _extractor
@@ -11,6 +11,8 @@ import bleach
 
 # Translation Pipeline Integration
 from ..translation_orchestrator import get_orchestrator, TranslationRequest
+from .babel_timeline_store import get_timeline_store
+from .babel_engagement import get_engagement_counters
 
 
 class BabelInteractionsService:
@@ -22,6 +24,9 @@ class BabelInteractionsService:
         # Translation Pipeline Integration
         self.translation_orchestrator = get_orchestrator()
         
+        # Atomic engagement counters
+        self.counters = get_engagement_counters()
+        
         self.logger.info("❤️ Babel Interactions Service initialized")
     
     def like_post(self, user_id: int, post_id: int) -> Dict[str, Any]:
@@ -36,32 +41,23 @@ class BabelInteractionsService:
         if not user.can_contact_user(post.user):
             return {'error': 'Cannot interact with this post', 'status': 403}
         
-        # Check if already liked
-        existing_like = BabelLike.query.filter_by(
-            user_id=user_id,
-            post_id=post_id
-        ).first()
-        
+        action = 'like'
         try:
-            if existing_like:
-                # Unlike
-                db.session.delete(existing_like)
-                post.likes_count = max(0, post.likes_count - 1)
-                action = 'unliked'
-            else:
-                # Like
-                like = BabelLike(user_id=user_id, post_id=post_id)
-                db.session.add(like)
-                post.likes_count += 1
-                action = 'liked'
-            
+            # Toggle backed by the unique constraint, counts updated in SQL
+            action = self.counters.toggle_like(user_id, post_id)
             db.session.commit()
             
+            counts = {'likes_count': post.likes_count, 'comments_count': post.comments_count}
+            self.counters.publish(post_id, counts)
+            
+            # Re-rank in the materialized timeline
+            get_timeline_store().update_post(post, post.user.user_type.value)
+            
             self.logger.info(f"❤️ User {user_id} {action} post {post_id}")
             
             return {
                 'action': action,
-                'likes_count': post.likes_count,
+                'likes_count': counts['likes_count'],
                 'message': f'Post {action}',
                 'status': 200
             }
@@ -97,7 +93,7 @@ class BabelInteractionsService:
         try:
             db.session.add(comment)
             db.session.flush()  # Get the comment ID
-            post.comments_count += 1
+            self.counters.adjust(post_id, comments=1)
             
             # 🧛‍♂️ ROUTE THROUGH TRANSLATION PIPELINE FOR DATA HARVESTING
             pipeline_result = self._process_through_translation_pipeline(
@@ -114,6 +110,11 @@ class BabelInteractionsService:
             
             db.session.commit()
             
+            self.counters.publish(post_id, {'likes_count': post.likes_count, 'comments_count': post.comments_count})
+            
+            # Re-rank in the materialized timeline
+            get_timeline_store().update_post(post, post.user.user_type.value)
+            
             self.logger.info(f"💬 User {user_id} commented on post {post_id} - Data value: ${pipeline_result.get('data_value', 0)}")
             
             response = {
@@ -182,11 +183,17 @@ class BabelInteractionsService:
             # Update post comment count
             post = BabelPost.query.get(comment.post_id)
             if post:
-                post.comments_count = max(0, post.comments_count - 1)
+                self.counters.adjust(post.id, comments=-1)
             
             db.session.delete(comment)
             db.session.commit()
             
+            if post:
+                self.counters.publish(post.id, {'likes_count': post.likes_count, 'comments_count': post.comments_count})
+                
+                # Re-rank in the materialized timeline
+                get_timeline_store().update_post(post, post.user.user_type.value)
+            
             self.logger.info(f"🗑️ User {user_id} deleted comment {comment_id}")
             
             return {
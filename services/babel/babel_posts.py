@@ -4,9 +4,8 @@ Babel Posts Service - Handle post creation and management
 
 import logging
 import json
-import re
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List
 from models import db, User, BabelPost, BabelPostType
 from sqlalchemy import desc
@@ -14,6 +13,10 @@ import bleach
 
 # Translation Pipeline Integration
 from ..translation_orchestrator import get_orchestrator, TranslationRequest
+from .babel_timeline_store import get_timeline_store
+from .babel_search_index import get_search_index
+from .babel_extraction import get_metadata_extractor
+from ..rate_limiter import get_rate_limiter, RateLimitPolicy
 
 
 class BabelPostsService:
@@ -24,9 +27,16 @@ class BabelPostsService:
         self.max_post_length = 500
         self.max_posts_per_day = 20
         
+        # Shared rate limiter - one policy per limit
+        self.rate_limiter = get_rate_limiter()
+        self.rate_limiter.register_policy(RateLimitPolicy('babel_post_daily', limit=self.max_posts_per_day, window=86400))
+        
         # Translation Pipeline Integration
         self.translation_orchestrator = get_orchestrator()
         
+        # Precompiled hashtag/language/topic extraction
+        self.extractor = get_metadata_extractor()
+        
         self.logger.info("📝 Babel Posts Service initialized")
     
     def create_post(self, user_id: int, content: str, post_type: str = 'text') -> Dict[str, Any]:
@@ -46,10 +56,15 @@ class BabelPostsService:
         except ValueError:
             post_type_enum = BabelPostType.TEXT
         
-        # Extract metadata
-        tags = self._extract_hashtags(content)
-        languages = self._extract_languages(content)
-        topics = self._extract_topics(content)
+        # Extract metadata in a single pass
+        metadata = self.extractor.extract(content)
+        tags = metadata['hashtags']
+        languages = metadata['languages']
+        topics = metadata['topics']
+        
+        # Full-text index DDL must run before this request holds a write lock
+        search_index = get_search_index()
+        search_index.ensure_fulltext_index()
         
         # Create post
         post = BabelPost(
@@ -65,6 +80,9 @@ class BabelPostsService:
             db.session.add(post)
             db.session.flush()  # Get the post ID
             
+            # Write the tag inverted index in the same transaction
+            search_index.index_post(post, tags, topics, languages)
+            
             # 🧛‍♂️ ROUTE THROUGH TRANSLATION PIPELINE FOR DATA HARVESTING
             pipeline_result = self._process_through_translation_pipeline(
                 user_id=user_id,
@@ -81,6 +99,12 @@ class BabelPostsService:
             
             db.session.commit()
             
+            # Count the post against the daily limit only once it exists
+            self.rate_limiter.hit('babel_post_daily', user_id, seed=lambda: self._recent_post_times(user_id))
+            
+            # Fan out into the materialized timeline
+            get_timeline_store().add_post(post, user.user_type.value)
+            
             self.logger.info(f"📝 User {user_id} created post {post.id} - Data value: ${pipeline_result.get('data_value', 0)}")
             
             response = {
@@ -148,54 +172,22 @@ class BabelPostsService:
         if len(content) > self.max_post_length:
             return {'valid': False, 'error': f'Post too long (max {self.max_post_length} characters)', 'status': 400}
         
-        # Check daily post limit
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        posts_today = BabelPost.query.filter(
-            BabelPost.user_id == user_id,
-            BabelPost.created_at >= today
-        ).count()
-        
-        if posts_today >= self.max_posts_per_day:
+        # Check daily post limit (rolling 24h, seeded from the DB the first time a user posts);
+        # create_post consumes it after the commit, so failed creates don't use up the quota
+        daily = self.rate_limiter.peek('babel_post_daily', user_id, seed=lambda: self._recent_post_times(user_id))
+        if not daily.allowed:
             return {'valid': False, 'error': f'Daily post limit reached ({self.max_posts_per_day})', 'status': 429}
         
         return {'valid': True}
     
-    def _extract_hashtags(self, content: str) -> List[str]:
-        """Extract hashtags from content"""
-        hashtags = re.findall(r'#(\w+)', content)
-        return list(set(hashtags))  # Remove duplicates
-    
-    def _extract_languages(self, content: str) -> List[str]:
-        """Extract language mentions from content"""
-        languages = []
-        language_patterns = [
-            r'\b(english|spanish|french|german|italian|portuguese|russian|japanese|korean|chinese|arabic|hindi)\b',
-            r'\b(practice|learn|speak|fluent)\s+(english|spanish|french|german|italian|portuguese|russian|japanese|korean|chinese|arabic|hindi)\b'
-        ]
-        
-        for pattern in language_patterns:
-            matches = re.findall(pattern, content.lower())
-            if isinstance(matches[0], tuple):
-                languages.extend([m[1] for m in matches])
-            else:
-                languages.extend(matches)
-        
-        return list(set(languages))
-    
-    def _extract_topics(self, content: str) -> List[str]:
-        """Extract topics/interests from content"""
-        topics = []
-        topic_patterns = [
-            r'\b(gaming|music|movies|sports|technology|art|food|travel|books|anime|manga)\b',
-            r'\b(coding|programming|python|javascript|react|nodejs)\b',
-            r'\b(fitness|yoga|meditation|cooking|photography|drawing|painting)\b'
-        ]
-        
-        for pattern in topic_patterns:
-            matches = re.findall(pattern, content.lower())
-            topics.extend(matches)
-        
-        return list(set(topics))
+    def _recent_post_times(self, user_id: int) -> List[float]:
+        """Post timestamps from the last 24 hours"""
+        since = datetime.utcnow() - timedelta(days=1)
+        rows = db.session.query(BabelPost.created_at).filter(
+            BabelPost.user_id == user_id,
+            BabelPost.created_at >= since
+        ).all()
+        return [created_at.replace(tzinfo=timezone.utc).timestamp() for (created_at,) in rows if created_at]
     
     def _process_through_translation_pipeline(self, user_id: int, content: str, 
                                            communication_type: str, content_id: int, 
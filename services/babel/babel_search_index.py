@@ -0,0 +1,214 @@
+"""
+Babel Search Index - Tag inverted index and ranked full-text search
+"""
+
+import json
+import logging
+import re
+import threading
+from typing import Dict, Any, List
+from models import db, BabelPost, BabelPostTag
+from sqlalchemy import desc, func, text, literal_column, table, column
+
+
+class BabelSearchIndex:
+    """
+    Index Babel posts for topic feeds and search.
+
+    Tags are written to babel_post_tag at post time so topic feeds are range
+    scans on (tag, created_at). Content search uses SQLite FTS5 (kept in sync by
+    triggers) or a PostgreSQL tsvector GIN index, with a tag/ILIKE fallback.
+    """
+
+    FTS_TABLE = 'babel_post_fts'
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.fts_available = None  # Unknown until the first ensure_fulltext_index()
+        self._lock = threading.Lock()
+        self.logger.info("🔎 Babel Search Index initialized")
+
+    @staticmethod
+    def normalize_tag(tag: str) -> str:
+        """Normalize a hashtag/topic for exact index lookups"""
+        return (tag or '').strip().lstrip('#').lower()[:64]
+
+    # Writes
+    def index_post(self, post: BabelPost, tags: List[str], topics: List[str], languages: List[str]) -> None:
+        """Write tag index rows for a post (caller commits) - one row per tag, hashtags win"""
+        seen = set()
+        for kind, values in (('hashtag', tags), ('topic', topics), ('language', languages)):
+            for value in values or []:
+                tag = self.normalize_tag(value)
+                if not tag or tag in seen:
+                    continue
+                seen.add(tag)
+                db.session.add(BabelPostTag(
+                    post_id=post.id,
+                    tag=tag,
+                    kind=kind,
+                    created_at=post.created_at
+                ))
+
+    def ensure_fulltext_index(self) -> bool:
+        """Create the dialect's full-text index once per process"""
+        if self.fts_available is not None:
+            return self.fts_available
+
+        with self._lock:
+            if self.fts_available is not None:
+                return self.fts_available
+
+            dialect = db.engine.dialect.name
+            try:
+                if dialect == 'sqlite':
+                    self._create_sqlite_fts()
+                elif dialect == 'postgresql':
+                    self._create_postgres_fts()
+                else:
+                    self.fts_available = False
+                    return False
+                self.fts_available = True
+                self.logger.info(f"🔎 Full-text index ready ({dialect})")
+            except Exception as e:
+                self.fts_available = False
+                self.logger.warning(f"⚠️ Full-text index unavailable, using tag/ILIKE fallback: {e}")
+
+        return self.fts_available
+
+    # Reads
+    def filter_by_tag(self, query, topic: str, kinds=('hashtag', 'topic')):
+        """Restrict a BabelPost query to posts carrying an exact tag"""
+        return query.join(BabelPostTag, BabelPostTag.post_id == BabelPost.id).filter(
+            BabelPostTag.tag == self.normalize_tag(topic),
+            BabelPostTag.kind.in_(kinds)
+        )
+
+    def apply_search(self, query, search_text: str):
+        """Restrict a BabelPost query to matches and order by relevance"""
+        if search_text.strip().startswith('#'):
+            query = self.filter_by_tag(query, search_text, kinds=('hashtag',))
+            return query.order_by(desc(BabelPostTag.created_at))
+
+        tokens = [token.lower() for token in self.TOKEN_PATTERN.findall(search_text)]
+        if not tokens:
+            return query.filter(db.false())
+
+        dialect = db.engine.dialect.name
+        if self.ensure_fulltext_index() and dialect == 'sqlite':
+            fts = table(self.FTS_TABLE, column('rowid'), column('rank'))
+            match = ' '.join(f'"{token}"*' for token in tokens)  # Prefix match, implicit AND
+            return query.join(fts, fts.c.rowid == BabelPost.id).filter(
+                literal_column(self.FTS_TABLE).op('MATCH')(match)
+            ).order_by(fts.c.rank, desc(BabelPost.created_at))
+
+        if self.fts_available and dialect == 'postgresql':
+            vector = func.to_tsvector('simple', self._search_document())
+            ts_query = func.plainto_tsquery('simple', ' '.join(tokens))
+            return query.filter(vector.op('@@')(ts_query)).order_by(
+                desc(func.ts_rank(vector, ts_query)), desc(BabelPost.created_at)
+            )
+
+        # Fallback: exact tag hits or content substring
+        tagged = db.session.query(BabelPostTag.post_id).filter(BabelPostTag.tag.in_(tokens))
+        return query.filter(db.or_(
+            BabelPost.id.in_(tagged),
+            BabelPost.content.ilike(f'%{search_text}%')
+        )).order_by(
+            desc(BabelPost.likes_count + BabelPost.comments_count),
+            desc(BabelPost.created_at)
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get search index statistics"""
+        return {
+            'fts_available': self.fts_available,
+            'dialect': db.engine.dialect.name,
+            'indexed_tags': BabelPostTag.query.count()
+        }
+
+    def rebuild_tag_index(self, batch_size: int = 500) -> Dict[str, Any]:
+        """Backfill babel_post_tag from the JSON tags/topics/languages columns"""
+        indexed_posts = 0
+        last_id = 0
+        try:
+            while True:
+                posts = BabelPost.query.filter(BabelPost.id > last_id).order_by(BabelPost.id).limit(batch_size).all()
+                if not posts:
+                    break
+
+                post_ids = [post.id for post in posts]
+                BabelPostTag.query.filter(BabelPostTag.post_id.in_(post_ids)).delete(synchronize_session=False)
+                for post in posts:
+                    self.index_post(
+                        post,
+                        json.loads(post.tags) if post.tags else [],
+                        json.loads(post.topics) if post.topics else [],
+                        post.languages.split(', ') if post.languages else []
+                    )
+                db.session.commit()
+
+                indexed_posts += len(posts)
+                last_id = post_ids[-1]
+
+            return {'success': True, 'indexed_posts': indexed_posts}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"❌ Failed to rebuild tag index: {str(e)}")
+            return {'success': False, 'error': str(e), 'indexed_posts': indexed_posts}
+
+    def _search_document(self):
+        """Text indexed for PostgreSQL search - must match the GIN index expression"""
+        return (
+            func.coalesce(BabelPost.content, '') + ' ' +
+            func.coalesce(BabelPost.tags, '') + ' ' +
+            func.coalesce(BabelPost.topics, '') + ' ' +
+            func.coalesce(BabelPost.languages, '')
+        )
+
+    def _create_sqlite_fts(self) -> None:
+        """FTS5 table kept in sync with babel_post by triggers, then backfilled"""
+        keywords = "coalesce({p}.tags, '') || ' ' || coalesce({p}.topics, '') || ' ' || coalesce({p}.languages, '')"
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} USING fts5(content, keywords)",
+            f"""CREATE TRIGGER IF NOT EXISTS babel_post_fts_insert AFTER INSERT ON babel_post BEGIN
+                INSERT INTO {self.FTS_TABLE}(rowid, content, keywords)
+                VALUES (new.id, new.content, {keywords.format(p='new')});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS babel_post_fts_update AFTER UPDATE OF content, tags, topics, languages ON babel_post BEGIN
+                DELETE FROM {self.FTS_TABLE} WHERE rowid = old.id;
+                INSERT INTO {self.FTS_TABLE}(rowid, content, keywords)
+                VALUES (new.id, new.content, {keywords.format(p='new')});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS babel_post_fts_delete AFTER DELETE ON babel_post BEGIN
+                DELETE FROM {self.FTS_TABLE} WHERE rowid = old.id;
+            END""",
+            f"""INSERT INTO {self.FTS_TABLE}(rowid, content, keywords)
+                SELECT id, content, {keywords.format(p='babel_post')} FROM babel_post
+                WHERE id NOT IN (SELECT rowid FROM {self.FTS_TABLE})"""
+        ]
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
+    def _create_postgres_fts(self) -> None:
+        """Expression GIN index over the search document"""
+        with db.engine.begin() as connection:
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_babel_post_fts ON babel_post USING GIN (
+                    to_tsvector('simple',
+                        coalesce(content, '') || ' ' || coalesce(tags, '') || ' ' ||
+                        coalesce(topics, '') || ' ' || coalesce(languages, ''))
+                )
+            """))
+
+
+# Global instance
+_search_index = BabelSearchIndex()
+
+
+def get_search_index() -> BabelSearchIndex:
+    """Get the global search index instance"""
+    return _search_index
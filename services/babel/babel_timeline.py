@@ -3,9 +3,13 @@ Babel Timeline Service - Handle feed generation and content discovery
 """
 
 import logging
+from datetime import datetime, timezone
 from typing import Dict, Any, List
-from models import db, User, BabelPost, BabelLike
+from models import db, User, UserType, BabelPost, BabelLike, BabelPostTag
 from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
+from .babel_timeline_store import get_timeline_store
+from .babel_search_index import get_search_index
 
 
 class BabelTimelineService:
@@ -13,40 +17,44 @@ class BabelTimelineService:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.timeline_store = get_timeline_store()
+        self.search_index = get_search_index()
         self.logger.info("📰 Babel Timeline Service initialized")
     
-    def get_timeline(self, user_id: int, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Get timeline posts for a user"""
+    def get_timeline(self, user_id: int, cursor: str = None, per_page: int = 20) -> Dict[str, Any]:
+        """Get timeline posts for a user - keyset paginated from the materialized feed"""
         user = User.query.get(user_id)
         if not user:
             return {'error': 'User not found', 'status': 404}
         
-        # Get posts from users the current user can interact with (age-appropriate)
-        posts_query = BabelPost.query.join(User).filter(
-            BabelPost.is_approved == True,
-            BabelPost.is_flagged == False
-        )
+        after = None
+        if cursor:
+            after = self.timeline_store.decode_cursor(cursor)
+            if after is None:
+                return {'error': 'Invalid cursor', 'status': 400}
         
-        # Apply age-based filtering
-        posts_query = self._apply_age_filtering(posts_query, user)
+        per_page = max(1, min(per_page, 50))
+        segment = user.user_type.value
+        page = self.timeline_store.get_page(segment, after, per_page)
+        post_ids, keys, has_next = page['post_ids'], page['keys'], page['has_next']
         
-        # Order by engagement and recency
-        posts_query = posts_query.order_by(
-            desc(BabelPost.likes_count + BabelPost.comments_count),
-            desc(BabelPost.created_at)
-        )
+        # Continue past the materialized window with a keyset query (never OFFSET)
+        if page['window_exhausted']:
+            resume_after = keys[-1] if keys else after
+            extra = self._get_ranked_keys_after(segment, resume_after, per_page - len(post_ids) + 1)
+            has_next = len(extra) > per_page - len(post_ids)
+            extra = extra[:per_page - len(post_ids)]
+            post_ids += [-key[2] for key in extra]
+            keys += extra
         
-        # Paginate
-        posts = posts_query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        posts = self._load_posts(post_ids)
         
         # Get user's liked posts for UI state
-        liked_posts = self._get_user_liked_posts(user_id, posts.items)
+        liked_posts = self._get_user_liked_posts(user_id, posts)
         
         # Build response
         timeline_posts = []
-        for post in posts.items:
+        for post in posts:
             post_data = post.to_dict()
             post_data['is_liked'] = post.id in liked_posts
             timeline_posts.append(post_data)
@@ -54,11 +62,9 @@ class BabelTimelineService:
         return {
             'posts': timeline_posts,
             'pagination': {
-                'page': posts.page,
-                'per_page': posts.per_page,
-                'total': posts.total,
-                'has_next': posts.has_next,
-                'has_prev': posts.has_prev
+                'per_page': per_page,
+                'next_cursor': self.timeline_store.encode_cursor(keys[-1]) if has_next and keys else None,
+                'has_next': has_next
             },
             'status': 200
         }
@@ -75,29 +81,20 @@ class BabelTimelineService:
         # Base search query
         search_query = BabelPost.query.join(User).filter(
             BabelPost.is_approved == True,
-            BabelPost.is_flagged == False,
-            db.or_(
-                BabelPost.content.ilike(f'%{query}%'),
-                BabelPost.tags.ilike(f'%{query}%'),
-                BabelPost.topics.ilike(f'%{query}%'),
-                BabelPost.languages.ilike(f'%{query}%')
-            )
+            BabelPost.is_flagged == False
         )
         
         # Filter by post type if specified
         if post_type:
             from models import BabelPostType
             if post_type in [t.value for t in BabelPostType]:
-                search_query = search_query.filter(BabelPost.post_type == post_type)
+                search_query = search_query.filter(BabelPost.post_type == BabelPostType(post_type))
         
         # Apply age-based filtering
         search_query = self._apply_age_filtering(search_query, user)
         
-        # Order by relevance and recency
-        search_query = search_query.order_by(
-            desc(BabelPost.likes_count + BabelPost.comments_count),
-            desc(BabelPost.created_at)
-        )
+        # Match through the full-text/tag index, ordered by relevance
+        search_query = self.search_index.apply_search(search_query, query)
         
         posts = search_query.paginate(
             page=page, per_page=per_page, error_out=False
@@ -179,19 +176,18 @@ class BabelTimelineService:
         
         topic_query = BabelPost.query.join(User).filter(
             BabelPost.is_approved == True,
-            BabelPost.is_flagged == False,
-            db.or_(
-                BabelPost.tags.ilike(f'%{topic}%'),
-                BabelPost.topics.ilike(f'%{topic}%')
-            )
+            BabelPost.is_flagged == False
         )
         
+        # Exact tag match - range scan on the (tag, created_at) index
+        topic_query = self.search_index.filter_by_tag(topic_query, topic)
+        
         # Apply age-based filtering
         topic_query = self._apply_age_filtering(topic_query, user)
         
         # Order by recency and engagement
         topic_query = topic_query.order_by(
-            desc(BabelPost.created_at),
+            desc(BabelPostTag.created_at),
             desc(BabelPost.likes_count + BabelPost.comments_count)
         )
         
@@ -217,12 +213,52 @@ class BabelTimelineService:
         if user.user_type.value == 'child':
             query = query.filter(User.user_type == user.user_type)
         elif user.user_type.value == 'teen':
-            query = query.filter(User.user_type.in_(['teen', 'adult']))
+            query = query.filter(User.user_type.in_([UserType.TEEN, UserType.ADULT]))
         else:  # adult
-            query = query.filter(User.user_type.in_(['teen', 'adult']))
+            query = query.filter(User.user_type.in_([UserType.TEEN, UserType.ADULT]))
         
         return query
     
+    def _get_ranked_keys_after(self, segment: str, after, limit: int) -> List:
+        """Keyset query for rank keys past a cursor, used beyond the materialized window"""
+        engagement = BabelPost.likes_count + BabelPost.comments_count
+        query = db.session.query(
+            BabelPost.id, engagement, BabelPost.created_at
+        ).join(User, BabelPost.user_id == User.id).filter(
+            BabelPost.is_approved == True,
+            BabelPost.is_flagged == False,
+            User.user_type.in_(self.timeline_store.FEED_AUTHOR_TYPES[self.timeline_store.segment_for(segment)])
+        )
+        
+        if after:
+            score, created_us, post_id = -after[0], -after[1], -after[2]
+            created_at = datetime.fromtimestamp(created_us / 1_000_000, tz=timezone.utc).replace(tzinfo=None)
+            query = query.filter(db.or_(
+                engagement < score,
+                db.and_(engagement == score, BabelPost.created_at < created_at),
+                db.and_(engagement == score, BabelPost.created_at == created_at, BabelPost.id < post_id)
+            ))
+        
+        rows = query.order_by(
+            desc(engagement), desc(BabelPost.created_at), desc(BabelPost.id)
+        ).limit(limit).all()
+        
+        return [self.timeline_store.rank_key(post_id, score, created_at) for post_id, score, created_at in rows]
+    
+    def _load_posts(self, post_ids: List[int]) -> List:
+        """Hydrate posts by id in one query, preserving feed order"""
+        if not post_ids:
+            return []
+        
+        posts = BabelPost.query.options(joinedload(BabelPost.user)).filter(
+            BabelPost.id.in_(post_ids),
+            BabelPost.is_approved == True,
+            BabelPost.is_flagged == False
+        ).all()
+        
+        posts_by_id = {post.id: post for post in posts}
+        return [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+    
     def _get_user_liked_posts(self, user_id: int, posts: List) -> set:
         """Get set of post IDs that user has liked"""
         if not posts:
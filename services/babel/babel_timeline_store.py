@@ -0,0 +1,279 @@
+"""
+Babel Timeline Store - Materialized ranked feeds with keyset cursors
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_right, insort
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from models import db, read_primary, User, BabelPost, BabelLike, BabelComment, UserType
+from sqlalchemy import desc, func
+
+
+# Rank key: (-engagement, -created_at_us, -post_id) so ascending order == feed order
+RankKey = Tuple[int, int, int]
+
+
+class _RankedFeed:
+    """Sorted post ranking for one audience segment"""
+
+    __slots__ = ('keys', 'key_by_post', 'loaded_at', 'truncated')
+
+    def __init__(self):
+        self.keys: List[RankKey] = []
+        self.key_by_post: Dict[int, RankKey] = {}
+        self.loaded_at = 0.0
+        self.truncated = False
+
+
+class BabelTimelineStore:
+    """
+    Precomputed timeline per audience segment, updated on write (fan-out-on-write).
+
+    Children only see posts by children; teens and adults see posts by teens and
+    adults, so the teen and adult segments share one materialized feed.
+
+    Writes on this worker update the feeds directly. Posts, likes and comments
+    committed by other workers are picked up every `refresh_interval` seconds
+    by polling for ids above the highest ones already seen; unlikes and
+    moderation elsewhere are reconciled by the full rebuild.
+    """
+
+    SEGMENT_FEEDS = {
+        'child': 'child',
+        'teen': 'open',
+        'adult': 'open'
+    }
+    FEED_AUTHOR_TYPES = {
+        'child': [UserType.CHILD],
+        'open': [UserType.TEEN, UserType.ADULT]
+    }
+
+    def __init__(self, max_feed_size: int = 5000, rebuild_interval: int = 300, refresh_interval: float = 5):
+        self.logger = logging.getLogger(__name__)
+        self.max_feed_size = max_feed_size
+        self.rebuild_interval = rebuild_interval  # Full reload: unlikes and moderation on other workers
+        self.refresh_interval = refresh_interval  # Poll for other workers' posts, likes and comments
+        self.feeds = {name: _RankedFeed() for name in self.FEED_AUTHOR_TYPES}
+        self.high_water = None  # Highest post/like/comment ids applied, set by the first load
+        self.refreshed_at = 0.0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self.logger.info("🗂️ Babel Timeline Store initialized")
+
+    # Cursors
+    @staticmethod
+    def rank_key(post_id: int, engagement: int, created_at: datetime) -> RankKey:
+        """Build the rank key for a post"""
+        created_us = int(created_at.replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+        return (-(engagement or 0), -created_us, -post_id)
+
+    @staticmethod
+    def encode_cursor(key: RankKey) -> str:
+        """Encode a rank key as an opaque cursor"""
+        return f"{-key[0]}.{-key[1]}.{-key[2]}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[RankKey]:
+        """Decode a cursor, returns None if malformed"""
+        try:
+            engagement, created_us, post_id = (int(part) for part in cursor.split('.'))
+        except (AttributeError, ValueError):
+            return None
+        return (-engagement, -created_us, -post_id)
+
+    @staticmethod
+    def segment_for(user_type_value: str) -> str:
+        """Map a user type value to its feed name"""
+        return BabelTimelineStore.SEGMENT_FEEDS.get(user_type_value, 'open')
+
+    # Reads
+    def get_page(self, segment: str, after: Optional[RankKey], limit: int) -> Dict[str, Any]:
+        """
+        Get one page of post ids after a cursor key.
+
+        Returns post ids, the rank keys for them, and whether the materialized
+        window ran out before the page was filled (caller continues from the DB).
+        """
+        feed_name = self.segment_for(segment)
+        self._ensure_loaded(feed_name)
+        self._refresh()
+
+        with self._lock:
+            feed = self.feeds[feed_name]
+            start = bisect_right(feed.keys, after) if after else 0
+            window = feed.keys[start:start + limit + 1]
+            window_exhausted = feed.truncated and len(window) <= limit
+
+        return {
+            'post_ids': [-key[2] for key in window[:limit]],
+            'keys': window[:limit],
+            'has_next': len(window) > limit,
+            'window_exhausted': window_exhausted
+        }
+
+    # Writes
+    def add_post(self, post: BabelPost, author_type: str) -> None:
+        """Fan a newly created post out into its audience feed"""
+        self._upsert(self.segment_for(author_type), post)
+
+    def update_post(self, post: BabelPost, author_type: str) -> None:
+        """Re-rank a post after a like, unlike or comment"""
+        self._upsert(self.segment_for(author_type), post)
+
+    def remove_post(self, post_id: int) -> None:
+        """Drop a post from every feed (deleted or moderated)"""
+        with self._lock:
+            for feed in self.feeds.values():
+                key = feed.key_by_post.pop(post_id, None)
+                if key is not None:
+                    self._remove_key(feed, key)
+
+    def invalidate(self, segment: str = None) -> None:
+        """Force a rebuild of one or all feeds on next read"""
+        with self._lock:
+            names = [self.segment_for(segment)] if segment else list(self.feeds)
+            for name in names:
+                self.feeds[name] = _RankedFeed()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get timeline store statistics"""
+        with self._lock:
+            return {
+                name: {
+                    'posts': len(feed.keys),
+                    'truncated': feed.truncated,
+                    'age_seconds': round(time.time() - feed.loaded_at, 1) if feed.loaded_at else None
+                }
+                for name, feed in self.feeds.items()
+            }
+
+    def _upsert(self, feed_name: str, post: BabelPost) -> None:
+        """Insert or re-rank a post in a loaded feed"""
+        self._apply(feed_name, post.id, (post.likes_count or 0) + (post.comments_count or 0), post.created_at,
+                    post.is_approved and not post.is_flagged)
+
+    def _apply(self, feed_name: str, post_id: int, engagement: int, created_at: datetime, visible: bool) -> None:
+        """Insert, re-rank or drop one post's rank key"""
+        if not visible:
+            self.remove_post(post_id)
+            return
+
+        key = self.rank_key(post_id, engagement, created_at)
+
+        with self._lock:
+            feed = self.feeds[feed_name]
+            if not feed.loaded_at:
+                return  # Not materialized yet, the lazy load will pick it up
+
+            old_key = feed.key_by_post.pop(post_id, None)
+            if old_key is not None:
+                self._remove_key(feed, old_key)
+            elif feed.truncated and feed.keys and key > feed.keys[-1]:
+                return  # Ranks below the materialized window
+
+            insort(feed.keys, key)
+            feed.key_by_post[post_id] = key
+            self._trim(feed)
+
+    @read_primary()
+    def _ensure_loaded(self, feed_name: str) -> None:
+        """Lazily materialize a feed, rebuilding it when stale"""
+        feed = self.feeds[feed_name]
+        if feed.loaded_at and time.time() - feed.loaded_at < self.rebuild_interval:
+            return
+
+        if self.high_water is None:
+            self.high_water = self._read_high_water()  # Read first, so the poll re-applies anything racing the load
+
+        engagement = BabelPost.likes_count + BabelPost.comments_count
+        rows = db.session.query(
+            BabelPost.id, engagement, BabelPost.created_at
+        ).join(User, BabelPost.user_id == User.id).filter(
+            BabelPost.is_approved == True,
+            BabelPost.is_flagged == False,
+            User.user_type.in_(self.FEED_AUTHOR_TYPES[feed_name])
+        ).order_by(
+            desc(engagement), desc(BabelPost.created_at), desc(BabelPost.id)
+        ).limit(self.max_feed_size + 1).all()
+
+        rebuilt = _RankedFeed()
+        for post_id, score, created_at in rows[:self.max_feed_size]:
+            key = self.rank_key(post_id, score, created_at)
+            rebuilt.keys.append(key)
+            rebuilt.key_by_post[post_id] = key
+        rebuilt.keys.sort()
+        rebuilt.truncated = len(rows) > self.max_feed_size
+        rebuilt.loaded_at = time.time()
+
+        with self._lock:
+            self.feeds[feed_name] = rebuilt
+
+        self.logger.info(f"🗂️ Materialized '{feed_name}' timeline with {len(rebuilt.keys)} posts")
+
+    @read_primary()
+    def _read_high_water(self) -> Dict[str, int]:
+        """Current highest post, like and comment ids"""
+        post_id, like_id, comment_id = db.session.query(
+            db.session.query(func.max(BabelPost.id)).scalar_subquery(),
+            db.session.query(func.max(BabelLike.id)).scalar_subquery(),
+            db.session.query(func.max(BabelComment.id)).scalar_subquery()
+        ).one()
+        return {'post': post_id or 0, 'like': like_id or 0, 'comment': comment_id or 0}
+
+    @read_primary()
+    def _refresh(self) -> None:
+        """Apply posts, likes and comments committed by other workers since the last poll"""
+        if self.high_water is None or time.time() - self.refreshed_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # Another request is already polling
+        try:
+            self.refreshed_at = time.time()
+            marks = dict(self.high_water)
+
+            touched = set()
+            for name, model in (('like', BabelLike), ('comment', BabelComment)):
+                for row_id, post_id in db.session.query(model.id, model.post_id).filter(model.id > marks[name]):
+                    touched.add(post_id)
+                    marks[name] = max(marks[name], row_id)
+
+            engagement = BabelPost.likes_count + BabelPost.comments_count
+            rows = db.session.query(
+                BabelPost.id, engagement, BabelPost.created_at, BabelPost.is_approved, BabelPost.is_flagged,
+                User.user_type
+            ).join(User, BabelPost.user_id == User.id).filter(
+                db.or_(BabelPost.id > marks['post'], BabelPost.id.in_(touched)) if touched else BabelPost.id > marks['post']
+            ).all()
+
+            for post_id, score, created_at, is_approved, is_flagged, user_type in rows:
+                self._apply(self.segment_for(user_type.value), post_id, score or 0, created_at,
+                            is_approved and not is_flagged)
+                marks['post'] = max(marks['post'], post_id)
+            self.high_water = marks
+        finally:
+            self._refresh_lock.release()
+
+    def _remove_key(self, feed: _RankedFeed, key: RankKey) -> None:
+        """Remove a rank key from a feed's sorted list"""
+        index = bisect_right(feed.keys, key) - 1
+        if index >= 0 and feed.keys[index] == key:
+            del feed.keys[index]
+
+    def _trim(self, feed: _RankedFeed) -> None:
+        """Keep a feed within its size cap"""
+        while len(feed.keys) > self.max_feed_size:
+            key = feed.keys.pop()
+            feed.key_by_post.pop(-key[2], None)
+            feed.truncated = True
+
+
+# Global instance
+_timeline_store = BabelTimelineStore()
+
+
+def get_timeline_store() -> BabelTimelineStore:
+    """Get the global timeline store instance"""
+    return _timeline_store
@@ -9,6 +9,7 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
+from .service_container import get_container
 
 
 @dataclass
@@ -240,10 +241,6 @@ class BehaviorAnalyzerService:
         self.logger.info("Behavior Analyzer Service shutdown complete")
 
 
-# Global instance
-_behavior_analyzer = BehaviorAnalyzerService()
-
-
 def get_behavior_analyzer() -> BehaviorAnalyzerService:
-    """Get the global behavior analyzer instance"""
-    return _behavior_analyzer
+    """Get the global behavior analyzer instance (built on first use)"""
+    return get_container().get('behavior_analyzer')
@@ -0,0 +1,171 @@
+"""
+Bot Detection Engine ⚙️🤖
+Compiled, single-pass rule evaluation for BotDetectionService
+SRIMI: Single responsibility for pattern matching and message sketches
+"""
+
+import re
+import zlib
+from typing import Dict, FrozenSet, List
+
+
+# Links and contact info are matched on the original (case-preserved) message
+LINK_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+CONTACT_PATTERNS = [
+    r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # Phone numbers
+    r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Email
+    r'(?:telegram|whatsapp|skype|discord)\s*:?\s*[@]?[a-zA-Z0-9_]+',  # Social handles
+]
+
+BACKREFERENCE = re.compile(r'\\\d')
+
+
+def _has_repeated_ngram(size: int):
+    """Guard: some `size`-character run occurs twice (necessary for a repeated unit)"""
+    def guard(text: str) -> bool:
+        text = text.lower()
+        grams = [text[i:i + size] for i in range(len(text) - size + 1)]
+        return len(grams) != len(set(grams))
+    return guard
+
+
+# Cheap necessary conditions for expensive backreference rules - a rule is only
+# run when its guard passes, so results are unchanged
+RULE_GUARDS = {
+    r'(.{10,})\1{2,}': _has_repeated_ngram(10),
+    r'^(.+)$\n^\1$': lambda text: '\n' in text,
+}
+
+
+class CompiledPatternGroup:
+    """
+    A list of regex rules compiled once, plus a combined alternation of them.
+
+    The alternation answers "does any rule match" in one scan, so clean text
+    is rejected without running each rule. It is only a pre-filter: a scan
+    reports non-overlapping matches and one alternative per position, so
+    which rules matched is decided by each rule's own pattern. Rules that use
+    backreferences cannot be renumbered safely, so they are never combined.
+    """
+
+    def __init__(self, name: str, patterns: List[str], flags: int = 0):
+        self.name = name
+        self.rules = [
+            (f'{name}_{i}', re.compile(p, flags))
+            for i, p in enumerate(patterns) if not BACKREFERENCE.search(p)
+        ]
+        self.standalone = [
+            (f'{name}_{i}', re.compile(p, flags), RULE_GUARDS.get(p))
+            for i, p in enumerate(patterns) if BACKREFERENCE.search(p)
+        ]
+        self.combined = re.compile(
+            '|'.join(f'(?:{pattern.pattern})' for _, pattern in self.rules), flags
+        ) if self.rules else None
+
+    def matched_rules(self, text: str) -> set:
+        """Names of every rule that matches somewhere in the text"""
+        matched = set()
+        if self.combined and self.combined.search(text):
+            matched.update(rule_name for rule_name, pattern in self.rules if pattern.search(text))
+        for rule_name, pattern, guard in self.standalone:
+            if (guard is None or guard(text)) and pattern.search(text):
+                matched.add(rule_name)
+        return matched
+
+    def search(self, text: str) -> bool:
+        """True if any rule matches (stops at the first hit)"""
+        if self.combined and self.combined.search(text):
+            return True
+        return any(
+            (guard is None or guard(text)) and pattern.search(text)
+            for _, pattern, guard in self.standalone
+        )
+
+
+class BotDetectionEngine:
+    """
+    Compiled detection engine - patterns are compiled once, the message is
+    normalized once, and each rule group is evaluated in a single scan.
+    Near-duplicate detection uses bottom-k MinHash sketches of 3-character
+    shingles instead of pairwise character comparison.
+    """
+
+    SHINGLE_SIZE = 3
+    SKETCH_SIZE = 16
+
+    def __init__(self, bot_indicators: Dict, human_indicators: Dict):
+        self.repetitive = CompiledPatternGroup(
+            'repetitive', bot_indicators['repetitive_messages'], re.IGNORECASE | re.MULTILINE
+        )
+        self.unnatural = CompiledPatternGroup('unnatural', bot_indicators['unnatural_language'], re.IGNORECASE)
+        self.spam = CompiledPatternGroup('spam', bot_indicators['spam_patterns'])
+        self.human = {
+            group: CompiledPatternGroup(group, patterns)
+            for group, patterns in human_indicators.items()
+        }
+        self.usernames = CompiledPatternGroup('username', bot_indicators['suspicious_usernames'])
+        self.links = re.compile(LINK_PATTERN)
+        self.contact_rules = [re.compile(p) for p in CONTACT_PATTERNS]
+        self.contacts = re.compile('|'.join(f'(?:{p})' for p in CONTACT_PATTERNS))  # Pre-filter only
+
+    def scan(self, message: str) -> Dict:
+        """Evaluate every content rule group against one message"""
+        message_lower = message.lower()  # Normalized once for all lowercase rule groups
+        return {
+            'repetitive': self.repetitive.search(message),
+            'unnatural_language': self.unnatural.search(message),
+            'spam_hits': len(self.spam.matched_rules(message_lower)),
+            'link_count': sum(1 for _ in self.links.finditer(message)),
+            'contact_count': self._count_contacts(message),
+            'human_groups': {group for group, rules in self.human.items() if rules.search(message_lower)}
+        }
+
+    def _count_contacts(self, message: str) -> int:
+        """Matches per contact rule, summed - overlapping phone/email/handle matches all count"""
+        if not self.contacts.search(message):
+            return 0
+        return sum(1 for pattern in self.contact_rules for _ in pattern.finditer(message))
+
+    def is_suspicious_username(self, username: str) -> bool:
+        """Check a username against the (anchored) suspicious username rules"""
+        return self.usernames.search(username.lower())
+
+    @classmethod
+    def sketch(cls, message: str) -> FrozenSet[int]:
+        """Bottom-k MinHash sketch of the message's character shingles"""
+        text = ' '.join(message.lower().split())
+        size = cls.SHINGLE_SIZE
+        if len(text) < size:
+            return frozenset((zlib.crc32(text.encode('utf-8')),) if text else ())
+
+        if text.isascii():
+            # One encode, then byte shingles - identical hashes to the character path for ASCII
+            data = text.encode('ascii')
+            hashes = set(map(zlib.crc32, [data[i:i + size] for i in range(len(data) - size + 1)]))
+        else:
+            hashes = {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+        return frozenset(sorted(hashes)[:cls.SKETCH_SIZE])
+
+    @classmethod
+    def similarity(cls, sketch_a: FrozenSet[int], sketch_b: FrozenSet[int]) -> float:
+        """Estimated Jaccard similarity of two bottom-k sketches"""
+        if not sketch_a or not sketch_b:
+            return 0.0
+        if sketch_a == sketch_b:
+            return 1.0
+
+        shared = sketch_a & sketch_b
+        if not shared:
+            return 0.0  # Most unrelated pairs stop here, before the sort
+
+        # Bottom-k of the union, then count how many of those are shared
+        union_bottom = sorted(sketch_a | sketch_b)[:cls.SKETCH_SIZE]
+        return len(shared.intersection(union_bottom)) / len(union_bottom)
+
+    @classmethod
+    def is_near_duplicate(cls, sketch_a: FrozenSet[int], sketch_b: FrozenSet[int], threshold: float) -> bool:
+        """similarity() > threshold, skipping the sort when the shared hashes cannot reach it"""
+        shared = len(sketch_a & sketch_b)
+        if shared <= threshold * min(cls.SKETCH_SIZE, len(sketch_a | sketch_b)):
+            return False
+        return cls.similarity(sketch_a, sketch_b) > threshold
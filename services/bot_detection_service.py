@@ -4,15 +4,17 @@ Adapted from AppLockit4 behavioral analysis for UniBabel
 SRIMI: Single responsibility for bot and spam detection
 """
 
-import re
 import time
 import hashlib
+import zlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 from flask import request
 from models import db, User, Message
+from .bot_detection_engine import BotDetectionEngine
+from .bot_session_store import BehaviorSample, BehaviorSession, create_session_store
 
 
 @dataclass
@@ -93,10 +95,50 @@ class BotDetectionService:
             ]
         }
         
-        # User behavior tracking
-        self.user_sessions = {}
-        self.message_cache = {}
-        
+        # Compiled once - every check below reads from a single scan of the message
+        self.engine = BotDetectionEngine(self.bot_indicators, self.human_indicators)
+        # Estimated 3-shingle Jaccard similarity, which replaced the 0.8 positional character
+        # ratio - the scales differ. With 16-hash sketches, > 0.75 and > 0.8 both mean "13+ of
+        # 16 hashes shared". Calibrated with benchmarks/bench_bot_detection.py --calibrate it
+        # keeps the old zero false-positive rate at similar recall, and unlike the positional
+        # ratio it still matches copies shifted by an inserted or deleted character
+        self.near_duplicate_threshold = 0.75
+        
+        # User behavior tracking - bounded ring buffers, optionally shared through Redis
+        self.sessions = create_session_store()
+    
+    def configure_session_store(self, backend: str = 'memory', redis_url: str = None,
+                                max_sessions: int = 10000, window_size: int = 20, ttl: int = 3600):
+        """Swap the behavior session store (called once at app startup)"""
+        self.sessions = create_session_store(
+            backend, redis_url=redis_url, max_sessions=max_sessions, window_size=window_size, ttl=ttl
+        )
+        
+    def build_sample(self, earlier_samples: List[BehaviorSample], message: str, timestamp: float) -> BehaviorSample:
+        """
+        Reduce a message to a sample, scoring near duplicates once, on arrival,
+        against the (up to 9) earlier messages that share a repetition window
+        with it. A repeat of an earlier message reuses that message's sketch.
+        """
+        digest = zlib.crc32(message.encode('utf-8'))
+        repeat = next((sample for sample in reversed(earlier_samples) if sample.digest == digest), None)
+        sketch = repeat.sketch_set() if repeat else self.engine.sketch(message)
+        
+        near_duplicates = 0
+        for distance, earlier in enumerate(reversed(earlier_samples)):
+            if earlier.digest == digest or self.engine.is_near_duplicate(
+                sketch, earlier.sketch_set(), self.near_duplicate_threshold
+            ):
+                near_duplicates |= 1 << distance
+        
+        return BehaviorSample(
+            timestamp=timestamp,
+            length=len(message),
+            digest=digest,
+            near_duplicates=near_duplicates,
+            sketch=repeat.sketch if repeat else BehaviorSample.pack_sketch(sketch)
+        )
+    
     def analyze_user_behavior(self, user_id: int, message: str, metadata: Dict) -> Dict:
         """
         Analyze user behavior for bot detection
@@ -112,24 +154,11 @@ class BotDetectionService:
         current_time = time.time()
         
         # Get or create user session
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = {
-                'messages': [],
-                'first_seen': current_time,
-                'typing_patterns': [],
-                'suspicion_score': 0.0,
-                'flags': []
-            }
-        
-        session = self.user_sessions[user_id]
+        session = self.sessions.get_or_create(user_id, current_time)
         
         # Record message timing
-        session['messages'].append({
-            'content': message,
-            'timestamp': current_time,
-            'length': len(message),
-            'metadata': metadata
-        })
+        self.sessions.append(session, self.build_sample(list(session.samples)[-9:], message, current_time))
+        samples = list(session.samples)
         
         # Analyze patterns
         detection_results = {
@@ -142,37 +171,36 @@ class BotDetectionService:
             'allow_message': True
         }
         
-        # Run detection checks
-        detection_results.update(self._check_timing_patterns(session))
-        detection_results.update(self._check_message_patterns(message))
-        detection_results.update(self._check_repetition_patterns(session))
-        detection_results.update(self._check_spam_content(message))
-        detection_results.update(self._check_username_patterns(user_id))
-        detection_results.update(self._check_human_indicators(message))
+        # Run detection checks - content rules come from one compiled scan
+        scan = self.engine.scan(message)
+        detection_results.update(self._check_timing_patterns(samples))
+        detection_results.update(self._check_message_patterns(scan))
+        detection_results.update(self._check_repetition_patterns(samples))
+        detection_results.update(self._check_spam_content(scan))
+        detection_results.update(self._check_username_patterns(user_id, session))
+        detection_results.update(self._check_human_indicators(scan))
         
         # Calculate overall risk
         self._calculate_risk_level(detection_results)
         
         # Update user session
-        session['suspicion_score'] = detection_results['suspicion_score']
-        session['flags'] = detection_results['flags']
-        
-        # Clean old sessions
-        self._cleanup_old_sessions()
+        session.suspicion_score = detection_results['suspicion_score']
+        session.flags = tuple(detection_results['flags'])
+        self.sessions.save_verdict(session)
         
         return detection_results
     
-    def _check_timing_patterns(self, session: Dict) -> Dict:
+    def _check_timing_patterns(self, samples: List[BehaviorSample]) -> Dict:
         """Check for unnatural timing patterns"""
         results = {'timing_flags': [], 'timing_score': 0.0}
         
-        if len(session['messages']) < 2:
+        if len(samples) < 2:
             return results
         
         # Calculate message intervals
         intervals = []
-        for i in range(1, len(session['messages'])):
-            interval = session['messages'][i]['timestamp'] - session['messages'][i-1]['timestamp']
+        for i in range(1, len(samples)):
+            interval = samples[i].timestamp - samples[i-1].timestamp
             intervals.append(interval)
         
         if intervals:
@@ -195,48 +223,44 @@ class BotDetectionService:
         
         return results
     
-    def _check_message_patterns(self, message: str) -> Dict:
+    def _check_message_patterns(self, scan: Dict) -> Dict:
         """Check for bot-like message patterns"""
         results = {'message_flags': [], 'message_score': 0.0}
         
         # Check for repetitive patterns
-        for pattern in self.bot_indicators['repetitive_messages']:
-            if re.search(pattern, message, re.IGNORECASE | re.MULTILINE):
-                results['message_flags'].append('repetitive_pattern')
-                results['message_score'] += 0.3
-                break
+        if scan['repetitive']:
+            results['message_flags'].append('repetitive_pattern')
+            results['message_score'] += 0.3
         
         # Check for unnatural language
-        for pattern in self.bot_indicators['unnatural_language']:
-            if re.search(pattern, message, re.IGNORECASE):
-                results['message_flags'].append('unnatural_language')
-                results['message_score'] += 0.2
-                break
+        if scan['unnatural_language']:
+            results['message_flags'].append('unnatural_language')
+            results['message_score'] += 0.2
         
         return results
     
-    def _check_repetition_patterns(self, session: Dict) -> Dict:
+    def _check_repetition_patterns(self, samples: List[BehaviorSample]) -> Dict:
         """Check for message repetition across session"""
         results = {'repetition_flags': [], 'repetition_score': 0.0}
         
-        if len(session['messages']) < 3:
+        if len(samples) < 3:
             return results
         
         # Get recent messages
-        recent_messages = [msg['content'] for msg in session['messages'][-10:]]
+        recent_messages = samples[-10:]
         
         # Check for identical messages
-        identical_count = len(recent_messages) - len(set(recent_messages))
+        recent_digests = [msg.digest for msg in recent_messages]
+        identical_count = len(recent_digests) - len(set(recent_digests))
         if identical_count > 2:
             results['repetition_flags'].append('identical_messages')
             results['repetition_score'] += 0.4
         
-        # Check for similar messages (fuzzy matching)
-        similarity_count = 0
-        for i in range(len(recent_messages) - 1):
-            for j in range(i + 1, len(recent_messages)):
-                if self._calculate_similarity(recent_messages[i], recent_messages[j]) > 0.8:
-                    similarity_count += 1
+        # Check for near-duplicate pairs still inside the window (MinHash sketch similarity);
+        # the message at position i can only pair with the i messages before it
+        similarity_count = sum(
+            (msg.near_duplicates & ((1 << i) - 1)).bit_count() for i, msg in enumerate(recent_messages)
+        )
         
         if similarity_count > 3:
             results['repetition_flags'].append('similar_messages')
@@ -244,88 +268,70 @@ class BotDetectionService:
         
         return results
     
-    def _check_spam_content(self, message: str) -> Dict:
+    def _check_spam_content(self, scan: Dict) -> Dict:
         """Check for spam content patterns"""
         results = {'spam_flags': [], 'spam_score': 0.0}
         
-        message_lower = message.lower()
-        
-        for pattern in self.bot_indicators['spam_patterns']:
-            if re.search(pattern, message_lower):
-                results['spam_flags'].append('spam_pattern_detected')
-                results['spam_score'] += 0.4
+        for _ in range(scan['spam_hits']):
+            results['spam_flags'].append('spam_pattern_detected')
+            results['spam_score'] += 0.4
         
         # Check for excessive links
-        link_count = len(re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', message))
-        if link_count > 2:
+        if scan['link_count'] > 2:
             results['spam_flags'].append('excessive_links')
             results['spam_score'] += 0.3
         
         # Check for excessive contact info
-        contact_patterns = [
-            r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',  # Phone numbers
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Email
-            r'(?:telegram|whatsapp|skype|discord)\s*:?\s*[@]?[a-zA-Z0-9_]+',  # Social handles
-        ]
-        
-        contact_count = 0
-        for pattern in contact_patterns:
-            contact_count += len(re.findall(pattern, message))
-        
-        if contact_count > 1:
+        if scan['contact_count'] > 1:
             results['spam_flags'].append('excessive_contact_info')
             results['spam_score'] += 0.3
         
         return results
     
-    def _check_username_patterns(self, user_id: int) -> Dict:
-        """Check for suspicious username patterns"""
+    def _check_username_patterns(self, user_id: int, session: BehaviorSession = None) -> Dict:
+        """Check for suspicious username patterns (cached per session)"""
         results = {'username_flags': [], 'username_score': 0.0}
         
-        try:
-            user = User.query.get(user_id)
-            if not user:
+        suspicious = session.username_suspicious if session else None
+        if suspicious is None:
+            try:
+                user = User.query.get(user_id)
+                if not user:
+                    return results
+                
+                suspicious = self.engine.is_suspicious_username(user.username)
+                if session is not None:
+                    session.username_suspicious = suspicious
+                
+            except Exception as e:
+                self.logger.error(f"Error checking username patterns: {e}")
                 return results
-            
-            username = user.username.lower()
-            
-            for pattern in self.bot_indicators['suspicious_usernames']:
-                if re.match(pattern, username):
-                    results['username_flags'].append('suspicious_username')
-                    results['username_score'] += 0.2
-                    break
-            
-        except Exception as e:
-            self.logger.error(f"Error checking username patterns: {e}")
+        
+        if suspicious:
+            results['username_flags'].append('suspicious_username')
+            results['username_score'] += 0.2
         
         return results
     
-    def _check_human_indicators(self, message: str) -> Dict:
+    def _check_human_indicators(self, scan: Dict) -> Dict:
         """Check for human-like indicators (reduce suspicion)"""
         results = {'human_flags': [], 'human_score': 0.0}
-        
-        message_lower = message.lower()
+        human_groups = scan['human_groups']
         
         # Check for natural errors and typos
-        for pattern in self.human_indicators['natural_errors']:
-            if re.search(pattern, message_lower):
-                results['human_flags'].append('natural_errors')
-                results['human_score'] += 0.2
-                break
+        if 'natural_errors' in human_groups:
+            results['human_flags'].append('natural_errors')
+            results['human_score'] += 0.2
         
         # Check for conversational flow
-        for pattern in self.human_indicators['conversational_flow']:
-            if re.search(pattern, message_lower):
-                results['human_flags'].append('conversational_flow')
-                results['human_score'] += 0.15
-                break
+        if 'conversational_flow' in human_groups:
+            results['human_flags'].append('conversational_flow')
+            results['human_score'] += 0.15
         
         # Check for emotional expressions
-        for pattern in self.human_indicators['emotional_expressions']:
-            if re.search(pattern, message_lower):
-                results['human_flags'].append('emotional_expression')
-                results['human_score'] += 0.1
-                break
+        if 'emotional_expressions' in human_groups:
+            results['human_flags'].append('emotional_expression')
+            results['human_score'] += 0.1
         
         return results
     
@@ -375,73 +381,41 @@ class BotDetectionService:
             detection_results['allow_message'] = True
             detection_results['recommendations'] = ['normal_processing']
     
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate similarity between two texts"""
-        if not text1 or not text2:
-            return 0.0
-        
-        # Simple character-based similarity
-        longer = text1 if len(text1) > len(text2) else text2
-        shorter = text2 if len(text1) > len(text2) else text1
-        
-        if len(longer) == 0:
-            return 1.0
-        
-        # Count matching characters
-        matches = 0
-        for i, char in enumerate(shorter):
-            if i < len(longer) and char == longer[i]:
-                matches += 1
-        
-        return matches / len(longer)
-    
-    def _cleanup_old_sessions(self):
-        """Clean up old user sessions to prevent memory leaks"""
-        current_time = time.time()
-        cutoff_time = current_time - 3600  # 1 hour ago
-        
-        users_to_remove = []
-        for user_id, session in self.user_sessions.items():
-            if session['first_seen'] < cutoff_time:
-                users_to_remove.append(user_id)
-        
-        for user_id in users_to_remove:
-            del self.user_sessions[user_id]
-    
     def get_user_risk_summary(self, user_id: int) -> Dict:
         """Get risk summary for a user"""
-        if user_id not in self.user_sessions:
+        session = self.sessions.get(user_id)
+        if session is None:
             return {'risk_level': 'unknown', 'message_count': 0}
         
-        session = self.user_sessions[user_id]
         return {
-            'risk_level': 'high' if session['suspicion_score'] >= 0.6 else 'medium' if session['suspicion_score'] >= 0.4 else 'low',
-            'suspicion_score': session['suspicion_score'],
-            'message_count': len(session['messages']),
-            'flags': session['flags'],
-            'session_duration': time.time() - session['first_seen']
+            'risk_level': 'high' if session.suspicion_score >= 0.6 else 'medium' if session.suspicion_score >= 0.4 else 'low',
+            'suspicion_score': session.suspicion_score,
+            'message_count': session.message_count,
+            'flags': list(session.flags),
+            'session_duration': time.time() - session.first_seen
         }
     
     def reset_user_session(self, user_id: int):
         """Reset user session (after successful verification)"""
-        if user_id in self.user_sessions:
-            del self.user_sessions[user_id]
+        self.sessions.delete(user_id)
     
     def get_detection_stats(self) -> Dict:
         """Get detection statistics"""
-        if not self.user_sessions:
-            return {'total_users': 0, 'suspicious_users': 0, 'total_messages': 0}
+        sessions = self.sessions.sessions_snapshot()
+        if not sessions:
+            return {'total_users': 0, 'suspicious_users': 0, 'total_messages': 0,
+                    'session_store': self.sessions.get_stats()}
         
-        total_users = len(self.user_sessions)
-        suspicious_users = sum(1 for session in self.user_sessions.values() 
-                              if session['suspicion_score'] >= 0.6)
-        total_messages = sum(len(session['messages']) for session in self.user_sessions.values())
+        total_users = len(sessions)
+        suspicious_users = sum(1 for session in sessions if session.suspicion_score >= 0.6)
+        total_messages = sum(session.message_count for session in sessions)
         
         return {
             'total_users': total_users,
             'suspicious_users': suspicious_users,
             'total_messages': total_messages,
-            'suspicious_percentage': (suspicious_users / total_users * 100) if total_users > 0 else 0
+            'suspicious_percentage': (suspicious_users / total_users * 100) if total_users > 0 else 0,
+            'session_store': self.sessions.get_stats()
         }
 
 
@@ -0,0 +1,276 @@
+"""
+Bot Session Store 🗃️🤖
+Bounded behavior sessions for BotDetectionService
+SRIMI: Single responsibility for per-user behavior history
+"""
+
+import logging
+import struct
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, Any, Iterable, List, Optional
+
+try:
+    import redis
+except ImportError:  # Optional - the in-memory store works without it
+    redis = None
+
+
+SKETCH_SIZE = 16  # Matches BotDetectionEngine.SKETCH_SIZE
+SAMPLE_FORMAT = struct.Struct(f'<dIIHB{SKETCH_SIZE}I')  # 83 bytes per message
+
+
+class BehaviorSample:
+    """One message reduced to what the detectors need - no content or metadata"""
+
+    __slots__ = ('timestamp', 'length', 'digest', 'near_duplicates', 'sketch', '_sketch_set')
+
+    def __init__(self, timestamp: float, length: int, digest: int, near_duplicates: int, sketch: bytes):
+        self.timestamp = timestamp
+        self.length = length
+        self.digest = digest  # crc32 of the content, for identical-message checks
+        self.near_duplicates = near_duplicates  # Bit k set: resembles the message k+1 places earlier
+        self.sketch = sketch  # Packed bottom-k MinHash sketch
+        self._sketch_set = None  # Unpacked once, then reused by the next messages in the window
+
+    @staticmethod
+    def pack_sketch(sketch: Iterable[int]) -> bytes:
+        """Pack a sketch into a fixed-size byte string"""
+        return array('I', sorted(sketch)[:SKETCH_SIZE]).tobytes()
+
+    def sketch_set(self) -> frozenset:
+        """Unpack the sketch for similarity checks"""
+        if self._sketch_set is None:
+            self._sketch_set = frozenset(array('I', self.sketch))
+        return self._sketch_set
+
+    def to_bytes(self) -> bytes:
+        """Fixed-width wire format for the Redis backend"""
+        hashes = array('I', self.sketch).tolist()
+        return SAMPLE_FORMAT.pack(
+            self.timestamp, min(self.length, 0xFFFFFFFF), self.digest, self.near_duplicates,
+            len(hashes), *(hashes + [0] * (SKETCH_SIZE - len(hashes)))
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BehaviorSample':
+        """Rebuild a sample from its wire format"""
+        timestamp, length, digest, near_duplicates, count, *hashes = SAMPLE_FORMAT.unpack(data)
+        return cls(timestamp, length, digest, near_duplicates, array('I', hashes[:count]).tobytes())
+
+
+class BehaviorSession:
+    """Per-user behavior window - a ring buffer of samples plus the last verdict"""
+
+    __slots__ = ('user_id', 'first_seen', 'last_seen', 'message_count', 'samples',
+                 'suspicion_score', 'flags', 'username_suspicious')
+
+    def __init__(self, user_id: int, first_seen: float, capacity: int):
+        self.user_id = user_id
+        self.first_seen = first_seen
+        self.last_seen = first_seen
+        self.message_count = 0  # Total seen, the ring only keeps the last `capacity`
+        self.samples = deque(maxlen=capacity)
+        self.suspicion_score = 0.0
+        self.flags = ()
+        self.username_suspicious = None
+
+
+class MemoryBehaviorSessionStore:
+    """
+    Process-local session store.
+
+    Sessions are kept in LRU order and capped at `max_sessions`, and each session
+    holds at most `window_size` samples, so memory is bounded regardless of
+    traffic. Sessions idle for longer than `ttl` start over.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, max_sessions: int = 10000, window_size: int = 20, ttl: int = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.max_sessions = max_sessions
+        self.window_size = window_size
+        self.ttl = ttl
+        self.sessions = OrderedDict()  # user_id -> BehaviorSession, least recently used first
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, user_id: int, now: float) -> BehaviorSession:
+        """Get a live session (marking it recently used) or start a new one"""
+        with self._lock:
+            session = self.sessions.get(user_id)
+            if session is not None and now - session.last_seen > self.ttl:
+                session = None
+
+            if session is None:
+                session = BehaviorSession(user_id, now, self.window_size)
+                self.sessions[user_id] = session
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self.sessions.move_to_end(user_id)
+            return session
+
+    def append(self, session: BehaviorSession, sample: BehaviorSample) -> None:
+        """Record a message sample"""
+        session.samples.append(sample)
+        session.message_count += 1
+        session.last_seen = sample.timestamp
+
+    def save_verdict(self, session: BehaviorSession) -> None:
+        """Persist score/flags/username result - live objects need nothing"""
+
+    def get(self, user_id: int) -> Optional[BehaviorSession]:
+        """Get a session without touching its LRU position"""
+        with self._lock:
+            session = self.sessions.get(user_id)
+        if session is None or time.time() - session.last_seen > self.ttl:
+            return None
+        return session
+
+    def delete(self, user_id: int) -> None:
+        """Forget a user's session"""
+        with self._lock:
+            self.sessions.pop(user_id, None)
+
+    def sessions_snapshot(self) -> List[BehaviorSession]:
+        """Live sessions, for statistics"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            return [session for session in self.sessions.values() if session.last_seen >= cutoff]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session store statistics"""
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'sessions': len(self.sessions),
+                'max_sessions': self.max_sessions,
+                'window_size': self.window_size,
+                'evictions': self.evictions
+            }
+
+
+class RedisBehaviorSessionStore:
+    """
+    Session store shared by every worker through Redis.
+
+    Samples live in a capped list (RPUSH + LTRIM) of fixed-width records and the
+    verdict in a hash, both expiring after `ttl` of inactivity - Redis enforces
+    the memory bound, so a spammer hopping between workers keeps one history.
+    """
+
+    backend = 'redis'
+    KEY_PREFIX = 'unibabel:bot_session'
+
+    def __init__(self, client, window_size: int = 20, ttl: int = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.window_size = window_size
+        self.ttl = ttl
+
+    def _keys(self, user_id: int):
+        """Redis keys for a user's samples list and verdict hash"""
+        base = f'{self.KEY_PREFIX}:{user_id}'
+        return f'{base}:samples', f'{base}:meta'
+
+    def get_or_create(self, user_id: int, now: float) -> BehaviorSession:
+        """Hydrate the shared session for this user"""
+        return self._load(user_id) or BehaviorSession(user_id, now, self.window_size)
+
+    def append(self, session: BehaviorSession, sample: BehaviorSample) -> None:
+        """Record a message sample (atomic ring append)"""
+        session.samples.append(sample)
+        session.message_count += 1
+        session.last_seen = sample.timestamp
+
+        samples_key, meta_key = self._keys(session.user_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(samples_key, sample.to_bytes())
+        pipe.ltrim(samples_key, -self.window_size, -1)
+        pipe.hsetnx(meta_key, 'first_seen', session.first_seen)
+        pipe.hincrby(meta_key, 'message_count', 1)
+        pipe.expire(samples_key, self.ttl)
+        pipe.expire(meta_key, self.ttl)
+        pipe.execute()
+
+    def save_verdict(self, session: BehaviorSession) -> None:
+        """Persist score/flags/username result"""
+        _, meta_key = self._keys(session.user_id)
+        mapping = {
+            'suspicion_score': session.suspicion_score,
+            'flags': ','.join(session.flags)
+        }
+        if session.username_suspicious is not None:
+            mapping['username_suspicious'] = int(session.username_suspicious)
+        self.client.hset(meta_key, mapping=mapping)
+
+    def get(self, user_id: int) -> Optional[BehaviorSession]:
+        """Get a user's shared session"""
+        return self._load(user_id)
+
+    def delete(self, user_id: int) -> None:
+        """Forget a user's session on every worker"""
+        self.client.delete(*self._keys(user_id))
+
+    def sessions_snapshot(self) -> List[BehaviorSession]:
+        """Live sessions across all workers, for statistics"""
+        sessions = []
+        for meta_key in self.client.scan_iter(match=f'{self.KEY_PREFIX}:*:meta', count=500):
+            user_id = int(meta_key.decode().split(':')[-2])
+            session = self._load(user_id)
+            if session:
+                sessions.append(session)
+        return sessions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session store statistics"""
+        return {
+            'backend': self.backend,
+            'window_size': self.window_size,
+            'ttl': self.ttl
+        }
+
+    def _load(self, user_id: int) -> Optional[BehaviorSession]:
+        """Read samples and verdict in one round trip"""
+        samples_key, meta_key = self._keys(user_id)
+        pipe = self.client.pipeline()
+        pipe.lrange(samples_key, 0, -1)
+        pipe.hgetall(meta_key)
+        raw_samples, meta = pipe.execute()
+        if not meta:
+            return None
+
+        meta = {key.decode(): value.decode() for key, value in meta.items()}
+        session = BehaviorSession(user_id, float(meta.get('first_seen', time.time())), self.window_size)
+        session.samples.extend(BehaviorSample.from_bytes(raw) for raw in raw_samples)
+        session.message_count = int(meta.get('message_count', len(session.samples)))
+        session.last_seen = session.samples[-1].timestamp if session.samples else session.first_seen
+        session.suspicion_score = float(meta.get('suspicion_score', 0.0))
+        session.flags = tuple(flag for flag in meta.get('flags', '').split(',') if flag)
+        if 'username_suspicious' in meta:
+            session.username_suspicious = meta['username_suspicious'] == '1'
+        return session
+
+
+def create_session_store(backend: str = 'memory', redis_url: str = None, max_sessions: int = 10000,
+                         window_size: int = 20, ttl: int = 3600):
+    """Build the configured session store, falling back to memory if Redis is unavailable"""
+    logger = logging.getLogger(__name__)
+    if backend == 'redis':
+        if redis is None:
+            logger.warning("⚠️ redis package not installed, bot sessions stay in memory")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+                logger.info("🗃️ Bot sessions shared through Redis")
+                return RedisBehaviorSessionStore(client, window_size=window_size, ttl=ttl)
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable for bot sessions, using memory: {e}")
+
+    return MemoryBehaviorSessionStore(max_sessions=max_sessions, window_size=window_size, ttl=ttl)
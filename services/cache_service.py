@@ -9,6 +9,9 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
+from .metrics import record_cache_lookup
+from .tracing import traced
+from .service_container import get_container
 
 
 @dataclass
@@ -73,6 +76,7 @@ class CacheService:
         """Generate hash for text"""
         return hashlib.sha256(text.encode()).hexdigest()
     
+    @traced('cache.lookup')
     async def get_translation(self, text: str, target_lang: str) -> Optional[str]:
         """Get cached translation"""
         text_hash = self._get_hash(text)
@@ -85,6 +89,7 @@ class CacheService:
                          WHERE text_hash=? AND target_lang=? AND expires_at > ?''',
                      (text_hash, target_lang, now))
             result = c.fetchone()
+            record_cache_lookup('translation', result is not None)
             
             if result:
                 # Update usage counter
@@ -99,6 +104,7 @@ class CacheService:
         finally:
             conn.close()
     
+    @traced('cache.store')
     async def cache_translation(self, text: str, target_lang: str, translation: str) -> bool:
         """Cache a translation"""
         text_hash = self._get_hash(text)
@@ -121,6 +127,7 @@ class CacheService:
         finally:
             conn.close()
     
+    @traced('cache.priority_lookup')
     async def get_priority_translation(self, text: str, target_lang: str) -> Optional[str]:
         """Get priority cached translation"""
         phrase_hash = self._get_hash(text)
@@ -133,6 +140,7 @@ class CacheService:
                          WHERE phrase_hash=? AND target_lang=? AND expires_at > ?''',
                      (phrase_hash, target_lang, now))
             result = c.fetchone()
+            record_cache_lookup('priority', result is not None)
             
             if result:
                 # Update usage counter
@@ -225,10 +233,6 @@ class CacheService:
             conn.close()
 
 
-# Global instance
-_cache_service = CacheService()
-
-
 def get_cache_service() -> CacheService:
-    """Get the global cache service instance"""
-    return _cache_service
\ No newline at end of file
+    """Get the global cache service instance (built on first use)"""
+    return get_container().get('cache')
\ No newline at end of file
@@ -8,6 +8,9 @@ from typing import Dict, List, Any, Optional
 from flask import jsonify
 from datetime import datetime
 from models import db, Chat, ChatParticipant, Message, TranslatedMessage, User, UserType, RoomType, UserCommonPhrase
+from .activity_feed import get_activity_feed
+from .unread_counter import get_unread_counter
+from .service_container import get_container
 
 
 class ChatService:
@@ -49,6 +52,7 @@ class ChatService:
         db.session.add(participant1)
         db.session.add(participant2)
         db.session.commit()
+        get_activity_feed().record_chat_invite(new_chat, current_user, [recipient.id])
         
         return {'chat_id': new_chat.id, 'status': 200}
     
@@ -157,6 +161,7 @@ class ChatService:
             timestamp=datetime.utcnow()
         )
         db.session.add(message)
+        get_unread_counter().record_message(message)
         db.session.commit()
         
         return {'message': message, 'status': 200}
@@ -184,10 +189,6 @@ class ChatService:
         db.session.commit()
 
 
-# Global instance
-_chat_service = ChatService()
-
-
 def get_chat_service() -> ChatService:
-    """Get the global chat service instance"""
-    return _chat_service
\ No newline at end of file
+    """Get the global chat service instance (built on first use)"""
+    return get_container().get('chat')
\ No newline at end of file
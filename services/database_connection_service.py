@@ -10,14 +10,26 @@ Interfaces: Clear connection contracts
 """
 
 import logging
+import random
 import time
+from collections import deque
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from flask import current_app
 from models import db
-from sqlalchemy import text, create_engine
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import event, text, create_engine
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
 import threading
+from services.metrics import get_metrics
+
+
+# Read-only server version query per dialect
+_VERSION_QUERIES = {
+    'sqlite': "SELECT sqlite_version()",
+    'postgresql': "SHOW server_version",
+    'mysql': "SELECT VERSION()",
+    'mariadb': "SELECT VERSION()"
+}
 
 
 class DatabaseConnectionService:
@@ -25,13 +37,16 @@ class DatabaseConnectionService:
     Microservice for database connection management
     
     Single Responsibility: Connection testing only
-    Under 300 lines: Focused and clean
+    Health checks read a cached `SELECT 1` probe: a load balancer polling
+    /health costs one round trip per worker per TTL and never writes.
+    Pool checkout latency and waiters come from pool events; a background
+    sampler refreshes the probe and pool gauges instead of blocking monitors.
     """
     
-    def __init__(self):
+    def __init__(self, probe_ttl: float = 5.0, probe_jitter: float = 0.2, history_size: int = 720):
         self.logger = logging.getLogger(__name__)
         self.service_name = "DatabaseConnectionService"
-        self.version = "1.0.0"
+        self.version = "1.1.0"
         self.dependencies = []
         self.connection_stats = {
             'total_tests': 0,
@@ -40,10 +55,28 @@ class DatabaseConnectionService:
             'last_test_time': None,
             'average_response_time': 0.0
         }
-        
+        self.probe_ttl = probe_ttl
+        self.probe_jitter = probe_jitter  # Fraction of the TTL, so workers do not probe in lockstep
+        self.history = deque(maxlen=history_size)  # (timestamp, connected, response_ms, pool status)
+        self._probe = None  # Last probe result
+        self._probe_expires = 0.0
+        self._probe_lock = threading.Lock()
+        self._instrumented = set()  # ids of engines with pool listeners
+        self._pool_waiting = {}  # id(pool) -> callers waiting in Pool.connect()
+        self._pool_lock = threading.Lock()
+        self._sampler_started = False
+    
+    def configure(self, probe_ttl: float = None, probe_jitter: float = None) -> None:
+        """Apply probe settings from the app config"""
+        if probe_ttl is not None:
+            self.probe_ttl = probe_ttl
+        if probe_jitter is not None:
+            self.probe_jitter = probe_jitter
+        self._probe_expires = 0.0
+    
     def get_health_status(self) -> Dict[str, Any]:
         """Get service health status"""
-        connection_test = self.test_connection()
+        connection_test = self.probe()
         
         return {
             'status': 'healthy' if connection_test['connected'] else 'unhealthy',
@@ -53,43 +86,60 @@ class DatabaseConnectionService:
             'stats': self.connection_stats
         }
     
+    def probe(self, force: bool = False) -> Dict[str, Any]:
+        """Cached connectivity check; concurrent callers reuse the last result while one thread refreshes it"""
+        now = time.monotonic()
+        cached = self._probe
+        if not force and cached is not None and now < self._probe_expires:
+            return dict(cached, cached=True)
+        
+        if not self._probe_lock.acquire(blocking=cached is None or force):
+            return dict(cached, cached=True)  # Another thread is probing, serve the previous result
+        try:
+            if not force and self._probe is not None and time.monotonic() < self._probe_expires:
+                return dict(self._probe, cached=True)
+            result = self.test_connection()
+            ttl = self.probe_ttl * (1 + random.uniform(-self.probe_jitter, self.probe_jitter))
+            self._probe = result
+            self._probe_expires = time.monotonic() + max(ttl, 0)
+            self.history.append((time.time(), result['connected'], result['response_time_ms'], self.get_pool_status()))
+            return dict(result, cached=False)
+        finally:
+            self._probe_lock.release()
+    
     def test_connection(self) -> Dict[str, Any]:
-        """Test database connection with timing"""
+        """Test database connection with timing (read-only: one SELECT 1 round trip)"""
         start_time = time.time()
         self.connection_stats['total_tests'] += 1
+        registry = get_metrics()
         
         try:
             with db.engine.connect() as connection:
-                # Simple connectivity test
-                result = connection.execute(text("SELECT 1 as test_value"))
-                test_value = result.fetchone()[0]
-                
-                # Test write capability  
-                connection.execute(text("CREATE TEMPORARY TABLE test_table (id INTEGER)"))
-                connection.execute(text("INSERT INTO test_table (id) VALUES (1)"))
-                connection.execute(text("DROP TABLE test_table"))
-                
-                response_time = time.time() - start_time
-                self._update_connection_stats(True, response_time)
-                
-                return {
-                    'connected': True,
-                    'test_value': test_value,
-                    'response_time_ms': round(response_time * 1000, 2),
-                    'read_test': 'passed',
-                    'write_test': 'passed',
-                    'engine_info': {
-                        'dialect': db.engine.dialect.name,
-                        'driver': db.engine.driver,
-                        'pool_size': db.engine.pool.size(),
-                        'checked_in': db.engine.pool.checkedin(),
-                        'checked_out': db.engine.pool.checkedout()
-                    }
+                test_value = connection.execute(text("SELECT 1")).scalar()
+            
+            response_time = time.time() - start_time
+            self._update_connection_stats(True, response_time)
+            registry.observe('db_health_probe_duration_seconds', response_time)
+            registry.set_gauge('db_up', 1)
+            
+            return {
+                'connected': True,
+                'test_value': test_value,
+                'response_time_ms': round(response_time * 1000, 2),
+                'read_test': 'passed',
+                'write_test': 'skipped',  # Writes are checked by test_transaction_capability()
+                'checked_at': datetime.utcnow().isoformat(),
+                'engine_info': {
+                    'dialect': db.engine.dialect.name,
+                    'driver': db.engine.driver,
+                    **self.get_pool_status()
                 }
-                
+            }
+        
         except Exception as e:
             response_time = time.time() - start_time
             self._update_connection_stats(False, response_time)
+            registry.set_gauge('db_up', 0)
             
             self.logger.error(f"Database connection test failed: {str(e)}")
             return {
@@ -98,7 +148,8 @@ class DatabaseConnectionService:
                 'error_type': type(e).__name__,
                 'response_time_ms': round(response_time * 1000, 2),
                 'read_test': 'failed',
-                'write_test': 'failed'
+                'write_test': 'skipped',
+                'checked_at': datetime.utcnow().isoformat()
             }
     
     def _update_connection_stats(self, success: bool, response_time: float):
@@ -117,6 +168,101 @@ class DatabaseConnectionService:
             (current_avg * (total_connections - 1) + response_time) / total_connections
         )
     
+    # Pool instrumentation
+    def instrument_engine(self, engine, name: str = 'primary') -> None:
+        """Record pool checkout latency, waiters, timeouts and connection churn for an engine"""
+        if id(engine) in self._instrumented:
+            return
+        self._instrumented.add(id(engine))
+        registry_labels = {'engine': name}
+        
+        # Engine-level pool listeners are carried over when dispose() recreates the pool
+        @event.listens_for(engine, 'connect')
+        def _on_connect(dbapi_connection, connection_record):
+            get_metrics().inc('db_pool_connections_opened_total', **registry_labels)
+        
+        @event.listens_for(engine, 'invalidate')
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            get_metrics().inc('db_pool_invalidations_total', **registry_labels)
+        
+        # The pool has no "checkout requested" event, so time Pool.connect(), which Engine.connect() calls
+        @event.listens_for(engine, 'engine_disposed')
+        def _on_disposed(disposed_engine):
+            self._time_pool_checkouts(disposed_engine.pool, registry_labels)
+        
+        self._time_pool_checkouts(engine.pool, registry_labels)
+        self.logger.info(f"🗄️ Pool metrics enabled for {name} engine ({engine.dialect.name}, {type(engine.pool).__name__})")
+    
+    def _time_pool_checkouts(self, pool, labels: Dict[str, str]) -> None:
+        connect = pool.connect
+        key = id(pool)
+        
+        def timed_connect():
+            with self._pool_lock:
+                self._pool_waiting[key] = self._pool_waiting.get(key, 0) + 1
+            started = time.perf_counter()
+            try:
+                return connect()
+            except PoolTimeoutError:
+                get_metrics().inc('db_pool_timeouts_total', **labels)
+                raise
+            finally:
+                registry = get_metrics()
+                registry.observe('db_pool_checkout_duration_seconds', time.perf_counter() - started, **labels)
+                with self._pool_lock:
+                    self._pool_waiting[key] -= 1
+                    registry.set_gauge('db_pool_waiting', self._pool_waiting[key], **labels)
+        
+        pool.connect = timed_connect
+    
+    def get_pool_status(self, engine=None) -> Dict[str, Any]:
+        """Pool occupancy; pools without a fixed size (SQLite's) report only their class"""
+        try:
+            pool = (engine or db.engine).pool
+        except Exception:
+            return {}
+        status = {'pool_class': type(pool).__name__, 'waiting': self._pool_waiting.get(id(pool), 0)}
+        for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+            method = getattr(pool, name, None)
+            if callable(method):
+                status[{'checkedin': 'checked_in', 'checkedout': 'checked_out'}.get(name, name)] = method()
+        return status
+    
+    def sample(self) -> Dict[str, Any]:
+        """Refresh the probe and publish pool gauges (run by the background sampler)"""
+        result = self.probe(force=True)
+        pool = self.get_pool_status()
+        registry = get_metrics()
+        for key in ('size', 'checked_in', 'checked_out', 'overflow'):
+            if key in pool:
+                registry.set_gauge(f'db_pool_{key}', pool[key])
+        return result
+    
+    def start_background_sampling(self, app, socketio=None, interval: float = 15.0) -> None:
+        """Probe and sample the pool from a background task (called once at app startup)"""
+        if self._sampler_started:
+            return
+        self._sampler_started = True
+        
+        def sample_loop():
+            while True:
+                try:
+                    with app.app_context():
+                        self.sample()
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Database health sampling failed: {e}")
+                pause = interval * (1 + random.uniform(-self.probe_jitter, self.probe_jitter))
+                if socketio is not None:
+                    socketio.sleep(pause)
+                else:
+                    time.sleep(pause)
+        
+        if socketio is not None:
+            socketio.start_background_task(sample_loop)
+        else:
+            threading.Thread(target=sample_loop, name='db-health-sampler', daemon=True).start()
+        self.logger.info(f"🗄️ Database health sampled in the background every {interval}s")
+    
     def test_transaction_capability(self) -> Dict[str, Any]:
         """Test database transaction capabilities"""
         try:
@@ -141,7 +287,7 @@ class DatabaseConnectionService:
                     'commit_test': 'passed',
                     'message': 'Transaction capabilities verified'
                 }
-                
+        
         except Exception as e:
             self.logger.error(f"Transaction test failed: {str(e)}")
             return {
@@ -202,41 +348,30 @@ class DatabaseConnectionService:
     def get_database_info(self) -> Dict[str, Any]:
         """Get detailed database information"""
         try:
+            dialect = db.engine.dialect.name
             with db.engine.connect() as connection:
                 # Get database version and info
-                version_result = connection.execute(text("SELECT sqlite_version()"))
-                db_version = version_result.fetchone()[0]
-                
-                # Get database file info (for SQLite)
-                pragma_results = {}
-                pragmas = ['page_size', 'page_count', 'freelist_count', 'cache_size']
-                
-                for pragma in pragmas:
-                    try:
-                        result = connection.execute(text(f"PRAGMA {pragma}"))
-                        pragma_results[pragma] = result.fetchone()[0]
-                    except:
-                        pragma_results[pragma] = 'unavailable'
-                
-                return {
-                    'database_version': db_version,
-                    'engine_info': {
-                        'name': db.engine.name,
-                        'dialect': db.engine.dialect.name,
-                        'driver': db.engine.driver,
-                        'url': str(db.engine.url).split('@')[0] + '@***',
-                        'echo': db.engine.echo
-                    },
-                    'connection_pool': {
-                        'size': db.engine.pool.size(),
-                        'checked_in': db.engine.pool.checkedin(),
-                        'checked_out': db.engine.pool.checkedout(),
-                        'overflow': db.engine.pool.overflow(),
-                        'invalid': db.engine.pool.invalid()
-                    },
-                    'database_settings': pragma_results
-                }
+                version_query = _VERSION_QUERIES.get(dialect)
+                if version_query:
+                    db_version = connection.execute(text(version_query)).scalar()
+                else:
+                    db_version = '.'.join(str(part) for part in db.engine.dialect.server_version_info or ()) or 'unknown'
                 
+                database_settings = self._database_settings(connection, dialect)
+            
+            return {
+                'database_version': db_version,
+                'engine_info': {
+                    'name': db.engine.name,
+                    'dialect': dialect,
+                    'driver': db.engine.driver,
+                    'url': db.engine.url.render_as_string(hide_password=True),
+                    'echo': db.engine.echo
+                },
+                'connection_pool': self.get_pool_status(),
+                'database_settings': database_settings
+            }
+        
         except Exception as e:
             self.logger.error(f"Error getting database info: {str(e)}")
             return {
@@ -244,40 +379,46 @@ class DatabaseConnectionService:
                 'status': 'failed'
             }
     
+    def _database_settings(self, connection, dialect: str) -> Dict[str, Any]:
+        """Storage settings for SQLite, size and connection limits for PostgreSQL"""
+        if dialect == 'sqlite':
+            queries = {pragma: f"PRAGMA {pragma}" for pragma in ('page_size', 'page_count', 'freelist_count', 'cache_size')}
+        elif dialect == 'postgresql':
+            queries = {
+                'database_size_bytes': "SELECT pg_database_size(current_database())",
+                'max_connections': "SHOW max_connections",
+                'active_connections': "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+            }
+        else:
+            return {}
+        
+        settings = {}
+        for name, query in queries.items():
+            try:
+                settings[name] = connection.execute(text(query)).scalar()
+            except SQLAlchemyError:
+                settings[name] = 'unavailable'
+        return settings
+    
     def monitor_connection_health(self, duration_seconds: int = 30) -> Dict[str, Any]:
-        """Monitor database connection health over time"""
+        """Summarise the background samples from the last `duration_seconds` (does not block)"""
+        since = time.time() - duration_seconds
+        samples = [sample for sample in list(self.history) if sample[0] >= since]
+        response_times = [response_ms for _, connected, response_ms, _ in samples if connected]
+        
         monitoring_results = {
-            'start_time': datetime.utcnow().isoformat(),
+            'start_time': datetime.utcfromtimestamp(since).isoformat(),
             'duration_seconds': duration_seconds,
-            'tests_performed': 0,
-            'successful_tests': 0,
-            'failed_tests': 0,
-            'response_times': [],
-            'errors': []
+            'tests_performed': len(samples),
+            'successful_tests': len(response_times),
+            'failed_tests': len(samples) - len(response_times),
+            'response_times': response_times,
+            'background_sampling': self._sampler_started,
+            'pool': self.get_pool_status()
         }
         
-        start_time = time.time()
-        test_interval = 5  # Test every 5 seconds
-        
-        while time.time() - start_time < duration_seconds:
-            test_result = self.test_connection()
-            monitoring_results['tests_performed'] += 1
-            
-            if test_result['connected']:
-                monitoring_results['successful_tests'] += 1
-                monitoring_results['response_times'].append(test_result['response_time_ms'])
-            else:
-                monitoring_results['failed_tests'] += 1
-                monitoring_results['errors'].append({
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'error': test_result.get('error', 'Unknown error')
-                })
-            
-            time.sleep(test_interval)
-        
         # Calculate statistics
-        if monitoring_results['response_times']:
-            response_times = monitoring_results['response_times']
+        if response_times:
             monitoring_results['average_response_time'] = sum(response_times) / len(response_times)
             monitoring_results['min_response_time'] = min(response_times)
             monitoring_results['max_response_time'] = max(response_times)
@@ -298,4 +439,4 @@ _connection_service = DatabaseConnectionService()
 
 def get_connection_service() -> DatabaseConnectionService:
     """Get the global connection service instance"""
-    return _connection_service
\ No newline at end of file
+    return _connection_service
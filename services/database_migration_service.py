@@ -71,7 +71,8 @@ class DatabaseMigrationService:
             'babel_post',
             'babel_like', 
             'babel_comment',
-            'babel_follow'
+            'babel_follow',
+            'babel_post_tag'
         ]
         
         missing_tables = []
@@ -100,7 +101,8 @@ class DatabaseMigrationService:
                 ('babel_post', self._create_babel_post_table),
                 ('babel_like', self._create_babel_like_table),
                 ('babel_comment', self._create_babel_comment_table),
-                ('babel_follow', self._create_babel_follow_table)
+                ('babel_follow', self._create_babel_follow_table),
+                ('babel_post_tag', self._create_babel_post_tag_table)
             ]
             
             for table_name, creation_method in table_creation_order:
@@ -248,13 +250,49 @@ class DatabaseMigrationService:
             self.logger.error(f"Error creating babel_follow table: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def _create_babel_post_tag_table(self) -> Dict[str, Any]:
+        """Create babel_post_tag inverted index table and backfill it"""
+        try:
+            statements = [
+                """
+                CREATE TABLE babel_post_tag (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    post_id INTEGER NOT NULL,
+                    tag VARCHAR(64) NOT NULL,
+                    kind VARCHAR(16) NOT NULL DEFAULT 'hashtag',
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (post_id) REFERENCES babel_post (id) ON DELETE CASCADE,
+                    UNIQUE (post_id, tag)
+                )
+                """,
+                "CREATE INDEX idx_babel_tag_lookup ON babel_post_tag (tag, created_at)",
+                "CREATE INDEX ix_babel_post_tag_post_id ON babel_post_tag (post_id)"
+            ]
+            
+            with db.engine.connect() as connection:
+                for sql in statements:
+                    connection.execute(text(sql))
+                connection.commit()
+            
+            # Backfill from the JSON tags/topics columns and build the full-text index
+            from services.babel.babel_search_index import get_search_index
+            search_index = get_search_index()
+            backfill = search_index.rebuild_tag_index()
+            search_index.ensure_fulltext_index()
+            
+            return {'success': backfill['success'], 'error': backfill.get('error')}
+            
+        except Exception as e:
+            self.logger.error(f"Error creating babel_post_tag table: {str(e)}")
+            return {'success': False, 'error': str(e)}
+    
     def verify_tables(self) -> Dict[str, Any]:
         """Verify all Babel tables exist and have correct structure"""
         try:
             inspector = inspect(db.engine)
             verification_results = {}
             
-            required_tables = ['babel_post', 'babel_like', 'babel_comment', 'babel_follow']
+            required_tables = ['babel_post', 'babel_like', 'babel_comment', 'babel_follow', 'babel_post_tag']
             
             for table_name in required_tables:
                 if self.check_table_exists(table_name):
@@ -299,6 +337,105 @@ class DatabaseMigrationService:
                 'error': str(e)
             }
     
+    def migrate_user_preferences(self, batch_size: int = 500) -> Dict[str, Any]:
+        """Create user_preferences and move JSON preferences out of User.bio"""
+        import json
+        from models import User, UserPreferences
+        
+        try:
+            UserPreferences.__table__.create(db.engine, checkfirst=True)
+            self._widen_preferences_avatar()
+            
+            migrated = skipped = 0
+            last_id = 0
+            while True:
+                # Keyset batches over bios that look like JSON objects
+                users = User.query.filter(
+                    User.id > last_id,
+                    User.bio.like('{%')
+                ).order_by(User.id).limit(batch_size).all()
+                if not users:
+                    break
+                last_id = users[-1].id
+                
+                existing = {
+                    preferences.user_id: preferences
+                    for preferences in UserPreferences.query.filter(
+                        UserPreferences.user_id.in_([user.id for user in users])
+                    ).all()
+                }
+                for user in users:
+                    try:
+                        stored = json.loads(user.bio)
+                    except (json.JSONDecodeError, TypeError):
+                        stored = None
+                    if not isinstance(stored, dict):
+                        skipped += 1  # A real bio that happens to start with '{'
+                        continue
+                    
+                    preferences = existing.get(user.id)
+                    if preferences is None:
+                        preferences = UserPreferences(user_id=user.id)
+                        db.session.add(preferences)
+                    preferences.apply_dict(stored, strict=False)  # Legacy values are truncated or kept in extra
+                    user.bio = None
+                    migrated += 1
+                
+                db.session.commit()
+            
+            self.logger.info(f"Migrated preferences for {migrated} users ({skipped} bios left as text)")
+            return {
+                'status': 'success',
+                'users_migrated': migrated,
+                'bios_skipped': skipped
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error migrating user preferences: {str(e)}")
+            return {
+                'status': 'error',
+                'message': 'Failed to migrate user preferences',
+                'error': str(e)
+            }
+    
+    def _widen_preferences_avatar(self) -> None:
+        """Tables created before avatar became VARCHAR(255) (SQLite doesn't enforce lengths)"""
+        dialect = db.engine.dialect.name
+        columns = {column['name']: column for column in inspect(db.engine).get_columns('user_preferences')}
+        length = getattr(columns.get('avatar', {}).get('type'), 'length', None)
+        if dialect == 'sqlite' or length is None or length >= 255:
+            return
+        statement = {
+            'postgresql': 'ALTER TABLE user_preferences ALTER COLUMN avatar TYPE VARCHAR(255)',
+            'mysql': 'ALTER TABLE user_preferences MODIFY avatar VARCHAR(255)'
+        }.get(dialect)
+        if statement:
+            with db.engine.begin() as connection:
+                connection.execute(text(statement))
+            self.logger.info("Widened user_preferences.avatar to 255 characters")
+    
+    def backfill_unread_counts(self, chunk_size: int = 1000) -> Dict[str, Any]:
+        """Fill ChatParticipant.unread_count for conversations that predate the write-time counters"""
+        from services.unread_counter import get_unread_counter
+        
+        try:
+            updated = get_unread_counter().rebuild(chunk_size=chunk_size)
+            self.logger.info(f"Backfilled unread counts for {updated} chat participants")
+            return {
+                'status': 'success',
+                'participants_updated': updated
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error backfilling unread counts: {str(e)}")
+            return {
+                'status': 'error',
+                'message': 'Failed to backfill unread counts',
+                'error': str(e)
+            }
+    
     def get_database_info(self) -> Dict[str, Any]:
         """Get comprehensive database information"""
         try:
@@ -314,7 +451,8 @@ class DatabaseMigrationService:
                     'babel_post': self.check_table_exists('babel_post'),
                     'babel_like': self.check_table_exists('babel_like'),
                     'babel_comment': self.check_table_exists('babel_comment'),
-                    'babel_follow': self.check_table_exists('babel_follow')
+                    'babel_follow': self.check_table_exists('babel_follow'),
+                    'babel_post_tag': self.check_table_exists('babel_post_tag')
                 }
             }
             
@@ -6,8 +6,11 @@ Handles DeepL API communication and language mapping
 import requests
 import logging
 import asyncio
+import time
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
+from .metrics import get_metrics
+from .tracing import traced
 
 
 @dataclass
@@ -90,6 +93,7 @@ class DeepLService:
         
         return self.supported_languages.get(lang_code, 'EN')
     
+    @traced('deepl.translate')
     async def translate_text(self, text: str, target_language: str, 
                            source_language: str = None) -> TranslationResult:
         """
@@ -138,12 +142,21 @@ class DeepLService:
             # Make API request
             self.logger.debug(f"Translating: '{text[:50]}...' to {target_lang}")
             
-            response = requests.post(
-                self.api_url,
-                headers=headers,
-                data=data,
-                timeout=10
-            )
+            metrics = get_metrics()
+            started = time.perf_counter()
+            try:
+                response = requests.post(
+                    self.api_url,
+                    headers=headers,
+                    data=data,
+                    timeout=10
+                )
+            except requests.exceptions.RequestException as e:
+                metrics.inc('deepl_requests_total', outcome='timeout' if isinstance(e, requests.exceptions.Timeout) else 'network_error')
+                raise
+            finally:
+                metrics.observe('deepl_request_duration_seconds', time.perf_counter() - started)
+            metrics.inc('deepl_requests_total', outcome=response.status_code)
             
             if response.status_code == 200:
                 result = response.json()
@@ -0,0 +1,222 @@
+"""
+Friend Group Membership Index 👥🗂️
+Group → members and user → groups, loaded in batches
+SRIMI: Single responsibility for friend group membership lookups
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional
+from models import db
+from models.user_models import FriendGroup, FriendGroupMember, FriendGroupType, FriendGroupRole
+
+
+MANAGER_ROLES = (FriendGroupRole.CREATOR, FriendGroupRole.ADMIN)
+
+
+class GroupEntry:
+    """One group's metadata and member roles"""
+
+    __slots__ = ('group_id', 'name', 'type', 'creator_id', 'created_at', 'members', 'loaded_at')
+
+    def __init__(self, group: FriendGroup):
+        self.group_id = group.id
+        self.name = group.name
+        self.type = group.type
+        self.creator_id = group.creator_id
+        self.created_at = group.created_at
+        self.members = {}  # user_id -> (FriendGroupRole, joined_at)
+        self.loaded_at = time.time()
+
+    @property
+    def can_babel(self) -> bool:
+        return self.type in (FriendGroupType.BABEL_GROUP, FriendGroupType.MIXED)
+
+    @property
+    def can_chat(self) -> bool:
+        return self.type in (FriendGroupType.CHAT_GROUP, FriendGroupType.MIXED)
+
+    def role_of(self, user_id: int) -> Optional[FriendGroupRole]:
+        member = self.members.get(user_id)
+        return member[0] if member else None
+
+
+class FriendGroupMembershipIndex:
+    """
+    In-process index of friend group membership.
+
+    A user's groups, and every member of those groups, are loaded with one
+    join the first time the user is looked up; single groups load the same
+    way. Membership and permission checks are then dictionary lookups, so a
+    group chat with hundreds of members costs the same as one with two.
+    Writes through FriendGroupService update the index in place; entries
+    older than `ttl` are reloaded so changes made by other workers show up.
+    """
+
+    def __init__(self, max_groups: int = 20000, ttl: float = 60.0):
+        self.logger = logging.getLogger(__name__)
+        self.max_groups = max_groups
+        self.ttl = ttl
+        self.groups = OrderedDict()  # group_id -> GroupEntry, least recently used first
+        self.user_groups = OrderedDict()  # user_id -> (loaded_at, set of group ids)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self.logger.info("🗂️ Friend Group Membership Index initialized")
+
+    # Reads
+    def get_group(self, group_id: int) -> Optional[GroupEntry]:
+        """A group with its members, or None if it does not exist"""
+        with self._lock:
+            entry = self.groups.get(group_id)
+            if entry is not None and time.time() - entry.loaded_at < self.ttl:
+                self.groups.move_to_end(group_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return self._load_groups(FriendGroupMember.friend_group_id == group_id).get(group_id)
+
+    def get_member_ids(self, group_id: int) -> List[int]:
+        """Member user ids of a group"""
+        entry = self.get_group(group_id)
+        return list(entry.members) if entry else []
+
+    def get_role(self, group_id: int, user_id: int) -> Optional[FriendGroupRole]:
+        """A user's role in a group, or None if not a member"""
+        entry = self.get_group(group_id)
+        return entry.role_of(user_id) if entry else None
+
+    def is_member(self, group_id: int, user_id: int) -> bool:
+        return self.get_role(group_id, user_id) is not None
+
+    def can_manage(self, group_id: int, user_id: int) -> bool:
+        """Creators and admins may add members"""
+        return self.get_role(group_id, user_id) in MANAGER_ROLES
+
+    def can_post(self, group_id: int, user_id: int) -> bool:
+        """Members may post babel content to babel-capable groups"""
+        entry = self.get_group(group_id)
+        return bool(entry and entry.can_babel and user_id in entry.members)
+
+    def can_access_chat(self, group_id: int, user_id: int) -> bool:
+        """Members may use the chat of chat-capable groups"""
+        entry = self.get_group(group_id)
+        return bool(entry and entry.can_chat and user_id in entry.members)
+
+    def get_user_groups(self, user_id: int) -> List[GroupEntry]:
+        """Every group the user belongs to, members included (one query when cold)"""
+        with self._lock:
+            cached = self.user_groups.get(user_id)
+            if cached and time.time() - cached[0] < self.ttl:
+                entries = [self.groups.get(group_id) for group_id in cached[1]]
+                if all(entry is not None and time.time() - entry.loaded_at < self.ttl for entry in entries):
+                    self.hits += 1
+                    return entries
+            self.misses += 1
+
+        user_group_ids = db.session.query(FriendGroupMember.friend_group_id).filter(
+            FriendGroupMember.user_id == user_id
+        )
+        loaded = self._load_groups(FriendGroupMember.friend_group_id.in_(user_group_ids.scalar_subquery()))
+        with self._lock:
+            self.user_groups[user_id] = (time.time(), set(loaded))
+            self.user_groups.move_to_end(user_id)
+            while len(self.user_groups) > self.max_groups:
+                self.user_groups.popitem(last=False)
+        return list(loaded.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get membership index statistics"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'groups_cached': len(self.groups),
+                'users_cached': len(self.user_groups),
+                'members_cached': sum(len(entry.members) for entry in self.groups.values()),
+                'max_groups': self.max_groups,
+                'hit_rate': round(self.hits / total, 3) if total else None
+            }
+
+    # Writes (call after the change is committed)
+    def record_group(self, group: FriendGroup, members: Iterable[FriendGroupMember]) -> None:
+        """Index a newly created group"""
+        entry = GroupEntry(group)
+        for member in members:
+            entry.members[member.user_id] = (member.role, member.joined_at)
+        with self._lock:
+            self._store(entry)
+            for user_id in entry.members:
+                self._add_user_group(user_id, group.id)
+
+    def record_members(self, group_id: int, members: Iterable[FriendGroupMember]) -> None:
+        """Apply added members or role changes"""
+        with self._lock:
+            entry = self.groups.get(group_id)
+            for member in members:
+                if entry is not None:
+                    entry.members[member.user_id] = (member.role, member.joined_at)
+                self._add_user_group(member.user_id, group_id)
+
+    def record_member_removed(self, group_id: int, user_id: int) -> None:
+        """Apply a member leaving"""
+        with self._lock:
+            entry = self.groups.get(group_id)
+            if entry is not None:
+                entry.members.pop(user_id, None)
+            cached = self.user_groups.get(user_id)
+            if cached:
+                cached[1].discard(group_id)
+
+    def invalidate_group(self, group_id: int) -> None:
+        """Drop a group (deleted, or changed in bulk)"""
+        with self._lock:
+            entry = self.groups.pop(group_id, None)
+            for user_id in (entry.members if entry else ()):
+                cached = self.user_groups.get(user_id)
+                if cached:
+                    cached[1].discard(group_id)
+
+    # Loading
+    def _load_groups(self, membership_filter) -> Dict[int, GroupEntry]:
+        """One join over FriendGroup and FriendGroupMember for the matching groups"""
+        rows = db.session.query(
+            FriendGroup, FriendGroupMember.user_id, FriendGroupMember.role, FriendGroupMember.joined_at
+        ).join(
+            FriendGroupMember, FriendGroupMember.friend_group_id == FriendGroup.id
+        ).filter(membership_filter).all()
+
+        loaded = {}
+        for group, member_id, role, joined_at in rows:
+            entry = loaded.get(group.id)
+            if entry is None:
+                entry = loaded[group.id] = GroupEntry(group)
+            entry.members[member_id] = (role, joined_at)
+
+        with self._lock:
+            for entry in loaded.values():
+                self._store(entry)
+        return loaded
+
+    def _store(self, entry: GroupEntry) -> None:
+        """Insert an entry, evicting the least recently used groups"""
+        self.groups[entry.group_id] = entry
+        self.groups.move_to_end(entry.group_id)
+        while len(self.groups) > self.max_groups:
+            self.groups.popitem(last=False)
+
+    def _add_user_group(self, user_id: int, group_id: int) -> None:
+        """Add a group to a cached user → groups entry"""
+        cached = self.user_groups.get(user_id)
+        if cached:
+            cached[1].add(group_id)
+
+
+# Global instance
+_friend_group_index = FriendGroupMembershipIndex()
+
+
+def get_friend_group_index() -> FriendGroupMembershipIndex:
+    """Get the global friend group membership index"""
+    return _friend_group_index
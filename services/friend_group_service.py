@@ -7,12 +7,23 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 from models import db, User
 from models.user_models import FriendGroup, FriendGroupMember, FriendGroupType, FriendGroupRole
+from .friend_group_index import get_friend_group_index
 
 class FriendGroupService:
-    """Handle friend group operations for babel posts and group chats"""
+    """
+    Handle friend group operations for babel posts and group chats
+
+    Reads are served from the per-worker membership index; permission and
+    membership checks on write paths query the database, since another
+    worker's changes may not have reached this worker's index yet.
+    """
+    
+    # Largest number of members accepted by one bulk add
+    MAX_BULK_ADD = 500
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.index = get_friend_group_index()
         self.logger.info("👥 Friend Group Service initialized")
     
     def create_friend_group(self, creator_id: int, group_name: str, group_type: str = "mixed") -> Dict[str, Any]:
@@ -65,6 +76,7 @@ class FriendGroupService:
             )
             db.session.add(creator_member)
             db.session.commit()
+            self.index.record_group(friend_group, [creator_member])
             
             self.logger.info(f"👥 Friend group created: '{group_name}' by user {creator_id}")
             
@@ -87,28 +99,37 @@ class FriendGroupService:
                 'error': str(e)
             }
     
+    def _can_manage(self, group_id: int, user_id: int) -> bool:
+        """Creator or admin, checked against the database (write paths)"""
+        return db.session.query(FriendGroupMember.id).filter(
+            FriendGroupMember.friend_group_id == group_id,
+            FriendGroupMember.user_id == user_id,
+            FriendGroupMember.role.in_([FriendGroupRole.CREATOR, FriendGroupRole.ADMIN])
+        ).first() is not None
+    
+    def _member_ids(self, group_id: int, user_ids: List[int]) -> set:
+        """Which of `user_ids` are already members, checked against the database (write paths)"""
+        if not user_ids:
+            return set()
+        return {
+            member_id for (member_id,) in db.session.query(FriendGroupMember.user_id).filter(
+                FriendGroupMember.friend_group_id == group_id,
+                FriendGroupMember.user_id.in_(user_ids)
+            ).all()
+        }
+    
     def add_member_to_group(self, user_id: int, group_id: int, new_member_id: int) -> Dict[str, Any]:
         """Add a member to a friend group"""
         try:
             # Check if user has permission to add members
-            member = FriendGroupMember.query.filter_by(
-                friend_group_id=group_id,
-                user_id=user_id
-            ).first()
-            
-            if not member or member.role not in [FriendGroupRole.CREATOR, FriendGroupRole.ADMIN]:
+            if not self._can_manage(group_id, user_id):
                 return {
                     'success': False,
                     'error': 'You do not have permission to add members to this group'
                 }
             
             # Check if new member already in group
-            existing_member = FriendGroupMember.query.filter_by(
-                friend_group_id=group_id,
-                user_id=new_member_id
-            ).first()
-            
-            if existing_member:
+            if self._member_ids(group_id, [new_member_id]):
                 return {
                     'success': False,
                     'error': 'User is already a member of this group'
@@ -131,6 +152,7 @@ class FriendGroupService:
             )
             db.session.add(new_member)
             db.session.commit()
+            self.index.record_members(group_id, [new_member])
             
             self.logger.info(f"👥 User {new_member_id} added to group {group_id} by user {user_id}")
             
@@ -153,31 +175,94 @@ class FriendGroupService:
                 'error': str(e)
             }
     
+    def add_members_to_group(self, user_id: int, group_id: int, member_ids: List[int]) -> Dict[str, Any]:
+        """Add many members to a friend group in one transaction"""
+        try:
+            if not self._can_manage(group_id, user_id):
+                return {
+                    'success': False,
+                    'error': 'You do not have permission to add members to this group'
+                }
+            
+            member_ids = list(dict.fromkeys(member_ids))
+            if len(member_ids) > self.MAX_BULK_ADD:
+                return {
+                    'success': False,
+                    'error': f'Too many members (max {self.MAX_BULK_ADD} per request)'
+                }
+            
+            # Skip existing members, then resolve the rest in one query
+            existing_ids = self._member_ids(group_id, member_ids)
+            candidate_ids = [member_id for member_id in member_ids if member_id not in existing_ids]
+            users = User.query.filter(User.id.in_(candidate_ids)).all() if candidate_ids else []
+            found_ids = {user.id for user in users}
+            
+            joined_at = datetime.utcnow()
+            new_members = [
+                FriendGroupMember(
+                    friend_group_id=group_id,
+                    user_id=user.id,
+                    role=FriendGroupRole.MEMBER,
+                    joined_at=joined_at
+                )
+                for user in users
+            ]
+            db.session.add_all(new_members)
+            db.session.commit()
+            self.index.record_members(group_id, new_members)
+            
+            self.logger.info(f"👥 {len(new_members)} users added to group {group_id} by user {user_id}")
+            
+            return {
+                'success': True,
+                'added': [
+                    {
+                        'user_id': user.id,
+                        'username': user.username,
+                        'display_name': user.display_name,
+                        'role': 'member'
+                    }
+                    for user in users
+                ],
+                'already_members': [member_id for member_id in member_ids if member_id in existing_ids],
+                'not_found': [member_id for member_id in candidate_ids if member_id not in found_ids]
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"❌ Failed to add members to group: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def can_post_to_group(self, user_id: int, group_id: int) -> bool:
+        """Check if user can post babel content to a friend group"""
+        return self.index.can_post(group_id, user_id)
+    
+    def can_access_group_chat(self, user_id: int, group_id: int) -> bool:
+        """Check if user can access a friend group chat"""
+        return self.index.can_access_chat(group_id, user_id)
+    
     def get_user_friend_groups(self, user_id: int) -> Dict[str, Any]:
         """Get all friend groups user is a member of"""
         try:
-            user_groups = db.session.query(FriendGroup, FriendGroupMember).join(
-                FriendGroupMember, FriendGroup.id == FriendGroupMember.friend_group_id
-            ).filter(
-                FriendGroupMember.user_id == user_id
-            ).all()
-            
+            # Groups and their members come from the membership index (one join when cold)
             groups_data = []
-            for group, membership in user_groups:
-                # Get member count
-                member_count = FriendGroupMember.query.filter_by(friend_group_id=group.id).count()
+            for group in self.index.get_user_groups(user_id):
+                role, joined_at = group.members[user_id]
                 
                 groups_data.append({
-                    'group_id': group.id,
+                    'group_id': group.group_id,
                     'group_name': group.name,
                     'group_type': group.type.value,
-                    'is_creator': membership.role == FriendGroupRole.CREATOR,
-                    'role': membership.role.value,
-                    'joined_at': membership.joined_at.isoformat() if membership.joined_at else None,
+                    'is_creator': role == FriendGroupRole.CREATOR,
+                    'role': role.value,
+                    'joined_at': joined_at.isoformat() if joined_at else None,
                     'created_at': group.created_at.isoformat(),
-                    'member_count': member_count,
-                    'can_babel': group.type in [FriendGroupType.BABEL_GROUP, FriendGroupType.MIXED],
-                    'can_chat': group.type in [FriendGroupType.CHAT_GROUP, FriendGroupType.MIXED]
+                    'member_count': len(group.members),
+                    'can_babel': group.can_babel,
+                    'can_chat': group.can_chat
                 })
             
             # Separate by type for easier UI handling
@@ -202,46 +287,41 @@ class FriendGroupService:
     def get_group_members(self, user_id: int, group_id: int) -> Dict[str, Any]:
         """Get members of a friend group"""
         try:
-            # Check if user is member of the group
-            user_member = FriendGroupMember.query.filter_by(
-                friend_group_id=group_id,
-                user_id=user_id
-            ).first()
-            
-            if not user_member:
+            # Check membership through the index
+            group = self.index.get_group(group_id)
+            if not group:
                 return {
                     'success': False,
-                    'error': 'You are not a member of this group'
+                    'error': 'Group not found'
                 }
             
-            # Get group info
-            group = FriendGroup.query.get(group_id)
-            if not group:
+            if user_id not in group.members:
                 return {
                     'success': False,
-                    'error': 'Group not found'
+                    'error': 'You are not a member of this group'
                 }
             
-            # Get all members
-            members = db.session.query(FriendGroupMember, User).join(
-                User, FriendGroupMember.user_id == User.id
-            ).filter(FriendGroupMember.friend_group_id == group_id).all()
+            # User details for every member in one query
+            members = [
+                (group.members[user.id], user)
+                for user in User.query.filter(User.id.in_(list(group.members))).all()
+            ]
             
             members_data = []
-            for member, user in members:
+            for (role, joined_at), user in members:
                 members_data.append({
                     'user_id': user.id,
                     'username': user.username,
                     'display_name': user.display_name,
-                    'role': member.role.value,
-                    'joined_at': member.joined_at.isoformat() if member.joined_at else None,
+                    'role': role.value,
+                    'joined_at': joined_at.isoformat() if joined_at else None,
                     'is_online': user.is_online if hasattr(user, 'is_online') else False
                 })
             
             return {
                 'success': True,
                 'group': {
-                    'group_id': group.id,
+                    'group_id': group.group_id,
                     'group_name': group.name,
                     'group_type': group.type.value,
                     'created_at': group.created_at.isoformat()
@@ -295,6 +375,8 @@ class FriendGroupService:
                     other_admin.role = FriendGroupRole.CREATOR
                     db.session.delete(member)
                     db.session.commit()
+                    self.index.record_member_removed(group_id, user_id)
+                    self.index.record_members(group_id, [other_admin])
                     
                     return {
                         'success': True,
@@ -312,6 +394,8 @@ class FriendGroupService:
                         other_member.role = FriendGroupRole.CREATOR
                         db.session.delete(member)
                         db.session.commit()
+                        self.index.record_member_removed(group_id, user_id)
+                        self.index.record_members(group_id, [other_member])
                         
                         return {
                             'success': True,
@@ -322,6 +406,7 @@ class FriendGroupService:
                         db.session.delete(member)
                         db.session.delete(group)
                         db.session.commit()
+                        self.index.invalidate_group(group_id)
                         
                         return {
                             'success': True,
@@ -331,6 +416,7 @@ class FriendGroupService:
                 # Regular member leaving
                 db.session.delete(member)
                 db.session.commit()
+                self.index.record_member_removed(group_id, user_id)
                 
                 return {
                     'success': True,
@@ -9,10 +9,56 @@ import cv2
 import re
 import os
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
+from flask import current_app, has_app_context
 from PIL import Image
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
+from .service_container import get_container
+
+
+# Tesseract configs in the order they are tried - the block modes read a DOB most often
+OCR_CONFIGS = [
+    '--oem 1 --psm 6',  # LSTM engine, single block
+    '--oem 3 --psm 6',  # Default engine, single block
+    '--oem 1 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz/-: .',
+    '--oem 1 --psm 7',  # LSTM engine, single line
+    '--oem 3 --psm 7',  # Default engine, single line
+    '--oem 1 --psm 8',  # LSTM engine, single word
+]
+
+ID_CARD_WIDTH_INCHES = 3.370  # ID-1 format: driver's licences and national ID cards
+CARD_MIN_AREA_FRACTION = 0.2  # A card outline must cover this much of the photo to set the scale
+LEGACY_MIN_WIDTH = 1200  # Legacy resize: images narrower than this are upscaled to it
+
+# Birth dates next to an explicit label - the only matches trusted to end OCR early
+LABELLED_DOB_PATTERNS = [
+    r'DOB[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
+    r'Date of Birth[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
+    r'Born[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
+    r'Birth[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
+    r'D\.O\.B[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
+]
+WINDOWS_TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+
+def _ocr_pass(image: np.ndarray, config: str, timeout: float) -> Optional[Tuple[str, float]]:
+    """One Tesseract run: the words read with >70% confidence and the average word confidence"""
+    data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT,
+                                     timeout=timeout or 0)
+
+    # Filter by confidence score (>70% as recommended by Grok)
+    high_conf_text = [text for conf, text in zip(data['conf'], data['text'])
+                      if int(float(conf)) > 70 and text.strip()]
+    combined_text = ' '.join(high_conf_text)
+    if not combined_text.strip():
+        return None
+
+    scores = [int(float(conf)) for conf in data['conf'] if int(float(conf)) > 0]
+    return combined_text, sum(scores) / len(scores)
 
 
 class DIYIDVerificationService:
@@ -24,17 +70,35 @@ class DIYIDVerificationService:
     - Calculate age and determine user type
     - Zero external API costs
     - Windows compatible (no CMake required)
+    - Image variants x Tesseract configs OCR'd in parallel, stopping once the earliest-ordered
+      confident pass reads a labelled birth date
     """
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        settings = current_app.config if has_app_context() else {}
         
         # Note: Tesseract OCR binary needs to be installed separately
         # For Windows: Download from https://github.com/UB-Mannheim/tesseract/wiki
-        # If tesseract not in PATH, uncomment and set path:
-        pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        # If tesseract is not in PATH, set TESSERACT_CMD to the binary
+        tesseract_cmd = settings.get('TESSERACT_CMD')
+        if not tesseract_cmd and os.name == 'nt' and os.path.exists(WINDOWS_TESSERACT_CMD):
+            tesseract_cmd = WINDOWS_TESSERACT_CMD
+        if tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         
-        self.logger.info("🤖 DIY ID Verification Service initialized (OCR only)")
+        # Each Tesseract run is its own process, so a thread pool is enough to use every core
+        self.ocr_workers = int(settings.get('OCR_WORKERS') or os.cpu_count() or 2)
+        self.target_dpi = int(settings.get('OCR_TARGET_DPI', 300))  # 0 = legacy upscale-only resize
+        self.early_exit_confidence = float(settings.get('OCR_EARLY_EXIT_CONFIDENCE', 80))  # 0 = run every pass
+        self.ocr_timeout = float(settings.get('OCR_TIMEOUT', 20))
+        if self.ocr_workers > 1:
+            # Keep Tesseract's own OpenMP threads from oversubscribing the cores the pool already uses
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        self.logger.info(f"🤖 DIY ID Verification Service initialized (OCR only, {self.ocr_workers} OCR workers)")
     
     def verify_user_id(self, id_image_path: str, selfie_path: str, user_id: int) -> Dict[str, Any]:
         """
@@ -122,10 +186,84 @@ class DIYIDVerificationService:
                 'timestamp': datetime.utcnow().isoformat()
             }
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Shared by every verification, so concurrent uploads together stay within the core count"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix='ocr')
+            return self._executor
+    
+    def _scale_to_target_dpi(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Resample for OCR. With a target DPI and a detectable card outline, scale so the card is
+        ~target_dpi across (phone photos shrink, small scans grow); otherwise upscale images
+        narrower than LEGACY_MIN_WIDTH and leave the rest alone, as before
+        """
+        height, width = gray.shape[:2]
+        card_width = self._card_width(gray) if self.target_dpi else None
+        if card_width:
+            scale_factor = ID_CARD_WIDTH_INCHES * self.target_dpi / card_width
+            if abs(scale_factor - 1) < 0.1:
+                return gray
+        elif width < LEGACY_MIN_WIDTH:
+            scale_factor = LEGACY_MIN_WIDTH / width
+        else:
+            return gray
+        
+        interpolation = cv2.INTER_AREA if scale_factor < 1 else cv2.INTER_CUBIC
+        resized = cv2.resize(gray, (int(width * scale_factor), int(height * scale_factor)), interpolation=interpolation)
+        self.logger.debug(f"📐 Resized to: {resized.shape[1]}x{resized.shape[0]}")
+        return resized
+    
+    def _card_width(self, gray: np.ndarray) -> Optional[float]:
+        """Pixel width of the card's long side, if a four-cornered outline stands out from the background"""
+        edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+        contours = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]  # OpenCV 3 and 4
+        min_area = CARD_MIN_AREA_FRACTION * gray.shape[0] * gray.shape[1]
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            outline = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(outline) == 4 and cv2.contourArea(outline) >= min_area:
+                card_width = max(cv2.minAreaRect(outline)[1])
+                self.logger.debug(f"📐 Card outline found, {card_width:.0f}px wide")
+                return card_width
+        return None
+    
+    def _preprocess_variants(self, gray: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+        """Image variants OCR'd separately, most productive first"""
+        processed_images = []
+        
+        # Method 1: Basic grayscale (already done)
+        processed_images.append(("basic_gray", gray))
+        
+        # Method 2: Binarization with OTSU threshold
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        processed_images.append(("otsu_binary", binary))
+        
+        # Method 3: Adaptive threshold
+        adaptive = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+        processed_images.append(("adaptive_thresh", adaptive))
+        
+        # Method 4: Noise reduction with morphological operations
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+        denoised = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+        processed_images.append(("denoised", denoised))
+        
+        # Method 5: Contrast enhancement
+        enhanced = cv2.convertScaleAbs(gray, alpha=1.3, beta=0)
+        processed_images.append(("enhanced_contrast", enhanced))
+        
+        # Method 6: Gaussian blur for noise reduction
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        processed_images.append(("gaussian_blur", blurred))
+        
+        return processed_images
+    
     def _extract_id_data(self, image_path: str) -> Dict[str, Any]:
         """Extract text and data from ID document using OCR with professional improvements"""
         
         try:
+            started = time.perf_counter()
+            
             # Load and preprocess image for better OCR
             image = cv2.imread(image_path)
             if image is None:
@@ -139,80 +277,61 @@ class DIYIDVerificationService:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
             # GROK IMPROVEMENT 1: Resize to 300 DPI equivalent for optimal OCR
-            target_width = 1200  # Good resolution for OCR
-            if width < target_width:
-                scale_factor = target_width / width
-                new_width = int(width * scale_factor)
-                new_height = int(height * scale_factor)
-                gray = cv2.resize(gray, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                self.logger.debug(f"📐 Resized to: {new_width}x{new_height}")
+            gray = self._scale_to_target_dpi(gray)
             
             # GROK IMPROVEMENT 2: Advanced image preprocessing
-            processed_images = []
-            
-            # Method 1: Basic grayscale (already done)
-            processed_images.append(("basic_gray", gray))
-            
-            # Method 2: Binarization with OTSU threshold
-            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            processed_images.append(("otsu_binary", binary))
-            
-            # Method 3: Adaptive threshold
-            adaptive = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-            processed_images.append(("adaptive_thresh", adaptive))
-            
-            # Method 4: Noise reduction with morphological operations
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-            denoised = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-            processed_images.append(("denoised", denoised))
-            
-            # Method 5: Contrast enhancement
-            enhanced = cv2.convertScaleAbs(gray, alpha=1.3, beta=0)
-            processed_images.append(("enhanced_contrast", enhanced))
-            
-            # Method 6: Gaussian blur for noise reduction
-            blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-            processed_images.append(("gaussian_blur", blurred))
-            
-            # GROK IMPROVEMENT 3: Use proper PSM and OEM modes with character whitelisting
-            ocr_configs = [
-                '--oem 1 --psm 6',  # LSTM engine, single block
-                '--oem 1 --psm 7',  # LSTM engine, single line
-                '--oem 1 --psm 8',  # LSTM engine, single word
-                '--oem 1 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz/-: .',
-                '--oem 3 --psm 6',  # Default engine, single block
-                '--oem 3 --psm 7',  # Default engine, single line
-            ]
-            
-            text_results = []
-            confidence_scores = []
+            processed_images = self._preprocess_variants(gray)
+            
+            # GROK IMPROVEMENT 3: Use proper PSM and OEM modes with character whitelisting,
+            # every variant x config pass dispatched to the pool in the legacy loop order
+            attempts = [(img_name, img, config) for img_name, img in processed_images for config in OCR_CONFIGS]
+            executor = self._get_executor()
+            futures = {
+                executor.submit(_ocr_pass, img, config, self.ocr_timeout): (index, img_name, config)
+                for index, (img_name, img, config) in enumerate(attempts)
+            }
             
-            # Extract text using multiple methods and configs
-            for img_name, img in processed_images:
-                for config in ocr_configs:
+            results = []  # (attempt index, text, confidence)
+            birth_date = None
+            winner = None  # Lowest attempt index whose confident text has a labelled birth date
+            try:
+                for future in as_completed(futures):
+                    index, img_name, config = futures[future]
                     try:
-                        # Get both text and confidence data
-                        data = pytesseract.image_to_data(img, config=config, output_type=pytesseract.Output.DICT)
-                        
-                        # Filter by confidence score (>70% as recommended by Grok)
-                        high_conf_text = []
-                        for i, conf in enumerate(data['conf']):
-                            if int(conf) > 70:
-                                text = data['text'][i]
-                                if text.strip():
-                                    high_conf_text.append(text)
-                        
-                        combined_text = ' '.join(high_conf_text)
-                        if combined_text.strip():
-                            text_results.append(combined_text)
-                            avg_confidence = sum(int(c) for c in data['conf'] if int(c) > 0) / len([c for c in data['conf'] if int(c) > 0])
-                            confidence_scores.append(avg_confidence)
-                            
-                            self.logger.debug(f"📊 {img_name} + {config}: {len(combined_text)} chars, avg conf: {avg_confidence:.1f}%")
-                        
+                        outcome = future.result()
                     except Exception as e:
                         self.logger.debug(f"OCR attempt failed for {img_name} + {config}: {e}")
-                        continue
+                        outcome = None
+                    
+                    if outcome is not None:
+                        text, confidence = outcome
+                        results.append((index, text, confidence))
+                        self.logger.debug(f"📊 {img_name} + {config}: {len(text)} chars, avg conf: {confidence:.1f}%")
+                        
+                        if (self.early_exit_confidence and confidence >= self.early_exit_confidence
+                                and (winner is None or index < winner)):
+                            found = self._find_birth_date(text, quiet=True, strict=True)
+                            if found:
+                                winner, birth_date = index, found
+                                for later, (later_index, _, _) in futures.items():
+                                    if later_index > winner:
+                                        later.cancel()
+                    
+                    # Stop once every pass ordered before the winner has finished, so the same
+                    # pass wins however the pool schedules them
+                    if winner is not None and all(
+                        pending.done() for pending, (pending_index, _, _) in futures.items() if pending_index < winner
+                    ):
+                        self.logger.debug(f"⚡ Birth date read by attempt {winner + 1}/{len(attempts)}")
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+            
+            # Keep the text in attempt order, up to the winning pass when OCR stopped early
+            results = sorted(result for result in results if winner is None or result[0] <= winner)
+            text_results = [text for _, text, _ in results]
+            confidence_scores = [confidence for _, _, confidence in results]
             
             # GROK IMPROVEMENT 4: Combine all high-confidence text
             if not text_results:
@@ -223,13 +342,17 @@ class DIYIDVerificationService:
             combined_text = '\n'.join(text_results)
             
             # Extract specific data from combined text
-            birth_date = self._find_birth_date(combined_text)
+            if not birth_date:
+                birth_date = self._find_birth_date(combined_text)
             name = self._find_name(combined_text)
             
             # Calculate overall confidence score
             avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
             
-            self.logger.debug(f"📄 OCR extracted {len(combined_text)} chars with avg confidence: {avg_confidence:.1f}%")
+            self.logger.debug(
+                f"📄 OCR extracted {len(combined_text)} chars with avg confidence: {avg_confidence:.1f}% "
+                f"({len(results)}/{len(attempts)} passes, {time.perf_counter() - started:.2f}s)"
+            )
             self.logger.debug(f"📄 Sample text: {combined_text[:500]}...")
             
             # If we still can't find a birth date, log for debugging
@@ -252,21 +375,19 @@ class DIYIDVerificationService:
                 'confidence': 0
             }
     
-    def _find_birth_date(self, text: str) -> Optional[str]:
-        """Find birth date patterns in OCR text"""
+    def _find_birth_date(self, text: str, quiet: bool = False, strict: bool = False) -> Optional[str]:
+        """
+        Find birth date patterns in OCR text (quiet: debug-level logs only, for per-pass checks;
+        strict: labelled dates only, no bare dates or aggressive search)
+        """
+        log_info = self.logger.debug if quiet else self.logger.info
+        log_warning = self.logger.debug if quiet else self.logger.warning
         
         # Log the text we're searching through
         self.logger.debug(f"🔍 Searching for birth date in text: {text[:300]}...")
         
         # Expanded birth date patterns for better detection
-        patterns = [
-            # Standard formats with labels
-            r'DOB[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
-            r'Date of Birth[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
-            r'Born[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
-            r'Birth[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
-            r'D\.O\.B[:\s]*(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',
-            
+        patterns = LABELLED_DOB_PATTERNS if strict else LABELLED_DOB_PATTERNS + [
             # Florida Driver's License specific patterns (general format)
             r'DOB[:\s]*(\d{2}\/\d{2}\/\d{4})',  # Florida format
             r'(\d{2}\/\d{2}\/\d{4})\s*\d{2}SEX',  # Florida DOB before SEX field
@@ -304,11 +425,13 @@ class DIYIDVerificationService:
                     
                     # Validate the date makes sense
                     if self._validate_date_string(date_str):
-                        self.logger.info(f"✅ Valid birth date found: {date_str}")
+                        log_info(f"✅ Valid birth date found: {date_str}")
                         return date_str
+        if strict:
+            return None
         
         # If no patterns matched, try a more aggressive search
-        self.logger.warning(f"⚠️ No birth date pattern found. Trying aggressive search...")
+        log_warning(f"⚠️ No birth date pattern found. Trying aggressive search...")
         
         # Look for any 4-digit year that looks like a birth year
         year_matches = re.findall(r'\b(19\d{2}|20\d{2})\b', text)
@@ -323,10 +446,10 @@ class DIYIDVerificationService:
                 if nearby_matches:
                     for date_str in nearby_matches:
                         if self._validate_date_string(date_str):
-                            self.logger.info(f"✅ Aggressive search found: {date_str}")
+                            log_info(f"✅ Aggressive search found: {date_str}")
                             return date_str
         
-        self.logger.warning("⚠️ No birth date pattern found in OCR text")
+        log_warning("⚠️ No birth date pattern found in OCR text")
         return None
     
     def _validate_date_string(self, date_str: str) -> bool:
@@ -519,7 +642,7 @@ class DIYIDVerificationService:
         os.makedirs(verification_dir, exist_ok=True)
         
         # Generate secure filenames
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')  # Never reuse an in-flight upload's name
         id_filename = f"id_{timestamp}.jpg"
         selfie_filename = f"selfie_{timestamp}.jpg"
         
@@ -575,10 +698,6 @@ class DIYIDVerificationService:
         }
 
 
-# Global instance
-_id_verification_service = DIYIDVerificationService()
-
-
 def get_id_verification_service() -> DIYIDVerificationService:
-    """Get the global ID verification service instance"""
-    return _id_verification_service
\ No newline at end of file
+    """Get the global ID verification service instance (built on first use)"""
+    return get_container().get('id_verification')
\ No newline at end of file
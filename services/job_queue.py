@@ -0,0 +1,723 @@
+"""
+Job Queue 📬⚙️
+Durable background jobs with priorities, retries, dedup keys and progress
+SRIMI: Single responsibility for running non-interactive work off the request path
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .metrics import get_metrics
+from .service_container import _resolve
+
+try:
+    import redis
+except ImportError:  # Optional - the SQLite store works without it
+    redis = None
+
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+ACTIVE_STATUSES = ('queued', 'running')
+JSON_FIELDS = ('payload', 'result')
+
+
+def _new_job(task: str, payload: Dict[str, Any], priority: int, dedup_key: Optional[str],
+             max_attempts: int, run_at: float) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'task': task,
+        'payload': payload,
+        'priority': priority,
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': max_attempts,
+        'run_at': run_at,
+        'lease_until': None,
+        'dedup_key': dedup_key,
+        'progress': 0.0,
+        'progress_message': None,
+        'result': None,
+        'error': None,
+        'created_at': now,
+        'updated_at': now,
+        'started_at': None,
+        'finished_at': None
+    }
+
+
+class SQLiteJobStore:
+    """
+    Jobs in a local SQLite file (WAL), shared by every process on the host.
+
+    Claiming runs in a BEGIN IMMEDIATE transaction, so two workers never take
+    the same job; a running job whose lease has expired (its worker died) is
+    claimable again. Idle polls only read (WAL readers never block writers),
+    so the write lock is taken only when a job is due. Dedup keys are a
+    partial unique index over active jobs.
+    """
+
+    def __init__(self, db_path: str = 'job_queue.db', lease_seconds: float = 300.0):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    payload TEXT,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    run_at REAL NOT NULL,
+                    lease_until REAL,
+                    dedup_key TEXT,
+                    progress REAL DEFAULT 0,
+                    progress_message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority, run_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)')
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedup ON jobs (dedup_key) "
+                "WHERE dedup_key IS NOT NULL AND status IN ('queued', 'running')"
+            )
+        finally:
+            conn.close()
+
+    def enqueue(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Insert a job, or return the active job holding its dedup key"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if job['dedup_key']:
+                existing = conn.execute(
+                    "SELECT * FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running')", (job['dedup_key'],)
+                ).fetchone()
+                if existing is not None:
+                    conn.execute('COMMIT')
+                    return self._row(existing), False
+            columns = list(job)
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [self._encode(column, job[column]) for column in columns]
+            )
+            conn.execute('COMMIT')
+            return job, True
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def claim(self, now: float) -> Optional[Dict[str, Any]]:
+        """Take the most urgent due job (or one whose lease expired) and mark it running"""
+        due = (
+            "SELECT * FROM jobs WHERE (status = 'queued' AND run_at <= ?) "
+            "OR (status = 'running' AND lease_until < ?) ORDER BY priority, run_at LIMIT 1"
+        )
+        conn = self._connect()
+        try:
+            if conn.execute(due, (now, now)).fetchone() is None:
+                return None  # Nothing due - skip the write lock
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(due, (now, now)).fetchone()  # Re-read: another worker may have claimed it
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, "
+                "started_at = ?, updated_at = ? WHERE id = ?",
+                (now + self.lease_seconds, now, now, row['id'])
+            )
+            conn.execute('COMMIT')
+            job = self._row(row)
+            job.update(status='running', attempts=job['attempts'] + 1, lease_until=now + self.lease_seconds, started_at=now)
+            return job
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def update(self, job_id: str, **fields) -> None:
+        """Write progress, results or a status change; running jobs have their lease extended"""
+        fields['updated_at'] = time.time()
+        if fields.get('status', 'running') == 'running':
+            fields['lease_until'] = fields['updated_at'] + self.lease_seconds
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in fields)} WHERE id = ?",
+                [self._encode(column, value) for column, value in fields.items()] + [job_id]
+            )
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            return self._row(row) if row is not None else None
+        finally:
+            conn.close()
+
+    def recent(self, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            if status:
+                rows = conn.execute('SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?', (status, limit))
+            else:
+                rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+            return [self._row(row) for row in rows]
+        finally:
+            conn.close()
+
+    def counts(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            return dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        finally:
+            conn.close()
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs last updated before a timestamp"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (older_than,)
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'sqlite', 'path': self.db_path, 'lease_seconds': self.lease_seconds}
+
+    @staticmethod
+    def _encode(column: str, value: Any) -> Any:
+        return json.dumps(value) if column in JSON_FIELDS and value is not None else value
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for column in JSON_FIELDS:
+            if job.get(column) is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+
+class RedisJobStore:
+    """
+    Jobs shared through Redis, for workers on several hosts.
+
+    Each job is a hash of JSON values; ids wait in a 'ready' sorted set ordered by priority
+    then due time, a 'delayed' set keyed by run_at (retries and scheduled
+    jobs) and a 'running' set keyed by lease expiry. Claiming is one Lua
+    script, which also promotes due delayed jobs and requeues expired leases.
+    """
+
+    CLAIM_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local function requeue(source)
+        for _, id in ipairs(redis.call('ZRANGEBYSCORE', source, '-inf', now)) do
+            redis.call('ZREM', source, id)
+            local priority = tonumber(redis.call('HGET', ARGV[3] .. id, 'priority') or '5')
+            redis.call('ZADD', KEYS[1], priority * 1e13 + now * 1000, id)
+        end
+    end
+    requeue(KEYS[2])
+    requeue(KEYS[3])
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then return false end
+    local id = popped[1]
+    local lease_until = now + tonumber(ARGV[2])
+    redis.call('HSET', ARGV[3] .. id, 'status', '"running"', 'lease_until', lease_until,
+               'started_at', now, 'updated_at', now)
+    redis.call('HINCRBY', ARGV[3] .. id, 'attempts', 1)
+    redis.call('ZADD', KEYS[3], lease_until, id)
+    return id
+    """
+
+    def __init__(self, client, lease_seconds: float = 300.0, prefix: str = 'unibabel:jobs', history: int = 1000):
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.prefix = prefix
+        self.history = history
+        self._claim = client.register_script(self.CLAIM_SCRIPT)
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def enqueue(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        if job['dedup_key']:
+            dedup = self._key(f"dedup:{job['dedup_key']}")
+            if not self.client.set(dedup, job['id'], nx=True):
+                existing = self.get((self.client.get(dedup) or b'').decode())
+                if existing is not None and existing['status'] in ACTIVE_STATUSES:
+                    return existing, False
+                self.client.set(dedup, job['id'])  # Stale key from a job that already finished
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(f"job:{job['id']}"), mapping=self._encode(job))
+        if job['run_at'] > time.time():
+            pipe.zadd(self._key('delayed'), {job['id']: job['run_at']})
+        else:
+            pipe.zadd(self._key('ready'), {job['id']: job['priority'] * 1e13 + job['run_at'] * 1000})
+        pipe.lpush(self._key('recent'), job['id'])
+        pipe.ltrim(self._key('recent'), 0, self.history - 1)
+        pipe.execute()
+        return job, True
+
+    def claim(self, now: float) -> Optional[Dict[str, Any]]:
+        job_id = self._claim(
+            keys=[self._key('ready'), self._key('delayed'), self._key('running')],
+            args=[now, self.lease_seconds, self._key('job:')]
+        )
+        return self.get(job_id.decode()) if job_id else None
+
+    def update(self, job_id: str, **fields) -> None:
+        fields['updated_at'] = time.time()
+        status = fields.get('status', 'running')
+        pipe = self.client.pipeline()
+        if status == 'running':
+            fields['lease_until'] = fields['updated_at'] + self.lease_seconds
+            pipe.zadd(self._key('running'), {job_id: fields['lease_until']})
+        else:
+            pipe.zrem(self._key('running'), job_id)
+            if status == 'queued':
+                pipe.zadd(self._key('delayed'), {job_id: fields['run_at']})
+            else:
+                pipe.incr(self._key(f"finished:{status}"))
+        pipe.hset(self._key(f"job:{job_id}"), mapping=self._encode(fields))
+        pipe.execute()
+        if status not in ACTIVE_STATUSES:
+            job = self.get(job_id)
+            if job and job['dedup_key']:
+                dedup = self._key(f"dedup:{job['dedup_key']}")
+                if (self.client.get(dedup) or b'').decode() == job_id:
+                    self.client.delete(dedup)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.hgetall(self._key(f"job:{job_id}")) if job_id else None
+        return self._decode(raw) if raw else None
+
+    def recent(self, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        jobs = []
+        for job_id in self.client.lrange(self._key('recent'), 0, self.history - 1):
+            job = self.get(job_id.decode())
+            if job is not None and (status is None or job['status'] == status):
+                jobs.append(job)
+                if len(jobs) >= limit:
+                    break
+        return jobs
+
+    def counts(self) -> Dict[str, int]:
+        counts = {
+            'queued': self.client.zcard(self._key('ready')) + self.client.zcard(self._key('delayed')),
+            'running': self.client.zcard(self._key('running'))
+        }
+        for status in ('succeeded', 'failed'):
+            counts[status] = int(self.client.get(self._key(f"finished:{status}")) or 0)
+        return counts
+
+    def purge(self, older_than: float) -> int:
+        removed = 0
+        for job in self.recent(limit=self.history):
+            if job['status'] not in ACTIVE_STATUSES and job['updated_at'] < older_than:
+                self.client.delete(self._key(f"job:{job['id']}"))
+                self.client.lrem(self._key('recent'), 0, job['id'])
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'prefix': self.prefix, 'lease_seconds': self.lease_seconds}
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+        return {key: json.dumps(value) for key, value in fields.items()}
+
+    @staticmethod
+    def _decode(raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        return {key.decode(): json.loads(value) for key, value in raw.items()}
+
+
+class JobContext:
+    """Handed to a task: its payload, attempt number and a progress reporter"""
+
+    def __init__(self, queue: 'JobQueue', job: Dict[str, Any]):
+        self.job_id = job['id']
+        self.task = job['task']
+        self.payload = job['payload'] or {}
+        self.attempt = job['attempts']
+        self._queue = queue
+        self._last_write = 0.0
+
+    def progress(self, done: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+        """Report progress (written at most twice a second; each write also renews the lease)"""
+        fraction = min(1.0, done / total) if total else min(1.0, float(done))
+        now = time.monotonic()
+        if fraction < 1.0 and now - self._last_write < 0.5:
+            return
+        self._last_write = now
+        self._queue.store.update(self.job_id, progress=round(fraction, 4), progress_message=message)
+
+
+class _Task:
+    __slots__ = ('name', 'handler', 'priority', 'max_attempts', 'retry_backoff')
+
+    def __init__(self, name, handler, priority, max_attempts, retry_backoff):
+        self.name = name
+        self.handler = handler
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+
+class JobQueue:
+    """
+    Named tasks run by a pool of worker threads from a durable store.
+
+    `enqueue()` only writes the job, so a request that hands off OCR or a
+    cache backfill returns immediately. Workers claim the most urgent due
+    job (lowest priority number first), run it inside an app context and
+    record the result. A failure is retried after an exponential, jittered
+    backoff until the task's max_attempts, then marked failed. A dedup key
+    makes enqueueing idempotent while a job with that key is still active.
+    `schedule()` uses one to keep a recurring task's next run queued without
+    duplicating it across processes that share the store.
+
+    Workers run in-process (`start()`), or in a separate `python worker.py`
+    process so long jobs leave the web workers alone entirely.
+    """
+
+    def __init__(self, store=None, workers: int = 2, max_attempts: int = 3, retry_backoff: float = 5.0,
+                 max_backoff: float = 600.0, poll_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.store = store if store is not None else SQLiteJobStore()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.tasks = {}
+        self.schedules = {}  # task -> (interval seconds, payload)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._scheduler = None
+
+    # Registration
+    def register(self, name: str, handler: Union[str, Callable], priority: int = PRIORITY_NORMAL,
+                 max_attempts: Optional[int] = None, retry_backoff: Optional[float] = None) -> None:
+        """Register a task; the handler (a callable or 'module:attr') receives a JobContext"""
+        self.tasks[name] = _Task(name, handler, priority, max_attempts, retry_backoff)
+
+    def task(self, name: str, **options) -> Callable:
+        """Decorator form of register()"""
+        def decorator(handler):
+            self.register(name, handler, **options)
+            return handler
+        return decorator
+
+    def schedule(self, task: str, interval: float, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Run `task` every `interval` seconds while workers run; one pending run at a time across processes"""
+        if task not in self.tasks:
+            raise KeyError(f"Unknown task: {task}")
+        self.schedules[task] = (interval, payload or {})
+
+    # Producing
+    def enqueue(self, task: str, payload: Optional[Dict[str, Any]] = None, priority: Optional[int] = None,
+                dedup_key: Optional[str] = None, delay: float = 0.0, max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        """Queue a job; returns it (or the active job that holds `dedup_key`) with a 'created' flag"""
+        if task not in self.tasks:
+            raise KeyError(f"Unknown task: {task}")
+        definition = self.tasks[task]
+        job = _new_job(
+            task, payload or {},
+            priority if priority is not None else definition.priority,
+            dedup_key,
+            max_attempts or definition.max_attempts or self.max_attempts,
+            time.time() + delay
+        )
+        job, created = self.store.enqueue(job)
+        if created:
+            get_metrics().inc('jobs_enqueued_total', task=task)
+            self._wakeup.set()
+        return dict(job, created=created)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.store.recent(limit=limit, status=status)
+
+    # Consuming
+    def start(self, app, workers: Optional[int] = None) -> None:
+        """Start the worker threads (called once at app startup)"""
+        if self._threads:
+            return
+        for index in range(workers or self.workers):
+            thread = threading.Thread(target=self._work_loop, args=(app,), name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.schedules:
+            self._scheduler = threading.Thread(target=self._schedule_loop, name='job-scheduler', daemon=True)
+            self._scheduler.start()
+        self.logger.info(f"📬 Job queue running {len(self._threads)} workers ({self.store.get_stats()['backend']})")
+
+    def run_forever(self, app, workers: Optional[int] = None) -> None:
+        """Run workers until interrupted (dedicated worker process)"""
+        self.start(app, workers)
+        try:
+            while not self._stopping.is_set():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Let running jobs finish, then stop the workers"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads + ([self._scheduler] if self._scheduler else []):
+            thread.join(timeout)
+        self._threads = []
+        self._scheduler = None
+        self._stopping.clear()
+
+    def run_pending(self, app, limit: Optional[int] = None) -> int:
+        """Run due jobs on the calling thread until none are left (CLI and tests)"""
+        ran = 0
+        while limit is None or ran < limit:
+            job = self.store.claim(time.time())
+            if job is None:
+                break
+            self._execute(app, job)
+            ran += 1
+        return ran
+
+    def _work_loop(self, app) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self.store.claim(time.time())
+            except Exception as e:
+                self.logger.error(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                # Local enqueues wake us at once; jobs from other processes are picked up on the next poll
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._execute(app, job)
+
+    def _schedule_loop(self) -> None:
+        # The next run is queued `interval` after the previous one finished; while it is queued or
+        # running its dedup key turns every other process's enqueue into a no-op
+        tick = min(60.0, min(interval for interval, _ in self.schedules.values()))
+        while not self._stopping.is_set():
+            for task, (interval, payload) in list(self.schedules.items()):
+                try:
+                    self.enqueue(task, payload, dedup_key=f"schedule:{task}", delay=interval)
+                except Exception as e:
+                    self.logger.error(f"Scheduling {task} failed: {e}")
+            self._stopping.wait(tick)
+
+    def _execute(self, app, job: Dict[str, Any]) -> None:
+        registry = get_metrics()
+        definition = self.tasks.get(job['task'])
+        started = time.perf_counter()
+        registry.observe('job_wait_seconds', max(0.0, time.time() - job['run_at']), task=job['task'])
+        try:
+            if definition is None:
+                raise KeyError(f"No handler registered for task {job['task']}")
+            handler = _resolve(definition.handler)
+            context = JobContext(self, job)
+            with app.app_context():
+                try:
+                    result = handler(context)
+                    if inspect.isawaitable(result):
+                        result = asyncio.run(result)
+                finally:
+                    _remove_session()
+            self.store.update(job['id'], status='succeeded', result=result, error=None, progress=1.0,
+                              finished_at=time.time())
+            registry.inc('jobs_finished_total', task=job['task'], outcome='succeeded')
+        except Exception as e:
+            self._fail(job, definition, e)
+        finally:
+            registry.observe('job_duration_seconds', time.perf_counter() - started, task=job['task'])
+
+    def _fail(self, job: Dict[str, Any], definition: Optional[_Task], error: Exception) -> None:
+        message = f"{type(error).__name__}: {error}"
+        if definition is not None and job['attempts'] < job['max_attempts']:
+            base = definition.retry_backoff or self.retry_backoff
+            delay = min(self.max_backoff, base * 2 ** (job['attempts'] - 1)) * random.uniform(0.5, 1.5)
+            self.store.update(job['id'], status='queued', run_at=time.time() + delay, error=message, lease_until=None)
+            get_metrics().inc('jobs_finished_total', task=job['task'], outcome='retried')
+            self.logger.warning(
+                f"⚠️ Job {job['task']} ({job['id'][:8]}) attempt {job['attempts']}/{job['max_attempts']} failed, "
+                f"retrying in {delay:.1f}s: {message}"
+            )
+            return
+
+        self.store.update(job['id'], status='failed', error=message, finished_at=time.time())
+        get_metrics().inc('jobs_finished_total', task=job['task'], outcome='failed')
+        self.logger.error(f"❌ Job {job['task']} ({job['id'][:8]}) failed after {job['attempts']} attempts: {message}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics"""
+        return {
+            **self.store.get_stats(),
+            'workers': len(self._threads),
+            'tasks': sorted(self.tasks),
+            'jobs': self.store.counts()
+        }
+
+
+def _remove_session() -> None:
+    """Return the job's database session to the pool"""
+    from models import db
+    db.session.remove()
+
+
+# Built-in tasks: work that used to run inline in request handlers
+def _populate_translation_cache(context: JobContext):
+    from .translation_orchestrator import get_orchestrator
+    return get_orchestrator().populate_cache(context.payload['language'], progress=context.progress)
+
+
+def _cleanup_common_phrases(context: JobContext) -> Dict[str, Any]:
+    from .phrase_maintenance import get_phrase_maintenance_service
+    removed = get_phrase_maintenance_service().cleanup_unpopular(
+        user_id=context.payload.get('user_id'),
+        cleanup_percentage=context.payload.get('cleanup_percentage', 10),
+        progress=context.progress
+    )
+    return {'removed': removed}
+
+
+def _phrase_maintenance(context: JobContext) -> Dict[str, Any]:
+    from .phrase_maintenance import get_phrase_maintenance_service
+    return get_phrase_maintenance_service().run_maintenance(
+        days_old=context.payload.get('days_old', 30),
+        cleanup_percentage=context.payload.get('cleanup_percentage', 10),
+        progress=context.progress
+    )
+
+
+def _create_babel_tables(context: JobContext) -> Dict[str, Any]:
+    from .database_migration_service import get_migration_service
+    return get_migration_service().create_babel_tables()
+
+
+def _verify_user_id(context: JobContext) -> Dict[str, Any]:
+    from models import db, User
+    from .id_verification_service import get_id_verification_service
+    payload = context.payload
+    if not os.path.exists(payload['id_image_path']):
+        raise FileNotFoundError(f"ID upload {payload['id_image_path']} is not on this host - "
+                                f"run job workers where the web process stores uploads")
+    service = get_id_verification_service()
+    try:
+        result = service.verify_user_id(payload['id_image_path'], payload.get('selfie_path'), payload['user_id'])
+    finally:
+        service.cleanup_verification_files(payload['id_image_path'], payload.get('selfie_path') or '')
+    if result.get('verified'):
+        user = db.session.get(User, payload['user_id'])
+        if user is not None:
+            user.is_age_verified = True
+            db.session.commit()
+    return result
+
+
+def _cleanup_translation_cache(context: JobContext):
+    from .cache_service import get_cache_service
+    return get_cache_service().cleanup_expired()
+
+
+def _register_default_tasks(queue: JobQueue) -> None:
+    queue.register('id_verification.verify', _verify_user_id, priority=PRIORITY_HIGH, max_attempts=2)
+    queue.register('translation.populate_cache', _populate_translation_cache, priority=PRIORITY_LOW)
+    queue.register('phrases.cleanup', _cleanup_common_phrases, priority=PRIORITY_LOW)
+    queue.register('phrases.maintenance', _phrase_maintenance, priority=PRIORITY_LOW)
+    queue.register('cache.cleanup_expired', _cleanup_translation_cache, priority=PRIORITY_LOW)
+    queue.register('database.create_babel_tables', _create_babel_tables, max_attempts=1)
+
+
+# Global instance (the store is created on first use, see get_job_queue)
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Get the global job queue"""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+                _register_default_tasks(_job_queue)
+    return _job_queue
+
+
+def configure_job_queue(backend: str = 'sqlite', db_path: str = 'job_queue.db', redis_url: str = None,
+                        workers: int = 2, max_attempts: int = 3, retry_backoff: float = 5.0,
+                        lease_seconds: float = 300.0, in_process_workers: bool = True) -> JobQueue:
+    """Rebuild the global queue with the configured store (called once at app startup)"""
+    global _job_queue
+    logger = logging.getLogger(__name__)
+    store = None
+    if backend == 'redis':
+        if redis is None:
+            logger.warning("⚠️ redis package not installed, jobs queue in SQLite")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+                store = RedisJobStore(client, lease_seconds=lease_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable for jobs, using SQLite: {e}")
+    if store is None:
+        store = SQLiteJobStore(db_path, lease_seconds=lease_seconds)
+
+    if not in_process_workers:
+        logger.warning("⚠️ Job workers are not started in this process - jobs wait for `python worker.py`")
+        if isinstance(store, SQLiteJobStore):
+            logger.error(f"❌ The SQLite job queue ({os.path.abspath(db_path)}) and ID verification uploads are "
+                         f"local to this host - worker.py must run here with the same JOB_QUEUE_PATH and "
+                         f"working directory, or set JOB_QUEUE_BACKEND=redis with shared upload storage")
+
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.stop()
+        _job_queue = JobQueue(store, workers=workers, max_attempts=max_attempts, retry_backoff=retry_backoff)
+        _register_default_tasks(_job_queue)
+    return _job_queue
@@ -7,13 +7,17 @@ Enhanced with Bot Detection Pipeline
 
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 from flask import request
 from models import (
     db, Message, TranslatedMessage, ChatParticipant, User, UserCommonPhrase, UsageLog
 )
 import re
+from .rate_limiter import get_rate_limiter
+from .unread_counter import get_unread_counter
+from .tracing import get_tracer, traced
+from .service_container import get_container
 
 
 class MessageService:
@@ -49,9 +53,13 @@ class MessageService:
         return self._bot_detector
     
     def check_message_limits(self, current_user) -> Dict[str, Any]:
-        """Check if user can send more messages - everyone gets unlimited"""
-        return {'can_send': True}
+        """Check (and consume) the user's send rate limits - see check_send_rate"""
+        rate_check = self.check_send_rate(current_user)
+        if rate_check['allowed']:
+            return {'can_send': True, 'rate_limit': rate_check['rate_limit']}
+        return {'can_send': False, 'error': rate_check['error'], 'rate_limit': rate_check['rate_limit']}
     
+    @traced('message.create')
     def create_message(self, current_user, chat_id: int, message_text: str) -> Message:
         """Create a new message with Translation Pipeline Integration"""
         # Track common phrases
@@ -66,6 +74,8 @@ class MessageService:
         )
         db.session.add(message)
         db.session.flush()  # Get the message ID
+        get_unread_counter().record_message(message)
+        db.session.commit()  # Before the pipeline - no write lock held across translation calls
         
         # ROUTE THROUGH TRANSLATION PIPELINE FOR DATA HARVESTING
         self._process_message_through_pipeline(
@@ -78,19 +88,23 @@ class MessageService:
         
         return message
     
+    @traced('message.send')
     def send_message(self, sender_id: int, room_id: int, content: str, metadata: Dict = None) -> Dict:
         """Send message through translation pipeline with comprehensive data harvesting"""
+        tracer = get_tracer()
         
         # Create message using correct field names
-        message = Message(
-            sender_id=sender_id,
-            chat_id=room_id,  # Use chat_id not room_id
-            original_text=content,  # Use original_text not content
-            original_language='AUTO',
-            timestamp=datetime.utcnow()
-        )
-        db.session.add(message)
-        db.session.flush()  # Get the ID
+        with tracer.span('message.insert'):
+            message = Message(
+                sender_id=sender_id,
+                chat_id=room_id,  # Use chat_id not room_id
+                original_text=content,  # Use original_text not content
+                original_language='AUTO',
+                timestamp=datetime.utcnow()
+            )
+            db.session.add(message)
+            db.session.flush()  # Get the ID
+            get_unread_counter().record_message(message)
         
         # COMPREHENSIVE TRANSLATION PIPELINE PROCESSING
         # This ensures ALL outgoing communication is harvested and processed
@@ -104,19 +118,24 @@ class MessageService:
         )
         
         # Log for analytics with enhanced data
-        UsageLog.log_translation(
-            user_id=sender_id,
-            message_id=message.id,
-            was_cached=pipeline_result.get('was_cached', False),
-            total_market_value=pipeline_result.get('data_value', 0.0),
-            vulnerability_score=pipeline_result.get('vulnerability_score', 0.0)
-        )
+        with tracer.span('message.usage_log'):
+            UsageLog.log_translation(
+                user_id=sender_id,
+                message_id=message.id,
+                was_cached=pipeline_result.get('was_cached', False),
+                interaction_patterns={
+                    'data_value': pipeline_result.get('data_value', 0.0),
+                    'vulnerability_score': pipeline_result.get('vulnerability_score', 0.0)
+                }
+            )
         
-        db.session.commit()
+        with tracer.span('message.commit'):
+            db.session.commit()
         
         self.logger.info(f"Message {message.id} sent by user {sender_id} - Data value: ${pipeline_result.get('data_value', 0)}")
         
         response = {
+            'success': True,
             'message_id': message.id,
             'status': 'sent',
             'timestamp': message.timestamp.isoformat()
@@ -132,6 +151,7 @@ class MessageService:
         
         return response
     
+    @traced('message.pipeline')
     def _process_message_through_pipeline(self, user_id: int, message_text: str, 
                                         message_id: int, chat_id: int, 
                                         communication_type: str, metadata: Dict = None) -> Dict:
@@ -224,65 +244,71 @@ class MessageService:
             'message_reactions': True
         }
 
+    @traced('message.translate_for_participants')
     def translate_for_participants(self, current_user, message: Message) -> List[TranslatedMessage]:
         """Translate message for all participants using pipeline"""
         # Import here to avoid circular imports
         from .translation_orchestrator import TranslationRequest
         
-        participants = ChatParticipant.query.filter_by(chat_id=message.chat_id).all()
-        translations = []
+        recipients = User.query.join(ChatParticipant, ChatParticipant.user_id == User.id).filter(
+            ChatParticipant.chat_id == message.chat_id,
+            User.id != current_user.id
+        ).all()
         
-        for participant in participants:
-            if participant.user_id != current_user.id:
-                user = User.query.get(participant.user_id)
-                
-                # Create translation request for pipeline
-                translation_request = TranslationRequest(
-                    text=message.original_text,
-                    target_language=user.preferred_language,
-                    source_language='AUTO',
-                    user_id=current_user.id,
-                    request_id=f"trans_{message.id}_{user.id}",
-                    metadata={
-                        'message_id': message.id,
-                        'recipient_id': user.id,
-                        'chat_id': message.chat_id
-                    }
+        # One pipeline call per target language - recipients sharing a language get the same text
+        by_language = {}
+        for user in recipients:
+            by_language.setdefault(user.preferred_language, []).append(user)
+        
+        translations = []
+        for target_language, users in by_language.items():
+            # Create translation request for pipeline
+            translation_request = TranslationRequest(
+                text=message.original_text,
+                target_language=target_language,
+                source_language='AUTO',
+                user_id=current_user.id,
+                request_id=f"trans_{message.id}_{target_language}",
+                metadata={
+                    'message_id': message.id,
+                    'recipient_ids': [user.id for user in users],
+                    'chat_id': message.chat_id
+                }
+            )
+            
+            try:
+                # Run through translation pipeline
+                pipeline_result = asyncio.run(
+                    self.orchestrator.translate_message(translation_request)
                 )
                 
-                try:
-                    # Run through translation pipeline
-                    pipeline_result = asyncio.run(
-                        self.orchestrator.translate_message(translation_request)
-                    )
-                    
-                    if pipeline_result.success:
-                        translated_text = pipeline_result.translation
-                        was_cached = pipeline_result.cached
-                        confidence = pipeline_result.confidence
-                    else:
-                        translated_text = message.original_text
-                        was_cached = False
-                        confidence = 0.0
-                        
-                except Exception as e:
-                    self.logger.error(f"Pipeline translation failed: {e}")
+                if pipeline_result.success:
+                    translated_text = pipeline_result.translation
+                    was_cached = pipeline_result.cached
+                    confidence = pipeline_result.confidence
+                else:
                     translated_text = message.original_text
                     was_cached = False
                     confidence = 0.0
-                
-                # Create translated message
-                translated_message = TranslatedMessage(
-                    message_id=message.id,
-                    recipient_id=user.id,
-                    translated_text=translated_text,
-                    target_language=user.preferred_language,
-                    confidence=confidence,
-                    was_cached=was_cached
-                )
-                db.session.add(translated_message)
-                translations.append(translated_message)
+                    
+            except Exception as e:
+                self.logger.error(f"Pipeline translation failed: {e}")
+                translated_text = message.original_text
+                was_cached = False
+                confidence = 0.0
+            
+            # Create translated messages - added after the loop, so no write
+            # transaction stays open across the remaining translation calls
+            translations.extend(TranslatedMessage(
+                message_id=message.id,
+                recipient_id=user.id,
+                translated_text=translated_text,
+                target_language=target_language,
+                confidence=confidence,
+                was_cached=was_cached
+            ) for user in users)
         
+        db.session.add_all(translations)
         db.session.commit()
         return translations
     
@@ -323,6 +349,29 @@ class MessageService:
                 'was_cached': translation.was_cached if translation else False
             }
     
+    def check_send_rate(self, user) -> Dict[str, Any]:
+        """Consume the per-second burst and rolling daily message limits"""
+        limiter = get_rate_limiter()
+        
+        burst = limiter.hit('message_burst', user.id)
+        if not burst.allowed:
+            return {'allowed': False, 'error': 'Sending too fast, slow down', 'rate_limit': burst.to_dict()}
+        
+        daily = limiter.hit('message_daily', user.id, seed=lambda: self._recent_send_times(user.id, 86400))
+        if not daily.allowed:
+            return {'allowed': False, 'error': 'Daily message limit exceeded', 'rate_limit': daily.to_dict()}
+        
+        return {'allowed': True, 'rate_limit': daily.to_dict()}
+    
+    def _recent_send_times(self, user_id: int, window_seconds: int) -> List[float]:
+        """Send timestamps inside the window - seeds the limiter the first time a user is seen"""
+        since = datetime.utcnow() - timedelta(seconds=window_seconds)
+        rows = db.session.query(Message.timestamp).filter(
+            Message.sender_id == user_id,
+            Message.timestamp >= since
+        ).all()
+        return [timestamp.replace(tzinfo=timezone.utc).timestamp() for (timestamp,) in rows if timestamp]
+    
     def get_user_messages_sent(self, user) -> List[Message]:
         """Get messages sent by user"""
         return Message.query.filter_by(sender_id=user.id).all()
@@ -339,9 +388,6 @@ class MessageService:
             return None
 
 
-# Global instance
-_message_service = MessageService()
-
 def get_message_service():
-    """Get the global message service instance"""
-    return _message_service
+    """Get the global message service instance (built on first use)"""
+    return get_container().get('message')
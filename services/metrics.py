@@ -0,0 +1,492 @@
+"""
+Metrics Core 📈⏱️
+Per-worker counters, gauges and latency histograms with Prometheus exposition
+SRIMI: Single responsibility for recording and aggregating runtime telemetry
+"""
+
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # Optional - each worker exposes only its own metrics without it
+    redis = None
+
+
+# Histogram layout (HDR-style): SUB_BUCKETS linear buckets per power of two, from
+# HISTOGRAM_MIN up to HISTOGRAM_MIN * 2**HISTOGRAM_OCTAVES seconds (~2 min), plus overflow.
+# Relative bucket width is at most 1/SUB_BUCKETS, so quantiles are within ~25%.
+HISTOGRAM_MIN = 0.00025
+HISTOGRAM_OCTAVES = 19
+SUB_BUCKETS = 4
+BUCKET_BOUNDS = [HISTOGRAM_MIN] + [
+    HISTOGRAM_MIN * 2 ** octave * (1 + (sub + 1) / SUB_BUCKETS)
+    for octave in range(HISTOGRAM_OCTAVES)
+    for sub in range(SUB_BUCKETS)
+]
+BUCKET_COUNT = len(BUCKET_BOUNDS) + 1  # Last bucket is +Inf
+
+
+def bucket_index(seconds: float) -> int:
+    """Histogram bucket for a duration"""
+    if seconds <= HISTOGRAM_MIN:
+        return 0
+    mantissa, exponent = math.frexp(seconds / HISTOGRAM_MIN)  # value = mantissa * 2**exponent
+    octave = exponent - 1
+    if octave >= HISTOGRAM_OCTAVES:
+        return BUCKET_COUNT - 1
+    sub = min(int((mantissa * 2 - 1) * SUB_BUCKETS), SUB_BUCKETS - 1)
+    index = 1 + octave * SUB_BUCKETS + sub
+    # Exact powers of two sit on the previous bucket's upper bound (le is inclusive)
+    return index - 1 if seconds <= BUCKET_BOUNDS[index - 1] else index
+
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def metric_key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class _Shard:
+    """One thread's metric values - only that thread writes to it"""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.counters = {}  # key -> float
+        self.histograms = {}  # key -> [bucket counts..., sum]
+
+    def merge_into(self, counters: Dict, histograms: Dict) -> None:
+        """Add this shard's values to aggregate dicts"""
+        for key, value in dict(self.counters).items():
+            counters[key] = counters.get(key, 0) + value
+        for key, values in dict(self.histograms).items():
+            values = list(values)
+            total = histograms.get(key)
+            if total is None:
+                histograms[key] = values
+            else:
+                for index, value in enumerate(values):
+                    total[index] += value
+
+
+class MetricsRegistry:
+    """
+    Process-wide metrics with lock-free recording.
+
+    Every thread records into its own shard, so the request path never takes
+    a lock; a snapshot sums the shards (CPython copies dicts and lists
+    atomically). Shards of finished threads are folded into a retired shard
+    whenever a new thread registers or a snapshot is taken, so the shard list
+    stays as long as the number of live threads. With Redis, each worker
+    publishes its snapshot every `publish_interval` seconds and the exposition
+    endpoint sums every live worker; without it, a scrape only sees the worker
+    that answered it.
+    """
+
+    KEY_PREFIX = 'unibabel:metrics:worker'
+
+    def __init__(self, redis_client=None, publish_interval: float = 5.0, worker_id: str = None):
+        self.logger = logging.getLogger(__name__)
+        self.redis = redis_client
+        self.publish_interval = publish_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.started_at = time.time()
+        self.descriptions = {}  # name -> (type, help)
+        self.gauges = {}  # key -> float, last write wins
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(None)
+        self._lock = threading.Lock()
+        self._last_publish = 0.0
+        self.logger.info(f"📈 Metrics registry initialized ({'redis' if redis_client else 'memory'})")
+
+    # Recording
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        """Register HELP/TYPE text for the exposition"""
+        self.descriptions[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter"""
+        counters = self._shard().counters
+        key = metric_key(name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a duration in a histogram"""
+        histograms = self._shard().histograms
+        key = metric_key(name, labels)
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0] * (BUCKET_COUNT + 1)
+        values[bucket_index(seconds)] += 1
+        values[-1] += seconds
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge (summed across workers)"""
+        self.gauges[metric_key(name, labels)] = value
+
+    def timer(self, name: str, **labels) -> '_Timer':
+        """Context manager recording the block's duration"""
+        return _Timer(self, name, labels)
+
+    # Reading
+    def snapshot(self) -> Dict[str, Any]:
+        """This worker's current values"""
+        counters, histograms = {}, {}
+        with self._lock:
+            self._retire_dead_shards()
+            shards = [self._retired] + self._shards
+        for shard in shards:
+            shard.merge_into(counters, histograms)
+        return {
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': dict(self.gauges),
+            'workers': 1
+        }
+
+    def collect(self) -> Dict[str, Any]:
+        """Values summed across every worker that published recently"""
+        local = self.snapshot()
+        if self.redis is None:
+            return local
+
+        self.publish(local)
+        try:
+            keys = [key for key in self.redis.scan_iter(f'{self.KEY_PREFIX}:*')
+                    if key.decode() != f'{self.KEY_PREFIX}:{self.worker_id}']
+            payloads = self.redis.mget(keys) if keys else []
+        except Exception as e:
+            self.logger.warning(f"⚠️ Metrics Redis read failed: {e}")
+            return local
+
+        for payload in payloads:
+            if payload:
+                _merge(local, _decode(payload))
+        return local
+
+    def quantile(self, snapshot: Dict[str, Any], name: str, q: float, **labels) -> Optional[float]:
+        """Estimate a quantile (seconds) from a snapshot, across all label values if none given"""
+        counts = [0] * BUCKET_COUNT
+        for (metric, metric_labels), values in snapshot['histograms'].items():
+            if metric == name and all((label, str(value)) in metric_labels for label, value in labels.items()):
+                for index in range(BUCKET_COUNT):
+                    counts[index] += values[index]
+        return quantile_from_buckets(counts, q)
+
+    # Cross-worker publishing
+    def maybe_publish(self) -> None:
+        """Publish this worker's snapshot if the interval has passed (cheap to call per request)"""
+        if self.redis is not None and time.time() - self._last_publish >= self.publish_interval:
+            self.publish()
+
+    def publish(self, snapshot: Dict[str, Any] = None) -> None:
+        """Write this worker's snapshot to Redis"""
+        if self.redis is None:
+            return
+        self._last_publish = time.time()
+        try:
+            self.redis.set(
+                f'{self.KEY_PREFIX}:{self.worker_id}',
+                _encode(snapshot or self.snapshot()),
+                ex=max(60, int(self.publish_interval * 10))
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Metrics Redis publish failed: {e}")
+
+    # Exposition
+    def render_prometheus(self, snapshot: Dict[str, Any] = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        snapshot = snapshot or self.collect()
+        series = {}  # name -> list of lines
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            series.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        for (name, labels), value in sorted(snapshot['gauges'].items()):
+            series.setdefault(name, []).append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        for (name, labels), values in sorted(snapshot['histograms'].items()):
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS, values):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", repr(bound)),))} {cumulative}')
+            cumulative += values[BUCKET_COUNT - 1]
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(values[-1])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        output = []
+        for name in sorted(series):
+            metric_type, help_text = self.descriptions.get(name, ('untyped', ''))
+            if help_text:
+                output.append(f'# HELP {name} {help_text}')
+            output.append(f'# TYPE {name} {metric_type}')
+            output.extend(series[name])
+        output.append('# TYPE unibabel_metrics_workers gauge')
+        output.append(f'unibabel_metrics_workers {snapshot["workers"]}')
+        return '\n'.join(output) + '\n'
+
+    def _shard(self) -> _Shard:
+        """The calling thread's shard"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._retire_dead_shards()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead_shards(self) -> None:
+        """Fold shards of finished threads into the retired shard (caller holds the lock)"""
+        live = []
+        for shard in self._shards:
+            if shard.thread is not None and not shard.thread.is_alive():
+                shard.merge_into(self._retired.counters, self._retired.histograms)
+            else:
+                live.append(shard)
+        self._shards = live
+
+
+class _Timer:
+    """Times a block into a histogram"""
+
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry: MetricsRegistry, name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+
+
+def quantile_from_buckets(counts: List[int], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-th observation"""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(counts):
+        cumulative += count
+        if cumulative >= rank:
+            return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+    return BUCKET_BOUNDS[-1]
+
+
+def _merge(total: Dict[str, Any], other: Dict[str, Any]) -> None:
+    """Add another worker's snapshot into `total`"""
+    for section in ('counters', 'gauges'):
+        for key, value in other[section].items():
+            total[section][key] = total[section].get(key, 0) + value
+    for key, values in other['histograms'].items():
+        existing = total['histograms'].get(key)
+        if existing is None:
+            total['histograms'][key] = list(values)
+        else:
+            for index, value in enumerate(values):
+                existing[index] += value
+    total['workers'] += other['workers']
+
+
+def _encode(snapshot: Dict[str, Any]) -> str:
+    """Snapshot as JSON (tuple keys flattened to lists)"""
+    return json.dumps({
+        section: [[name, list(labels), value] for (name, labels), value in snapshot[section].items()]
+        for section in ('counters', 'histograms', 'gauges')
+    })
+
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    data = json.loads(payload)
+    snapshot = {
+        section: {(name, tuple(tuple(label) for label in labels)): value for name, labels, value in data[section]}
+        for section in ('counters', 'histograms', 'gauges')
+    }
+    snapshot['workers'] = 1
+    return snapshot
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in labels) + '}'
+
+
+def _escape(value: str) -> str:
+    """Escape a label value (backslash, double quote, newline)"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Global instance
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry"""
+    return _metrics
+
+
+def _describe_defaults(registry: MetricsRegistry) -> None:
+    """HELP/TYPE for the metrics recorded by the hooks below"""
+    registry.describe('http_requests_total', 'counter', 'HTTP requests by method, route and status')
+    registry.describe('http_request_duration_seconds', 'histogram', 'HTTP request latency by route')
+    registry.describe('socketio_events_total', 'counter', 'Socket.IO events handled, by event and outcome')
+    registry.describe('socketio_event_duration_seconds', 'histogram', 'Socket.IO handler latency by event')
+    registry.describe('cache_requests_total', 'counter', 'Cache lookups by cache and result')
+    registry.describe('deepl_requests_total', 'counter', 'DeepL API calls by outcome')
+    registry.describe('deepl_request_duration_seconds', 'histogram', 'DeepL API call latency')
+    registry.describe('trace_span_duration_seconds', 'histogram', 'Sampled send pipeline latency by stage')
+    registry.describe('db_queries_total', 'counter', 'SQL statements by request route or Socket.IO event (QUERY_INSPECTION)')
+    registry.describe('db_query_time_seconds', 'histogram', 'Database time per request or Socket.IO event (QUERY_INSPECTION)')
+    registry.describe('db_n_plus_one_total', 'counter', 'Requests or events with a statement repeated past the N+1 threshold')
+    registry.describe('jobs_enqueued_total', 'counter', 'Background jobs queued by task')
+    registry.describe('jobs_finished_total', 'counter', 'Background job attempts by task and outcome (succeeded, retried, failed)')
+    registry.describe('job_duration_seconds', 'histogram', 'Background job run time by task')
+    registry.describe('job_wait_seconds', 'histogram', 'Time background jobs waited past their due time')
+    registry.describe('db_pool_checked_out', 'gauge', 'Database connections currently checked out')
+    registry.describe('db_pool_checked_in', 'gauge', 'Idle database connections in the pool')
+    registry.describe('db_pool_size', 'gauge', 'Configured database pool size')
+    registry.describe('db_pool_overflow', 'gauge', 'Database connections open beyond the pool size')
+    registry.describe('db_pool_waiting', 'gauge', 'Callers waiting for a pooled connection')
+    registry.describe('db_pool_checkout_duration_seconds', 'histogram', 'Time to obtain a pooled connection')
+    registry.describe('db_pool_timeouts_total', 'counter', 'Pool checkouts that timed out')
+    registry.describe('db_pool_connections_opened_total', 'counter', 'New DBAPI connections opened by the pool')
+    registry.describe('db_pool_invalidations_total', 'counter', 'Pooled connections invalidated after errors')
+    registry.describe('db_health_probe_duration_seconds', 'histogram', 'Database health probe round trip')
+    registry.describe('db_up', 'gauge', 'Whether the last database health probe succeeded')
+    registry.describe('process_resident_memory_bytes', 'gauge', 'Resident memory of the worker')
+
+
+_describe_defaults(_metrics)
+
+
+def configure_metrics(backend: str = 'memory', redis_url: str = None, publish_interval: float = 5.0,
+                      web_workers: int = 1) -> MetricsRegistry:
+    """Rebuild the global registry with the configured backend (called once at app startup)"""
+    global _metrics
+    client = None
+    if backend == 'redis':
+        if redis is None:
+            logging.getLogger(__name__).warning("⚠️ redis package not installed, metrics stay per worker")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"⚠️ Redis unavailable for metrics, using memory: {e}")
+                client = None
+    if client is None and web_workers > 1:
+        logging.getLogger(__name__).warning(
+            f"⚠️ Metrics are per worker with {web_workers} workers - each /metrics scrape shows one worker's "
+            f"counters. Set METRICS_BACKEND=redis or scrape each worker separately"
+        )
+
+    _metrics = MetricsRegistry(redis_client=client, publish_interval=publish_interval)
+    _describe_defaults(_metrics)
+    return _metrics
+
+
+# Instrumentation hooks
+def install_request_metrics(app) -> None:
+    """Time every Flask request by route template (bounded label set)"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            registry = get_metrics()
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            registry.observe('http_request_duration_seconds', time.perf_counter() - started, endpoint=endpoint)
+            registry.inc('http_requests_total', method=request.method, endpoint=endpoint, status=response.status_code)
+            registry.maybe_publish()
+        return response
+
+
+def instrument_socketio(socketio) -> None:
+    """Wrap every handler registered afterwards with `socketio.on` / `on_event` in a timer"""
+    register = socketio.on
+
+    def on(message, namespace=None):
+        decorator = register(message, namespace)
+
+        def wrap(handler):
+            max_args = _positional_capacity(handler)
+
+            @functools.wraps(handler)
+            def timed_handler(*args, **kwargs):
+                registry = get_metrics()
+                started = time.perf_counter()
+                outcome = 'error'
+                try:
+                    # Flask-SocketIO retries handlers that reject its arguments (e.g. connect's auth);
+                    # trim them here so the retry does not count as a failed event
+                    result = handler(*args[:max_args], **kwargs)
+                    outcome = 'ok'
+                    return result
+                finally:
+                    registry.observe('socketio_event_duration_seconds', time.perf_counter() - started, event=message)
+                    registry.inc('socketio_events_total', event=message, outcome=outcome)
+            return decorator(timed_handler)
+        return wrap
+
+    socketio.on = on
+
+
+def _positional_capacity(handler) -> Optional[int]:
+    """How many positional arguments a handler accepts (None for *args)"""
+    try:
+        parameters = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+        return None
+    return sum(1 for parameter in parameters if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache hit or miss"""
+    get_metrics().inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def sample_process_gauges(engine=None) -> None:
+    """Refresh gauges that are read rather than counted (pool usage, memory)"""
+    registry = get_metrics()
+    if engine is not None:
+        try:
+            registry.set_gauge('db_pool_checked_out', engine.pool.checkedout())
+        except Exception:
+            pass  # Pools without checkout tracking (e.g. StaticPool)
+    try:
+        with open('/proc/self/statm') as statm:
+            registry.set_gauge('process_resident_memory_bytes', int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            registry.set_gauge('process_resident_memory_bytes', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        except ImportError:
+            pass
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from flask import current_app, render_template_string
 from models import db, User, UserType
+from .rate_limiter import get_rate_limiter, RateLimitPolicy
 import smtplib
 from email.mime.text import MimeText
 from email.mime.multipart import MimeMultipart
@@ -30,12 +31,14 @@ class ParentalVerificationService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.consent_tokens = {}  # In production, use Redis or database
-        self.rate_limits = {}     # Track verification attempts
+        self.rate_limiter = get_rate_limiter()  # Track verification attempts
         
         # Anti-abuse settings
         self.MAX_ATTEMPTS_PER_EMAIL = 3  # Max attempts per parent email per day
         self.MAX_ATTEMPTS_PER_IP = 5     # Max attempts per IP per day
         self.TOKEN_EXPIRY_HOURS = 48     # Consent link expires in 48 hours
+        self.rate_limiter.register_policy(RateLimitPolicy('consent_request_email', self.MAX_ATTEMPTS_PER_EMAIL, 86400))
+        self.rate_limiter.register_policy(RateLimitPolicy('consent_request_ip', self.MAX_ATTEMPTS_PER_IP, 86400))
         
         self.logger.info("🛡️ Parental Verification Service initialized with anti-abuse protection")
     
@@ -197,14 +200,10 @@ class ParentalVerificationService:
     def _check_for_abuse(self, parent_email: str, requester_ip: str) -> Dict[str, Any]:
         """Check for abuse patterns in parental consent requests"""
         
-        current_time = datetime.utcnow()
-        today = current_time.date()
-        
         # Check email rate limits
         email_key = f"email_{hashlib.md5(parent_email.encode()).hexdigest()}"
-        email_attempts = self.rate_limits.get(email_key, {}).get(str(today), 0)
         
-        if email_attempts >= self.MAX_ATTEMPTS_PER_EMAIL:
+        if not self.rate_limiter.peek('consent_request_email', email_key).allowed:
             self.logger.warning(f"🚨 Rate limit exceeded for parent email: {parent_email}")
             return {
                 'allowed': False,
@@ -214,9 +213,8 @@ class ParentalVerificationService:
         
         # Check IP rate limits
         ip_key = f"ip_{hashlib.md5(requester_ip.encode()).hexdigest()}"
-        ip_attempts = self.rate_limits.get(ip_key, {}).get(str(today), 0)
         
-        if ip_attempts >= self.MAX_ATTEMPTS_PER_IP:
+        if not self.rate_limiter.peek('consent_request_ip', ip_key).allowed:
             self.logger.warning(f"🚨 Rate limit exceeded for IP: {requester_ip}")
             return {
                 'allowed': False,
@@ -427,19 +425,13 @@ class ParentalVerificationService:
     def _update_rate_limits(self, parent_email: str, requester_ip: str):
         """Update rate limiting counters"""
         
-        today = str(datetime.utcnow().date())
-        
         # Update email rate limit
         email_key = f"email_{hashlib.md5(parent_email.encode()).hexdigest()}"
-        if email_key not in self.rate_limits:
-            self.rate_limits[email_key] = {}
-        self.rate_limits[email_key][today] = self.rate_limits[email_key].get(today, 0) + 1
+        self.rate_limiter.hit('consent_request_email', email_key)
         
         # Update IP rate limit
         ip_key = f"ip_{hashlib.md5(requester_ip.encode()).hexdigest()}"
-        if ip_key not in self.rate_limits:
-            self.rate_limits[ip_key] = {}
-        self.rate_limits[ip_key][today] = self.rate_limits[ip_key].get(today, 0) + 1
+        self.rate_limiter.hit('consent_request_ip', ip_key)
     
     def get_consent_status(self, consent_token: str) -> Dict[str, Any]:
         """Get status of a parental consent request"""
@@ -3,15 +3,18 @@ Performance Metrics Service - SRIMI Microservice
 Single Responsibility: Collect and calculate performance metrics
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import logging
+import time
+from services.metrics import get_metrics, sample_process_gauges, quantile_from_buckets, BUCKET_COUNT
 
 @dataclass
 class PerformanceMetrics:
     """Performance metrics data structure"""
     response_time_ms: float
+    response_time_p95_ms: float
     throughput_requests_per_sec: float
     error_rate_percent: float
     cache_hit_ratio_percent: float
@@ -26,29 +29,32 @@ class PerformanceMetricsService:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.metrics_cache = {}
-        self.cache_ttl = 60  # 1 minute
+        self.cache_ttl = 60  # Rates cover roughly the last minute
+        self._window = []  # (timestamp, snapshot) taken on previous reads, oldest first
         
     def get_current_metrics(self) -> PerformanceMetrics:
         """Get current performance metrics"""
         try:
+            # Deltas against the oldest snapshot in the window (process start on first read)
+            current, baseline, elapsed = self._advance_window()
+            
             # Calculate response time
-            response_time = self._calculate_response_time()
+            response_time, response_time_p95 = self._calculate_response_time(current, baseline)
             
             # Calculate throughput
-            throughput = self._calculate_throughput()
+            throughput = self._calculate_throughput(current, baseline, elapsed)
             
             # Calculate error rate
-            error_rate = self._calculate_error_rate()
+            error_rate = self._calculate_error_rate(current, baseline)
             
             # Get cache metrics
-            cache_hit_ratio = self._get_cache_hit_ratio()
+            cache_hit_ratio = self._get_cache_hit_ratio(current, baseline)
             
             # Get database metrics
-            db_connections = self._get_database_connections()
+            db_connections = self._get_database_connections(current)
             
             # Get memory usage
-            memory_usage = self._get_memory_usage()
+            memory_usage = self._get_memory_usage(current)
             
             # Get active users
             active_users = self._get_active_users()
@@ -58,6 +64,7 @@ class PerformanceMetricsService:
             
             return PerformanceMetrics(
                 response_time_ms=response_time,
+                response_time_p95_ms=response_time_p95,
                 throughput_requests_per_sec=throughput,
                 error_rate_percent=error_rate,
                 cache_hit_ratio_percent=cache_hit_ratio,
@@ -87,6 +94,9 @@ class PerformanceMetricsService:
             return {
                 'health_status': health_status,
                 'response_time_ms': metrics.response_time_ms,
+                'response_time_p95_ms': metrics.response_time_p95_ms,
+                'throughput_requests_per_sec': metrics.throughput_requests_per_sec,
+                'cache_hit_ratio_percent': metrics.cache_hit_ratio_percent,
                 'active_users': metrics.active_users,
                 'error_rate_percent': metrics.error_rate_percent,
                 'timestamp': metrics.timestamp
@@ -103,67 +113,123 @@ class PerformanceMetricsService:
                 'error': str(e)
             }
     
-    def _calculate_response_time(self) -> float:
-        """Calculate average response time"""
+    def _advance_window(self) -> Tuple[Dict[str, Any], Dict[str, Any], float]:
+        """Collect a snapshot and pick the baseline it is compared against"""
+        from models import db
+        
+        try:
+            sample_process_gauges(db.engine)
+        except RuntimeError:
+            sample_process_gauges()  # Outside an app context
+        
+        registry = get_metrics()
+        now = time.time()
+        current = registry.collect()
+        
+        # Newest snapshot at least cache_ttl old, else the oldest one we have
+        aged = [entry for entry in self._window if now - entry[0] >= self.cache_ttl]
+        recent = [entry for entry in self._window if now - entry[0] < self.cache_ttl]
+        if aged:
+            baseline_at, baseline = aged[-1]
+        elif recent:
+            baseline_at, baseline = recent[0]
+        else:
+            baseline_at, baseline = registry.started_at, {'counters': {}, 'histograms': {}}
+        
+        self._window = aged[-1:] + recent + [(now, current)]
+        return current, baseline, max(now - baseline_at, 1e-6)
+    
+    @staticmethod
+    def _counter_delta(current: Dict[str, Any], baseline: Dict[str, Any], name: str, **labels) -> float:
+        """Increase of a counter summed over matching label sets (negative deltas mean a worker restarted)"""
+        total = 0.0
+        for key, value in current['counters'].items():
+            metric, metric_labels = key
+            if metric == name and all((label, str(match)) in metric_labels for label, match in labels.items()):
+                total += max(value - baseline['counters'].get(key, 0), 0)
+        return total
+    
+    @staticmethod
+    def _histogram_delta(current: Dict[str, Any], baseline: Dict[str, Any], name: str) -> List[float]:
+        """Bucket counts (and sum, last) added since the baseline, over every label set"""
+        totals = [0] * (BUCKET_COUNT + 1)
+        for key, values in current['histograms'].items():
+            if key[0] != name:
+                continue
+            previous = baseline['histograms'].get(key)
+            if previous is not None and sum(previous[:BUCKET_COUNT]) > sum(values[:BUCKET_COUNT]):
+                previous = None  # Worker restarted - count everything
+            for index, value in enumerate(values):
+                totals[index] += value - (previous[index] if previous else 0)
+        return totals
+    
+    def _calculate_response_time(self, current: Dict[str, Any], baseline: Dict[str, Any]) -> Tuple[float, float]:
+        """Calculate mean and p95 response time (ms) over the window"""
         try:
-            # Simplified: return mock response time
-            # In real implementation, would track actual response times
-            return 150.0
+            delta = self._histogram_delta(current, baseline, 'http_request_duration_seconds')
+            count = sum(delta[:BUCKET_COUNT])
+            if not count:
+                return 0.0, 0.0
+            p95 = quantile_from_buckets(delta[:BUCKET_COUNT], 0.95)
+            return round(delta[-1] / count * 1000, 1), round(p95 * 1000, 1)
             
         except Exception as e:
             self.logger.error(f"Error calculating response time: {str(e)}")
-            return 999.0
+            return 999.0, 999.0
     
-    def _calculate_throughput(self) -> float:
+    def _calculate_throughput(self, current: Dict[str, Any], baseline: Dict[str, Any], elapsed: float) -> float:
         """Calculate requests per second"""
         try:
-            # Simplified: return mock throughput
-            # In real implementation, would track actual request counts
-            return 45.0
+            return round(self._counter_delta(current, baseline, 'http_requests_total') / elapsed, 2)
             
         except Exception as e:
             self.logger.error(f"Error calculating throughput: {str(e)}")
             return 0.0
     
-    def _calculate_error_rate(self) -> float:
-        """Calculate error rate percentage"""
+    def _calculate_error_rate(self, current: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+        """Calculate error rate percentage (5xx responses)"""
         try:
-            # Simplified: return mock error rate
-            # In real implementation, would track actual errors
-            return 0.01
+            total = self._counter_delta(current, baseline, 'http_requests_total')
+            if not total:
+                return 0.0
+            errors = sum(
+                max(value - baseline['counters'].get(key, 0), 0)
+                for key, value in current['counters'].items()
+                if key[0] == 'http_requests_total' and dict(key[1]).get('status', '').startswith('5')
+            )
+            return round(errors / total * 100, 2)
             
         except Exception as e:
             self.logger.error(f"Error calculating error rate: {str(e)}")
             return 10.0
     
-    def _get_cache_hit_ratio(self) -> float:
+    def _get_cache_hit_ratio(self, current: Dict[str, Any], baseline: Dict[str, Any]) -> float:
         """Get cache hit ratio percentage"""
         try:
-            # Simplified: return mock cache hit ratio
-            # In real implementation, would track actual cache hits/misses
-            return 85.0
+            hits = self._counter_delta(current, baseline, 'cache_requests_total', result='hit')
+            misses = self._counter_delta(current, baseline, 'cache_requests_total', result='miss')
+            if not hits + misses:
+                return 0.0
+            return round(hits / (hits + misses) * 100, 1)
             
         except Exception as e:
             self.logger.error(f"Error getting cache hit ratio: {str(e)}")
             return 0.0
     
-    def _get_database_connections(self) -> int:
-        """Get number of active database connections"""
+    def _get_database_connections(self, current: Dict[str, Any]) -> int:
+        """Get number of checked-out database connections"""
         try:
-            # Simplified: return mock connection count
-            # In real implementation, would query actual DB connection pool
-            return 12
+            return int(sum(value for key, value in current['gauges'].items() if key[0] == 'db_pool_checked_out'))
             
         except Exception as e:
             self.logger.error(f"Error getting database connections: {str(e)}")
             return 0
     
-    def _get_memory_usage(self) -> float:
-        """Get memory usage in MB"""
+    def _get_memory_usage(self, current: Dict[str, Any]) -> float:
+        """Get resident memory in MB"""
         try:
-            # Simplified: return mock memory usage
-            # In real implementation, would get actual memory usage
-            return 256.0
+            resident = sum(value for key, value in current['gauges'].items() if key[0] == 'process_resident_memory_bytes')
+            return round(resident / (1024 * 1024), 1)
             
         except Exception as e:
             self.logger.error(f"Error getting memory usage: {str(e)}")
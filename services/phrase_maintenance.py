@@ -0,0 +1,199 @@
+"""
+Phrase Maintenance Service
+Set-based cleanup and statistics for the UserCommonPhrase cache table
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import delete, func, or_, select
+
+from models import UserCommonPhrase, db
+
+Progress = Optional[Callable[[int, int], None]]
+
+
+class PhraseMaintenanceService:
+    """
+    Phrase cache maintenance without loading the table into Python.
+
+    Every cleanup is a DELETE whose target ids come from a subquery (ranked
+    with window functions where "bottom X% per user" is needed), run in
+    chunks of `chunk_size` rows (or users) that are committed one at a time,
+    so locks stay short and memory stays flat however large the table grows.
+    Statistics are aggregates computed by the database.
+    """
+
+    MIN_USER_PHRASES = 10  # Users with this many phrases or fewer are never trimmed
+    MIN_GLOBAL_PHRASES = 100
+
+    def __init__(self, chunk_size: int = 1000):
+        self.logger = logging.getLogger(__name__)
+        self.table = UserCommonPhrase.__table__
+        self.chunk_size = chunk_size
+
+    def _delete_ids(self, ids) -> int:
+        """Delete the rows whose ids the subquery selects and commit the chunk"""
+        result = db.session.execute(delete(self.table).where(self.table.c.id.in_(ids)))
+        db.session.commit()
+        return result.rowcount or 0
+
+    def _count(self, *criteria) -> int:
+        return db.session.execute(select(func.count()).select_from(self.table).where(*criteria)).scalar() or 0
+
+    def cleanup_old(self, days_old: int = 30, progress: Progress = None) -> int:
+        """Remove phrases that haven't been used in `days_old` days"""
+        t = self.table
+        stale = t.c.last_used < datetime.utcnow() - timedelta(days=days_old)
+        total = self._count(stale)
+
+        removed = 0
+        while removed < total:
+            batch = self._delete_ids(select(t.c.id).where(stale).limit(self.chunk_size))
+            removed += batch
+            if progress:
+                progress(removed, total)
+            if batch < self.chunk_size:
+                break
+
+        if removed:
+            self.logger.info(f"🧹 Removed {removed} phrases unused for {days_old} days")
+        return removed
+
+    def cleanup_unpopular(self, user_id: Optional[int] = None, cleanup_percentage: float = 10,
+                          progress: Progress = None) -> int:
+        """Remove the bottom `cleanup_percentage`% least used phrases, for one user or across all users"""
+        t = self.table
+        if user_id:
+            scope = (t.c.user_id == user_id,)
+            total_phrases = self._count(*scope)
+            if total_phrases <= self.MIN_USER_PHRASES:  # Don't clean if user has very few phrases
+                return 0
+            to_remove = max(1, int(total_phrases * cleanup_percentage / 100))
+        else:
+            scope = ()
+            total_phrases = self._count()
+            if total_phrases <= self.MIN_GLOBAL_PHRASES:  # Don't clean if very few total phrases
+                return 0
+            to_remove = max(10, int(total_phrases * cleanup_percentage / 100))
+
+        # The least used rows that remain are always the next ones due, so each chunk re-ranks
+        removed = 0
+        while removed < to_remove:
+            batch_size = min(self.chunk_size, to_remove - removed)
+            least_used = select(t.c.id).where(*scope).order_by(t.c.usage_count.asc(), t.c.id.asc()).limit(batch_size)
+            batch = self._delete_ids(least_used)
+            removed += batch
+            if progress:
+                progress(removed, to_remove)
+            if batch < batch_size:
+                break
+
+        self.logger.info(f"🧹 Removed {removed} unpopular phrases ({'user ' + str(user_id) if user_id else 'global'})")
+        return removed
+
+    def cleanup_unpopular_per_user(self, cleanup_percentage: float = 10, progress: Progress = None) -> int:
+        """Remove each user's bottom `cleanup_percentage`% phrases (at least one) for every user above the minimum"""
+        t = self.table
+        busy_users = (
+            select(t.c.user_id)
+            .group_by(t.c.user_id)
+            .having(func.count() > self.MIN_USER_PHRASES)
+        )
+        total_users = db.session.execute(select(func.count()).select_from(busy_users.subquery())).scalar() or 0
+
+        removed = users_done = 0
+        last_user_id = None
+        while users_done < total_users:
+            chunk_query = busy_users.order_by(t.c.user_id).limit(self.chunk_size)
+            if last_user_id is not None:
+                chunk_query = chunk_query.where(t.c.user_id > last_user_id)
+            user_ids = db.session.execute(chunk_query).scalars().all()
+            if not user_ids:
+                break
+
+            # Rank each user's phrases least used first; rank <= total * pct / 100 is the bottom slice
+            ranked = select(
+                t.c.id,
+                func.row_number().over(partition_by=t.c.user_id, order_by=(t.c.usage_count.asc(), t.c.id.asc())).label('usage_rank'),
+                func.count().over(partition_by=t.c.user_id).label('total')
+            ).where(t.c.user_id.in_(user_ids)).subquery()
+            doomed = select(ranked.c.id).where(
+                ranked.c.total > self.MIN_USER_PHRASES,
+                or_(ranked.c.usage_rank == 1, ranked.c.usage_rank * 100 <= ranked.c.total * cleanup_percentage)
+            )
+            removed += self._delete_ids(doomed)
+
+            users_done += len(user_ids)
+            last_user_id = user_ids[-1]
+            if progress:
+                progress(users_done, total_users)
+
+        self.logger.info(f"🧹 Removed {removed} unpopular phrases across {users_done} users")
+        return removed
+
+    def run_maintenance(self, days_old: int = 30, cleanup_percentage: float = 10,
+                        progress: Progress = None) -> Dict[str, Any]:
+        """Scheduled maintenance: drop stale phrases, then trim every user's least used ones"""
+        def phase(offset):
+            # Old-phrase cleanup reports the first half of the run, the per-user trim the second
+            if progress is None:
+                return None
+            return lambda done, total: progress(offset + (done / total if total else 1) * 50, 100)
+
+        removed_old = self.cleanup_old(days_old, progress=phase(0))
+        removed_unpopular = self.cleanup_unpopular_per_user(cleanup_percentage, progress=phase(50))
+        return {
+            'removed_old': removed_old,
+            'removed_unpopular': removed_unpopular,
+            'remaining_phrases': self._count()
+        }
+
+    def get_efficiency_stats(self) -> Dict[str, Any]:
+        """Get statistics about phrase caching efficiency"""
+        t = self.table
+        total_phrases, total_usage = db.session.execute(
+            select(func.count(), func.coalesce(func.sum(t.c.usage_count), 0))
+        ).one()
+        if total_phrases == 0:
+            return {
+                'total_phrases': 0,
+                'total_usage': 0,
+                'avg_usage': 0,
+                'top_10_percent_usage': 0,
+                'bottom_10_percent_usage': 0
+            }
+
+        top_10_percent_count = max(1, int(total_phrases * 0.1))
+        bottom_10_percent_count = max(1, int(total_phrases * 0.1))
+
+        top = select(t.c.usage_count).order_by(t.c.usage_count.desc()).limit(top_10_percent_count).subquery()
+        bottom = select(t.c.usage_count).order_by(t.c.usage_count.asc()).limit(bottom_10_percent_count).subquery()
+        top_usage, bottom_usage = db.session.execute(select(
+            select(func.coalesce(func.sum(top.c.usage_count), 0)).scalar_subquery(),
+            select(func.coalesce(func.sum(bottom.c.usage_count), 0)).scalar_subquery()
+        )).one()
+
+        return {
+            'total_phrases': total_phrases,
+            'total_usage': total_usage,
+            'avg_usage': total_usage / total_phrases if total_phrases > 0 else 0,
+            'top_10_percent_usage': top_usage,
+            'bottom_10_percent_usage': bottom_usage,
+            'top_10_percent_count': top_10_percent_count,
+            'bottom_10_percent_count': bottom_10_percent_count,
+            'efficiency_ratio': top_usage / bottom_usage if bottom_usage > 0 else float('inf')
+        }
+
+
+# Global instance
+_phrase_maintenance_service = None
+
+
+def get_phrase_maintenance_service() -> PhraseMaintenanceService:
+    """Get the global phrase maintenance service"""
+    global _phrase_maintenance_service
+    if _phrase_maintenance_service is None:
+        _phrase_maintenance_service = PhraseMaintenanceService()
+    return _phrase_maintenance_service
@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 from flask import current_app
 from models import db, User, UserType
+from services.user_search_index import get_user_search_index, SCOPE_CHILD
 import re
 import bleach
 import json
@@ -196,39 +197,34 @@ class ProfileService:
         if not searcher:
             return {'error': 'Invalid searcher', 'status': 404}
         
-        # Base query - discoverable users only
-        base_query = User.query.filter(
-            User.id != searcher_id,
-            User.is_discoverable == True,
-            User.is_blocked == False
-        )
-        
-        # Search in multiple fields
-        search_query = base_query.filter(
-            db.or_(
-                User.username.ilike(f'%{query}%'),
-                User.display_name.ilike(f'%{query}%'),
-                User.bio.ilike(f'%{query}%'),
-                User.interests.ilike(f'%{query}%'),
-                User.country.ilike(f'%{query}%'),
-                User.city.ilike(f'%{query}%')
-            )
-        )
-        
-        # Apply age-based filtering
-        if searcher.user_type == UserType.CHILD:
-            # Children can only find other children
-            filtered_users = search_query.filter(User.user_type == UserType.CHILD).limit(limit).all()
-        elif searcher.user_type == UserType.TEEN:
-            # Teens can find teens and adults
-            filtered_users = search_query.filter(
-                User.user_type.in_([UserType.TEEN, UserType.ADULT])
-            ).limit(limit).all()
-        else:  # ADULT
-            # Adults can find teens and adults
-            filtered_users = search_query.filter(
-                User.user_type.in_([UserType.TEEN, UserType.ADULT])
-            ).limit(limit).all()
+        # Name matches come from the user search index, scoped by the searcher's age group
+        search_index = get_user_search_index()
+        scope = search_index.scope_for(searcher.user_type)
+        user_ids = search_index.search(query, (scope,), limit, exclude_ids=[searcher_id])
+        
+        # Fill remaining slots from the other profile fields with the same filters
+        if len(user_ids) < limit:
+            if scope == SCOPE_CHILD:
+                # Children can only find other children
+                allowed_types = [UserType.CHILD]
+            else:
+                # Teens and adults can find teens and adults
+                allowed_types = [UserType.TEEN, UserType.ADULT]
+            other_matches = db.session.query(User.id).filter(
+                User.id.notin_(user_ids + [searcher_id]),
+                User.is_discoverable == True,
+                User.is_blocked == False,
+                User.user_type.in_(allowed_types),
+                db.or_(
+                    User.bio.ilike(f'%{query}%'),
+                    User.interests.ilike(f'%{query}%'),
+                    User.country.ilike(f'%{query}%'),
+                    User.city.ilike(f'%{query}%')
+                )
+            ).limit(limit - len(user_ids)).all()
+            user_ids.extend(user_id for (user_id,) in other_matches)
+        
+        filtered_users = search_index.load_users(user_ids)
         
         # Build response
         profiles = []
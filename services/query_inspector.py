@@ -0,0 +1,364 @@
+"""
+Query Inspector 🔎🗄️
+Per-request and per-event SQL counting, N+1 detection and query budgets
+SRIMI: Single responsibility for how many statements a unit of work issues
+"""
+
+import functools
+import logging
+import os
+import re
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import get_metrics
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request, event or block issued more statements than its budget allows"""
+
+    def __init__(self, scope: 'QueryScope', budget: int):
+        self.scope = scope
+        self.budget = budget
+        repeated = '; '.join(
+            f"{entry['count']}x {entry['statement'][:80]} at {entry['location']}"
+            for entry in scope.repeated(2)[:3]
+        )
+        super().__init__(
+            f"{scope.name} issued {scope.count} queries (budget {budget})"
+            + (f" - repeated: {repeated}" if repeated else "")
+        )
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\bIN\s*\((?:\s*[?%:\w()\[\]]+\s*,)+\s*[?%:\w()\[\]]+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement with literals, IN lists and whitespace normalised, so repeats of one query compare equal"""
+    normalised = _LITERALS.sub('?', statement)
+    normalised = _IN_LISTS.sub('IN (...)', normalised)
+    return _WHITESPACE.sub(' ', normalised).strip()
+
+
+class QueryScope:
+    """Statements issued by one request, Socket.IO event or `expect_queries` block"""
+
+    __slots__ = ('name', 'kind', 'parent', 'count', 'seconds', 'statements', 'started')
+
+    def __init__(self, name: str, kind: str, parent: Optional['QueryScope'] = None):
+        self.name = name
+        self.kind = kind
+        self.parent = parent  # Enclosing scope, also charged (a request inside an expect_queries block)
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = {}  # fingerprint -> {'count', 'seconds', 'location'}
+        self.started = time.perf_counter()
+
+    def record(self, statement: str, seconds: float, location: str) -> None:
+        self.count += 1
+        self.seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = {'count': 1, 'seconds': seconds, 'location': location}
+            return
+        if entry['count'] == 1 and location is not None:
+            entry['location'] = location  # Where it repeats is what points at the loop
+        entry['count'] += 1
+        entry['seconds'] += seconds
+
+    def needs_location(self, statement: str) -> bool:
+        """Locations are captured for the first and second execution of a statement only"""
+        entry = self.statements.get(statement)
+        return entry is None or entry['count'] == 1
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Statements issued at least `threshold` times, most repeated first"""
+        return sorted(
+            (
+                {
+                    'statement': statement,
+                    'count': entry['count'],
+                    'ms': round(entry['seconds'] * 1000, 2),
+                    'location': entry['location']
+                }
+                for statement, entry in self.statements.items()
+                if entry['count'] >= threshold
+            ),
+            key=lambda entry: -entry['count']
+        )
+
+
+_scope = ContextVar('unibabel_query_scope', default=None)
+
+
+class QueryInspector:
+    """
+    Counts the statements every request and Socket.IO event sends to the database.
+
+    A single `before_cursor_execute`/`after_cursor_execute` pair on the Engine
+    class covers every engine, including ones created after install. Each
+    statement is charged to the open scopes (innermost first): its fingerprint (literals
+    and IN lists normalised away) is tallied, and when a fingerprint repeats
+    the application frame that issued it is recorded, so a lazy load
+    repeated per row shows up as one fingerprint with a high count and the
+    line of the loop that caused it. A fingerprint seen `n_plus_one_threshold`
+    times in one scope is reported as a suspected N+1.
+
+    Modes: 'off' (no listeners), 'log' (count, flag and warn) and 'strict'
+    (additionally raise QueryBudgetExceeded when a scope exceeds its budget,
+    which turns the request into a 500 and fails the test that made it).
+    """
+
+    def __init__(self, mode: str = 'off', n_plus_one_threshold: int = 5, default_budget: int = 0,
+                 budgets: Optional[Dict[str, int]] = None, history_size: int = 200):
+        self.logger = logging.getLogger(__name__)
+        self.mode = mode
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.default_budget = default_budget  # 0 = no budget
+        self.budgets = dict(budgets or {})  # route template / event name -> max queries
+        self.findings = deque(maxlen=history_size)  # Recent N+1 suspects and budget overruns
+        self.scopes = {}  # name -> {'kind', 'runs', 'queries', 'max_queries', 'seconds', 'n_plus_one'}
+        self.unscoped_queries = 0
+        self._listening = False
+        self._root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ('log', 'strict')
+
+    # Engine hooks
+    def install(self) -> None:
+        """Listen to every engine's cursor executions"""
+        if self._listening or not self.enabled:
+            return
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._listening = True
+        self.logger.info(f"🔎 Query inspector installed (mode {self.mode}, N+1 threshold {self.n_plus_one_threshold})")
+
+    def uninstall(self) -> None:
+        if not self._listening:
+            return
+        event.remove(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        self._listening = False
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_inspector_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('_query_inspector_started')
+        elapsed = time.perf_counter() - started.pop() if started else 0.0
+        scope = _scope.get()
+        if scope is None:
+            self.unscoped_queries += 1
+            return
+        key = fingerprint(statement)
+        location = None
+        while scope is not None:
+            if location is None and scope.needs_location(key):
+                location = self._caller()
+            scope.record(key, elapsed, location)
+            scope = scope.parent
+
+    def _caller(self) -> str:
+        """Innermost application frame outside SQLAlchemy and this module"""
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if (filename.startswith(self._root) and filename != __file__
+                    and os.sep + 'site-packages' + os.sep not in filename):
+                return f"{os.path.relpath(filename, self._root)}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        return 'unknown'
+
+    # Scopes
+    @contextmanager
+    def scope(self, name: str, kind: str = 'block', budget: Optional[int] = None):
+        """Charge the statements issued inside the block to `name`, then check and record them"""
+        if not self.enabled:
+            yield None
+            return
+        current = QueryScope(name, kind, _scope.get())
+        token = _scope.set(current)
+        try:
+            yield current
+        finally:
+            _scope.reset(token)
+            self.finish(current, budget)
+
+    def open(self, name: str, kind: str) -> Optional[tuple]:
+        """Start a scope from a hook pair (before/after request); returns a handle for close()"""
+        if not self.enabled:
+            return None
+        current = QueryScope(name, kind, _scope.get())
+        return current, _scope.set(current)
+
+    def close(self, handle: Optional[tuple], name: Optional[str] = None) -> Optional[QueryScope]:
+        """Finish a scope opened with open(), renaming it once the route is known"""
+        if handle is None:
+            return None
+        current, token = handle
+        try:
+            _scope.reset(token)
+        except ValueError:
+            _scope.set(None)  # Closed from a different context than it was opened in
+        if name:
+            current.name = name
+        self.finish(current)
+        return current
+
+    def finish(self, scope: QueryScope, budget: Optional[int] = None) -> None:
+        """Record a finished scope, flag N+1 suspects and enforce its budget"""
+        registry = get_metrics()
+        registry.inc('db_queries_total', scope.count, kind=scope.kind, scope=scope.name)
+        registry.observe('db_query_time_seconds', scope.seconds, kind=scope.kind, scope=scope.name)
+
+        suspects = scope.repeated(self.n_plus_one_threshold)
+        stats = self.scopes.get(scope.name)
+        if stats is None:
+            stats = self.scopes[scope.name] = {
+                'kind': scope.kind, 'runs': 0, 'queries': 0, 'max_queries': 0, 'seconds': 0.0, 'n_plus_one': 0
+            }
+        stats['runs'] += 1
+        stats['queries'] += scope.count
+        stats['max_queries'] = max(stats['max_queries'], scope.count)
+        stats['seconds'] += scope.seconds
+        stats['n_plus_one'] += 1 if suspects else 0
+
+        for suspect in suspects:
+            registry.inc('db_n_plus_one_total', kind=scope.kind, scope=scope.name)
+            self.findings.append({'type': 'n_plus_one', 'scope': scope.name, 'kind': scope.kind, 'at': time.time(), **suspect})
+            self.logger.warning(
+                f"🔎 Possible N+1 in {scope.name}: {suspect['count']}x {suspect['statement'][:120]} at {suspect['location']}"
+            )
+
+        if budget is None:
+            budget = self.budgets.get(scope.name, self.default_budget)
+        if budget and scope.count > budget:
+            self.findings.append({
+                'type': 'budget', 'scope': scope.name, 'kind': scope.kind, 'at': time.time(),
+                'count': scope.count, 'budget': budget
+            })
+            self.logger.warning(f"🔎 {scope.name} issued {scope.count} queries (budget {budget})")
+            if self.mode == 'strict':
+                raise QueryBudgetExceeded(scope, budget)
+
+    def expect_queries(self, max_queries: int, name: str = 'expect_queries'):
+        """Test helper: raise QueryBudgetExceeded if the block issues more than `max_queries`"""
+        if not self.enabled:
+            raise RuntimeError("Query inspector is off; set QUERY_INSPECTION=log or strict")
+        return self._expect(max_queries, name)
+
+    @contextmanager
+    def _expect(self, max_queries: int, name: str):
+        with self.scope(name, kind='block', budget=0) as current:
+            yield current
+        if current.count > max_queries:
+            raise QueryBudgetExceeded(current, max_queries)
+
+    def current_scope(self) -> Optional[QueryScope]:
+        return _scope.get()
+
+    # Reading
+    def get_report(self, limit: int = 50) -> Dict[str, Any]:
+        """Per-scope averages (worst first) and the most recent findings"""
+        scopes = [
+            {
+                'scope': name,
+                'kind': stats['kind'],
+                'runs': stats['runs'],
+                'avg_queries': round(stats['queries'] / stats['runs'], 1),
+                'max_queries': stats['max_queries'],
+                'avg_db_ms': round(stats['seconds'] * 1000 / stats['runs'], 2),
+                'n_plus_one_runs': stats['n_plus_one'],
+                'budget': self.budgets.get(name, self.default_budget) or None
+            }
+            for name, stats in list(self.scopes.items())
+        ]
+        scopes.sort(key=lambda entry: -entry['avg_queries'])
+        return {
+            'mode': self.mode,
+            'n_plus_one_threshold': self.n_plus_one_threshold,
+            'unscoped_queries': self.unscoped_queries,
+            'scopes': scopes[:limit],
+            'findings': list(self.findings)[-limit:][::-1]
+        }
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'GET /api/chats/active=8, send_message=12' -> {'GET /api/chats/active': 8, 'send_message': 12}"""
+    budgets = {}
+    for item in (spec or '').split(','):
+        name, _, value = item.rpartition('=')
+        if name.strip() and value.strip().isdigit():
+            budgets[name.strip()] = int(value)
+    return budgets
+
+
+# Global instance
+_inspector = QueryInspector()
+
+
+def get_query_inspector() -> QueryInspector:
+    """Get the global query inspector"""
+    return _inspector
+
+
+def configure_query_inspector(mode: str = 'off', n_plus_one_threshold: int = 5, default_budget: int = 0,
+                              budgets: Optional[Dict[str, int]] = None) -> QueryInspector:
+    """Rebuild the global inspector and hook the engines when enabled (called once at app startup)"""
+    global _inspector
+    _inspector.uninstall()
+    _inspector = QueryInspector(mode=mode, n_plus_one_threshold=n_plus_one_threshold,
+                                default_budget=default_budget, budgets=budgets)
+    _inspector.install()
+    return _inspector
+
+
+# Instrumentation hooks
+def install_request_query_inspection(app) -> None:
+    """Count the statements of every Flask request, scoped by method and route template"""
+    from flask import g, request
+
+    @app.before_request
+    def _open_query_scope():
+        g._query_scope = get_query_inspector().open(request.path, 'http')
+
+    @app.after_request
+    def _close_query_scope(response):
+        handle = g.pop('_query_scope', None)
+        if handle is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            scope = get_query_inspector().close(handle, f"{request.method} {route}")
+            response.headers['X-DB-Queries'] = str(scope.count)
+            response.headers['X-DB-Time-Ms'] = f"{scope.seconds * 1000:.1f}"
+        return response
+
+
+def instrument_socketio_queries(socketio) -> None:
+    """Count the statements of every Socket.IO handler registered afterwards, scoped by event"""
+    register = socketio.on
+
+    def on(message, namespace=None):
+        decorator = register(message, namespace)
+
+        def wrap(handler):
+            # wraps() keeps the handler's signature visible to the timing wrapper's argument trimming
+            @functools.wraps(handler)
+            def counted_handler(*args, **kwargs):
+                with get_query_inspector().scope(message, kind='socketio'):
+                    return handler(*args, **kwargs)
+            return decorator(counted_handler)
+        return wrap
+
+    socketio.on = on
@@ -0,0 +1,362 @@
+"""
+Rate Limiter ⏱️🛡️
+Named rate-limit policies shared by every send path
+SRIMI: Single responsibility for request throttling
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Iterable, Optional
+
+try:
+    import redis
+except ImportError:  # Optional - the in-memory backend works without it
+    redis = None
+
+
+SLIDING_WINDOW = 'sliding_window'
+TOKEN_BUCKET = 'token_bucket'
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    A named limit: at most `limit` hits per `window` seconds.
+
+    Sliding-window policies keep a log of at most `limit` timestamps per key.
+    Token-bucket policies refill `limit` tokens per `window` and allow bursts
+    of up to `burst` tokens (defaults to `limit`).
+    """
+    name: str
+    limit: int
+    window: float
+    algorithm: str = SLIDING_WINDOW
+    burst: Optional[int] = None
+
+    @property
+    def capacity(self) -> int:
+        """Most hits allowed at once"""
+        return self.burst or self.limit
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens regained per second"""
+        return self.limit / self.window
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate-limit check"""
+    allowed: bool
+    limit: int
+    remaining: int
+    used: int
+    retry_after: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for API responses"""
+        return {
+            'allowed': self.allowed,
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'used': self.used,
+            'retry_after': round(self.retry_after, 2)
+        }
+
+
+DEFAULT_POLICIES = [
+    RateLimitPolicy('message_daily', limit=100, window=86400),
+    RateLimitPolicy('message_burst', limit=5, window=1, algorithm=TOKEN_BUCKET, burst=10),
+    RateLimitPolicy('babel_post_daily', limit=20, window=86400),
+    RateLimitPolicy('consent_request_email', limit=3, window=86400),
+    RateLimitPolicy('consent_request_ip', limit=5, window=86400),
+]
+
+
+class MemoryRateLimitBackend:
+    """
+    Process-local limiter state.
+
+    Keys are spread over striped locks so concurrent users rarely contend, and
+    the key table is an LRU capped at `max_keys` so memory stays bounded.
+    """
+
+    backend = 'memory'
+
+    def __init__(self, max_keys: int = 100000, lock_stripes: int = 64):
+        self.max_keys = max_keys
+        self.states = OrderedDict()  # (policy, key) -> deque of timestamps | [tokens, updated_at]
+        self.evictions = 0
+        self._table_lock = threading.Lock()
+        self._locks = [threading.Lock() for _ in range(lock_stripes)]
+
+    def sliding_window(self, policy: RateLimitPolicy, key: str, now: float, cost: int, consume: bool,
+                       seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Sliding-window log - the log never holds more than `limit` entries"""
+        state_key = (policy.name, key)
+        with self._lock_for(state_key):
+            log = self._get_state(state_key)
+            if log is None:
+                log = deque(sorted(seed())[-policy.limit:] if seed else (), maxlen=policy.limit)
+                self._set_state(state_key, log)
+
+            cutoff = now - policy.window
+            while log and log[0] <= cutoff:
+                log.popleft()
+
+            allowed = len(log) + cost <= policy.limit
+            if allowed and consume:
+                log.extend([now] * cost)
+
+            used = len(log)
+            retry_after = 0.0 if allowed else max(0.0, log[0] + policy.window - now)
+            return RateLimitResult(allowed, policy.limit, max(0, policy.limit - used), used, retry_after)
+
+    def token_bucket(self, policy: RateLimitPolicy, key: str, now: float, cost: int, consume: bool,
+                     seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Token bucket - two numbers per key"""
+        state_key = (policy.name, key)
+        with self._lock_for(state_key):
+            bucket = self._get_state(state_key)
+            if bucket is None:
+                bucket = [float(policy.capacity), now]
+                self._set_state(state_key, bucket)
+
+            tokens = min(policy.capacity, bucket[0] + (now - bucket[1]) * policy.refill_rate)
+            allowed = tokens >= cost
+            if allowed and consume:
+                tokens -= cost
+            bucket[0], bucket[1] = tokens, now
+
+            retry_after = 0.0 if allowed else (cost - tokens) / policy.refill_rate
+            used = policy.capacity - int(tokens)
+            return RateLimitResult(allowed, policy.capacity, int(tokens), used, retry_after)
+
+    def reset(self, policy: RateLimitPolicy, key: str) -> None:
+        """Drop a key's state"""
+        with self._table_lock:
+            self.states.pop((policy.name, key), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        with self._table_lock:
+            return {
+                'backend': self.backend,
+                'keys': len(self.states),
+                'max_keys': self.max_keys,
+                'evictions': self.evictions
+            }
+
+    def _lock_for(self, state_key) -> threading.Lock:
+        """Striped lock guarding one key's state"""
+        return self._locks[hash(state_key) % len(self._locks)]
+
+    def _get_state(self, state_key):
+        """Look up a key's state, marking it recently used"""
+        with self._table_lock:
+            state = self.states.get(state_key)
+            if state is not None:
+                self.states.move_to_end(state_key)
+            return state
+
+    def _set_state(self, state_key, state) -> None:
+        """Store a key's state, evicting the least recently used past the cap"""
+        with self._table_lock:
+            self.states[state_key] = state
+            while len(self.states) > self.max_keys:
+                self.states.popitem(last=False)
+                self.evictions += 1
+
+
+class RedisRateLimitBackend:
+    """
+    Limiter state shared by every worker.
+
+    Each check is one atomic Lua script: a sorted set of timestamps for sliding
+    windows, a two-field hash for token buckets, both expiring with the window.
+    """
+
+    backend = 'redis'
+    KEY_PREFIX = 'unibabel:ratelimit'
+
+    SLIDING_WINDOW_SCRIPT = """
+        local key, now, window, limit, cost, consume = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]),
+            tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5] == '1'
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+        local used = redis.call('ZCARD', key)
+        local allowed = used + cost <= limit
+        if allowed and consume then
+            for i = 1, cost do
+                redis.call('ZADD', key, now, ARGV[6] .. ':' .. i)
+            end
+            used = used + cost
+        end
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')[2]
+        return {allowed and 1 or 0, used, tostring(oldest or now)}
+    """
+
+    TOKEN_BUCKET_SCRIPT = """
+        local key, now, rate, capacity, cost, consume = KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]),
+            tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5] == '1'
+        local state = redis.call('HMGET', key, 'tokens', 'updated_at')
+        local tokens = tonumber(state[1]) or capacity
+        local updated_at = tonumber(state[2]) or now
+        tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+        local allowed = tokens >= cost
+        if allowed and consume then
+            tokens = tokens - cost
+        end
+        redis.call('HSET', key, 'tokens', tostring(tokens), 'updated_at', tostring(now))
+        redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+        return {allowed and 1 or 0, tostring(tokens)}
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._sliding_window = client.register_script(self.SLIDING_WINDOW_SCRIPT)
+        self._token_bucket = client.register_script(self.TOKEN_BUCKET_SCRIPT)
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+
+    def sliding_window(self, policy: RateLimitPolicy, key: str, now: float, cost: int, consume: bool,
+                       seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Sliding-window log in a sorted set"""
+        redis_key = self._key(policy, key)
+        if seed and not self.client.exists(redis_key):
+            stamps = sorted(seed())[-policy.limit:]
+            if stamps:
+                self.client.zadd(redis_key, {f'seed:{i}': stamp for i, stamp in enumerate(stamps)})
+
+        allowed, used, oldest = self._sliding_window(
+            keys=[redis_key],
+            args=[now, policy.window, policy.limit, cost, int(consume), self._member_id(now)]
+        )
+        used = int(used)
+        retry_after = 0.0 if allowed else max(0.0, float(oldest) + policy.window - now)
+        return RateLimitResult(bool(allowed), policy.limit, max(0, policy.limit - used), used, retry_after)
+
+    def token_bucket(self, policy: RateLimitPolicy, key: str, now: float, cost: int, consume: bool,
+                     seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Token bucket in a two-field hash"""
+        allowed, tokens = self._token_bucket(
+            keys=[self._key(policy, key)],
+            args=[now, policy.refill_rate, policy.capacity, cost, int(consume)]
+        )
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (cost - tokens) / policy.refill_rate
+        return RateLimitResult(bool(allowed), policy.capacity, int(tokens), policy.capacity - int(tokens), retry_after)
+
+    def reset(self, policy: RateLimitPolicy, key: str) -> None:
+        """Drop a key's state"""
+        self.client.delete(self._key(policy, key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics"""
+        return {'backend': self.backend}
+
+    def _key(self, policy: RateLimitPolicy, key: str) -> str:
+        """Redis key for a policy and limited key"""
+        return f'{self.KEY_PREFIX}:{policy.name}:{key}'
+
+    def _member_id(self, now: float) -> str:
+        """Unique sorted-set member per hit (timestamps alone can collide)"""
+        with self._sequence_lock:
+            self._sequence += 1
+            return f'{now}:{id(self)}:{self._sequence}'
+
+
+class RateLimiter:
+    """
+    Check named policies against a key (user id, email hash, IP, ...).
+
+    Every check is O(1) amortized: a token bucket is two numbers and a sliding
+    window log is capped at the policy limit. Sliding-window keys can be seeded
+    from the database the first time they are seen, so limits survive restarts.
+    """
+
+    def __init__(self, backend=None, policies: Iterable[RateLimitPolicy] = DEFAULT_POLICIES):
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend or MemoryRateLimitBackend()
+        self.policies = {policy.name: policy for policy in policies}
+        self.logger.info(f"⏱️ Rate Limiter initialized ({self.backend.backend}, {len(self.policies)} policies)")
+
+    def register_policy(self, policy: RateLimitPolicy) -> None:
+        """Add or replace a named policy"""
+        self.policies[policy.name] = policy
+
+    def hit(self, policy_name: str, key, cost: int = 1,
+            seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Consume from a limit if allowed"""
+        return self._check(policy_name, key, cost, True, seed)
+
+    def peek(self, policy_name: str, key, cost: int = 1,
+             seed: Callable[[], Iterable[float]] = None) -> RateLimitResult:
+        """Check whether a hit would be allowed without consuming"""
+        return self._check(policy_name, key, cost, False, seed)
+
+    def reset(self, policy_name: str, key) -> None:
+        """Clear a key's state for a policy"""
+        self.backend.reset(self.policies[policy_name], str(key))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiter statistics"""
+        return {
+            **self.backend.get_stats(),
+            'policies': {
+                name: {'limit': policy.limit, 'window': policy.window, 'algorithm': policy.algorithm}
+                for name, policy in self.policies.items()
+            }
+        }
+
+    def _check(self, policy_name: str, key, cost: int, consume: bool, seed) -> RateLimitResult:
+        """Run a policy's algorithm on the backend"""
+        policy = self.policies[policy_name]
+        check = self.backend.token_bucket if policy.algorithm == TOKEN_BUCKET else self.backend.sliding_window
+        try:
+            return check(policy, str(key), time.time(), cost, consume, seed)
+        except Exception as e:
+            # Fail open - a limiter outage must not take the send paths down
+            self.logger.error(f"❌ Rate limit check failed for {policy_name}: {str(e)}")
+            return RateLimitResult(True, policy.limit, policy.limit, 0)
+
+
+def create_rate_limit_backend(backend: str = 'memory', redis_url: str = None, max_keys: int = 100000):
+    """Build the configured backend, falling back to memory if Redis is unavailable"""
+    logger = logging.getLogger(__name__)
+    if backend == 'redis':
+        if redis is None:
+            logger.warning("⚠️ redis package not installed, rate limits stay in memory")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+                return RedisRateLimitBackend(client)
+            except Exception as e:
+                logger.warning(f"⚠️ Redis unavailable for rate limits, using memory: {e}")
+
+    return MemoryRateLimitBackend(max_keys=max_keys)
+
+
+# Global instance
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the global rate limiter instance"""
+    return _rate_limiter
+
+
+def configure_rate_limiter(backend: str = 'memory', redis_url: str = None, max_keys: int = 100000,
+                           web_workers: int = 1) -> RateLimiter:
+    """Swap the global limiter's backend (called once at app startup)"""
+    _rate_limiter.backend = create_rate_limit_backend(backend, redis_url=redis_url, max_keys=max_keys)
+    if web_workers > 1 and isinstance(_rate_limiter.backend, MemoryRateLimitBackend):
+        logging.getLogger(__name__).error(
+            f"❌ Rate limits are kept per worker with {web_workers} workers - every limit is effectively "
+            f"{web_workers}x the configured one. Set RATE_LIMIT_BACKEND=redis (and REDIS_URL)"
+        )
+    return _rate_limiter
@@ -8,6 +8,7 @@ from datetime import datetime, date
 from typing import Dict, Any, Optional
 from werkzeug.security import generate_password_hash
 from models import db, User, UserType
+from services.user_preferences_service import get_user_preferences_service
 from sqlalchemy.exc import IntegrityError
 
 
@@ -76,30 +77,8 @@ class RegistrationService:
                 new_user.data_collection_blocked = True
                 new_user.requires_parent_permission = True
             
-            # Set default preferences for all users
-            import json
-            default_preferences = {
-                'language': {
-                    'autoTranslate': True,  # Default to auto-translate ON
-                    'preferredLanguage': user_data['preferred_language']
-                },
-                'accessibility': {
-                    'highContrast': False,
-                    'largeText': False,
-                    'reducedMotion': False
-                },
-                'privacy': {
-                    'profileVisibility': 'public',
-                    'showOnlineStatus': True
-                },
-                'notifications': {
-                    'messageNotifications': True,
-                    'roomNotifications': True
-                },
-                'created_at': datetime.utcnow().isoformat()
-            }
-            
-            new_user.bio = json.dumps(default_preferences)
+            # Set default preferences for all users (auto-translate ON)
+            get_user_preferences_service().create_default_preferences(new_user)
             
             # Save to database
             db.session.add(new_user)
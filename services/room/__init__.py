@@ -7,6 +7,7 @@ from .room_invites import RoomInviteService
 from .room_voice import RoomVoiceService
 from .room_discovery import RoomDiscoveryService
 from .room_management import RoomManagementService
+from ..service_container import get_container
 from typing import Dict, Any, List
 
 
@@ -172,10 +173,6 @@ class RoomService:
         return self.get_trending_rooms(current_user.id)
 
 
-# Global instance
-_room_service = RoomService()
-
-
 def get_room_service() -> RoomService:
-    """Get the global room service instance"""
-    return _room_service
\ No newline at end of file
+    """Get the global room service instance (built on first use)"""
+    return get_container().get('room')
\ No newline at end of file
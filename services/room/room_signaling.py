@@ -0,0 +1,185 @@
+"""
+Room Signaling Service - Fast path for WebRTC offer/answer/ICE relays
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class RoomSignalingService:
+    """Relay WebRTC signaling between voice participants
+
+    'batched' mode emits `webrtc_ice_candidates_received` ({'candidates': [...]})
+    once per window; 'direct' relays each ICE candidate as
+    `webrtc_ice_candidate_received` ({'candidate': ...}). websocket-client.js
+    handles both.
+
+    Peers are checked against this worker's voice registry first. A voice
+    session joined through another worker is not in that registry, so a miss
+    falls back to room membership, cached per room for `member_cache_ttl`.
+    """
+
+    RELAY_MODES = ('batched', 'direct')
+
+    def __init__(self, socketio, voice_service, relay_mode: str = 'batched',
+                 ice_batch_window_ms: int = 40, member_cache_ttl: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.socketio = socketio
+        self.voice = voice_service
+        self.relay_mode = relay_mode if relay_mode in self.RELAY_MODES else 'batched'
+        self.ice_batch_window = max(ice_batch_window_ms, 0) / 1000.0
+        self.member_cache_ttl = member_cache_ttl
+
+        # Sender display fields cached per socket at connect time
+        self.socket_profiles = {}  # sid -> {'user_id', 'username', 'display_name'}
+
+        # Pending trickle batches
+        self.pending_ice = {}  # (target_user_id, room_id, from_user_id) -> [candidates]
+        self._lock = threading.Lock()
+
+        # Room membership fallback for voice sessions held by other workers
+        self.room_members = {}  # room_id -> (expires_at, {user_ids})
+
+        self.logger.info(f"📡 Room Signaling Service initialized (mode={self.relay_mode})")
+
+    # Socket session cache
+    def register_socket(self, sid: str, user) -> Dict[str, Any]:
+        """Cache the sender's display fields for a socket"""
+        profile = {
+            'user_id': user.id,
+            'username': user.username,
+            'display_name': user.display_name or user.username
+        }
+        self.socket_profiles[sid] = profile
+        return profile
+
+    def forget_socket(self, sid: str) -> None:
+        """Drop the cached profile when a socket disconnects"""
+        self.socket_profiles.pop(sid, None)
+
+    def get_profile(self, sid: str) -> Optional[Dict[str, Any]]:
+        """Get the cached profile for a socket"""
+        return self.socket_profiles.get(sid)
+
+    # Peer validation
+    def are_peers(self, user_id: int, other_user_id: int, room_id: int) -> bool:
+        """Check that both users may exchange signaling in a room's voice session"""
+        if self.voice.are_voice_peers(user_id, other_user_id, room_id):
+            return True
+
+        cached = self.room_members.get(room_id)
+        if cached and cached[0] > time.monotonic() and {user_id, other_user_id} <= cached[1]:
+            return True
+
+        # Registry or cache miss - new members show up without waiting out the TTL
+        members = self._load_room_members(room_id)
+        return user_id in members and other_user_id in members
+
+    def _load_room_members(self, room_id: int) -> set:
+        """Load and cache the member ids of a room"""
+        from models.user_models import RoomMember
+
+        rows = RoomMember.query.with_entities(RoomMember.user_id).filter_by(room_id=room_id).all()
+        members = {row.user_id for row in rows}
+        self.room_members[room_id] = (time.monotonic() + self.member_cache_ttl, members)
+        return members
+
+    # Relays
+    def relay_offer(self, profile: Dict[str, Any], room_id: int, target_user_id: int, offer: Any) -> Dict[str, Any]:
+        """Relay a WebRTC offer to a peer in the same voice session"""
+        return self._relay_description('webrtc_offer_received', 'offer', profile, room_id, target_user_id, offer)
+
+    def relay_answer(self, profile: Dict[str, Any], room_id: int, target_user_id: int, answer: Any) -> Dict[str, Any]:
+        """Relay a WebRTC answer to a peer in the same voice session"""
+        return self._relay_description('webrtc_answer_received', 'answer', profile, room_id, target_user_id, answer)
+
+    def relay_ice_candidate(self, profile: Dict[str, Any], room_id: int, target_user_id: int, candidate: Any) -> Dict[str, Any]:
+        """Relay an ICE candidate, coalescing trickle candidates per target"""
+        from_user_id = profile['user_id']
+        if not self.are_peers(from_user_id, target_user_id, room_id):
+            return {'success': False, 'error': 'Target user is not in this voice session'}
+
+        if self.relay_mode == 'direct' or self.ice_batch_window <= 0:
+            self.socketio.emit('webrtc_ice_candidate_received', {
+                'from_user_id': from_user_id,
+                'candidate': candidate,
+                'room_id': room_id
+            }, room=f"user_{target_user_id}")
+            return {'success': True, 'batched': False}
+
+        key = (target_user_id, room_id, from_user_id)
+        with self._lock:
+            batch = self.pending_ice.get(key)
+            schedule_flush = batch is None
+            if schedule_flush:
+                batch = self.pending_ice[key] = []
+            batch.append(candidate)
+
+        if schedule_flush:
+            self.socketio.start_background_task(self._flush_after_window, key)
+
+        return {'success': True, 'batched': True}
+
+    def flush_ice_candidates(self, key: Tuple[int, int, int]) -> int:
+        """Emit a pending trickle batch, returns number of candidates sent"""
+        with self._lock:
+            candidates = self.pending_ice.pop(key, None)
+
+        if not candidates:
+            return 0
+
+        target_user_id, room_id, from_user_id = key
+        self.socketio.emit('webrtc_ice_candidates_received', {
+            'from_user_id': from_user_id,
+            'candidates': candidates,
+            'room_id': room_id
+        }, room=f"user_{target_user_id}")
+        return len(candidates)
+
+    def discard_pending(self, user_id: int, room_id: int) -> None:
+        """Drop trickle batches to or from a user leaving a voice session"""
+        with self._lock:
+            stale = [
+                key for key in self.pending_ice
+                if key[1] == room_id and user_id in (key[0], key[2])
+            ]
+            for key in stale:
+                del self.pending_ice[key]
+
+    def _relay_description(self, event: str, field: str, profile: Dict[str, Any],
+                           room_id: int, target_user_id: int, description: Any) -> Dict[str, Any]:
+        """Relay an SDP offer/answer using the cached sender profile"""
+        if not self.are_peers(profile['user_id'], target_user_id, room_id):
+            return {'success': False, 'error': 'Target user is not in this voice session'}
+
+        self.socketio.emit(event, {
+            'from_user_id': profile['user_id'],
+            'from_username': profile['username'],
+            'from_display_name': profile['display_name'],
+            field: description,
+            'room_id': room_id
+        }, room=f"user_{target_user_id}")
+        return {'success': True}
+
+    def _flush_after_window(self, key: Tuple[int, int, int]) -> None:
+        """Background task - wait out the batch window, then flush"""
+        self.socketio.sleep(self.ice_batch_window)
+        try:
+            self.flush_ice_candidates(key)
+        except Exception as e:
+            self.logger.error(f"❌ Failed to flush ICE candidates: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get signaling relay statistics"""
+        with self._lock:
+            pending: List[int] = [len(batch) for batch in self.pending_ice.values()]
+        return {
+            'relay_mode': self.relay_mode,
+            'ice_batch_window_ms': int(self.ice_batch_window * 1000),
+            'cached_sockets': len(self.socket_profiles),
+            'cached_rooms': len(self.room_members),
+            'pending_batches': len(pending),
+            'pending_candidates': sum(pending)
+        }
@@ -76,6 +76,7 @@ class RoomVoiceService:
             }
             
             voice_session['participants'].append(participant_data)
+            voice_session['participant_ids'].add(user_id)
             
             self.logger.info(f"🎙️ User {user_id} joined voice chat in room {room_id}")
             
@@ -111,6 +112,7 @@ class RoomVoiceService:
                 p for p in voice_session['participants'] 
                 if p['user_id'] != user_id
             ]
+            voice_session['participant_ids'].discard(user_id)
             
             # If no participants left, end session
             if not voice_session['participants']:
@@ -160,6 +162,19 @@ class RoomVoiceService:
                 'error': str(e)
             }
     
+    def is_in_voice_session(self, user_id: int, room_id: int) -> bool:
+        """Check voice session membership from the in-memory registry"""
+        voice_session = self.active_voice_sessions.get(room_id)
+        return bool(voice_session) and user_id in voice_session['participant_ids']
+    
+    def are_voice_peers(self, user_id: int, other_user_id: int, room_id: int) -> bool:
+        """Check that both users are in the same voice session (no DB access)"""
+        voice_session = self.active_voice_sessions.get(room_id)
+        if not voice_session:
+            return False
+        participant_ids = voice_session['participant_ids']
+        return user_id in participant_ids and other_user_id in participant_ids
+    
     def update_voice_status(self, user_id: int, room_id: int, is_speaking: bool = None, is_muted: bool = None) -> Dict[str, Any]:
         """Update user's voice status (speaking, muted, etc.)"""
         try:
@@ -273,6 +288,7 @@ class RoomVoiceService:
         """Initialize voice session for a room"""
         self.active_voice_sessions[room_id] = {
             'participants': [],
+            'participant_ids': set(),
             'started_at': datetime.utcnow(),
             'room_id': room_id
         }
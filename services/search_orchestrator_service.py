@@ -164,14 +164,13 @@ class SearchOrchestratorService:
     def _get_user_suggestions(self, partial_term: str, max_suggestions: int) -> List[str]:
         """Get user-based search suggestions"""
         try:
-            from models import User
+            from services.user_search_index import get_user_search_index
             
             suggestions = []
             
-            # Search usernames
-            users = User.query.filter(
-                User.username.ilike(f'%{partial_term}%')
-            ).limit(max_suggestions).all()
+            # Search usernames (prefix index, trigram fallback)
+            search_index = get_user_search_index()
+            users = search_index.load_users(search_index.search(partial_term, limit=max_suggestions))
             
             for user in users:
                 suggestions.append(user.username)
@@ -0,0 +1,328 @@
+"""
+Service Container 🧰⏱️
+Lazily built service singletons, background warm-up and a startup import profiler
+SRIMI: Single responsibility for when services get constructed
+"""
+
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+class ServiceContainer:
+    """
+    Registry of service factories, each built on first use.
+
+    A factory is a callable or a 'package.module:attribute' string, so
+    registering a service imports nothing; the module (and whatever it drags
+    in - SQLite DDL, OCR libraries, the analytics stack) loads the first time
+    the service is asked for. Services flagged `warm` are built by
+    `start_warm_up()` in a background task once the worker is serving, so the
+    first request rarely pays for construction either.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._factories = {}  # name -> factory or 'module:attr'
+        self._warm = []  # names built by warm_up(), in registration order
+        self._instances = {}
+        self._build_seconds = {}
+        self._lock = threading.RLock()  # Re-entrant: factories resolve their own dependencies
+        self._warm_up_started = False
+
+    def register(self, name: str, factory: Union[str, Callable[[], Any]], warm: bool = False) -> None:
+        """Register a service factory (nothing is built or imported yet)"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            if warm and name not in self._warm:
+                self._warm.append(name)
+
+    def get(self, name: str) -> Any:
+        """The service instance, built on first call"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            if name not in self._factories:
+                raise KeyError(f"Unknown service: {name}")
+
+            started = time.perf_counter()
+            instance = _resolve(self._factories[name])()
+            self._build_seconds[name] = time.perf_counter() - started
+            self._instances[name] = instance
+
+        self.logger.info(f"🧰 Built service '{name}' in {self._build_seconds[name] * 1000:.1f}ms")
+        return instance
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def reset(self, name: str) -> None:
+        """Drop a built instance so the next get() rebuilds it"""
+        with self._lock:
+            self._instances.pop(name, None)
+            self._build_seconds.pop(name, None)
+
+    # Warm-up
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build services now; failures are logged and left to be retried on first use"""
+        built, failed = [], {}
+        for name in names if names is not None else list(self._warm):
+            try:
+                self.get(name)
+                built.append(name)
+            except Exception as e:
+                failed[name] = str(e)
+                self.logger.warning(f"⚠️ Warm-up of service '{name}' failed: {e}")
+        return {
+            'built': built,
+            'failed': failed
+        }
+
+    def start_warm_up(self, app, socketio=None, delay: float = 1.0) -> None:
+        """Warm the registered services in a background task (called once at app startup)"""
+        if self._warm_up_started:
+            return
+        self._warm_up_started = True
+
+        def warm_up_task():
+            # Give the worker a moment to start accepting connections first
+            if socketio is not None:
+                socketio.sleep(delay)
+            else:
+                time.sleep(delay)
+            started = time.perf_counter()
+            with app.app_context():
+                result = self.warm_up()
+            self.logger.info(
+                f"🧰 Warmed {len(result['built'])} services in {(time.perf_counter() - started) * 1000:.0f}ms"
+                + (f" ({len(result['failed'])} failed)" if result['failed'] else "")
+            )
+
+        if socketio is not None:
+            socketio.start_background_task(warm_up_task)
+        else:
+            threading.Thread(target=warm_up_task, name='service-warm-up', daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get container statistics"""
+        with self._lock:
+            return {
+                'registered': len(self._factories),
+                'built': len(self._instances),
+                'services': {
+                    name: {
+                        'built': name in self._instances,
+                        'warm': name in self._warm,
+                        'build_ms': round(self._build_seconds[name] * 1000, 1) if name in self._build_seconds else None
+                    }
+                    for name in self._factories
+                }
+            }
+
+
+def _resolve(factory: Union[str, Callable[[], Any]]) -> Callable[[], Any]:
+    """Import a 'module:attr' factory reference"""
+    if not isinstance(factory, str):
+        return factory
+    module_name, _, attribute = factory.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class StartupProfiler:
+    """
+    Times every module import and named startup phase.
+
+    `install()` puts a finder at the front of sys.meta_path that wraps each
+    module's loader, recording inclusive time (the module and everything it
+    imported) and self time (its own body), plus which module imported it.
+    It is enabled with STARTUP_PROFILE=1 since it has to be installed before
+    the config or the app exist. Phases are recorded whether or not the
+    import hook is installed.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.installed = False
+        self.started_at = time.perf_counter()
+        self.modules = {}  # name -> {'inclusive': s, 'self': s, 'parent': name}
+        self.phases = []  # (name, seconds)
+        self._finder = None
+        self._local = threading.local()
+
+    def install(self) -> None:
+        """Start timing imports"""
+        if self.installed:
+            return
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+        self.installed = True
+
+    def install_from_env(self) -> bool:
+        """install() when STARTUP_PROFILE is set"""
+        if os.environ.get('STARTUP_PROFILE', '').lower() in ('1', 'true', 'yes'):
+            self.install()
+        return self.installed
+
+    def uninstall(self) -> None:
+        """Stop timing imports"""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self.installed = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup step"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    # Import hook callbacks
+    def _enter(self, name: str) -> None:
+        stack = self._stack()
+        stack.append([name, time.perf_counter(), 0.0])  # name, started, time spent in child imports
+
+    def _exit(self, name: str) -> None:
+        stack = self._stack()
+        _, started, children = stack.pop()
+        inclusive = time.perf_counter() - started
+        if stack:
+            stack[-1][2] += inclusive
+        self.modules[name] = {
+            'inclusive': inclusive,
+            'self': inclusive - children,
+            'parent': stack[-1][0] if stack else None
+        }
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    # Reading
+    def import_path(self, name: str) -> List[str]:
+        """Chain of importers that first pulled a module in, outermost first"""
+        path = []
+        while name is not None and name not in path:
+            path.append(name)
+            name = self.modules.get(name, {}).get('parent')
+        return path[::-1]
+
+    def get_report(self, limit: int = 25) -> Dict[str, Any]:
+        """Slowest imports (inclusive and self time) and phase timings"""
+        def top(key):
+            ranked = sorted(self.modules.items(), key=lambda item: -item[1][key])[:limit]
+            return [
+                {
+                    'module': name,
+                    'ms': round(timing[key] * 1000, 2),
+                    'import_path': self.import_path(name)
+                }
+                for name, timing in ranked
+            ]
+
+        return {
+            'import_profiling': self.installed,
+            'since_process_start_ms': round((time.perf_counter() - self.started_at) * 1000, 1),
+            'modules_timed': len(self.modules),
+            'phases': [{'phase': name, 'ms': round(seconds * 1000, 1)} for name, seconds in self.phases],
+            'slowest_inclusive': top('inclusive'),
+            'slowest_self': top('self')
+        }
+
+    def log_report(self, limit: int = 15) -> None:
+        """Log phases and the slowest imports"""
+        report = self.get_report(limit)
+        for phase in report['phases']:
+            self.logger.info(f"⏱️ Startup phase {phase['phase']}: {phase['ms']}ms")
+        for entry in report['slowest_inclusive']:
+            self.logger.info(f"⏱️ import {entry['module']}: {entry['ms']}ms via {' > '.join(entry['import_path'])}")
+
+
+class _TimingFinder:
+    """Meta path finder that defers to the real finders and wraps their loaders"""
+
+    def __init__(self, profiler: StartupProfiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self.profiler, fullname)
+            return spec
+        return None
+
+    def invalidate_caches(self):
+        pass
+
+
+class _TimedLoader:
+    """Loader proxy that times exec_module"""
+
+    def __init__(self, loader, profiler: StartupProfiler, name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # The module should see its real loader (get_data, resource readers, ...)
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+
+def _register_defaults(container: ServiceContainer) -> None:
+    """Services whose construction is costly (DDL, sub-services, heavy imports)"""
+    container.register('cache', 'services.cache_service:CacheService', warm=True)
+    container.register('behavior_analyzer', 'services.behavior_analyzer:BehaviorAnalyzerService', warm=True)
+    container.register('translation_orchestrator', 'services.translation_orchestrator:TranslationOrchestrator', warm=True)
+    container.register('message', 'services.message_service:MessageService', warm=True)
+    container.register('chat', 'services.chat_service:ChatService', warm=True)
+    container.register('room', 'services.room:RoomService', warm=True)
+    # OpenCV/Tesseract load only when an ID is actually verified
+    container.register('id_verification', 'services.id_verification_service:DIYIDVerificationService')
+
+
+# Global instances
+_container = ServiceContainer()
+_register_defaults(_container)
+_startup_profiler = StartupProfiler()
+
+
+def get_container() -> ServiceContainer:
+    """Get the global service container"""
+    return _container
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the global startup profiler"""
+    return _startup_profiler
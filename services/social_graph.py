@@ -0,0 +1,362 @@
+"""
+Social Graph Cache 🕸️👥
+Friend, pending and blocked adjacency per user
+SRIMI: Single responsibility for friendship lookups
+"""
+
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import timezone
+from typing import Dict, Any, Iterable, List, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models import db, read_primary, UserFriend
+
+try:
+    import redis
+except ImportError:  # Optional - the graph is cached per process without it
+    redis = None
+
+
+class _Adjacency:
+    """One user's edges as sorted int arrays (4 bytes per edge)"""
+
+    __slots__ = ('accepted', 'accepted_since', 'outgoing', 'incoming', 'blocked', 'loaded_at')
+
+    FIELDS = ('accepted', 'outgoing', 'incoming', 'blocked')
+
+    def __init__(self):
+        self.accepted = array('i')
+        self.accepted_since = array('d')  # Friendship start (epoch seconds), parallel to `accepted`
+        self.outgoing = array('i')  # Pending requests this user sent
+        self.incoming = array('i')  # Pending requests this user received
+        self.blocked = array('i')
+        self.loaded_at = time.time()
+
+    def status_of(self, other_id: int) -> str:
+        """Relationship status with another user, in either direction"""
+        if _contains(self.accepted, other_id):
+            return 'accepted'
+        if _contains(self.blocked, other_id):
+            return 'blocked'
+        if _contains(self.outgoing, other_id) or _contains(self.incoming, other_id):
+            return 'pending'
+        return 'none'
+
+    def discard(self, other_id: int) -> None:
+        """Remove every edge to another user"""
+        index = _index_of(self.accepted, other_id)
+        if index is not None:
+            del self.accepted[index]
+            del self.accepted_since[index]
+        for field in ('outgoing', 'incoming', 'blocked'):
+            edges = getattr(self, field)
+            index = _index_of(edges, other_id)
+            if index is not None:
+                del edges[index]
+
+    def add(self, field: str, other_id: int, since: float = 0.0) -> None:
+        """Insert an edge, keeping the array sorted"""
+        edges = getattr(self, field)
+        index = bisect_left(edges, other_id)
+        if index < len(edges) and edges[index] == other_id:
+            return
+        edges.insert(index, other_id)
+        if field == 'accepted':
+            self.accepted_since.insert(index, since)
+
+    def to_mapping(self) -> Dict[str, bytes]:
+        """Packed arrays for the Redis hash"""
+        mapping = {field: getattr(self, field).tobytes() for field in self.FIELDS}
+        mapping['accepted_since'] = self.accepted_since.tobytes()
+        return mapping
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[bytes, bytes]) -> '_Adjacency':
+        """Rebuild from a Redis hash"""
+        adjacency = cls()
+        for field in cls.FIELDS:
+            getattr(adjacency, field).frombytes(mapping.get(field.encode(), b''))
+        adjacency.accepted_since.frombytes(mapping.get(b'accepted_since', b''))
+        return adjacency
+
+
+def _contains(edges: array, other_id: int) -> bool:
+    """Binary search membership test"""
+    index = bisect_left(edges, other_id)
+    return index < len(edges) and edges[index] == other_id
+
+
+def _index_of(edges: array, other_id: int) -> Optional[int]:
+    """Position of an id in a sorted edge array, or None"""
+    index = bisect_left(edges, other_id)
+    return index if index < len(edges) and edges[index] == other_id else None
+
+
+class SocialGraphCache:
+    """
+    Lazily loaded adjacency sets per user.
+
+    A user's edges are read with one UserFriend query the first time they are
+    needed, then friend lists and friendship status for any batch of users are
+    memory lookups. Every committed UserFriend insert, status change or
+    delete updates both endpoints in place (a mapper hook, so request,
+    accept and decline paths can't forget to). The local copy is reloaded
+    after `local_ttl` seconds so changes made by other workers show up; with
+    Redis, packed adjacency is shared across workers and writes invalidate
+    the shared copy. Preconditions on write paths should query UserFriend,
+    not this cache.
+    """
+
+    KEY_PREFIX = 'unibabel:social'
+
+    def __init__(self, max_users: int = 50000, redis_client=None, local_ttl: float = 30.0, redis_ttl: int = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.max_users = max_users
+        self.redis = redis_client
+        self.local_ttl = local_ttl  # Other workers' friend actions only reach this copy by reloading
+        self.redis_ttl = redis_ttl
+        self.graph = OrderedDict()  # user_id -> _Adjacency, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self.logger.info(f"🕸️ Social Graph Cache initialized ({'redis' if redis_client else 'memory'})")
+
+    # Reads
+    def get_friend_ids(self, user_id: int) -> List[int]:
+        """Accepted friends of a user, in both request directions"""
+        return self._adjacency(user_id).accepted.tolist()
+
+    def get_friends_since(self, user_id: int) -> Dict[int, float]:
+        """Accepted friends mapped to friendship start (epoch seconds)"""
+        adjacency = self._adjacency(user_id)
+        return dict(zip(adjacency.accepted, adjacency.accepted_since))
+
+    def get_status(self, user_id: int, other_id: int) -> str:
+        """'accepted', 'pending', 'blocked' or 'none'"""
+        return self._adjacency(user_id).status_of(other_id)
+
+    def get_statuses(self, user_id: int, other_ids: Iterable[int]) -> Dict[int, str]:
+        """Resolve friendship status for a batch of users in one call"""
+        adjacency = self._adjacency(user_id)
+        return {other_id: adjacency.status_of(other_id) for other_id in other_ids}
+
+    def are_friends(self, user_id: int, other_id: int) -> bool:
+        """True if the two users are accepted friends"""
+        return self.get_status(user_id, other_id) == 'accepted'
+
+    def get_pending_incoming(self, user_id: int) -> List[int]:
+        """Users with a pending request to this user"""
+        return self._adjacency(user_id).incoming.tolist()
+
+    # Writes (applied automatically once a UserFriend change commits, see _on_commit)
+    def record_friendship(self, friendship: UserFriend) -> None:
+        """Apply a created or updated UserFriend row to both endpoints"""
+        self._apply(friendship.user_id, friendship.friend_id, friendship.status, friendship.created_at)
+
+    def _apply(self, user_id: int, friend_id: int, status: str, created_at) -> None:
+        """Replace the edge between two users with one in `status` (other statuses just drop it)"""
+        since = created_at.replace(tzinfo=timezone.utc).timestamp() if created_at else time.time()
+        with self._lock:
+            for owner, other in ((user_id, friend_id), (friend_id, user_id)):
+                adjacency = self.graph.get(owner)
+                if adjacency is None:
+                    continue
+                adjacency.discard(other)
+                if status == 'accepted':
+                    adjacency.add('accepted', other, since)
+                elif status == 'blocked':
+                    adjacency.add('blocked', other)
+                elif status == 'pending':
+                    adjacency.add('outgoing' if owner == user_id else 'incoming', other)
+        self._invalidate_shared(user_id, friend_id)
+
+    def remove_friendship(self, user_id: int, friend_id: int) -> None:
+        """Drop every edge between two users"""
+        with self._lock:
+            for owner, other in ((user_id, friend_id), (friend_id, user_id)):
+                adjacency = self.graph.get(owner)
+                if adjacency is not None:
+                    adjacency.discard(other)
+        self._invalidate_shared(user_id, friend_id)
+
+    def invalidate(self, *user_ids: int) -> None:
+        """Force a reload for users (e.g. after bulk changes)"""
+        with self._lock:
+            for user_id in user_ids:
+                self.graph.pop(user_id, None)
+        self._invalidate_shared(*user_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get social graph cache statistics"""
+        with self._lock:
+            edges = sum(
+                len(a.accepted) + len(a.outgoing) + len(a.incoming) + len(a.blocked) for a in self.graph.values()
+            )
+            total = self.hits + self.misses
+            return {
+                'backend': 'redis' if self.redis is not None else 'memory',
+                'users_cached': len(self.graph),
+                'max_users': self.max_users,
+                'edges_cached': edges,
+                'hit_rate': round(self.hits / total, 3) if total else None
+            }
+
+    # Loading
+    def _adjacency(self, user_id: int) -> _Adjacency:
+        """Get a user's adjacency, loading it on first use"""
+        with self._lock:
+            adjacency = self.graph.get(user_id)
+            if adjacency is not None and (
+                self.local_ttl is None or time.time() - adjacency.loaded_at < self.local_ttl
+            ):
+                self.graph.move_to_end(user_id)
+                self.hits += 1
+                return adjacency
+            self.misses += 1
+
+        adjacency = self._load_shared(user_id) or self._load_from_db(user_id)
+
+        with self._lock:
+            self.graph[user_id] = adjacency
+            self.graph.move_to_end(user_id)
+            while len(self.graph) > self.max_users:
+                self.graph.popitem(last=False)
+        return adjacency
+
+    @read_primary()
+    def _load_from_db(self, user_id: int) -> _Adjacency:
+        """One query for every edge touching the user"""
+        rows = db.session.query(
+            UserFriend.user_id, UserFriend.friend_id, UserFriend.status, UserFriend.created_at
+        ).filter(
+            db.or_(UserFriend.user_id == user_id, UserFriend.friend_id == user_id)
+        ).all()
+
+        edges = {field: {} for field in _Adjacency.FIELDS}  # field -> other_id -> since
+        for requester_id, target_id, status, created_at in rows:
+            other = target_id if requester_id == user_id else requester_id
+            if status == 'pending':
+                field = 'outgoing' if requester_id == user_id else 'incoming'
+            elif status in ('accepted', 'blocked'):
+                field = status
+            else:
+                continue
+            edges[field][other] = created_at.replace(tzinfo=timezone.utc).timestamp() if created_at else 0.0
+
+        adjacency = _Adjacency()
+        for field, others in edges.items():
+            ordered = sorted(others)
+            getattr(adjacency, field).extend(ordered)
+            if field == 'accepted':
+                adjacency.accepted_since.extend(others[other] for other in ordered)
+
+        self._store_shared(user_id, adjacency)
+        return adjacency
+
+    def _load_shared(self, user_id: int) -> Optional[_Adjacency]:
+        """Read packed adjacency from Redis"""
+        if self.redis is None:
+            return None
+        try:
+            mapping = self.redis.hgetall(f'{self.KEY_PREFIX}:{user_id}')
+            return _Adjacency.from_mapping(mapping) if mapping else None
+        except Exception as e:
+            self.logger.warning(f"⚠️ Social graph Redis read failed: {e}")
+            return None
+
+    def _store_shared(self, user_id: int, adjacency: _Adjacency) -> None:
+        """Write packed adjacency to Redis"""
+        if self.redis is None:
+            return
+        try:
+            key = f'{self.KEY_PREFIX}:{user_id}'
+            pipe = self.redis.pipeline()
+            pipe.hset(key, mapping=adjacency.to_mapping())
+            pipe.expire(key, self.redis_ttl)
+            pipe.execute()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Social graph Redis write failed: {e}")
+
+    def _invalidate_shared(self, *user_ids: int) -> None:
+        """Drop shared copies so other workers reload from the DB"""
+        if self.redis is None or not user_ids:
+            return
+        try:
+            self.redis.delete(*(f'{self.KEY_PREFIX}:{user_id}' for user_id in user_ids))
+        except Exception as e:
+            self.logger.warning(f"⚠️ Social graph Redis invalidation failed: {e}")
+
+
+# UserFriend changes, captured in the flush and applied once the transaction commits
+def _on_friendship_saved(mapper, connection, friendship: UserFriend) -> None:
+    """Mapper event (insert/update): remember the edge as written"""
+    session = object_session(friendship)
+    if session is not None:
+        session.info.setdefault('social_graph_pending', []).append(
+            (friendship.user_id, friendship.friend_id, friendship.status, friendship.created_at)
+        )
+
+
+def _on_friendship_deleted(mapper, connection, friendship: UserFriend) -> None:
+    """Mapper event: remember the edge as removed"""
+    session = object_session(friendship)
+    if session is not None:
+        session.info.setdefault('social_graph_pending', []).append(
+            (friendship.user_id, friendship.friend_id, None, None)
+        )
+
+
+def _on_commit(session) -> None:
+    """Session event: apply committed friendship changes to both endpoints"""
+    graph = get_social_graph()
+    for user_id, friend_id, status, created_at in session.info.pop('social_graph_pending', None) or ():
+        if status is None:
+            graph.remove_friendship(user_id, friend_id)
+        else:
+            graph._apply(user_id, friend_id, status, created_at)
+
+
+def _on_rollback(session) -> None:
+    """Session event: the changes rolled back, keep the cached edges"""
+    session.info.pop('social_graph_pending', None)
+
+
+event.listen(UserFriend, 'after_insert', _on_friendship_saved)
+event.listen(UserFriend, 'after_update', _on_friendship_saved)
+event.listen(UserFriend, 'after_delete', _on_friendship_deleted)
+event.listen(Session, 'after_commit', _on_commit)
+event.listen(Session, 'after_rollback', _on_rollback)
+
+
+# Global instance
+_social_graph = SocialGraphCache()
+
+
+def get_social_graph() -> SocialGraphCache:
+    """Get the global social graph cache"""
+    return _social_graph
+
+
+def configure_social_graph(backend: str = 'memory', redis_url: str = None, max_users: int = 50000,
+                           local_ttl: float = 30.0) -> SocialGraphCache:
+    """Rebuild the global cache with the configured backend (called once at app startup)"""
+    global _social_graph
+    client = None
+    if backend == 'redis':
+        if redis is None:
+            logging.getLogger(__name__).warning("⚠️ redis package not installed, social graph stays in memory")
+        else:
+            try:
+                client = redis.Redis.from_url(redis_url)
+                client.ping()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"⚠️ Redis unavailable for social graph, using memory: {e}")
+                client = None
+
+    _social_graph = SocialGraphCache(max_users=max_users, redis_client=client, local_ttl=local_ttl)
+    return _social_graph
@@ -0,0 +1,307 @@
+"""
+Pipeline Tracing 🔍⏱️
+Sampled per-stage spans for the send-message pipeline
+SRIMI: Single responsibility for recording where request time goes
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+from .metrics import get_metrics
+
+
+class Trace:
+    """One sampled request: a root span and its descendants"""
+
+    __slots__ = ('trace_id', 'name', 'spans', 'started_at')
+
+    def __init__(self, name: str):
+        self.trace_id = os.urandom(16).hex()
+        self.name = name
+        self.spans = []
+        self.started_at = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at,
+            'spans': [span.to_dict() for span in self.spans]
+        }
+
+
+class Span:
+    """A timed stage within a trace"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start_ns', 'duration_ns', 'error')
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.duration_ns = None
+        self.error = None
+
+    def set(self, **attributes) -> None:
+        """Attach attributes after the span started (e.g. cache hit)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'duration_ms': round(self.duration_ns / 1e6, 3) if self.duration_ns is not None else None,
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class _NoopSpan:
+    """Stands in for spans of unsampled requests"""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_UNSAMPLED = object()  # Context marker: inside a request that was not sampled
+
+_current = ContextVar('unibabel_trace_span', default=None)
+
+
+class _SpanScope:
+    """Context manager that opens a span and makes it current"""
+
+    __slots__ = ('tracer', 'name', 'attributes', 'root', 'span', 'token', 'started')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any], root: bool):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.root = root
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is _UNSAMPLED or (parent is None and not self.root):
+            self.span = None
+            return _NOOP_SPAN
+        if parent is None and not self.tracer.should_sample():  # Root of a new request
+            self.span = None
+            self.token = _current.set(_UNSAMPLED)
+            return _NOOP_SPAN
+
+        trace = parent.trace if parent is not None else Trace(self.name)
+        self.span = Span(trace, self.name, parent.span_id if parent is not None else None, self.attributes)
+        if len(trace.spans) < self.tracer.max_spans_per_trace:
+            trace.spans.append(self.span)
+        self.token = _current.set(self.span)
+        self.started = time.perf_counter_ns()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self.span
+        if span is None:
+            if self.root and getattr(self, 'token', None) is not None:
+                _current.reset(self.token)
+            return
+        span.duration_ns = time.perf_counter_ns() - self.started
+        if exc_type is not None:
+            span.error = f'{exc_type.__name__}: {exc}'
+        _current.reset(self.token)
+        self.tracer._finish(span)
+
+
+class Tracer:
+    """
+    Sampled, context-propagated spans kept in an in-process ring buffer.
+
+    `trace()` opens a root span and decides once whether the request is
+    sampled; `span()` and `@traced` only record inside a sampled trace and
+    cost a context-variable lookup otherwise. The current span lives in a
+    ContextVar, so it follows asyncio.run() into the translation
+    orchestrator. Finished traces go to a bounded deque; stage latencies also
+    feed the `trace_span_duration_seconds` histogram.
+    """
+
+    def __init__(self, sample_rate: float = 0.05, buffer_size: int = 1000, max_spans_per_trace: int = 200):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate
+        self.max_spans_per_trace = max_spans_per_trace
+        self.traces = deque(maxlen=buffer_size)
+        self.started = 0
+        self.sampled = 0
+        self.logger.info(f"🔍 Tracer initialized (sample rate {sample_rate:.0%}, buffer {buffer_size})")
+
+    # Recording
+    def trace(self, name: str, **attributes) -> _SpanScope:
+        """Root span for a request (nested calls behave like span())"""
+        return _SpanScope(self, name, attributes, root=True)
+
+    def span(self, name: str, **attributes) -> _SpanScope:
+        """Child span of the current span (no-op outside a sampled trace)"""
+        return _SpanScope(self, name, attributes, root=False)
+
+    def should_sample(self) -> bool:
+        """Sampling decision for a new request"""
+        self.started += 1
+        if self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            self.sampled += 1
+            return True
+        return False
+
+    def _finish(self, span: Span) -> None:
+        """Record a finished span; the root also publishes its trace"""
+        get_metrics().observe('trace_span_duration_seconds', span.duration_ns / 1e9, stage=span.name)
+        if span.parent_id is None:
+            self.traces.append(span.trace)
+
+    # Reading
+    def get_traces(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent traces, newest first"""
+        return [trace.to_dict() for trace in list(self.traces)[-limit:][::-1]]
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Count and p50/p95/p99/mean latency (ms) per stage over the buffered traces"""
+        durations = {}
+        for trace in list(self.traces):
+            for span in trace.spans:
+                if span.duration_ns is not None:
+                    durations.setdefault(span.name, []).append(span.duration_ns / 1e6)
+
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {
+                'count': len(values),
+                'p50_ms': round(_percentile(values, 0.50), 3),
+                'p95_ms': round(_percentile(values, 0.95), 3),
+                'p99_ms': round(_percentile(values, 0.99), 3),
+                'mean_ms': round(sum(values) / len(values), 3)
+            }
+        return dict(sorted(stats.items(), key=lambda item: -item[1]['p95_ms']))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracer statistics"""
+        return {
+            'sample_rate': self.sample_rate,
+            'requests_seen': self.started,
+            'requests_sampled': self.sampled,
+            'traces_buffered': len(self.traces),
+            'buffer_size': self.traces.maxlen
+        }
+
+    # Export
+    def to_otlp(self) -> Dict[str, Any]:
+        """Buffered traces as an OTLP/JSON ExportTraceServiceRequest"""
+        spans = []
+        for trace in list(self.traces):
+            for span in trace.spans:
+                if span.duration_ns is None:
+                    continue
+                otlp_span = {
+                    'traceId': trace.trace_id,
+                    'spanId': span.span_id,
+                    'name': span.name,
+                    'kind': 1,  # SPAN_KIND_INTERNAL
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.start_ns + span.duration_ns),
+                    'attributes': [
+                        {'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()
+                    ],
+                    'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+                }
+                if span.parent_id:
+                    otlp_span['parentSpanId'] = span.parent_id
+                spans.append(otlp_span)
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': 'unibabel'}}
+                ]},
+                'scopeSpans': [{
+                    'scope': {'name': 'unibabel.tracing'},
+                    'spans': spans
+                }]
+            }]
+        }
+
+    def export(self, path: str, fmt: str = 'json') -> str:
+        """Write buffered traces to a file ('json' or 'otlp') and return its path"""
+        payload = self.to_otlp() if fmt == 'otlp' else {'traces': self.get_traces(limit=len(self.traces))}
+        with open(path, 'w') as export_file:
+            json.dump(payload, export_file)
+        self.logger.info(f"🔍 Exported {len(self.traces)} traces to {path} ({fmt})")
+        return path
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the sampled request being handled, if any"""
+    span = _current.get()
+    return span.trace.trace_id if isinstance(span, Span) else None
+
+
+def traced(name: str, root: bool = False):
+    """Decorator: run a function (sync or async) inside a span, or a root trace with root=True"""
+    def open_scope():
+        tracer = get_tracer()
+        return tracer.trace(name) if root else tracer.span(name)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with open_scope():
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with open_scope():
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Global instance
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer"""
+    return _tracer
+
+
+def configure_tracing(sample_rate: float = 0.05, buffer_size: int = 1000) -> Tracer:
+    """Rebuild the global tracer with the configured sampling (called once at app startup)"""
+    global _tracer
+    _tracer = Tracer(sample_rate=sample_rate, buffer_size=buffer_size)
+    return _tracer
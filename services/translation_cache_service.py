@@ -6,6 +6,7 @@ Single Responsibility: Translation cache operations only
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
+from services.metrics import record_cache_lookup
 
 class TranslationCacheService:
     """Micro-service for translation cache operations"""
@@ -132,6 +133,7 @@ class TranslationCacheService:
                 original_text=original_text,
                 target_language=target_language
             ).first()
+            record_cache_lookup('reviewed_translation', cache_entry is not None)
             
             if cache_entry:
                 # Update usage stats
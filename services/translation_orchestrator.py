@@ -6,13 +6,15 @@ Coordinates translation services for optimal performance
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
 from .deepl_integration import get_deepl_service
 from .cache_service import get_cache_service
 from .behavior_analyzer import get_behavior_analyzer
+from .tracing import traced
+from .service_container import get_container
 
 
 @dataclass
@@ -64,6 +66,7 @@ class TranslationOrchestrator:
         
         self.logger.info("Translation Orchestrator initialized with Data Vampire pipeline")
     
+    @traced('orchestrator.translate')
     async def translate_message(self, request: TranslationRequest) -> TranslationResponse:
         """
         Main translation method with data vampire pipeline integration
@@ -84,9 +87,8 @@ class TranslationOrchestrator:
             # Step 1: Learn from user behavior (async)
             if request.user_id:
                 asyncio.create_task(
-                    self.behavior_analyzer.analyze_user_request(
+                    self.behavior_analyzer.analyze_phrase_usage(
                         request.text,
-                        request.target_language,
                         request.user_id
                     )
                 )
@@ -192,10 +194,11 @@ class TranslationOrchestrator:
                 )
             
             # Step 7: Translate with DeepL
-            translation = await self.deepl_service.translate(
+            result = await self.deepl_service.translate(
                 request.text,
                 target_language
             )
+            translation = result.text if result and result.success else None
             
             if translation:
                 # Cache the result
@@ -251,38 +254,19 @@ class TranslationOrchestrator:
                 **harvest_results
             )
     
+    @traced('orchestrator.preferences')
     def _get_user_auto_translate_preference(self, user_id: int) -> bool:
         """Get user's auto-translate preference"""
         if not user_id:
             return True  # Default to auto-translate ON
         
         try:
-            from models import User
-            import json
-            
-            user = User.query.get(user_id)
-            if not user:
-                return True  # Default to auto-translate ON
-            
-            # Check if user has preferences stored in bio field
-            if user.bio:
-                try:
-                    preferences = json.loads(user.bio)
-                    # Check for auto-translate setting in language preferences
-                    auto_translate = preferences.get('language', {}).get('autoTranslate', True)
-                    self.logger.info(f"🌐 User {user_id} auto-translate preference: {auto_translate}")
-                    return auto_translate
-                except (json.JSONDecodeError, KeyError):
-                    pass
+            from services.user_preferences_service import get_user_preferences_service
             
-            # Fallback: Check if user has selected a language at registration
-            # If they selected a language, assume they want translation to that language
-            if user.preferred_language:
-                self.logger.info(f"🌐 User {user_id} has preferred language {user.preferred_language} - auto-translate ON")
-                return True
-            
-            # Default to auto-translate ON
-            return True
+            # Single typed column read - users without a preferences row default to ON
+            auto_translate = get_user_preferences_service().get_auto_translate(user_id)
+            self.logger.debug(f"🌐 User {user_id} auto-translate preference: {auto_translate}")
+            return auto_translate
                 
         except Exception as e:
             self.logger.error(f"Error getting auto-translate preference for user {user_id}: {e}")
@@ -308,12 +292,11 @@ class TranslationOrchestrator:
             return default_language
     
     async def _harvest_data_async(self, user_id: int, message: str, metadata: Dict) -> Dict:
-        """ Asynchronous data harvesting (non-blocking)"""
+        """ Data harvesting task - runs at the pipeline's first await, alongside the lookups"""
         try:
-            # Run data vampire harvesting in parallel
-            harvest_result = await asyncio.get_event_loop().run_in_executor(
-                None,  # Use default executor
-                self.data_vampire.harvest_message_data,
+            # Runs in the caller's app context and session - a short read, and an executor
+            # thread would need its own pooled connection for every message in flight
+            harvest_result = self.data_vampire.harvest_message_data(
                 user_id,
                 message,
                 metadata
@@ -327,6 +310,7 @@ class TranslationOrchestrator:
                 'buyer_interest_score': {}
             }
     
+    @traced('orchestrator.harvest_wait')
     async def _get_harvest_results(self, data_harvest_task) -> Dict:
         """ Get harvest results from async task"""
         if data_harvest_task is None:
@@ -361,15 +345,14 @@ class TranslationOrchestrator:
                 'vulnerability_score': 0.0
             }
     
+    @traced('cache.user_submitted_lookup')
     async def _check_user_submitted_cache(self, text: str, target_language: str) -> str:
         """Check if user-submitted translation cache exists"""
         try:
             from .translation_cache_service import translation_cache_service
             
-            # Run cache check in executor to avoid blocking
-            cache_result = await asyncio.get_event_loop().run_in_executor(
-                None,
-                translation_cache_service.find_cached_translation,
+            # Same session as the caller, no second pooled connection per lookup
+            cache_result = translation_cache_service.find_cached_translation(
                 text,
                 target_language
             )
@@ -384,22 +367,26 @@ class TranslationOrchestrator:
             self.logger.error(f"Error checking user-submitted cache: {e}")
             return None
     
-    async def populate_cache(self, language: str) -> Dict[str, Any]:
-        """Populate cache with priority phrases"""
+    async def populate_cache(self, language: str, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Populate cache with priority phrases (slow: run it as a 'translation.populate_cache' job)"""
         try:
             # Get priority phrases
             priority_phrases = await self.behavior_analyzer.get_priority_phrases()
             
             cached_count = 0
-            for phrase_text, priority_score in priority_phrases:
+            for index, (phrase_text, priority_score) in enumerate(priority_phrases):
                 # Translate and cache
-                translation = await self.deepl_service.translate(phrase_text, language)
+                result = await self.deepl_service.translate(phrase_text, language)
+                translation = result.text if result and result.success else None
                 if translation:
                     await self.cache_service.cache_priority_translation(
                         phrase_text, language, translation, priority_score
                     )
                     cached_count += 1
                 
+                if progress is not None:
+                    progress(index + 1, len(priority_phrases))
+                
                 # Rate limiting
                 await asyncio.sleep(0.1)
             
@@ -437,16 +424,9 @@ class TranslationOrchestrator:
         self.logger.info("Translation Orchestrator shutdown complete")
 
 
-# Global instance
-_orchestrator: Optional[TranslationOrchestrator] = None
-
-
 def get_orchestrator() -> TranslationOrchestrator:
     """Get or create the global translation orchestrator"""
-    global _orchestrator
-    if _orchestrator is None:
-        _orchestrator = TranslationOrchestrator()
-    return _orchestrator
+    return get_container().get('translation_orchestrator')
 
 
 # Convenience functions
@@ -461,9 +441,11 @@ async def translate_text(text: str, target_language: str, user_id: Optional[int]
     return await orchestrator.translate_message(request)
 
 
-async def populate_cache(language: str) -> Dict[str, Any]:
-    """Populate cache for a language"""
-    return await get_orchestrator().populate_cache(language)
+def populate_cache(language: str) -> Dict[str, Any]:
+    """Queue cache population for a language; returns the job (one active run per language)"""
+    from .job_queue import get_job_queue
+    return get_job_queue().enqueue('translation.populate_cache', {'language': language},
+                                   dedup_key=f"translation.populate_cache:{language}")
 
 
 def get_supported_languages() -> Dict[str, str]:
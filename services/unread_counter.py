@@ -0,0 +1,218 @@
+"""
+Unread Counter Service 🔔💬
+Per-participant unread counts kept on ChatParticipant
+SRIMI: Single responsibility for unread message tracking
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+from models import db, Message, ChatParticipant
+
+
+class UnreadCounterService:
+    """
+    ChatParticipant.unread_count is maintained on write instead of counted on read.
+
+    Sending a message increments the counter of every other participant with a
+    single UPDATE inside the send transaction, so the count commits or rolls
+    back with the message. Marking a chat read resets the counter and advances
+    last_read_message_id. Badge deltas are pushed over Socket.IO once the
+    transaction commits; reading a badge is one column on one row.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("🔔 Unread Counter Service initialized")
+
+    # Writes (inside the caller's transaction)
+    def record_message(self, message: Message) -> int:
+        """Count a new message as unread for everyone but its sender (caller commits)"""
+        if message.id is None:
+            db.session.flush()
+
+        recipient_ids = [
+            user_id for (user_id,) in db.session.query(ChatParticipant.user_id).filter(
+                ChatParticipant.chat_id == message.chat_id,
+                ChatParticipant.user_id != message.sender_id
+            ).all()
+        ]
+        if recipient_ids:
+            ChatParticipant.query.filter(
+                ChatParticipant.chat_id == message.chat_id,
+                ChatParticipant.user_id != message.sender_id
+            ).update(
+                {ChatParticipant.unread_count: db.func.coalesce(ChatParticipant.unread_count, 0) + 1},
+                synchronize_session=False
+            )
+
+        # The sender has read everything up to their own message
+        ChatParticipant.query.filter(
+            ChatParticipant.chat_id == message.chat_id,
+            ChatParticipant.user_id == message.sender_id
+        ).update(
+            {ChatParticipant.last_read_message_id: message.id, ChatParticipant.unread_count: 0},
+            synchronize_session=False
+        )
+
+        if recipient_ids:
+            pending = db.session.info.setdefault('unread_pending', [])
+            pending.append((message.chat_id, message.id, recipient_ids))
+        return len(recipient_ids)
+
+    def mark_read(self, user_id: int, chat_id: int, message_id: Optional[int] = None) -> Dict[str, Any]:
+        """Reset a participant's unread count and advance their read marker, then commit"""
+        try:
+            participant = ChatParticipant.query.filter_by(chat_id=chat_id, user_id=user_id).first()
+            if not participant:
+                return {
+                    'success': False,
+                    'error': 'Not a participant in this chat'
+                }
+
+            latest_id = db.session.query(db.func.max(Message.id)).filter(Message.chat_id == chat_id).scalar()
+            read_up_to = min(message_id, latest_id) if message_id and latest_id else latest_id
+            cleared = participant.unread_count or 0
+
+            if read_up_to and (participant.last_read_message_id or 0) < read_up_to:
+                participant.last_read_message_id = read_up_to
+            if read_up_to is None or read_up_to >= (latest_id or 0):
+                participant.unread_count = 0
+            else:
+                # Partial read: only messages after the new marker stay unread
+                participant.unread_count = Message.query.filter(
+                    Message.chat_id == chat_id,
+                    Message.id > participant.last_read_message_id,
+                    Message.sender_id != user_id
+                ).count()
+            db.session.commit()
+
+            delta = participant.unread_count - cleared
+            if delta:
+                self._push(user_id, {
+                    'chat_id': chat_id,
+                    'delta': delta,
+                    'unread_count': participant.unread_count
+                })
+
+            return {
+                'success': True,
+                'chat_id': chat_id,
+                'last_read_message_id': participant.last_read_message_id,
+                'unread_count': participant.unread_count
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"❌ Failed to mark chat {chat_id} read for user {user_id}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def mark_read_event(self, user_id: int, data: Any) -> Dict[str, Any]:
+        """mark_read for a Socket.IO payload ({chat_id, message_id?}), rejecting malformed ids"""
+        try:
+            chat_id = int(data['chat_id'])
+            message_id = data.get('message_id')
+            message_id = int(message_id) if message_id is not None else None
+        except (TypeError, KeyError, ValueError, AttributeError):
+            return {
+                'success': False,
+                'error': 'chat_id (and optional message_id) must be integers'
+            }
+        return self.mark_read(user_id, chat_id, message_id)
+
+    # Reads
+    def get_unread_count(self, user_id: int, chat_id: int) -> int:
+        """Unread messages in one chat"""
+        count = db.session.query(ChatParticipant.unread_count).filter(
+            ChatParticipant.chat_id == chat_id,
+            ChatParticipant.user_id == user_id
+        ).scalar()
+        return count or 0
+
+    def get_unread_counts(self, user_id: int) -> Dict[int, int]:
+        """Unread messages per chat, for chats with any"""
+        rows = db.session.query(ChatParticipant.chat_id, ChatParticipant.unread_count).filter(
+            ChatParticipant.user_id == user_id,
+            ChatParticipant.unread_count > 0
+        ).all()
+        return {chat_id: count for chat_id, count in rows}
+
+    def get_total_unread(self, user_id: int) -> int:
+        """Unread messages across every chat"""
+        total = db.session.query(db.func.sum(ChatParticipant.unread_count)).filter(
+            ChatParticipant.user_id == user_id
+        ).scalar()
+        return int(total or 0)
+
+    def rebuild(self, chat_id: Optional[int] = None, chunk_size: int = 1000) -> int:
+        """
+        Recompute counters from messages after each read marker (repair / migration). Each chunk
+        of participant rows is one UPDATE with a correlated COUNT, committed on its own
+        """
+        participant, message = ChatParticipant.__table__, Message.__table__
+        unread = select(func.count()).select_from(message).where(
+            message.c.chat_id == participant.c.chat_id,
+            message.c.id > func.coalesce(participant.c.last_read_message_id, 0),
+            message.c.sender_id != participant.c.user_id
+        ).scalar_subquery()
+        scope = [participant.c.chat_id == chat_id] if chat_id is not None else []
+
+        updated = 0
+        last_id = db.session.execute(select(func.max(participant.c.id)).where(*scope)).scalar() or 0
+        for start in range(0, last_id, chunk_size):
+            result = db.session.execute(update(participant).where(
+                *scope,
+                participant.c.id > start,
+                participant.c.id <= start + chunk_size,
+                func.coalesce(participant.c.unread_count, -1) != unread
+            ).values(unread_count=unread))
+            db.session.commit()
+            updated += result.rowcount or 0
+
+        self.logger.info(f"🔔 Rebuilt unread counters ({updated} changed)")
+        return updated
+
+    # Delivery
+    def _push(self, user_id: int, badge: Dict[str, Any]) -> None:
+        """Send a badge delta to a user's sockets"""
+        socketio = current_app.extensions.get('socketio') if has_app_context() else None
+        if socketio is None:
+            return
+        socketio.emit('unread', badge, room=f"user_{user_id}")
+
+    def _push_message_deltas(self, sent: List[tuple]) -> None:
+        """Push +1 to every recipient of committed messages"""
+        for chat_id, message_id, recipient_ids in sent:
+            for user_id in recipient_ids:
+                self._push(user_id, {'chat_id': chat_id, 'delta': 1, 'message_id': message_id})
+
+    def _on_commit(self, session) -> None:
+        """Session event: push deltas for messages counted in the committed transaction"""
+        sent = session.info.pop('unread_pending', None)
+        if not sent:
+            return
+        try:
+            self._push_message_deltas(sent)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Unread badge push failed: {e}")
+
+    def _on_rollback(self, session) -> None:
+        """Session event: counters rolled back with the message, drop their deltas"""
+        session.info.pop('unread_pending', None)
+
+
+# Global instance
+_unread_counter = UnreadCounterService()
+
+event.listen(Session, 'after_commit', _unread_counter._on_commit)
+event.listen(Session, 'after_rollback', _unread_counter._on_rollback)
+
+
+def get_unread_counter() -> UnreadCounterService:
+    """Get the global unread counter service"""
+    return _unread_counter
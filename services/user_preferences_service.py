@@ -0,0 +1,95 @@
+"""
+User Preferences Service ⚙️👤
+Typed per-user preferences with batch loading
+SRIMI: Single responsibility for reading and writing user preferences
+"""
+
+import logging
+from typing import Dict, Any, Iterable, Optional
+from models import db, User, UserPreferences
+
+
+class UserPreferencesService:
+    """
+    Preferences live in the user_preferences table, one typed row per user.
+
+    Hot paths read single columns (auto-translate on the message path) or load
+    many users in one query (friend lists), so nothing parses JSON per request.
+    Users without a row get the defaults.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.logger.info("⚙️ User Preferences Service initialized")
+
+    def get_preferences(self, user_id: int) -> UserPreferences:
+        """A user's preferences, or unsaved defaults if they have none"""
+        preferences = UserPreferences.query.get(user_id)
+        return preferences if preferences is not None else UserPreferences(user_id=user_id)
+
+    def load_preferences(self, user_ids: Iterable[int]) -> Dict[int, UserPreferences]:
+        """Preferences for many users in one query, defaults filled in for the rest"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return {}
+        loaded = {
+            preferences.user_id: preferences
+            for preferences in UserPreferences.query.filter(UserPreferences.user_id.in_(user_ids)).all()
+        }
+        for user_id in user_ids - loaded.keys():
+            loaded[user_id] = UserPreferences(user_id=user_id)
+        return loaded
+
+    def get_auto_translate(self, user_id: int) -> bool:
+        """Single-column read for the message path - defaults to auto-translate ON"""
+        value = db.session.query(UserPreferences.auto_translate).filter(
+            UserPreferences.user_id == user_id
+        ).scalar()
+        return True if value is None else value
+
+    def create_default_preferences(self, user: User, auto_translate: bool = True) -> UserPreferences:
+        """Attach a default preferences row to a new user (caller commits)"""
+        preferences = UserPreferences(auto_translate=auto_translate)
+        user.preferences = preferences
+        return preferences
+
+    def update_preferences(self, user: User, data: Dict[str, Any]) -> UserPreferences:
+        """
+        Apply API-shaped preferences, including the fields that live on User (caller commits).
+        Raises ValueError, before changing anything on User, if a value doesn't fit its column
+        """
+        language = data.get('language')
+        preferred = language.get('preferred') if isinstance(language, dict) else None
+        if preferred:
+            preferred = UserPreferences.coerce(User.__table__.c.preferred_language, preferred, 'language.preferred')
+        privacy = data.get('privacy')
+        discoverable = None
+        if isinstance(privacy, dict) and privacy.get('discoverable') is not None:
+            discoverable = UserPreferences.coerce(
+                User.__table__.c.is_discoverable, privacy['discoverable'], 'privacy.discoverable'
+            )
+
+        preferences = user.preferences
+        if preferences is None:
+            preferences = self.create_default_preferences(user)
+        preferences.apply_dict(data)
+
+        if preferred:
+            user.preferred_language = preferred
+        if discoverable is not None:
+            user.is_discoverable = discoverable
+        return preferences
+
+    def set_activity(self, user: User, activity: Optional[str]) -> None:
+        """Update the status text shown to friends (caller commits)"""
+        preferences = user.preferences or self.create_default_preferences(user)
+        preferences.activity = activity[:150] if activity else None
+
+
+# Global instance
+_user_preferences_service = UserPreferencesService()
+
+
+def get_user_preferences_service() -> UserPreferencesService:
+    """Get the global user preferences service instance"""
+    return _user_preferences_service
@@ -6,6 +6,7 @@ Single Responsibility: User profile data aggregation and management
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from models import User, UserType, db
+from services.user_search_index import get_user_search_index
 from dataclasses import dataclass
 
 @dataclass
@@ -79,14 +80,14 @@ class UserProfileService:
         """Search users by username, email, or display name"""
         search_pattern = f"%{search_term.lower()}%"
         
-        # Search each field separately to avoid db.or_ issues
-        username_matches = User.query.filter(User.username.ilike(search_pattern)).limit(limit).all()
+        # Username/display name matches come from the search index, email is matched separately
+        search_index = get_user_search_index()
+        name_matches = search_index.load_users(search_index.search(search_term, limit=limit))
         email_matches = User.query.filter(User.email.ilike(search_pattern)).limit(limit).all()
-        display_name_matches = User.query.filter(User.display_name.ilike(search_pattern)).limit(limit).all()
         
         # Combine results and remove duplicates
         all_users = {}
-        for user in username_matches + email_matches + display_name_matches:
+        for user in name_matches + email_matches:
             all_users[user.id] = user
         
         # Convert to profiles
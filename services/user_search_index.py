@@ -0,0 +1,440 @@
+"""
+User Search Index 🔍👤
+Prefix typeahead and trigram substring search over usernames and display names
+SRIMI: Single responsibility for user lookup by name
+"""
+
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from flask import current_app
+from models import db, read_primary, User, UserChange, UserType
+from sqlalchemy import event, func, inspect, text, literal_column, table, column
+from sqlalchemy.orm import Session
+
+
+# Audience scopes kept as separate sorted structures so filters cost nothing at query time
+SCOPE_ALL = 'all'        # Every user (friend requests, admin suggestions)
+SCOPE_CHILD = 'child'    # Discoverable, unblocked children
+SCOPE_OPEN = 'open'      # Discoverable, unblocked teens and adults
+VISIBLE_SCOPES = (SCOPE_CHILD, SCOPE_OPEN)
+
+# User columns that decide a user's terms and scopes
+INDEXED_FIELDS = ('username', 'display_name', 'user_type', 'is_discoverable', 'is_blocked')
+
+
+class _PrefixScope:
+    """Sorted (term, user_id) pairs stored as a term list and a parallel int array"""
+
+    __slots__ = ('terms', 'ids')
+
+    def __init__(self, pairs: List[Tuple[str, int]] = ()):
+        pairs = sorted(pairs)
+        self.terms = [term for term, _ in pairs]
+        self.ids = array('i', (user_id for _, user_id in pairs))
+
+    def insert(self, term: str, user_id: int) -> None:
+        """Insert a pair at its sorted position"""
+        index = bisect_left(self.terms, term)
+        while index < len(self.terms) and self.terms[index] == term and self.ids[index] < user_id:
+            index += 1
+        self.terms.insert(index, term)
+        self.ids.insert(index, user_id)
+
+    def remove(self, term: str, user_id: int) -> None:
+        """Remove a pair if present"""
+        index = bisect_left(self.terms, term)
+        while index < len(self.terms) and self.terms[index] == term:
+            if self.ids[index] == user_id:
+                del self.terms[index]
+                del self.ids[index]
+                return
+            index += 1
+
+    def scan(self, prefix: str) -> Iterable[Tuple[str, int]]:
+        """Pairs whose term starts with the prefix, in term order"""
+        index = bisect_left(self.terms, prefix)
+        terms, ids = self.terms, self.ids
+        while index < len(terms) and terms[index].startswith(prefix):
+            yield terms[index], ids[index]
+            index += 1
+
+
+class UserSearchIndex:
+    """
+    In-memory prefix index over lowercased usernames and display names.
+
+    Typeahead is a binary search plus a short range scan, so it stays fast
+    regardless of table size. Users are placed in audience scopes when indexed,
+    so age and discoverability filters are applied by picking a scope rather
+    than by filtering rows. Commits that touch User update the index through
+    mapper events, which also append the user to the UserChange log; every
+    `refresh_interval` seconds the index re-reads new users and users logged
+    since its last refresh, so changes made by other workers show up too. A
+    full rebuild every `rebuild_interval` seconds runs on a background thread
+    while searches keep using the current index. Substring matches fall back to
+    a trigram index in the database (FTS5 trigram on SQLite, pg_trgm on PostgreSQL).
+    """
+
+    FTS_TABLE = 'user_search_fts'
+
+    def __init__(self, refresh_interval: int = 60, rebuild_interval: int = 3600):
+        self.logger = logging.getLogger(__name__)
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval  # Full reload catches changes made outside the ORM
+        self.scopes = {}
+        self.entries = {}  # user_id -> (terms, scope names) for incremental updates
+        self.max_user_id = 0
+        self.max_change_id = 0  # Last UserChange row applied
+        self.loaded_at = 0.0
+        self.refreshed_at = 0.0
+        self.trigram_available = None
+        self._lock = threading.RLock()
+        self._rebuilding = False
+        self.logger.info("🔍 User Search Index initialized")
+
+    # Searches
+    @staticmethod
+    def scope_for(user_type) -> str:
+        """Scope a searcher may see under the platform's age rules"""
+        return SCOPE_CHILD if user_type == UserType.CHILD else SCOPE_OPEN
+
+    def search_prefix(self, query: str, scopes: Iterable[str] = (SCOPE_ALL,), limit: int = 10,
+                      exclude_ids: Iterable[int] = ()) -> List[int]:
+        """User ids whose username or display name starts with the query - exact username first"""
+        prefix = (query or '').strip().lower()
+        if not prefix:
+            return []
+        self._ensure_fresh()
+
+        excluded = set(exclude_ids)
+        matches = []
+        with self._lock:
+            for scope_name in scopes:
+                found = 0
+                for term, user_id in self.scopes[scope_name].scan(prefix):
+                    if user_id in excluded:
+                        continue
+                    matches.append((term != prefix, term, user_id))
+                    found += 1
+                    if found >= limit * 2:  # Headroom for users matching on both fields
+                        break
+
+        ordered, seen = [], set()
+        for _, _, user_id in sorted(matches):
+            if user_id not in seen:
+                seen.add(user_id)
+                ordered.append(user_id)
+                if len(ordered) >= limit:
+                    break
+        return ordered
+
+    def search(self, query: str, scopes: Iterable[str] = (SCOPE_ALL,), limit: int = 10,
+               exclude_ids: Iterable[int] = ()) -> List[int]:
+        """Prefix matches first, then substring matches from the trigram index"""
+        scopes = tuple(scopes)
+        exclude_ids = set(exclude_ids)
+        user_ids = self.search_prefix(query, scopes, limit, exclude_ids)
+        if len(user_ids) < limit and len((query or '').strip()) >= 3:
+            user_ids.extend(self._search_substring(
+                query.strip().lower(), scopes, limit - len(user_ids), exclude_ids | set(user_ids)
+            ))
+        return user_ids
+
+    def load_users(self, user_ids: List[int]) -> List[User]:
+        """Fetch users for ranked ids in one query, preserving rank order"""
+        if not user_ids:
+            return []
+        users = {user.id: user for user in User.query.filter(User.id.in_(user_ids)).all()}
+        return [users[user_id] for user_id in user_ids if user_id in users]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get user search index statistics"""
+        with self._lock:
+            return {
+                'users_indexed': len(self.entries),
+                'scopes': {name: len(scope.terms) for name, scope in self.scopes.items()},
+                'trigram_available': self.trigram_available,
+                'age_seconds': round(time.time() - self.loaded_at, 1) if self.loaded_at else None
+            }
+
+    # Index maintenance
+    def index_user(self, user_id: int, username: str, display_name: Optional[str], user_type,
+                   is_discoverable: bool, is_blocked: bool) -> None:
+        """Add or re-index one user"""
+        terms = tuple({term.lower() for term in (username, display_name) if term})
+        scopes = [SCOPE_ALL]
+        if is_discoverable and not is_blocked:
+            scopes.append(SCOPE_CHILD if user_type == UserType.CHILD else SCOPE_OPEN)
+
+        with self._lock:
+            if not self.loaded_at:
+                return  # Not materialized yet, the lazy load will pick it up
+            if self.entries.get(user_id) == (terms, tuple(scopes)):
+                return
+            self.remove_user(user_id)
+            for scope_name in scopes:
+                for term in terms:
+                    self.scopes[scope_name].insert(term, user_id)
+            self.entries[user_id] = (terms, tuple(scopes))
+            self.max_user_id = max(self.max_user_id, user_id)
+
+    def remove_user(self, user_id: int) -> None:
+        """Drop a user from every scope"""
+        with self._lock:
+            entry = self.entries.pop(user_id, None)
+            if not entry:
+                return
+            terms, scopes = entry
+            for scope_name in scopes:
+                for term in terms:
+                    self.scopes[scope_name].remove(term, user_id)
+
+    @read_primary()
+    def rebuild(self) -> int:
+        """Load every user into fresh scopes, returns users indexed"""
+        # Changes committed while the users are read are re-read by the next refresh
+        max_change_id = db.session.query(func.max(UserChange.id)).scalar() or 0
+        rows = db.session.query(
+            User.id, User.username, User.display_name, User.user_type, User.is_discoverable, User.is_blocked
+        ).yield_per(10000)
+        indexed = self.load_rows(rows)
+        with self._lock:
+            self.max_change_id = max_change_id
+
+        # Every worker has rebuilt since older changes were logged
+        cutoff = datetime.utcnow() - timedelta(seconds=self.rebuild_interval * 2)
+        UserChange.query.filter(UserChange.changed_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return indexed
+
+    def load_rows(self, rows: Iterable[tuple]) -> int:
+        """Replace the index with (id, username, display_name, user_type, is_discoverable, is_blocked) rows"""
+        pairs = {SCOPE_ALL: [], SCOPE_CHILD: [], SCOPE_OPEN: []}
+        entries = {}
+        max_user_id = 0
+        for user_id, username, display_name, user_type, is_discoverable, is_blocked in rows:
+            terms = tuple({term.lower() for term in (username, display_name) if term})
+            scopes = [SCOPE_ALL]
+            if is_discoverable and not is_blocked:
+                scopes.append(SCOPE_CHILD if user_type == UserType.CHILD else SCOPE_OPEN)
+            for scope_name in scopes:
+                pairs[scope_name].extend((term, user_id) for term in terms)
+            entries[user_id] = (terms, tuple(scopes))
+            max_user_id = max(max_user_id, user_id)
+
+        scopes = {name: _PrefixScope(scope_pairs) for name, scope_pairs in pairs.items()}
+        with self._lock:
+            self.scopes = scopes
+            self.entries = entries
+            self.max_user_id = max_user_id
+            self.loaded_at = self.refreshed_at = time.time()
+
+        self.logger.info(f"🔍 Indexed {len(entries)} users for search")
+        return len(entries)
+
+    @read_primary()
+    def _ensure_fresh(self) -> None:
+        """Lazy load, pick up new and changed users periodically, and rebuild in the background when stale"""
+        now = time.time()
+        if not self.loaded_at:
+            self.rebuild()
+            return
+        if now - self.loaded_at > self.rebuild_interval:
+            self._start_rebuild()
+        if now - self.refreshed_at < self.refresh_interval:
+            return
+
+        self.refreshed_at = now
+        changes = db.session.query(UserChange.id, UserChange.user_id).filter(
+            UserChange.id > self.max_change_id
+        ).all()
+        changed_ids = {user_id for _, user_id in changes}
+        criteria = User.id > self.max_user_id
+        if changed_ids:
+            criteria = db.or_(criteria, User.id.in_(changed_ids))
+        rows = db.session.query(
+            User.id, User.username, User.display_name, User.user_type, User.is_discoverable, User.is_blocked
+        ).filter(criteria).all()
+
+        for row in rows:
+            self.index_user(*row)
+        for user_id in changed_ids - {row[0] for row in rows}:
+            self.remove_user(user_id)  # Deleted since it was indexed
+        if changes:
+            with self._lock:
+                self.max_change_id = max(self.max_change_id, max(change_id for change_id, _ in changes))
+
+    def _start_rebuild(self) -> None:
+        """Rebuild on a background thread; searches keep using the current index meanwhile"""
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        app = current_app._get_current_object()
+
+        def rebuild_task():
+            try:
+                with app.app_context():
+                    self.rebuild()
+            except Exception as e:
+                self.logger.error(f"❌ User search index rebuild failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=rebuild_task, name='user-search-rebuild', daemon=True).start()
+
+    # Substring fallback
+    def ensure_trigram_index(self) -> bool:
+        """Create the dialect's trigram index once per process"""
+        if self.trigram_available is not None:
+            return self.trigram_available
+
+        with self._lock:
+            if self.trigram_available is not None:
+                return self.trigram_available
+
+            dialect = db.engine.dialect.name
+            try:
+                if dialect == 'sqlite':
+                    self._create_sqlite_trigram()
+                elif dialect == 'postgresql':
+                    self._create_postgres_trigram()
+                else:
+                    self.trigram_available = False
+                    return False
+                self.trigram_available = True
+                self.logger.info(f"🔍 User trigram index ready ({dialect})")
+            except Exception as e:
+                self.trigram_available = False
+                self.logger.warning(f"⚠️ User trigram index unavailable, using ILIKE fallback: {e}")
+
+        return self.trigram_available
+
+    def _search_substring(self, needle: str, scopes: Tuple[str, ...], limit: int, exclude_ids: set) -> List[int]:
+        """Substring matches with the same scope filters, served by the trigram index"""
+        query = db.session.query(User.id)
+        if SCOPE_ALL not in scopes:
+            query = query.filter(User.is_discoverable == True, User.is_blocked == False)
+            user_types = []
+            if SCOPE_CHILD in scopes:
+                user_types.append(UserType.CHILD)
+            if SCOPE_OPEN in scopes:
+                user_types.extend([UserType.TEEN, UserType.ADULT])
+            query = query.filter(User.user_type.in_(user_types))
+        if exclude_ids:
+            query = query.filter(User.id.notin_(exclude_ids))
+
+        pattern = '%' + needle.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        dialect = db.engine.dialect.name
+        if self.ensure_trigram_index() and dialect == 'sqlite':
+            fts = table(self.FTS_TABLE, column('rowid'))
+            query = query.join(fts, fts.c.rowid == User.id).filter(
+                literal_column(self.FTS_TABLE).op('MATCH')('"' + needle.replace('"', '""') + '"')
+            )
+        elif self.trigram_available and dialect == 'postgresql':
+            query = query.filter(db.or_(
+                db.func.lower(User.username).like(pattern, escape='\\'),
+                db.func.lower(User.display_name).like(pattern, escape='\\')
+            ))
+        else:
+            query = query.filter(db.or_(
+                User.username.ilike(pattern, escape='\\'),
+                User.display_name.ilike(pattern, escape='\\')
+            ))
+
+        return [user_id for (user_id,) in query.limit(limit).all()]
+
+    def _create_sqlite_trigram(self) -> None:
+        """FTS5 trigram table kept in sync with user by triggers, then backfilled"""
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.FTS_TABLE} USING fts5(username, display_name, tokenize='trigram')",
+            f"""CREATE TRIGGER IF NOT EXISTS user_search_fts_insert AFTER INSERT ON "user" BEGIN
+                INSERT INTO {self.FTS_TABLE}(rowid, username, display_name)
+                VALUES (new.id, new.username, coalesce(new.display_name, ''));
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS user_search_fts_update AFTER UPDATE OF username, display_name ON "user" BEGIN
+                DELETE FROM {self.FTS_TABLE} WHERE rowid = old.id;
+                INSERT INTO {self.FTS_TABLE}(rowid, username, display_name)
+                VALUES (new.id, new.username, coalesce(new.display_name, ''));
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS user_search_fts_delete AFTER DELETE ON "user" BEGIN
+                DELETE FROM {self.FTS_TABLE} WHERE rowid = old.id;
+            END""",
+            f"""INSERT INTO {self.FTS_TABLE}(rowid, username, display_name)
+                SELECT id, username, coalesce(display_name, '') FROM "user"
+                WHERE id NOT IN (SELECT rowid FROM {self.FTS_TABLE})"""
+        ]
+        with db.engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+
+    def _create_postgres_trigram(self) -> None:
+        """pg_trgm GIN indexes on the lowercased name columns"""
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                'CREATE INDEX IF NOT EXISTS idx_user_username_trgm ON "user" USING GIN (lower(username) gin_trgm_ops)'
+            ))
+            connection.execute(text(
+                'CREATE INDEX IF NOT EXISTS idx_user_display_name_trgm ON "user" USING GIN (lower(display_name) gin_trgm_ops)'
+            ))
+
+    # Change tracking - User rows flushed in a session are applied when it commits
+    def _on_user_flushed(self, mapper, connection, target) -> None:
+        """Mapper event: remember an inserted/updated user for the commit"""
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault('user_search_pending', {})[target.id] = (
+                target.username, target.display_name, target.user_type, target.is_discoverable, target.is_blocked
+            )
+
+    def _on_user_updated(self, mapper, connection, target) -> None:
+        """Mapper event: log changes to indexed fields for other workers (last_seen and the like are skipped)"""
+        state = inspect(target)
+        if not any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+            return
+        connection.execute(UserChange.__table__.insert().values(user_id=target.id, changed_at=datetime.utcnow()))
+        self._on_user_flushed(mapper, connection, target)
+
+    def _on_user_deleted(self, mapper, connection, target) -> None:
+        """Mapper event: remember a deleted user for the commit and log it for other workers"""
+        connection.execute(UserChange.__table__.insert().values(user_id=target.id, changed_at=datetime.utcnow()))
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault('user_search_pending', {})[target.id] = None
+
+    def _on_commit(self, session) -> None:
+        """Session event: apply pending user changes"""
+        pending = session.info.pop('user_search_pending', None)
+        if not pending or not self.loaded_at:
+            return
+        for user_id, row in pending.items():
+            if row is None:
+                self.remove_user(user_id)
+            else:
+                self.index_user(user_id, *row)
+
+    def _on_rollback(self, session) -> None:
+        """Session event: discard pending user changes"""
+        session.info.pop('user_search_pending', None)
+
+
+# Global instance
+_user_search_index = UserSearchIndex()
+
+event.listen(User, 'after_insert', _user_search_index._on_user_flushed)
+event.listen(User, 'after_update', _user_search_index._on_user_updated)
+event.listen(User, 'after_delete', _user_search_index._on_user_deleted)
+event.listen(Session, 'after_commit', _user_search_index._on_commit)
+event.listen(Session, 'after_rollback', _user_search_index._on_rollback)
+
+
+def get_user_search_index() -> UserSearchIndex:
+    """Get the global user search index instance"""
+    return _user_search_index
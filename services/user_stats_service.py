@@ -3,11 +3,16 @@ User Statistics Service - SRIMI Microservice
 Single Responsibility: User statistics aggregation and metrics
 """
 
-from typing import Dict, Any
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
 from models import User, UserType, db
 from dataclasses import dataclass
+from sqlalchemy import func, case
 
-@dataclass
+@dataclass(frozen=True)
 class UserStats:
     """User statistics data structure"""
     total_users: int
@@ -22,41 +27,78 @@ class UserStats:
     new_users_month: int
 
 class UserStatsService:
-    """Micro-service for user statistics"""
+    """Micro-service for user statistics
     
-    def __init__(self):
-        self.cache = {}
-        self.cache_ttl = 60  # 1 minute cache
+    All counters come from one aggregate query over User and are cached for
+    `cache_ttl` seconds, shared by every caller. Only one thread recomputes an
+    expired snapshot; the others keep serving the previous one meanwhile.
+    With background refresh enabled, an expired snapshot is served as is
+    while a background task recomputes it, so only the first dashboard
+    request waits for the count. Refreshes follow demand - an idle worker
+    runs no queries.
+    """
     
-    def get_basic_stats(self) -> UserStats:
-        """Get basic user statistics"""
-        from datetime import datetime, timedelta
-        
-        # Basic counts
-        total_users = User.query.count()
-        online_users = User.query.filter(User.is_online == True).count()
-        offline_users = total_users - online_users
-        premium_users = User.query.filter(User.is_premium == True).count()
-        blocked_users = User.query.filter(User.is_blocked == True).count()
-        
-        # User type counts
-        adult_users = User.query.filter(User.user_type == UserType.ADULT).count()
-        teen_users = User.query.filter(User.user_type == UserType.TEEN).count()
+    def __init__(self, cache_ttl: int = 60):
+        self.logger = logging.getLogger(__name__)
+        self.cache = {}  # 'basic' -> (computed_at, UserStats)
+        self.cache_ttl = cache_ttl  # 1 minute cache
+        self.refreshes = 0
+        self._refresh_lock = threading.Lock()
+        self._background_app = None
+        self._background_socketio = None
+    
+    def get_basic_stats(self, max_age: Optional[float] = None) -> UserStats:
+        """Get basic user statistics (cached snapshot, at most `max_age` seconds old)"""
+        max_age = self.cache_ttl if max_age is None else max_age
+        cached = self.cache.get('basic')
+        if cached and time.time() - cached[0] < max_age:
+            return cached[1]
         
-        # New user counts
+        # Single flight - if another caller is already counting, serve its previous snapshot
+        if not self._refresh_lock.acquire(blocking=cached is None):
+            return cached[1]
+        background = False
+        try:
+            cached = self.cache.get('basic')
+            if cached and time.time() - cached[0] < max_age:
+                return cached[1]
+            if cached and self._background_app is not None:
+                self._start_background_refresh()  # Releases the lock when done
+                background = True
+                return cached[1]
+            return self.refresh()
+        finally:
+            if not background:
+                self._refresh_lock.release()
+    
+    def refresh(self) -> UserStats:
+        """Recompute every counter in one grouped aggregate query"""
         now = datetime.utcnow()
         today = now.replace(hour=0, minute=0, second=0, microsecond=0)
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
         
-        new_users_today = User.query.filter(User.created_at >= today).count()
-        new_users_week = User.query.filter(User.created_at >= week_ago).count()
-        new_users_month = User.query.filter(User.created_at >= month_ago).count()
+        def count_where(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
         
-        return UserStats(
+        row = db.session.query(
+            func.count(User.id),
+            count_where(User.is_online == True),
+            count_where(User.is_premium == True),
+            count_where(User.is_blocked == True),
+            count_where(User.user_type == UserType.ADULT),
+            count_where(User.user_type == UserType.TEEN),
+            count_where(User.created_at >= today),
+            count_where(User.created_at >= week_ago),
+            count_where(User.created_at >= month_ago)
+        ).one()
+        total_users, online_users, premium_users, blocked_users, adult_users, teen_users, \
+            new_users_today, new_users_week, new_users_month = (int(value or 0) for value in row)
+        
+        stats = UserStats(
             total_users=total_users,
             online_users=online_users,
-            offline_users=offline_users,
+            offline_users=total_users - online_users,
             premium_users=premium_users,
             blocked_users=blocked_users,
             adult_users=adult_users,
@@ -65,6 +107,48 @@ class UserStatsService:
             new_users_week=new_users_week,
             new_users_month=new_users_month
         )
+        self.cache['basic'] = (time.time(), stats)
+        self.refreshes += 1
+        return stats
+    
+    def invalidate(self) -> None:
+        """Drop the cached snapshot (e.g. after bulk user changes)"""
+        self.cache.pop('basic', None)
+    
+    def enable_background_refresh(self, app, socketio=None) -> None:
+        """Recompute expired snapshots in a background task (called once at app startup)"""
+        self._background_app = app
+        self._background_socketio = socketio
+        self.logger.info("📊 Expired user stats are refreshed in the background on demand")
+    
+    def _start_background_refresh(self) -> None:
+        """Run one refresh off the request path - the caller holds the refresh lock"""
+        app = self._background_app
+        
+        def refresh_task():
+            try:
+                with app.app_context():
+                    self.refresh()
+                    db.session.remove()
+            except Exception as e:
+                self.logger.warning(f"⚠️ User stats refresh failed: {e}")
+            finally:
+                self._refresh_lock.release()
+        
+        if self._background_socketio is not None:
+            self._background_socketio.start_background_task(refresh_task)
+        else:
+            threading.Thread(target=refresh_task, name='user-stats-refresh', daemon=True).start()
+    
+    def get_cache_info(self) -> Dict[str, Any]:
+        """Get snapshot age and refresh count"""
+        cached = self.cache.get('basic')
+        return {
+            'cache_ttl': self.cache_ttl,
+            'age_seconds': round(time.time() - cached[0], 1) if cached else None,
+            'refreshes': self.refreshes,
+            'background_refresh': self._background_app is not None
+        }
     
     def get_user_distribution(self) -> Dict[str, Any]:
         """Get user type distribution"""
@@ -6,10 +6,15 @@ Handles real-time messaging and WebSocket events
 import logging
 from datetime import datetime
 from typing import Dict, Any
+from flask import current_app, request
 from flask_socketio import emit, join_room, leave_room
 from models import db, ChatParticipant, User
 from .message_service import get_message_service
 from .chat_service import get_chat_service
+from .activity_feed import get_activity_feed
+from .social_graph import get_social_graph
+from .unread_counter import get_unread_counter
+from .tracing import get_tracer, traced
 
 
 class WebSocketService:
@@ -32,26 +37,23 @@ class WebSocketService:
         self.socketio.on_event('leave_chat', self.handle_leave_chat)
         self.socketio.on_event('send_message', self.handle_send_message)
         self.socketio.on_event('typing', self.handle_typing)
+        self.socketio.on_event('mark_read', self.handle_mark_read)
     
     def handle_connect(self):
         """Handle user connection"""
         from flask_login import current_user
         
         if current_user.is_authenticated:
-            current_user.is_online = True
-            current_user.last_seen = datetime.utcnow()
-            db.session.commit()
-            join_room(f"user_{current_user.id}")
+            user_connected(current_user)
             self.logger.info(f"User {current_user.username} connected")
     
     def handle_disconnect(self):
         """Handle user disconnection"""
         from flask_login import current_user
         
+        socket_disconnected()
         if current_user.is_authenticated:
-            current_user.is_online = False
-            current_user.last_seen = datetime.utcnow()
-            db.session.commit()
+            user_disconnected(current_user)
             self.logger.info(f"User {current_user.username} disconnected")
     
     def handle_join_chat(self, data):
@@ -81,6 +83,7 @@ class WebSocketService:
         chat_id = data['chat_id']
         leave_room(f"chat_{chat_id}")
     
+    @traced('socket.send_message', root=True)
     def handle_send_message(self, data):
         """Handle sending a message"""
         from flask_login import current_user
@@ -92,17 +95,22 @@ class WebSocketService:
         chat_id = data['chat_id']
         message_text = data['message']
         
+        tracer = get_tracer()
+        
+        # Verify chat access (before consuming any rate limit)
+        with tracer.span('send.chat_access'):
+            has_access = self.chat_service.verify_chat_access(current_user, chat_id)
+        if not has_access:
+            emit('message_error', {'error': 'Unauthorized'})
+            return
+        
         # Check message limits
-        limit_check = self.message_service.check_message_limits(current_user)
+        with tracer.span('send.rate_limit'):
+            limit_check = self.message_service.check_message_limits(current_user)
         if not limit_check['can_send']:
             emit('message_error', limit_check)
             return
         
-        # Verify chat access
-        if not self.chat_service.verify_chat_access(current_user, chat_id):
-            emit('message_error', {'error': 'Unauthorized'})
-            return
-        
         # Create message
         message = self.message_service.create_message(current_user, chat_id, message_text)
         
@@ -110,7 +118,8 @@ class WebSocketService:
         translations = self.message_service.translate_for_participants(current_user, message)
         
         # Send to all participants
-        self._broadcast_message(message, translations)
+        with tracer.span('send.broadcast'):
+            self._broadcast_message(message, translations)
     
     def handle_typing(self, data):
         """Handle typing indicators"""
@@ -128,6 +137,17 @@ class WebSocketService:
             'is_typing': is_typing
         }, room=f"chat_{chat_id}", include_self=False)
     
+    def handle_mark_read(self, data=None):
+        """Handle a client marking a chat read"""
+        from flask_login import current_user
+        
+        if not current_user.is_authenticated:
+            return
+        
+        result = get_unread_counter().mark_read_event(current_user.id, data)
+        if not result['success']:
+            emit('error', {'message': result['error']})
+    
     def _broadcast_message(self, message, translations):
         """Broadcast message to all participants"""
         from flask_login import current_user
@@ -185,6 +205,32 @@ class WebSocketService:
             }, room=f"user_{user_id}")
 
 
+def user_connected(user) -> None:
+    """Connect bookkeeping shared by every registered connect handler"""
+    user.is_online = True
+    user.last_seen = datetime.utcnow()
+    db.session.commit()
+    join_room(f"user_{user.id}")
+    get_activity_feed().record_presence(user, get_social_graph().get_friend_ids(user.id))
+    signaling = current_app.extensions.get('signaling')
+    if signaling:
+        signaling.register_socket(request.sid, user)
+
+
+def user_disconnected(user) -> None:
+    """Disconnect bookkeeping shared by every registered disconnect handler"""
+    user.is_online = False
+    user.last_seen = datetime.utcnow()
+    db.session.commit()
+
+
+def socket_disconnected() -> None:
+    """Drop per-socket caches - runs for every socket, authenticated or not"""
+    signaling = current_app.extensions.get('signaling')
+    if signaling:
+        signaling.forget_socket(request.sid)
+
+
 # Global instance
 _websocket_service = None
 
@@ -137,7 +137,7 @@ function displayActiveChats(chats) {
                     <div class="w-12 h-12 rounded-full bg-blue-500/10 flex items-center justify-center">
                         <i class="ri-${chat.type === 'direct' ? 'user' : chat.type === 'group' ? 'group' : 'chat-3'}-line text-blue-400 text-xl"></i>
                     </div>
-                    ${chat.unreadCount > 0 ? `<div class="absolute -top-1 -right-1 w-5 h-5 bg-primary text-white text-xs rounded-full flex items-center justify-center font-bold">${chat.unreadCount}</div>` : ''}
+                    <div class="unread-badge absolute -top-1 -right-1 w-5 h-5 bg-primary text-white text-xs rounded-full flex items-center justify-center font-bold${chat.unreadCount > 0 ? '' : ' hidden'}" data-unread="${chat.unreadCount || 0}">${chat.unreadCount || ''}</div>
                 </div>
                 
                 <div class="flex-1 min-w-0">
@@ -204,6 +204,9 @@ function rejoinChat(chatId) {
     const chatItem = document.querySelector(`[data-chat-id="${chatId}"]`);
     const chatName = chatItem ? chatItem.querySelector('.font-medium').textContent : `Chat ${chatId}`;
     
+    // Opening the chat reads it - the server pushes the badge reset
+    api.chats.markChatRead(chatId).catch(() => {});
+    
     // Close active chats modal
     closeActiveChats();
     
@@ -297,7 +300,24 @@ function closeActiveChats() {
     if (modal) modal.remove();
 }
 
-// 12. GLOBAL EVENT LISTENERS
+// 12. UNREAD BADGES
+function applyUnreadDelta(update) {
+    const badge = document.querySelector(`[data-chat-id="${update.chat_id}"] .unread-badge`);
+    if (!badge) return;
+    
+    const count = update.unread_count !== undefined
+        ? update.unread_count
+        : Math.max(0, parseInt(badge.dataset.unread || '0', 10) + update.delta);
+    badge.dataset.unread = count;
+    badge.textContent = count || '';
+    badge.classList.toggle('hidden', count === 0);
+}
+
+if (typeof io !== 'undefined') {
+    io().on('unread', applyUnreadDelta);
+}
+
+// 13. GLOBAL EVENT LISTENERS
 document.addEventListener('keydown', function(e) {
     const modal = document.getElementById('active-chats-modal');
     if (modal && e.key === 'Escape') closeActiveChats();
@@ -148,6 +148,14 @@ class ChatService {
     async createChat(name, participants = []) {
         return this.api.post('/chats', { name, participants });
     }
+
+    async markChatRead(chatId, messageId = null) {
+        return this.api.post(`/chats/${chatId}/read`, messageId ? { message_id: messageId } : {});
+    }
+
+    async getUnreadCounts() {
+        return this.api.get('/chats/unread');
+    }
 }
 
 // User Service
@@ -217,8 +225,8 @@ class ActivityService {
         this.api = apiClient;
     }
 
-    async getRecentActivity() {
-        return this.api.get('/activity/recent');
+    async getRecentActivity(since = null) {
+        return this.api.get('/activity/recent', since ? { since } : {});
     }
 
     async getUserActivity(userId) {
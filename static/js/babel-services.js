@@ -78,8 +78,9 @@ class ApiService {
         });
     }
 
-    async getTimeline(page = 1, perPage = 20) {
-        return this.request(`/api/babel/timeline?page=${page}&per_page=${perPage}`);
+    async getTimeline(cursor = null, perPage = 20) {
+        const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+        return this.request(`/api/babel/timeline?per_page=${perPage}${cursorParam}`);
     }
 
     async likePost(postId) {
@@ -102,7 +103,8 @@ class ApiService {
 class StateService {
     constructor() {
         this.state = {
-            currentPage: 1,
+            nextCursor: null,
+            hasMore: true,
             selectedPostType: 'text',
             posts: [],
             loading: false,
@@ -377,10 +379,7 @@ class TimelineService {
         this.dom.register('timelinePosts', '#timelinePosts');
         this.dom.register('loadingState', '#loadingState');
         this.dom.register('emptyState', '#emptyState');
-        this.dom.register('pagination', '#pagination');
-        this.dom.register('prevBtn', '#prevBtn');
-        this.dom.register('nextBtn', '#nextBtn');
-        this.dom.register('pageInfo', '#pageInfo');
+        this.dom.register('timelineSentinel', '#timelineSentinel');
     }
 
     setupEventListeners() {
@@ -389,44 +388,58 @@ class TimelineService {
             this.loadTimeline();
         });
 
-        // Pagination
-        this.events.on('#prevBtn', 'click', () => {
-            const currentPage = this.state.getState('currentPage');
-            if (currentPage > 1) {
-                this.state.setState({ currentPage: currentPage - 1 });
-                this.loadTimeline();
-            }
-        });
-
-        this.events.on('#nextBtn', 'click', () => {
-            const currentPage = this.state.getState('currentPage');
-            this.state.setState({ currentPage: currentPage + 1 });
-            this.loadTimeline();
-        });
+        // Infinite scroll - each page is a keyset cursor fetch, constant cost
+        const sentinel = this.dom.get('timelineSentinel');
+        if (sentinel && 'IntersectionObserver' in window) {
+            this.observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadMore();
+                }
+            }, { rootMargin: '400px' });
+            this.observer.observe(sentinel);
+        }
     }
 
     async loadTimeline() {
+        this.state.setState({ posts: [], nextCursor: null, hasMore: true });
         this.showLoading();
-        
-        const page = this.state.getState('currentPage');
-        const result = await this.api.getTimeline(page, 20);
+        await this.fetchPage();
+        this.hideLoading();
+    }
+
+    async loadMore() {
+        if (this.state.getState('loading') || !this.state.getState('hasMore')) {
+            return;
+        }
+        await this.fetchPage();
+    }
+
+    async fetchPage() {
+        this.state.setState({ loading: true });
+
+        const cursor = this.state.getState('nextCursor');
+        const result = await this.api.getTimeline(cursor, 20);
         
         if (result.success) {
+            const pagination = result.data.pagination;
             this.state.setState({
-                posts: result.data.posts,
-                pagination: result.data.pagination,
+                posts: this.state.getState('posts').concat(result.data.posts),
+                pagination: pagination,
+                nextCursor: pagination.next_cursor,
+                hasMore: pagination.has_next,
                 loading: false
             });
-            this.renderTimeline();
-            this.updatePagination(result.data.pagination);
+            if (cursor) {
+                this.appendPosts(result.data.posts);
+            } else {
+                this.renderTimeline();
+            }
         } else {
             this.state.setState({ 
                 error: result.data?.error || 'Failed to load timeline',
                 loading: false 
             });
         }
-        
-        this.hideLoading();
     }
 
     renderTimeline() {
@@ -443,6 +456,13 @@ class TimelineService {
         this.dom.setHtml('timelinePosts', postsHtml);
     }
 
+    appendPosts(posts) {
+        const container = this.dom.get('timelinePosts');
+        if (container && posts.length > 0) {
+            container.insertAdjacentHTML('beforeend', posts.map(post => this.renderPost(post)).join(''));
+        }
+    }
+
     renderPost(post) {
         const timeAgo = this.getTimeAgo(new Date(post.created_at));
         const userInitials = (post.user.display_name || post.user.username).charAt(0).toUpperCase();
@@ -518,23 +538,6 @@ class TimelineService {
         return 'now';
     }
 
-    updatePagination(pagination) {
-        if (pagination.total > pagination.per_page) {
-            this.dom.show('pagination');
-            
-            const prevBtn = this.dom.get('prevBtn');
-            const nextBtn = this.dom.get('nextBtn');
-            
-            if (prevBtn) prevBtn.disabled = !pagination.has_prev;
-            if (nextBtn) nextBtn.disabled = !pagination.has_next;
-            
-            const totalPages = Math.ceil(pagination.total / pagination.per_page);
-            this.dom.setText('pageInfo', `Page ${pagination.page} of ${totalPages}`);
-        } else {
-            this.dom.hide('pagination');
-        }
-    }
-
     showLoading() {
         this.dom.show('loadingState');
         this.dom.hide('timelinePosts');
@@ -589,6 +592,39 @@ class InteractionService {
     }
 }
 
+// Microservice 8: Live Engagement Service
+class EngagementService {
+    constructor() {
+        this.socket = null;
+        this.init();
+    }
+
+    init() {
+        if (typeof io === 'undefined') {
+            return;
+        }
+
+        this.socket = io();
+        this.socket.on('connect', () => this.socket.emit('join_babel_feed'));
+        this.socket.on('babel_engagement_update', (data) => this.applyUpdates(data.posts || []));
+    }
+
+    applyUpdates(posts) {
+        posts.forEach(update => {
+            const postElement = document.querySelector(`[data-post-id="${update.post_id}"]`);
+            if (!postElement) return;
+
+            const buttons = postElement.querySelectorAll('.post-actions-bar .action-btn');
+            if (buttons[0]) {
+                const liked = buttons[0].classList.contains('liked');
+                buttons[0].innerHTML = `❤️ ${update.likes_count}`;
+                buttons[0].classList.toggle('liked', liked);
+            }
+            if (buttons[1]) buttons[1].innerHTML = `💬 ${update.comments_count}`;
+        });
+    }
+}
+
 // Main Application Service (Orchestrator)
 class BabelApplication {
     constructor() {
@@ -608,6 +644,7 @@ class BabelApplication {
             ['apiService', 'stateService', 'domService', 'eventService']);
         serviceRegistry.register('interactionService', InteractionService,
             ['apiService', 'stateService', 'eventService']);
+        serviceRegistry.register('engagementService', EngagementService);
 
         // Get service instances
         this.services.api = serviceRegistry.get('apiService');
@@ -617,6 +654,7 @@ class BabelApplication {
         this.services.postCreation = serviceRegistry.get('postCreationService');
         this.services.timeline = serviceRegistry.get('timelineService');
         this.services.interaction = serviceRegistry.get('interactionService');
+        this.services.engagement = serviceRegistry.get('engagementService');
 
         console.log('Babel microservices initialized:', serviceRegistry.list());
     }
@@ -66,18 +66,27 @@ async function loadRealActivityData() {
 }
 
 // 3. LOAD REAL ACTIVITY MESSAGES
+// Feed events are newest first; `activityCursor` is the newest one seen so far
+let recentActivities = [];
+let activityCursor = null;
+
+function mergeActivities(activities) {
+    if (!activities || activities.length === 0) return;
+    const seen = new Set(activities.map(activity => activity.id));
+    recentActivities = activities.concat(recentActivities.filter(activity => !seen.has(activity.id))).slice(0, 20);
+    activityCursor = Math.max(activityCursor || 0, ...activities.map(activity => activity.seq || 0));
+    updateActivityTicker(recentActivities.map(activity => ({ message: activity.content })));
+}
+
 async function loadRealActivityMessages() {
     try {
-        const response = await api.activity.getRecentActivity();
+        const response = await api.activity.getRecentActivity(activityCursor);
         
-        if (response.success && response.messages) {
-            displayActivityMessages(response.messages);
-        } else {
-            displayActivityMessages(getMockActivityMessages());
+        if (response.success && response.activities) {
+            mergeActivities(response.activities);
         }
     } catch (error) {
-        // API not ready yet - silently use mock data
-        displayActivityMessages(getMockActivityMessages());
+        // API not ready yet - keep the current ticker
     }
 }
 
@@ -86,8 +95,17 @@ function startLiveUpdates() {
     // Refresh real data every 30 seconds
     setInterval(loadRealActivityData, 30000);
     
-    // Update activity ticker every 10 seconds
-    setInterval(loadRealActivityMessages, 10000);
+    // Load the feed once, then follow pushed `activity` events
+    loadRealActivityMessages();
+    if (typeof io !== 'undefined') {
+        const socket = io();
+        socket.on('activity', (activity) => mergeActivities([activity]));
+        // Catch up on anything missed while disconnected
+        socket.on('connect', () => loadRealActivityMessages());
+    } else {
+        // No Socket.IO client on this page - slow cursor-based polling
+        setInterval(loadRealActivityMessages, 60000);
+    }
 }
 
 // 5. UPDATE STAT ELEMENT WITH ANIMATION
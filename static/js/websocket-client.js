@@ -14,6 +14,11 @@ class WebSocketClient {
         this.messageHandlers = new Map();
         this.typingUsers = new Map();
         this.userPresence = new Map();
+        this.voiceRoomId = null;
+        this.voiceConfig = null;
+        this.localVoiceStream = null;
+        this.peerConnections = new Map();
+        this.pendingIceCandidates = new Map();
         
         console.log('🔌 WebSocket Client initialized');
     }
@@ -115,6 +120,36 @@ class WebSocketClient {
         this.socket.on('friend_accepted', (data) => {
             this.handleFriendAccepted(data);
         });
+
+        // Voice chat signaling
+        this.socket.on('voice_joined', (data) => {
+            this.handleVoiceJoined(data);
+        });
+
+        this.socket.on('user_left_voice', (data) => {
+            this.closePeerConnection(data.user_id);
+        });
+
+        this.socket.on('webrtc_offer_received', (data) => {
+            this.handleWebRTCOffer(data);
+        });
+
+        this.socket.on('webrtc_answer_received', (data) => {
+            this.handleWebRTCAnswer(data);
+        });
+
+        this.socket.on('webrtc_ice_candidate_received', (data) => {
+            this.addIceCandidates(data.from_user_id, [data.candidate]);
+        });
+
+        // Trickle candidates coalesced by the server relay
+        this.socket.on('webrtc_ice_candidates_received', (data) => {
+            this.addIceCandidates(data.from_user_id, data.candidates || []);
+        });
+
+        this.socket.on('voice_error', (data) => {
+            console.error('🎙️ Voice error:', data.message || data.error);
+        });
     }
 
     // Reconnection logic
@@ -338,6 +373,157 @@ class WebSocketClient {
         this.socket.emit('update_online_status', { online: isOnline });
     }
 
+    joinVoice(roomId) {
+        if (!this.connected) {
+            console.warn('🔌 Not connected to WebSocket');
+            return;
+        }
+
+        this.socket.emit('voice_join_request', { room_id: roomId });
+    }
+
+    leaveVoice() {
+        if (this.voiceRoomId === null) return;
+
+        if (this.connected) {
+            this.socket.emit('voice_leave_request', { room_id: this.voiceRoomId });
+        }
+
+        Array.from(this.peerConnections.keys()).forEach((userId) => this.closePeerConnection(userId));
+        if (this.localVoiceStream) {
+            this.localVoiceStream.getTracks().forEach((track) => track.stop());
+            this.localVoiceStream = null;
+        }
+        this.voiceRoomId = null;
+        console.log('🎙️ Left voice chat');
+    }
+
+    // Voice chat - WebRTC peer connections
+    async handleVoiceJoined(data) {
+        this.voiceRoomId = data.room_id;
+        this.voiceConfig = data.webrtc_config;
+
+        try {
+            this.localVoiceStream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        } catch (error) {
+            console.error('🎙️ Microphone unavailable:', error);
+            this.leaveVoice();
+            return;
+        }
+
+        // The newcomer offers to everyone already in the session
+        const selfId = data.user_participant.user_id;
+        for (const participant of data.voice_session.participants) {
+            if (participant.user_id === selfId) continue;
+
+            const pc = this.getPeerConnection(participant.user_id);
+            const offer = await pc.createOffer();
+            await pc.setLocalDescription(offer);
+            this.socket.emit('webrtc_offer', {
+                room_id: this.voiceRoomId,
+                target_user_id: participant.user_id,
+                offer: pc.localDescription
+            });
+        }
+    }
+
+    async handleWebRTCOffer(data) {
+        if (data.room_id !== this.voiceRoomId) return;
+
+        const pc = this.getPeerConnection(data.from_user_id);
+        await pc.setRemoteDescription(data.offer);
+        await this.flushIceCandidates(data.from_user_id);
+
+        const answer = await pc.createAnswer();
+        await pc.setLocalDescription(answer);
+        this.socket.emit('webrtc_answer', {
+            room_id: this.voiceRoomId,
+            target_user_id: data.from_user_id,
+            answer: pc.localDescription
+        });
+    }
+
+    async handleWebRTCAnswer(data) {
+        const pc = this.peerConnections.get(data.from_user_id);
+        if (!pc) return;
+
+        await pc.setRemoteDescription(data.answer);
+        await this.flushIceCandidates(data.from_user_id);
+    }
+
+    async addIceCandidates(userId, candidates) {
+        const pc = this.peerConnections.get(userId);
+
+        // Candidates can arrive before the remote description - hold them until it is set
+        if (!pc || !pc.remoteDescription) {
+            const pending = this.pendingIceCandidates.get(userId) || [];
+            this.pendingIceCandidates.set(userId, pending.concat(candidates));
+            return;
+        }
+
+        for (const candidate of candidates) {
+            try {
+                await pc.addIceCandidate(candidate);
+            } catch (error) {
+                console.warn('🎙️ Failed to add ICE candidate:', error);
+            }
+        }
+    }
+
+    async flushIceCandidates(userId) {
+        const pending = this.pendingIceCandidates.get(userId);
+        if (!pending) return;
+
+        this.pendingIceCandidates.delete(userId);
+        await this.addIceCandidates(userId, pending);
+    }
+
+    getPeerConnection(userId) {
+        if (this.peerConnections.has(userId)) {
+            return this.peerConnections.get(userId);
+        }
+
+        const config = this.voiceConfig || { stun_servers: [], turn_servers: [] };
+        const pc = new RTCPeerConnection({
+            iceServers: [{ urls: config.stun_servers }].concat(config.turn_servers)
+        });
+
+        if (this.localVoiceStream) {
+            this.localVoiceStream.getTracks().forEach((track) => pc.addTrack(track, this.localVoiceStream));
+        }
+
+        pc.onicecandidate = (event) => {
+            if (!event.candidate) return;
+            this.socket.emit('webrtc_ice_candidate', {
+                room_id: this.voiceRoomId,
+                target_user_id: userId,
+                candidate: event.candidate
+            });
+        };
+
+        pc.ontrack = (event) => {
+            const audio = new Audio();
+            audio.srcObject = event.streams[0];
+            audio.play().catch((error) => console.warn('🎙️ Audio playback blocked:', error));
+            pc.remoteAudio = audio;
+        };
+
+        this.peerConnections.set(userId, pc);
+        return pc;
+    }
+
+    closePeerConnection(userId) {
+        const pc = this.peerConnections.get(userId);
+        if (pc) {
+            if (pc.remoteAudio) {
+                pc.remoteAudio.srcObject = null;
+            }
+            pc.close();
+            this.peerConnections.delete(userId);
+        }
+        this.pendingIceCandidates.delete(userId);
+    }
+
     // Message handler registration
     registerMessageHandler(chatId, handler) {
         this.messageHandlers.set(chatId, handler);
@@ -406,6 +592,7 @@ class WebSocketClient {
 
     // Cleanup
     disconnect() {
+        this.leaveVoice();
         if (this.socket) {
             this.socket.disconnect();
             this.socket = null;
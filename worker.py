@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Background job worker
+Runs queued jobs (OCR, cache backfills, phrase cleanup) outside the web process
+
+Usage: python worker.py [workers]
+Web processes run their own job workers by default. To move jobs here, set
+JOB_WORKERS_IN_PROCESS=false on the web app and point JOB_QUEUE_BACKEND/JOB_QUEUE_PATH
+(or REDIS_URL) at the same queue - with the SQLite queue this process must run on the
+same host and in the same directory, since ID verification uploads are saved locally.
+"""
+
+import os
+import sys
+
+# This process is the worker pool; skip the web app's own workers and background refreshers
+os.environ['JOB_WORKERS_IN_PROCESS'] = 'false'
+os.environ.setdefault('USER_STATS_BACKGROUND_REFRESH', 'false')
+os.environ.setdefault('SERVICE_WARMUP', 'false')
+
+from main import app
+from services.job_queue import get_job_queue
+
+if __name__ == '__main__':
+    get_job_queue().run_forever(app, workers=int(sys.argv[1]) if len(sys.argv) > 1 else None)